@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Async concurrency benchmark for ToneSoul System
+語魂系統非同步並行基準測試
+
+Fires N concurrent requests on one event loop and compares the blocking
+call path (sync process_sentence inside a coroutine, as /v1/process used to
+do) with process_sentence_async. --handler-delay-ms simulates a functional
+module waiting on I/O (e.g. a remote knowledge lookup). The result cache
+and request coalescing are disabled so that every request runs the modules.
+    
+    python benchmarks/async_concurrency.py --requests 200 --concurrency 32 --handler-delay-ms 20
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# 需在匯入 src.main 之前設定：固定的幾個句子會全部命中快取或合併成同一次執行，跳過模擬的模組延遲
+os.environ["TONESOUL_RESULT_CACHE_SIZE"] = "0"
+os.environ["TONESOUL_COALESCE_REQUESTS"] = "0"
+
+from src.main import tonesoul_service  # noqa: E402
+from src.core.quantile_sketch import DDSketch  # noqa: E402
+
+SENTENCES = [
+    "謝謝你的幫助。",
+    "我承諾明天完成報告",
+    "什麼是人工智慧？",
+    "你好，今天天氣怎麼樣？",
+    "這個服務真的很糟糕",
+    "請幫我打開檔案",
+]
+
+
+def add_handler_delay(delay_ms: float) -> None:
+    """讓每個功能模組在處理前等待 delay_ms，模擬 I/O 延遲"""
+    if delay_ms <= 0:
+        return
+    
+    for module in tonesoul_service.modules.values():
+        for name in ("process_batch", "process_vow_batch"):
+            original = getattr(module, name, None)
+            if original is None:
+                continue
+            
+            def delayed(router_outputs, _original=original):
+                time.sleep(delay_ms / 1000)
+                return _original(router_outputs)
+            
+            setattr(module, name, delayed)
+
+
+async def run(mode: str, total: int, concurrency: int) -> dict:
+    """以指定模式送出 total 個請求，最多 concurrency 個同時進行"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = DDSketch()
+    
+    async def one(index: int) -> None:
+        sentence = SENTENCES[index % len(SENTENCES)]
+        async with semaphore:
+            start = time.perf_counter()
+            if mode == "blocking":
+                result = tonesoul_service.process_sentence(sentence)
+            else:
+                result = await tonesoul_service.process_sentence_async(sentence)
+            latencies.add((time.perf_counter() - start) * 1000)
+            assert result["success"], result["module_response"]
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(total)))
+    elapsed = time.perf_counter() - start
+    await tonesoul_service.drain_background_tasks()
+    
+    return {
+        "mode": mode,
+        "requests": total,
+        "elapsed_s": elapsed,
+        "throughput_rps": total / elapsed,
+        "p50_ms": latencies.quantile(0.5),
+        "p99_ms": latencies.quantile(0.99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ToneSoul async concurrency benchmark")
+    parser.add_argument("--requests", type=int, default=200, help="Number of requests per mode")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent requests in flight")
+    parser.add_argument("--handler-delay-ms", type=float, default=20.0,
+                        help="Simulated I/O wait inside each functional module")
+    args = parser.parse_args()
+    
+    add_handler_delay(args.handler_delay_ms)
+    
+    print("ToneSoul Async Concurrency Benchmark | 語魂系統非同步並行基準測試")
+    print(f"requests={args.requests} concurrency={args.concurrency} handler_delay_ms={args.handler_delay_ms}")
+    print("=" * 72)
+    
+    results = [asyncio.run(run(mode, args.requests, args.concurrency)) for mode in ("blocking", "async")]
+    for result in results:
+        print(f"{result['mode']:>8}: {result['throughput_rps']:8.1f} req/s  "
+              f"p50 {result['p50_ms']:7.1f} ms  p99 {result['p99_ms']:7.1f} ms  "
+              f"({result['elapsed_s']:.2f}s)")
+    
+    print("=" * 72)
+    print(f"Concurrency gain | 並行提升: {results[1]['throughput_rps'] / results[0]['throughput_rps']:.1f}x")
+    tonesoul_service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
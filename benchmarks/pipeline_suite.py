@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Pipeline benchmark suite for ToneSoul System
+語魂系統管線基準測試套件
+
+Runs three groups of benchmarks on a seeded synthetic corpus that covers every
+ToneFunction (see sentence_generator.py):
+
+- stage.*      per-item cost of ToneBridge, ToneFunctionClassifier,
+               ToneStrategicRouter, each functional module (including
+               VowChecker) and each evolution module
+- e2e.*        ToneSoulService.process_sentence without evolution and with
+               inline evolution
+- asgi.*       in-process ASGI throughput of POST /v1/process under concurrency
+
+Results are written as JSON. With --baseline each benchmark is compared with a
+saved run, and changes beyond --threshold are reported as regressions.
+The result cache is disabled unless --with-cache is given, so repeated runs
+measure the pipeline itself.
+    
+    python benchmarks/pipeline_suite.py --output bench_results.json
+    python benchmarks/pipeline_suite.py --baseline bench_results.json --fail-on-regression
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from sentence_generator import SentenceGenerator  # noqa: E402
+
+RESULT_VERSION = 1
+
+
+def measure(run: Callable[[], Any], items: int, repeat: int,
+            prepare: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+    """
+    重複執行 run 並以中位數回報每筆耗時
+    
+    Args:
+        run: 被量測的函數；提供 prepare 時以 prepare 的返回值為參數
+        items: 每次執行處理的筆數
+        repeat: 重複次數
+        prepare: 每次執行前的準備工作（不計時）
+    
+    Returns:
+        每筆耗時（微秒）的中位數、最小值與每秒處理筆數
+    """
+    samples = []
+    for _ in range(repeat):
+        arguments = (prepare(),) if prepare is not None else ()
+        start = time.perf_counter_ns()
+        run(*arguments)
+        samples.append((time.perf_counter_ns() - start) / 1000 / max(items, 1))
+    median = statistics.median(samples)
+    return {
+        "unit": "us/op",
+        "value": round(median, 3),
+        "min": round(min(samples), 3),
+        "ops_per_s": round(1e6 / median, 1) if median else None,
+        "higher_is_better": False
+    }
+
+
+def bench_stages(corpus: List[str], repeat: int) -> Dict[str, Dict[str, Any]]:
+    """各管線階段、功能模組與進化模組的微基準"""
+    from src.core.adaptive_learning_module import AdaptiveLearningModule
+    from src.core.knowledge_evolution_module import KnowledgeEvolutionModule
+    from src.core.metacognitive_module import MetacognitiveModule
+    from src.core.module_registry import create_functional_modules
+    from src.core.tone_bridge import ToneBridge
+    from src.core.tone_function_classifier import ToneFunctionClassifier
+    from src.core.tone_strategic_router import ToneStrategicRouter
+    from src.core.vow_checker import VowChecker
+    from src.core.vow_store import VowStore
+    
+    bridge = ToneBridge(compact_trace=True)
+    classifier = ToneFunctionClassifier()
+    router = ToneStrategicRouter()
+    count = len(corpus)
+    results = {
+        "stage.tone_bridge": measure(lambda: bridge.analyze_batch(corpus), count, repeat),
+        "stage.tone_function_classifier": measure(
+            classifier.classify_batch, count, repeat, prepare=lambda: bridge.analyze_batch(corpus)
+        ),
+        "stage.tone_strategic_router": measure(
+            router.route_batch, count, repeat,
+            prepare=lambda: classifier.classify_batch(bridge.analyze_batch(corpus))
+        ),
+    }
+    
+    # 功能模組：依路由結果分組，每組交給對應模組整批處理
+    routes = defaultdict(list)
+    for index, router_output in enumerate(router.route_batch(classifier.classify_batch(bridge.analyze_batch(corpus)))):
+        routes[router_output["next_strategy"]["next_module"]].append(index)
+    
+    for next_module, indices in sorted(routes.items()):
+        sentences = [corpus[i] for i in indices]
+        
+        def prepare(sentences=sentences):
+            modules = create_functional_modules(VowChecker(vow_store=VowStore()))
+            return modules, router.route_batch(classifier.classify_batch(bridge.analyze_batch(sentences)))
+        
+        def run(prepared, next_module=next_module):
+            modules, router_outputs = prepared
+            if next_module == "vow_checker_module":
+                return modules[next_module].process_vow_batch(router_outputs)
+            return modules[next_module].process_batch(router_outputs)
+        
+        results[f"stage.{next_module}"] = measure(run, len(sentences), repeat, prepare=prepare)
+    
+    # 進化模組：以完整處理後的追溯鏈為輸入，每次重複使用新的模組實例
+    modules = create_functional_modules(VowChecker(vow_store=VowStore()))
+    traces = []
+    for next_module, indices in routes.items():
+        router_outputs = router.route_batch(classifier.classify_batch(bridge.analyze_batch([corpus[i] for i in indices])))
+        method = "process_vow_batch" if next_module == "vow_checker_module" else "process_batch"
+        traces.extend(output["source_trace"] for output in getattr(modules[next_module], method)(router_outputs))
+    context = {"user_satisfaction": 0.8, "response_time": 5}
+    
+    evolution = {
+        "adaptive_learning": (AdaptiveLearningModule, "process_interaction"),
+        "metacognitive": (MetacognitiveModule, "monitor_cognitive_process"),
+        "knowledge_evolution": (KnowledgeEvolutionModule, "process_knowledge_evolution"),
+    }
+    for name, (module_class, method) in evolution.items():
+        def run(module, method=method):
+            process = getattr(module, method)
+            for source_trace in traces:
+                process(source_trace, context)
+        
+        results[f"stage.evolution.{name}"] = measure(run, len(traces), repeat, prepare=module_class)
+    
+    return results
+
+
+def bench_e2e(corpus: List[str], repeat: int) -> Dict[str, Dict[str, Any]]:
+    """ToneSoulService.process_sentence 的端到端基準（不含進化與同步執行進化）"""
+    from src.main import ToneSoulService
+    
+    results = {}
+    for name, sync_evolution in (("e2e.process_sentence", False), ("e2e.process_sentence_with_evolution", True)):
+        service = ToneSoulService()
+        if not sync_evolution:
+            # 只量測請求路徑，不把工作交給背景進化管線
+            service._run_evolution = lambda *args, **kwargs: None
+        
+        def run():
+            for sentence in corpus:
+                service.process_sentence(sentence, sync_evolution=sync_evolution)
+        
+        results[name] = measure(run, len(corpus), repeat)
+        service.shutdown()
+    return results
+
+
+def bench_asgi(corpus: List[str], concurrency: int, repeat: int) -> Dict[str, Dict[str, Any]]:
+    """以 httpx 的 ASGI 傳輸在行程內量測 POST /v1/process 的吞吐量"""
+    import httpx
+    from src.core.quantile_sketch import DDSketch
+    from src.main import app, tonesoul_service
+    
+    async def run_once() -> Dict[str, float]:
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies = DDSketch()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            async def one(sentence: str) -> None:
+                async with semaphore:
+                    start = time.perf_counter_ns()
+                    response = await client.post("/v1/process", json={"sentence": sentence})
+                    latencies.add((time.perf_counter_ns() - start) / 1e6)
+                    response.raise_for_status()
+            
+            start = time.perf_counter_ns()
+            await asyncio.gather(*(one(sentence) for sentence in corpus))
+            elapsed = (time.perf_counter_ns() - start) / 1e9
+        await tonesoul_service.drain_background_tasks()
+        return {"rps": len(corpus) / elapsed, "p50": latencies.quantile(0.5), "p99": latencies.quantile(0.99)}
+    
+    runs = [asyncio.run(run_once()) for _ in range(repeat)]
+    tonesoul_service.evolution_pipeline.flush(timeout=30)
+    rps = statistics.median(run["rps"] for run in runs)
+    return {
+        "asgi.process.throughput": {
+            "unit": "req/s", "value": round(rps, 1), "max": round(max(run["rps"] for run in runs), 1),
+            "concurrency": concurrency, "higher_is_better": True
+        },
+        "asgi.process.p50_latency": {
+            "unit": "ms", "value": round(statistics.median(run["p50"] for run in runs), 3), "higher_is_better": False
+        },
+        "asgi.process.p99_latency": {
+            "unit": "ms", "value": round(statistics.median(run["p99"] for run in runs), 3), "higher_is_better": False
+        },
+    }
+
+
+def tone_function_coverage(corpus) -> Dict[str, Dict[str, int]]:
+    """產生的語氣功能與分類器實際判定的對照，用於確認語料涵蓋每個分類分支"""
+    from src.core.tone_bridge import ToneBridge
+    from src.core.tone_function_classifier import ToneFunctionClassifier
+    
+    outputs = ToneFunctionClassifier().classify_batch(ToneBridge().analyze_batch([sentence for _, sentence in corpus]))
+    coverage: Dict[str, Counter] = defaultdict(Counter)
+    for (expected, _), output in zip(corpus, outputs):
+        coverage[expected.value][output["tone_function"].value] += 1
+    return {expected: dict(counts) for expected, counts in coverage.items()}
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any], threshold: float) -> Dict[str, Dict[str, Any]]:
+    """
+    與基準結果比較
+    
+    Args:
+        results: 本次的基準結果
+        baseline: 先前保存的結果檔內容
+        threshold: 視為退步或進步的相對變化門檻（例如 0.1 表示 10%）
+    
+    Returns:
+        每個基準的基準值、本次數值、變化比例與 regression / improvement / unchanged / new 狀態
+    """
+    comparison = {}
+    previous = baseline.get("benchmarks", {})
+    for name, current in results.items():
+        if name not in previous or not previous[name].get("value"):
+            comparison[name] = {"status": "new", "current": current["value"]}
+            continue
+        before = previous[name]["value"]
+        change = (current["value"] - before) / before
+        worse = -change if current.get("higher_is_better") else change
+        if worse > threshold:
+            status = "regression"
+        elif worse < -threshold:
+            status = "improvement"
+        else:
+            status = "unchanged"
+        comparison[name] = {"status": status, "baseline": before, "current": current["value"], "change": round(change, 4)}
+    return comparison
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=Path(__file__).parent, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="ToneSoul pipeline benchmark suite")
+    parser.add_argument("--sentences", type=int, default=600, help="Corpus size (spread evenly over every ToneFunction)")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetitions per benchmark; the median is reported")
+    parser.add_argument("--seed", type=int, default=42, help="Corpus random seed")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent requests for the ASGI benchmark")
+    parser.add_argument("--only", choices=["stage", "e2e", "asgi"], action="append",
+                        help="Run only the given benchmark group (repeatable)")
+    parser.add_argument("--with-cache", action="store_true", help="Keep the result cache enabled")
+    parser.add_argument("--output", "-o", help="Write results as JSON to this path")
+    parser.add_argument("--baseline", help="Compare against a previously written results file")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative change treated as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with status 1 on any regression")
+    args = parser.parse_args(argv)
+    
+    if not args.with_cache:
+        # 需在匯入 src.main 之前設定
+        os.environ["TONESOUL_RESULT_CACHE_SIZE"] = "0"
+    groups = set(args.only or ["stage", "e2e", "asgi"])
+    
+    corpus = SentenceGenerator(seed=args.seed).generate(args.sentences)
+    sentences = [sentence for _, sentence in corpus]
+    
+    print("ToneSoul Pipeline Benchmark Suite | 語魂系統管線基準測試套件", file=sys.stderr)
+    print(f"sentences={args.sentences} repeat={args.repeat} seed={args.seed}", file=sys.stderr)
+    
+    benchmarks: Dict[str, Dict[str, Any]] = {}
+    if "stage" in groups:
+        benchmarks.update(bench_stages(sentences, args.repeat))
+    if "e2e" in groups:
+        benchmarks.update(bench_e2e(sentences, args.repeat))
+    if "asgi" in groups:
+        benchmarks.update(bench_asgi(sentences, args.concurrency, args.repeat))
+    
+    report = {
+        "version": RESULT_VERSION,
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sentences": args.sentences,
+            "repeat": args.repeat,
+            "seed": args.seed,
+            "result_cache": args.with_cache
+        },
+        "coverage": tone_function_coverage(corpus),
+        "benchmarks": benchmarks
+    }
+    
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            report["comparison"] = compare(benchmarks, json.load(f), args.threshold)
+        regressions = [name for name, entry in report["comparison"].items() if entry["status"] == "regression"]
+    
+    print("=" * 72, file=sys.stderr)
+    for name, entry in benchmarks.items():
+        line = f"{name:<48} {entry['value']:>12,.3f} {entry['unit']}"
+        if "comparison" in report and "change" in report["comparison"][name]:
+            result = report["comparison"][name]
+            line += f"  {result['change']:+.1%} {result['status']}"
+        print(line, file=sys.stderr)
+    print("=" * 72, file=sys.stderr)
+    
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+        print(f"Results written to {args.output} | 結果已寫入", file=sys.stderr)
+    else:
+        print(output)
+    
+    if regressions:
+        print(f"⚠️  Regressions beyond {args.threshold:.0%}: {', '.join(regressions)}", file=sys.stderr)
+        if args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+Synthetic Traditional Chinese sentence generator for ToneSoul benchmarks
+語魂系統基準測試用的繁體中文合成句子產生器
+
+Each ToneFunction has its own templates and slot values, so a generated corpus
+exercises every classification branch, route and functional module. The
+generator is seeded, so the same arguments always yield the same corpus and
+benchmark runs stay comparable across releases.
+"""
+
+import random
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.core.tone_function_classifier import ToneFunction
+
+# 填入模板的詞彙
+SLOTS: Dict[str, Sequence[str]] = {
+    "time": ["明天", "今天下午", "下週一", "這個週末", "月底前", "三天內"],
+    "task": ["季度報告", "專案企劃", "測試案例", "會議紀錄", "預算表", "設計稿"],
+    "doc": ["合約草稿", "簡報檔案", "使用手冊", "會議紀錄", "需求文件", "行程表"],
+    "skill": ["設定每日提醒", "備份手機照片", "申請退款", "更新作業系統", "匯出報表", "重設密碼"],
+    "concept": ["人工智慧", "語魂系統", "雲端運算", "區塊鏈", "量子電腦", "機器學習"],
+    "place": ["最近的捷運站", "客服中心", "總公司", "附近的郵局", "停車場入口"],
+    "product": ["新手機", "外送服務", "網路連線", "售後服務", "應用程式"],
+    "event": ["專案延期", "系統當機", "會議取消", "航班延誤", "訂單出錯"],
+    "feeling": ["好累", "好難過", "很失落", "很焦慮", "很沮喪"],
+    "person": ["王經理", "陳老師", "林小姐", "客服人員", "團隊成員"],
+    "team": ["研發團隊", "行銷部門", "設計小組", "客服團隊"],
+}
+
+# 各 ToneFunction 的模板；UNKNOWN 只有空白輸入會被分類到
+TEMPLATES: Dict[ToneFunction, Sequence[str]] = {
+    ToneFunction.INSTRUCTIONAL: [
+        "如何{skill}？",
+        "{task}要怎麼做才能{time}完成？",
+        "遇到{event}該怎麼辦？",
+    ],
+    ToneFunction.FACTUAL_INQUIRY: [
+        "什麼是{concept}？",
+        "為什麼會發生{event}？",
+        "{place}在哪裡？",
+        "{concept}是何時出現的？",
+    ],
+    ToneFunction.OPINION_SEEKING: [
+        "你覺得{product}怎麼樣？",
+        "你對{concept}有什麼看法？",
+        "你認為{team}的提案可行嗎？",
+    ],
+    ToneFunction.VOW_DECLARATION: [
+        "我承諾{time}完成{task}",
+        "我保證{time}把{doc}交給{person}",
+        "我答應你{time}整理好{doc}",
+        "我發誓{time}不再拖延{task}",
+    ],
+    ToneFunction.STATEMENT_DECLARATION: [
+        "{team}{time}會發布新版本。",
+        "這份{doc}已經更新到最新版本。",
+        "{concept}是今年最重要的方向。",
+    ],
+    ToneFunction.EMOTIONAL_VENT: [
+        "{event}讓我{feeling}，心情一直很低落。",
+        "我真的{feeling}，{task}完全沒有照計畫走。",
+    ],
+    ToneFunction.APPRECIATION: [
+        "謝謝你{time}提醒我{task}的事。",
+        "感謝{person}的協助，結果很棒！",
+        "太好了，{doc}終於完成了。",
+    ],
+    ToneFunction.COMPLAINT: [
+        "這個{product}真的很糟糕",
+        "我對{product}非常不滿",
+        "{event}一直發生，好煩。",
+    ],
+    ToneFunction.ACTION_REQUEST: [
+        "請把{doc}寄給{person}",
+        "請在{time}開啟{doc}",
+        "請安排{time}的會議",
+    ],
+    ToneFunction.ASSISTANCE_SEEKING: [
+        "可以幫忙看一下{doc}嗎",
+        "我需要有人協助處理{task}",
+        "{team}需要技術支援",
+    ],
+    ToneFunction.CASUAL_CHAT: [
+        "你好，{time}天氣不錯。",
+        "早安！今天也要加油。",
+        "嗨，好久不見。",
+    ],
+    ToneFunction.UNKNOWN: [
+        " ",
+        "　",
+    ],
+}
+
+
+class SentenceGenerator:
+    """依 ToneFunction 輪流產生合成句子的可重現產生器"""
+    
+    def __init__(self, seed: int = 42, tone_functions: Optional[Sequence[ToneFunction]] = None):
+        """
+        Args:
+            seed: 亂數種子
+            tone_functions: 要產生的語氣功能，預設為全部
+        """
+        self.random = random.Random(seed)
+        self.tone_functions = list(tone_functions or TEMPLATES)
+    
+    def sentence(self, tone_function: ToneFunction) -> str:
+        """產生一個屬於 tone_function 的句子"""
+        template = self.random.choice(TEMPLATES[tone_function])
+        return template.format(**{name: self.random.choice(values) for name, values in SLOTS.items()})
+    
+    def generate(self, count: int) -> List[Tuple[ToneFunction, str]]:
+        """
+        產生 count 個句子，各語氣功能輪流出現
+        
+        Returns:
+            (預期的語氣功能, 句子) 列表
+        """
+        return [
+            (tone_function, self.sentence(tone_function))
+            for tone_function in (self.tone_functions[i % len(self.tone_functions)] for i in range(count))
+        ]
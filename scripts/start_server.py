@@ -8,6 +8,7 @@ import subprocess
 import sys
 import os
 import argparse
+import secrets
 from pathlib import Path
 
 
@@ -32,6 +33,18 @@ def main():
         action="store_true", 
         help="Enable auto-reload for development | 啟用開發模式自動重載"
     )
+    parser.add_argument(
+        "--workers", 
+        type=int, 
+        default=1, 
+        help="Worker processes; more than 1 starts a state coordinator | 工作行程數，大於 1 時啟動狀態協調者"
+    )
+    parser.add_argument(
+        "--coordinator-port", 
+        type=int, 
+        default=0, 
+        help="Local port for the state coordinator (0 = any free port) | 狀態協調者的本機端口"
+    )
     parser.add_argument(
         "--log-level", 
         default="info", 
@@ -41,6 +54,9 @@ def main():
     
     args = parser.parse_args()
     
+    if args.workers > 1 and args.reload:
+        parser.error("--reload cannot be combined with --workers")
+    
     # Change to project root
     project_root = Path(__file__).parent.parent
     os.chdir(project_root)
@@ -50,6 +66,7 @@ def main():
     print(f"Host: {args.host}")
     print(f"Port: {args.port}")
     print(f"Reload: {args.reload}")
+    print(f"Workers: {args.workers}")
     print(f"Log Level: {args.log_level}")
     print(f"Working Directory: {os.getcwd()}")
     print("=" * 60)
@@ -66,6 +83,20 @@ def main():
     if args.reload:
         command.append("--reload")
     
+    env = os.environ.copy()
+    coordinator = None
+    if args.workers > 1:
+        # 各工作行程透過本機協調者共用學習與誓言狀態
+        sys.path.insert(0, str(project_root))
+        from src.core.state_coordinator import start_coordinator_process
+        
+        authkey = secrets.token_hex(16)
+        coordinator, address = start_coordinator_process(("127.0.0.1", args.coordinator_port), authkey.encode())
+        env["TONESOUL_COORDINATOR_ADDRESS"] = f"{address[0]}:{address[1]}"
+        env["TONESOUL_COORDINATOR_AUTHKEY"] = authkey
+        command.extend(["--workers", str(args.workers)])
+        print(f"State coordinator listening on {address[0]}:{address[1]} | 狀態協調者已啟動")
+    
     print(f"Starting server with command: {' '.join(command)}")
     print("\n🚀 Server starting... | 服務器啟動中...")
     print(f"📖 API Documentation: http://{args.host}:{args.port}/docs")
@@ -75,7 +106,7 @@ def main():
     print("=" * 60)
     
     try:
-        subprocess.run(command, check=True)
+        subprocess.run(command, check=True, env=env)
     except KeyboardInterrupt:
         print("\n\n🛑 Server stopped by user | 服務器被用戶停止")
     except subprocess.CalledProcessError as e:
@@ -85,6 +116,9 @@ def main():
         print("\n❌ uvicorn not found. Please install dependencies:")
         print("pip install -r requirements.txt")
         return 1
+    finally:
+        if coordinator is not None:
+            coordinator.terminate()
     
     return 0
 
@@ -15,8 +15,7 @@ setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     url="https://github.com/yourusername/tonesoul-system",
-    packages=find_packages(where="src"),
-    package_dir={"": "src"},
+    packages=find_packages(include=["src", "src.*"]),
     classifiers=[
         "Development Status :: 4 - Beta",
         "Intended Audience :: Developers",
@@ -41,7 +40,7 @@ setup(
     },
     entry_points={
         "console_scripts": [
-            "tonesoul=main:app",
+            "tonesoul=src.cli:main",
         ],
     },
 )
\ No newline at end of file
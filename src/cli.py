@@ -0,0 +1,481 @@
+# file: src/cli.py
+"""
+ToneSoul 離線批次命令列工具
+
+不經 HTTP，直接以多行程執行 ToneBridge → ToneFunctionClassifier → ToneStrategicRouter → 功能模組，
+處理 JSONL 或純文字語料，輸出分片的 JSONL 結果，支援檢查點續跑並列印吞吐量摘要。
+index 子命令把 FAQ 語料建成 QAModule 與 KnowledgeBaseModule 使用的知識庫索引。
+    
+    tonesoul batch logs/*.jsonl.gz --output-dir out/ --workers 8
+    tonesoul batch logs/*.jsonl.gz --output-dir out/ --resume
+    tonesoul index faq.jsonl --output-dir knowledge-index/
+"""
+import argparse
+import concurrent.futures
+import gzip
+import json
+import logging
+import os
+import sys
+import time
+from collections import Counter, defaultdict, deque
+from typing import Any, Dict, IO, Iterator, List, Optional, Sequence, Tuple
+
+from src.core.tone_bridge import ToneBridge
+from src.core.tone_function_classifier import ToneFunctionClassifier
+from src.core.tone_strategic_router import ToneStrategicRouter
+from src.core.vow_checker import VowChecker
+from src.core.vow_store import VowStore
+from src.core.module_registry import create_functional_modules
+from src.core.knowledge_corpus import KnowledgeIndex, build_index, read_corpus
+
+CHECKPOINT_FILE = "checkpoint.json"
+CHECKPOINT_VERSION = 1
+
+# (chunk_id, 來源檔案, 起始行號, 原始行列表)
+Chunk = Tuple[int, str, int, List[str]]
+
+
+class OfflinePipeline:
+    """
+    工作行程內的處理流程
+    
+    與服務端相同的四個階段整批執行，但不經准入排程與模組期限，也不執行進化處理；
+    誓言只保存在工作行程內的 VowStore，並隨結果輸出。
+    """
+    
+    def __init__(self, knowledge_index: Optional[str] = None):
+        """
+        Args:
+            knowledge_index: 知識庫索引目錄（各工作行程以記憶體映射共用）
+        """
+        self.bridge = ToneBridge(compact_trace=True)
+        self.classifier = ToneFunctionClassifier()
+        self.router = ToneStrategicRouter()
+        self.vow_checker = VowChecker(vow_store=VowStore())
+        self.modules = create_functional_modules(
+            self.vow_checker, KnowledgeIndex.load(knowledge_index) if knowledge_index else None
+        )
+    
+    def process(self, sentences: List[str], trace_ids: List[Optional[str]]) -> List[dict]:
+        """整批處理句子，返回與輸入順序一致的模組輸出"""
+        bridge_outputs = self.bridge.analyze_batch(sentences, trace_ids)
+        classifier_outputs = self.classifier.classify_batch(bridge_outputs)
+        router_outputs = self.router.route_batch(classifier_outputs)
+        
+        groups: Dict[str, List[int]] = defaultdict(list)
+        for index, router_output in enumerate(router_outputs):
+            next_module = router_output["next_strategy"]["next_module"]
+            groups[next_module if next_module in self.modules else "default_handler_module"].append(index)
+        
+        final_outputs: List[Optional[dict]] = [None] * len(sentences)
+        for next_module, indices in groups.items():
+            batch = [router_outputs[i] for i in indices]
+            if next_module == "vow_checker_module":
+                results = self.vow_checker.process_vow_batch(batch)
+            else:
+                results = self.modules[next_module].process_batch(batch)
+            for i, result in zip(indices, results):
+                final_outputs[i] = result
+        return final_outputs
+
+
+_pipeline: Optional[OfflinePipeline] = None
+_options: Dict[str, Any] = {}
+
+
+def _init_worker(options: Dict[str, Any]) -> None:
+    """工作行程初始化：每個行程建立一次處理流程"""
+    global _pipeline, _options
+    logging.getLogger().setLevel(logging.WARNING)
+    _pipeline = OfflinePipeline(options.get("knowledge_index"))
+    _options = options
+
+
+def _parse_line(line: str, input_format: str, field: str, id_field: Optional[str]) -> Tuple[str, Optional[str]]:
+    if input_format == "text":
+        return line.strip(), None
+    data = json.loads(line)
+    if isinstance(data, str):
+        return data, None
+    if not isinstance(data, dict):
+        raise ValueError("expected a JSON object or string")
+    sentence = data.get(field)
+    if not isinstance(sentence, str):
+        raise ValueError(f"missing string field {field!r}")
+    record_id = data.get(id_field) if id_field else None
+    return sentence, None if record_id is None else str(record_id)
+
+
+def _process_chunk(chunk: Chunk) -> Tuple[int, List[str], Counter]:
+    """
+    在工作行程中處理一個分塊
+    
+    Returns:
+        (chunk_id, 序列化的結果行, 統計計數)
+    """
+    chunk_id, source, start_line, lines = chunk
+    input_format = _options["input_format"]
+    if input_format == "auto":
+        input_format = detect_format(source)
+    
+    records: List[Optional[dict]] = []
+    sentences: List[str] = []
+    ids: List[Optional[str]] = []
+    positions: List[int] = []
+    counts: Counter = Counter()
+    for offset, line in enumerate(lines):
+        if not line.strip():
+            continue
+        base = {"source": source, "line": start_line + offset}
+        try:
+            sentence, record_id = _parse_line(line, input_format, _options["field"], _options["id_field"])
+            if not sentence.strip():
+                raise ValueError("empty sentence")
+        except ValueError as e:
+            records.append(dict(base, success=False, error=str(e)))
+            counts["errors"] += 1
+            continue
+        if record_id is not None:
+            base["id"] = record_id
+        positions.append(len(records))
+        records.append(base)
+        sentences.append(sentence)
+        ids.append(None)
+    
+    if sentences:
+        try:
+            final_outputs = _pipeline.process(sentences, ids)
+        except Exception as e:
+            final_outputs = None
+            for position in positions:
+                records[position].update(success=False, error=str(e))
+            counts["errors"] += len(positions)
+        if final_outputs is not None:
+            for position, sentence, final_output in zip(positions, sentences, final_outputs):
+                record = records[position]
+                _fill_record(record, sentence, final_output, _options["with_trace"])
+                counts[f"module:{record['next_module']}"] += 1
+    counts["records"] += len(records)
+    return chunk_id, [json.dumps(record, ensure_ascii=False) for record in records], counts
+
+
+def _fill_record(record: dict, sentence: str, final_output: dict, with_trace: bool) -> None:
+    source_trace = final_output["source_trace"]
+    next_strategy = final_output.get("next_strategy", {})
+    tone_function = final_output.get("tone_function")
+    vow_object = final_output.get("vow_object")
+    record.update(
+        success=True,
+        trace_id=source_trace.id,
+        sentence=sentence,
+        intent_type=final_output.get("intent_type", "unknown"),
+        tone_function=tone_function.value if tone_function is not None else "unknown",
+        next_module=next_strategy.get("next_module"),
+        priority=next_strategy.get("priority"),
+        module_response=final_output.get("module_response"),
+        processing_status=final_output.get("processing_status", "completed")
+    )
+    if vow_object is not None:
+        record["vow_object"] = vow_object.model_dump(mode="json")
+    if with_trace:
+        record["source_trace"] = [
+            {
+                "tool": step.tool,
+                "status": step.status.value,
+                "evidence": step.evidence,
+                "trust_level": step.trust_level.value,
+                "latency_ms": step.latency_ms
+            }
+            for step in source_trace.steps
+        ]
+
+
+def detect_format(path: str) -> str:
+    """依副檔名判斷輸入格式（.jsonl / .ndjson / .json 為 jsonl，其他為 text）"""
+    name = path[:-3] if path.endswith(".gz") else path
+    return "jsonl" if name.endswith((".jsonl", ".ndjson", ".json")) else "text"
+
+
+def _open_input(path: str) -> IO[str]:
+    if path == "-":
+        return sys.stdin
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    return open(path, "r", encoding="utf-8", errors="replace")
+
+
+def iter_chunks(paths: Sequence[str], chunk_size: int) -> Iterator[Chunk]:
+    """
+    逐檔逐行讀取並切成分塊（分塊不跨檔案），chunk_id 在相同輸入與 chunk_size 下是確定的
+    
+    Args:
+        paths: 輸入檔案路徑（"-" 表示標準輸入，.gz 自動解壓）
+        chunk_size: 每個分塊的行數
+    """
+    chunk_id = 0
+    for path in paths:
+        handle = _open_input(path)
+        try:
+            lines: List[str] = []
+            start_line = 1
+            for line_number, line in enumerate(handle, start=1):
+                lines.append(line)
+                if len(lines) >= chunk_size:
+                    yield chunk_id, path, start_line, lines
+                    chunk_id += 1
+                    lines = []
+                    start_line = line_number + 1
+            if lines:
+                yield chunk_id, path, start_line, lines
+                chunk_id += 1
+        finally:
+            if handle is not sys.stdin:
+                handle.close()
+
+
+class ShardWriter:
+    """
+    分片輸出與檢查點
+    
+    結果依序寫入 part-NNNNN.jsonl，每個分片達到 shard_lines 行後換下一個分片。
+    每寫完一個分塊就以原子替換更新檢查點，記錄已完成的分塊與目前分片的位元組位置；
+    續跑時把目前分片截斷到檢查點位置，捨棄上次中斷時寫了一半的內容。
+    """
+    
+    def __init__(self, output_dir: str, shard_lines: int, job: Dict[str, Any], resume: bool):
+        self.output_dir = output_dir
+        self.shard_lines = shard_lines
+        self.job = job
+        self.state: Dict[str, Any] = {
+            "version": CHECKPOINT_VERSION,
+            "job": job,
+            "watermark": 0,
+            "done": [],
+            "shard_index": 0,
+            "shard_records": 0,
+            "shard_offset": 0,
+            "counts": {}
+        }
+        os.makedirs(output_dir, exist_ok=True)
+        checkpoint_path = os.path.join(output_dir, CHECKPOINT_FILE)
+        if os.path.exists(checkpoint_path):
+            if not resume:
+                raise ValueError(f"{checkpoint_path} exists; pass --resume to continue or choose another output dir")
+            with open(checkpoint_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("version") != CHECKPOINT_VERSION or state.get("job") != job:
+                raise ValueError("checkpoint was written for different inputs or options")
+            self.state = state
+        self._done = set(self.state["done"])
+        self._open_shard(truncate=True)
+    
+    @property
+    def counts(self) -> Counter:
+        return Counter(self.state["counts"])
+    
+    def is_done(self, chunk_id: int) -> bool:
+        """分塊是否已在之前的執行中完成"""
+        return chunk_id < self.state["watermark"] or chunk_id in self._done
+    
+    def write(self, chunk_id: int, lines: List[str], counts: Counter) -> None:
+        """寫入一個分塊的結果並更新檢查點"""
+        if lines:
+            data = ("\n".join(lines) + "\n").encode("utf-8")
+            self._handle.write(data)
+            self._handle.flush()
+            self.state["shard_offset"] += len(data)
+            self.state["shard_records"] += len(lines)
+        
+        self._done.add(chunk_id)
+        while self.state["watermark"] in self._done:
+            self._done.discard(self.state["watermark"])
+            self.state["watermark"] += 1
+        self.state["done"] = sorted(self._done)
+        self.state["counts"] = dict(self.counts + counts)
+        
+        if self.state["shard_records"] >= self.shard_lines:
+            self._handle.close()
+            self.state.update(shard_index=self.state["shard_index"] + 1, shard_records=0, shard_offset=0)
+            self._open_shard(truncate=True)
+        self._save_checkpoint()
+    
+    def close(self) -> None:
+        self._handle.close()
+    
+    def shard_paths(self) -> List[str]:
+        return [self._shard_path(i) for i in range(self.state["shard_index"] + 1)
+                if os.path.exists(self._shard_path(i))]
+    
+    def _shard_path(self, index: int) -> str:
+        return os.path.join(self.output_dir, f"part-{index:05d}.jsonl")
+    
+    def _open_shard(self, truncate: bool) -> None:
+        path = self._shard_path(self.state["shard_index"])
+        self._handle = open(path, "r+b" if os.path.exists(path) else "wb")
+        if truncate:
+            self._handle.truncate(self.state["shard_offset"])
+        self._handle.seek(self.state["shard_offset"])
+    
+    def _save_checkpoint(self) -> None:
+        path = os.path.join(self.output_dir, CHECKPOINT_FILE)
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+
+def run_batch(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    執行離線批次處理
+    
+    Returns:
+        吞吐量摘要
+    """
+    job = {
+        "inputs": [os.path.abspath(path) if path != "-" else path for path in args.inputs],
+        "chunk_size": args.chunk_size,
+        "ordered": not args.unordered
+    }
+    if args.resume and "-" in args.inputs:
+        raise ValueError("--resume cannot be used with standard input")
+    writer = ShardWriter(args.output_dir, args.shard_lines, job, args.resume)
+    options = {
+        "input_format": args.format,
+        "field": args.field,
+        "id_field": args.id_field,
+        "with_trace": args.with_trace,
+        "knowledge_index": args.knowledge_index
+    }
+    
+    # 同時在途的分塊數有上限，讀取速度受處理速度牽制，記憶體用量與輸入大小無關
+    max_in_flight = max(1, args.workers) * 4
+    start_time = time.perf_counter()
+    processed = Counter()
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=args.workers, initializer=_init_worker, initargs=(options,)
+    ) as pool:
+        pending: deque = deque()
+        
+        def collect(future: concurrent.futures.Future) -> None:
+            chunk_id, lines, counts = future.result()
+            writer.write(chunk_id, lines, counts)
+            processed.update(counts)
+        
+        for chunk in iter_chunks(args.inputs, args.chunk_size):
+            if writer.is_done(chunk[0]):
+                continue
+            pending.append(pool.submit(_process_chunk, chunk))
+            while len(pending) >= max_in_flight:
+                if args.unordered:
+                    done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in done:
+                        pending.remove(future)
+                        collect(future)
+                else:
+                    collect(pending.popleft())
+        while pending:
+            if args.unordered:
+                done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    pending.remove(future)
+                    collect(future)
+            else:
+                collect(pending.popleft())
+    writer.close()
+    
+    elapsed = time.perf_counter() - start_time
+    total = writer.counts
+    return {
+        "records": processed["records"],
+        "errors": processed["errors"],
+        "elapsed_seconds": round(elapsed, 3),
+        "records_per_second": round(processed["records"] / elapsed, 1) if elapsed > 0 else 0.0,
+        "workers": args.workers,
+        "total_records": total["records"],
+        "total_errors": total["errors"],
+        "modules": {key.split(":", 1)[1]: value for key, value in sorted(total.items()) if key.startswith("module:")},
+        "shards": writer.shard_paths()
+    }
+
+
+def run_index(args: argparse.Namespace) -> int:
+    """建立知識庫索引並列印索引摘要"""
+    start_time = time.perf_counter()
+    try:
+        meta = build_index(read_corpus(args.corpus, args.question_field, args.answer_field),
+                           args.output_dir, k1=args.k1, b=args.b,
+                           embedding_dim=args.embedding_dim, nlist=args.nlist, nprobe=args.nprobe)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    
+    print(f"✅ Indexed {meta['documents']} entries ({meta['terms']} terms) in "
+          f"{time.perf_counter() - start_time:.2f}s", file=sys.stderr)
+    print(json.dumps(meta, ensure_ascii=False, indent=2))
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="tonesoul", description="ToneSoul offline tools | 語魂系統離線工具")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    batch = subparsers.add_parser("batch", help="Classify and route JSONL or text corpora | 批次處理語料")
+    batch.add_argument("inputs", nargs="+", help="Input files (.gz supported, - for stdin) | 輸入檔案")
+    batch.add_argument("--output-dir", "-o", required=True, help="Directory for output shards and checkpoint | 輸出目錄")
+    batch.add_argument("--format", choices=["auto", "jsonl", "text"], default="auto",
+                       help="Input format (auto: by file extension) | 輸入格式")
+    batch.add_argument("--field", default="sentence", help="JSONL field holding the sentence | 句子欄位")
+    batch.add_argument("--id-field", default=None, help="JSONL field copied to the output as id | 識別欄位")
+    batch.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes | 工作行程數")
+    batch.add_argument("--chunk-size", type=int, default=1000, help="Lines per work unit | 每個分塊的行數")
+    batch.add_argument("--shard-lines", type=int, default=1_000_000, help="Records per output shard | 每個分片的行數")
+    batch.add_argument("--unordered", action="store_true",
+                       help="Write chunks as they finish instead of in input order | 依完成順序輸出")
+    batch.add_argument("--with-trace", action="store_true", help="Include trace steps in each record | 輸出追溯步驟")
+    batch.add_argument("--resume", action="store_true", help="Continue from the checkpoint in --output-dir | 從檢查點續跑")
+    batch.add_argument("--knowledge-index", default=None,
+                       help="Knowledge index directory for QA and knowledge base answers | 知識庫索引目錄")
+    
+    index = subparsers.add_parser("index", help="Build the BM25 knowledge index from a JSONL corpus | 建立知識庫索引")
+    index.add_argument("corpus", help="JSONL corpus, one entry per line | JSONL 語料")
+    index.add_argument("--output-dir", "-o", required=True, help="Index directory | 索引輸出目錄")
+    index.add_argument("--question-field", default="question", help="Field holding the question or title | 問題欄位")
+    index.add_argument("--answer-field", default="answer", help="Field holding the answer | 答案欄位")
+    index.add_argument("--k1", type=float, default=1.2, help="BM25 term frequency saturation | BM25 k1 參數")
+    index.add_argument("--b", type=float, default=0.75, help="BM25 length normalization | BM25 b 參數")
+    index.add_argument("--embedding-dim", type=int, default=256,
+                       help="Hashed n-gram embedding dimension, 0 disables vector search | 向量維度（0 表示停用）")
+    index.add_argument("--nlist", type=int, default=0,
+                       help="IVF clusters for vector search, 0 scans every entry | 向量索引聚類數（0 表示全量掃描）")
+    index.add_argument("--nprobe", type=int, default=8, help="IVF clusters scanned per query | 每次查詢掃描的聚類數")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """命令列進入點"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    logging.getLogger().setLevel(logging.WARNING)
+    
+    if args.command == "index":
+        return run_index(args)
+    
+    if args.workers < 1 or args.chunk_size < 1 or args.shard_lines < 1:
+        parser.error("--workers, --chunk-size and --shard-lines must be at least 1")
+    
+    try:
+        summary = run_batch(args)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    
+    print(f"✅ Processed {summary['records']} records ({summary['errors']} errors) in "
+          f"{summary['elapsed_seconds']}s, {summary['records_per_second']} records/s "
+          f"with {summary['workers']} workers", file=sys.stderr)
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
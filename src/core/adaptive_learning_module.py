@@ -5,6 +5,7 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple
 from collections import defaultdict, deque
 
+from src.core.sliding_window import SlidingWindowMetric
 from src.schemas.source_trace import SourceTrace, TraceStep, TraceStatus, TrustLevel
 from src.schemas.evolution_object import (
     LearningPattern, LearningType, EvolutionRecord, EvolutionStatus,
@@ -24,7 +25,8 @@ class AdaptiveLearningModule:
         # 學習模式存儲
         self.learning_patterns: Dict[str, LearningPattern] = {}
         self.interaction_history: deque = deque(maxlen=10000)  # 保留最近10000次互動
-        self.performance_metrics: Dict[str, List[float]] = defaultdict(list)
+        # 以環形緩衝區維護最近 10/20/50/100 筆的滑動視窗統計
+        self.performance_metrics: Dict[str, SlidingWindowMetric] = defaultdict(SlidingWindowMetric)
         
         # 進化記錄
         self.evolution_records: Dict[str, EvolutionRecord] = {}
@@ -298,18 +300,11 @@ class AdaptiveLearningModule:
     def _update_performance_metrics(self, interaction_record: Dict[str, Any]):
         """更新性能指標"""
         # 更新各種性能指標
-        self.performance_metrics["response_time"].append(interaction_record["total_latency"])
-        self.performance_metrics["success_rate"].append(interaction_record["success_rate"])
-        
-        # 保持指標歷史在合理範圍內
-        for metric_name, values in self.performance_metrics.items():
-            if len(values) > 1000:
-                self.performance_metrics[metric_name] = values[-1000:]
+        self.performance_metrics["response_time"].push(interaction_record["total_latency"])
+        self.performance_metrics["success_rate"].push(interaction_record["success_rate"])
         
         # 更新系統狀態
-        if self.performance_metrics["success_rate"]:
-            avg_success_rate = sum(self.performance_metrics["success_rate"][-100:]) / min(100, len(self.performance_metrics["success_rate"]))
-            self.system_state.overall_performance_score = avg_success_rate
+        self.system_state.overall_performance_score = self.performance_metrics["success_rate"].mean(100)
         
         self.system_state.last_updated = datetime.now()
     
@@ -322,9 +317,10 @@ class AdaptiveLearningModule:
             return suggestions
         
         # 檢查性能下降
-        if len(self.performance_metrics["success_rate"]) >= 50:
-            recent_performance = sum(self.performance_metrics["success_rate"][-20:]) / 20
-            historical_performance = sum(self.performance_metrics["success_rate"][-50:-20]) / 30
+        success_rate = self.performance_metrics["success_rate"]
+        if len(success_rate) >= 50:
+            recent_performance = success_rate.sum(20) / 20
+            historical_performance = (success_rate.sum(50) - success_rate.sum(20)) / 30
             
             if recent_performance < historical_performance * 0.9:  # 性能下降超過10%
                 suggestions.append({
@@ -336,7 +332,7 @@ class AdaptiveLearningModule:
         
         # 檢查響應時間
         if len(self.performance_metrics["response_time"]) >= 20:
-            avg_response_time = sum(self.performance_metrics["response_time"][-20:]) / 20
+            avg_response_time = self.performance_metrics["response_time"].mean(20)
             if avg_response_time > 2000:  # 響應時間超過2秒
                 suggestions.append({
                     "type": "response_time_high",
@@ -358,10 +354,10 @@ class AdaptiveLearningModule:
         
         # 添加最近的性能指標
         if self.performance_metrics["response_time"]:
-            summary["avg_response_time"] = sum(self.performance_metrics["response_time"][-10:]) / min(10, len(self.performance_metrics["response_time"]))
+            summary["avg_response_time"] = self.performance_metrics["response_time"].mean(10)
         
         if self.performance_metrics["success_rate"]:
-            summary["recent_success_rate"] = sum(self.performance_metrics["success_rate"][-10:]) / min(10, len(self.performance_metrics["success_rate"]))
+            summary["recent_success_rate"] = self.performance_metrics["success_rate"].mean(10)
         
         return summary
     
@@ -381,9 +377,10 @@ class AdaptiveLearningModule:
         insights["most_active_patterns"] = pattern_usage[:5]
         
         # 性能趨勢
-        if len(self.performance_metrics["success_rate"]) >= 10:
-            recent_avg = sum(self.performance_metrics["success_rate"][-10:]) / 10
-            older_avg = sum(self.performance_metrics["success_rate"][-20:-10]) / 10 if len(self.performance_metrics["success_rate"]) >= 20 else recent_avg
+        success_rate = self.performance_metrics["success_rate"]
+        if len(success_rate) >= 10:
+            recent_avg = success_rate.sum(10) / 10
+            older_avg = (success_rate.sum(20) - success_rate.sum(10)) / 10 if len(success_rate) >= 20 else recent_avg
             insights["performance_trends"]["success_rate_trend"] = "improving" if recent_avg > older_avg else "declining"
         
         return insights
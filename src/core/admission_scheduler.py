@@ -0,0 +1,200 @@
+# file: src/core/admission_scheduler.py
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, Optional
+
+from src.core.quantile_sketch import DDSketch
+
+# 路由策略使用的優先級，由高到低
+PRIORITY_LEVELS = ("high", "medium", "low")
+
+# 加權公平出列的權重：高優先級每輪取得較多的執行名額，低優先級不會被完全餓死
+DEFAULT_WEIGHTS: Dict[str, int] = {"high": 4, "medium": 2, "low": 1}
+
+
+class AdmissionRejected(Exception):
+    """請求在排隊時被卸載（佇列過深或等待過久）"""
+    
+    def __init__(self, priority: str, reason: str):
+        super().__init__(f"{priority} priority request shed: {reason}")
+        self.priority = priority
+        self.reason = reason
+
+
+class _Waiter:
+    __slots__ = ("priority", "enqueued_at", "event", "granted", "rejected")
+    
+    def __init__(self, priority: str):
+        self.priority = priority
+        self.enqueued_at = time.perf_counter()
+        self.event = threading.Event()
+        self.granted = False
+        self.rejected: Optional[str] = None
+
+
+class AdmissionScheduler:
+    """
+    依路由優先級排程的准入控制器
+    
+    同時執行的請求數不超過 max_concurrency；名額用完時請求依優先級進入各自的佇列，
+    釋放名額時以平滑加權輪詢（smooth weighted round-robin）在非空佇列間挑選下一個請求。
+    過載時優先卸載低優先級：佇列總深度達上限時先淘汰最低優先級中最新的請求，
+    而每個請求的最長等待時間與其權重成正比，低優先級最先逾時被卸載。
+    """
+    
+    def __init__(self, max_concurrency: int = 16, max_queue_depth: int = 256,
+                 max_wait_ms: float = 1000, weights: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            max_concurrency: 同時執行的請求上限
+            max_queue_depth: 所有優先級佇列的總深度上限
+            max_wait_ms: 權重為 1 的優先級最長等待時間，其他優先級依權重等比放大
+            weights: 各優先級的出列權重
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        if max_queue_depth < 0:
+            raise ValueError("max_queue_depth must not be negative")
+        
+        self.max_concurrency = max_concurrency
+        self.max_queue_depth = max_queue_depth
+        self.weights = dict(weights or DEFAULT_WEIGHTS)
+        if set(self.weights) != set(PRIORITY_LEVELS) or min(self.weights.values()) < 1:
+            raise ValueError(f"weights must assign a positive weight to each of {PRIORITY_LEVELS}")
+        self.max_wait_ms = {priority: max_wait_ms * weight for priority, weight in self.weights.items()}
+        
+        self._lock = threading.Lock()
+        self._active = 0
+        self._queues: Dict[str, Deque[_Waiter]] = {priority: deque() for priority in PRIORITY_LEVELS}
+        self._credits: Dict[str, int] = {priority: 0 for priority in PRIORITY_LEVELS}
+        self._wait_sketches: Dict[str, DDSketch] = {priority: DDSketch() for priority in PRIORITY_LEVELS}
+        self.stats: Dict[str, Dict[str, int]] = {
+            priority: {"admitted": 0, "shed_queue_depth": 0, "shed_wait_time": 0}
+            for priority in PRIORITY_LEVELS
+        }
+    
+    @contextmanager
+    def admit(self, priority: str) -> Iterator[float]:
+        """
+        取得執行名額，離開區塊時釋放
+        
+        Args:
+            priority: 路由策略的優先級（未知的值視為 medium）
+        
+        Returns:
+            排隊等待的毫秒數
+        """
+        wait_ms = self.acquire(priority)
+        try:
+            yield wait_ms
+        finally:
+            self.release()
+    
+    def acquire(self, priority: str) -> float:
+        """
+        取得執行名額，必要時排隊等待
+        
+        Raises:
+            AdmissionRejected: 請求被卸載
+        """
+        if priority not in self._queues:
+            priority = "medium"
+        
+        waiter = _Waiter(priority)
+        with self._lock:
+            if self._active < self.max_concurrency and not self._queued():
+                self._active += 1
+                self._record_admission(waiter)
+                return 0.0
+            self._enqueue(waiter)
+        
+        if waiter.rejected is None:
+            waiter.event.wait(self.max_wait_ms[priority] / 1000)
+        
+        with self._lock:
+            if waiter.granted:
+                return self._record_admission(waiter)
+            if waiter.rejected is None:
+                # 等待逾時：自行離開佇列
+                self._queues[priority].remove(waiter)
+                waiter.rejected = "wait_time"
+                self.stats[priority]["shed_wait_time"] += 1
+        
+        raise AdmissionRejected(priority, waiter.rejected)
+    
+    def release(self) -> None:
+        """釋放執行名額；有請求排隊時直接把名額轉交給加權輪詢選出的請求"""
+        with self._lock:
+            waiter = self._next_waiter()
+            if waiter is None:
+                self._active -= 1
+                return
+            waiter.granted = True
+            waiter.event.set()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """各優先級的佇列深度、等待時間分位數與卸載次數"""
+        with self._lock:
+            return {
+                "active": self._active,
+                "max_concurrency": self.max_concurrency,
+                "queued": self._queued(),
+                "priorities": {
+                    priority: {
+                        "queue_depth": len(self._queues[priority]),
+                        "weight": self.weights[priority],
+                        "max_wait_ms": self.max_wait_ms[priority],
+                        **self.stats[priority],
+                        "wait_ms": self._wait_sketches[priority].summary()
+                    }
+                    for priority in PRIORITY_LEVELS
+                }
+            }
+    
+    def _queued(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+    
+    def _enqueue(self, waiter: _Waiter) -> None:
+        """加入佇列；總深度已達上限時淘汰較低優先級的最新請求，沒有更低的則拒絕新請求"""
+        if self._queued() >= self.max_queue_depth:
+            victim = None
+            for priority in reversed(PRIORITY_LEVELS):
+                if priority == waiter.priority:
+                    break
+                if self._queues[priority]:
+                    victim = self._queues[priority].pop()
+                    break
+            if victim is None:
+                victim = waiter
+            victim.rejected = "queue_depth"
+            self.stats[victim.priority]["shed_queue_depth"] += 1
+            victim.event.set()
+            if victim is waiter:
+                return
+        self._queues[waiter.priority].append(waiter)
+    
+    def _next_waiter(self) -> Optional[_Waiter]:
+        """平滑加權輪詢：在非空佇列間依權重選出下一個請求"""
+        candidates = [priority for priority in PRIORITY_LEVELS if self._queues[priority]]
+        if not candidates:
+            return None
+        
+        total = 0
+        for priority in PRIORITY_LEVELS:
+            if priority not in candidates:
+                # 空佇列不累積額度，避免之後一次搶走多個名額
+                self._credits[priority] = 0
+                continue
+            self._credits[priority] += self.weights[priority]
+            total += self.weights[priority]
+        chosen = max(candidates, key=lambda priority: self._credits[priority])
+        self._credits[chosen] -= total
+        return self._queues[chosen].popleft()
+    
+    def _record_admission(self, waiter: _Waiter) -> float:
+        wait_ms = (time.perf_counter() - waiter.enqueued_at) * 1000
+        self.stats[waiter.priority]["admitted"] += 1
+        self._wait_sketches[waiter.priority].add(wait_ms)
+        return wait_ms
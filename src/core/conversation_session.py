@@ -0,0 +1,60 @@
+# file: src/core/conversation_session.py
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, Optional
+
+# 每個會話保留的最近回合數
+MAX_SESSION_HISTORY = 20
+
+
+class ConversationSession:
+    """
+    WebSocket 連線的會話狀態
+    
+    一條連線對應一個會話，跨回合重用：互動上下文（例如 user_satisfaction）只需設定一次，
+    之後每個回合都沿用；並保留最近回合的語氣功能與路由，供前端與進化處理參考。
+    """
+    
+    def __init__(self, session_id: Optional[str] = None, stream_trace: bool = False):
+        """
+        Args:
+            session_id: 會話 ID，未提供時自動生成
+            stream_trace: 預設是否在每個階段完成時推送追溯步驟
+        """
+        self.session_id = session_id or str(uuid.uuid4())
+        self.stream_trace = stream_trace
+        self.created_at = datetime.now()
+        self.turns = 0
+        self.context: Dict[str, Any] = {"session_id": self.session_id}
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=MAX_SESSION_HISTORY)
+    
+    def update_context(self, **values: Any) -> None:
+        """更新會話上下文，值為 None 的項目不覆蓋既有設定"""
+        self.context.update({key: value for key, value in values.items() if value is not None})
+    
+    def begin_turn(self) -> Dict[str, Any]:
+        """開始新回合，返回本回合使用的互動上下文"""
+        self.turns += 1
+        return dict(self.context, turn=self.turns,
+                    previous_tone_function=self.history[-1]["tone_function"] if self.history else None)
+    
+    def record_turn(self, response: Dict[str, Any]) -> None:
+        """記錄回合結果"""
+        self.history.append({
+            "turn": self.turns,
+            "trace_id": response.get("trace_id"),
+            "tone_function": response.get("tone_function"),
+            "next_module": response.get("next_strategy", {}).get("next_module"),
+            "success": response.get("success", False)
+        })
+    
+    def get_summary(self) -> Dict[str, Any]:
+        """會話摘要"""
+        return {
+            "session_id": self.session_id,
+            "created_at": self.created_at.isoformat(),
+            "turns": self.turns,
+            "stream_trace": self.stream_trace,
+            "history": list(self.history)
+        }
@@ -0,0 +1,225 @@
+# file: src/core/evolution_pipeline.py
+import logging
+import random
+import threading
+from collections import deque
+from enum import Enum
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from src.schemas.source_trace import SourceTrace
+
+logger = logging.getLogger(__name__)
+
+
+class OverflowPolicy(str, Enum):
+    """佇列已滿時的處理策略"""
+    DROP = "drop"        # 丟棄新提交的工作
+    SAMPLE = "sample"    # 按比例抽樣：被抽中的工作取代佇列中最舊的工作，其餘丟棄
+    BLOCK = "block"      # 阻塞提交者直到佇列有空位（或逾時）
+
+
+class EvolutionPipeline:
+    """
+    非同步進化管線
+    
+    接收已完成的 SourceTrace 與互動上下文，透過有界佇列交給背景執行緒，
+    由背景執行緒分批執行自適應學習、元認知監控與知識進化，
+    讓進化處理不再計入請求的響應時間。
+    """
+    
+    def __init__(self, adaptive_learning, metacognitive, knowledge_evolution,
+                 max_queue_size: int = 1000, batch_size: int = 32,
+                 overflow_policy: OverflowPolicy = OverflowPolicy.DROP,
+                 sample_rate: float = 0.1, block_timeout: Optional[float] = None):
+        if max_queue_size < 1:
+            raise ValueError("max_queue_size must be at least 1")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("sample_rate must be between 0.0 and 1.0")
+        
+        self.adaptive_learning = adaptive_learning
+        self.metacognitive = metacognitive
+        self.knowledge_evolution = knowledge_evolution
+        
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.overflow_policy = OverflowPolicy(overflow_policy)
+        self.sample_rate = sample_rate
+        self.block_timeout = block_timeout
+        
+        # 進化模組的狀態只允許一個執行緒同時修改；讀取摘要時也應持有此鎖
+        self.lock = threading.RLock()
+        
+        self._queue: Deque[Tuple[SourceTrace, Dict[str, Any]]] = deque()
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._running = False
+        self._worker: Optional[threading.Thread] = None
+        self._random = random.Random()
+        
+        self.stats: Dict[str, int] = {
+            "submitted": 0,
+            "accepted": 0,
+            "processed": 0,
+            "dropped": 0,
+            "evicted": 0,
+            "batches": 0,
+            "errors": 0
+        }
+    
+    def start(self) -> None:
+        """啟動背景執行緒（重複調用無副作用）"""
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+            self._worker = threading.Thread(
+                target=self._run, name="tonesoul-evolution", daemon=True
+            )
+            self._worker.start()
+    
+    def submit(self, source_trace: SourceTrace, context: Dict[str, Any]) -> bool:
+        """
+        提交一筆已完成的處理結果給背景進化處理
+        
+        Args:
+            source_trace: 完整的處理追溯
+            context: 進化上下文
+        
+        Returns:
+            工作是否被接受（依溢出策略可能被丟棄）
+        """
+        if not self._running:
+            self.start()
+        
+        with self._condition:
+            self.stats["submitted"] += 1
+            
+            if len(self._queue) >= self.max_queue_size:
+                if self.overflow_policy == OverflowPolicy.DROP:
+                    self.stats["dropped"] += 1
+                    return False
+                
+                if self.overflow_policy == OverflowPolicy.SAMPLE:
+                    if self._random.random() >= self.sample_rate:
+                        self.stats["dropped"] += 1
+                        return False
+                    # 被抽中的工作取代最舊的工作，讓佇列偏向較新的互動
+                    self._queue.popleft()
+                    self.stats["evicted"] += 1
+                
+                elif self.overflow_policy == OverflowPolicy.BLOCK:
+                    has_room = self._condition.wait_for(
+                        lambda: len(self._queue) < self.max_queue_size or not self._running,
+                        timeout=self.block_timeout
+                    )
+                    if not has_room or not self._running:
+                        self.stats["dropped"] += 1
+                        return False
+            
+            self._queue.append((source_trace, context))
+            self.stats["accepted"] += 1
+            self._condition.notify_all()
+            return True
+    
+    def process_now(self, source_trace: SourceTrace, context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        同步執行單筆進化處理並返回洞察（供需要即時 evolution_insights 的請求使用）
+        
+        Args:
+            source_trace: 完整的處理追溯
+            context: 進化上下文
+        
+        Returns:
+            三個進化模組的處理結果
+        """
+        with self.lock:
+            return self._evolve(source_trace, context)
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待佇列中已接受的工作全部處理完畢
+        
+        Args:
+            timeout: 最長等待秒數，None 表示無限等待
+        
+        Returns:
+            是否在期限內處理完畢
+        """
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not self._queue and self._in_flight == 0, timeout=timeout
+            )
+    
+    def shutdown(self, timeout: Optional[float] = 5.0) -> None:
+        """處理完剩餘工作後停止背景執行緒"""
+        self.flush(timeout)
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._worker is not None:
+            self._worker.join(timeout)
+            self._worker = None
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """獲取管線統計資訊"""
+        with self._condition:
+            stats = dict(self.stats)
+            stats["queue_size"] = len(self._queue)
+            stats["in_flight"] = self._in_flight
+        stats["max_queue_size"] = self.max_queue_size
+        stats["overflow_policy"] = self.overflow_policy.value
+        stats["running"] = self._running
+        return stats
+    
+    def _run(self) -> None:
+        """背景執行緒主迴圈：每次取出一批工作並在單次持鎖內處理"""
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._queue or not self._running)
+                if not self._queue and not self._running:
+                    return
+                batch: List[Tuple[SourceTrace, Dict[str, Any]]] = []
+                while self._queue and len(batch) < self.batch_size:
+                    batch.append(self._queue.popleft())
+                self._in_flight = len(batch)
+                # 佇列騰出空位，喚醒被 BLOCK 策略阻塞的提交者
+                self._condition.notify_all()
+            
+            processed = 0
+            errors = 0
+            with self.lock:
+                for source_trace, context in batch:
+                    try:
+                        self._evolve(source_trace, context)
+                        processed += 1
+                    except Exception as e:
+                        errors += 1
+                        logger.error(f"Background evolution failed for trace {source_trace.id}: {str(e)}")
+            
+            with self._condition:
+                self.stats["processed"] += processed
+                self.stats["errors"] += errors
+                self.stats["batches"] += 1
+                self._in_flight = 0
+                self._condition.notify_all()
+    
+    def _evolve(self, source_trace: SourceTrace, context: Dict[str, Any]) -> Dict[str, Any]:
+        """依序執行三個進化模組"""
+        # 自適應學習
+        learning_results = self.adaptive_learning.process_interaction(source_trace, context)
+        
+        # 元認知監控
+        metacognitive_results = self.metacognitive.monitor_cognitive_process(source_trace, context)
+        
+        # 知識進化
+        knowledge_evolution_results = self.knowledge_evolution.process_knowledge_evolution(
+            source_trace, context
+        )
+        
+        return {
+            "adaptive_learning": learning_results,
+            "metacognitive_analysis": metacognitive_results,
+            "knowledge_evolution": knowledge_evolution_results
+        }
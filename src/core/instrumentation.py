@@ -0,0 +1,240 @@
+# file: src/core/instrumentation.py
+import bisect
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# 直方圖的桶上限（秒），涵蓋 5 微秒到 10 秒，子毫秒級的階段也能分辨
+DEFAULT_BUCKETS_SECONDS: Tuple[float, ...] = (
+    0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+# 輸出時才讀取的即時指標：(名稱, 類型, 說明, [(標籤, 數值)])
+CollectedMetric = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+
+class Counter:
+    """帶標籤的單調遞增計數器"""
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, *labelvalues: str, amount: float = 1) -> None:
+        """
+        增加計數
+        
+        Args:
+            labelvalues: 依 labelnames 順序的標籤值
+            amount: 增加量
+        """
+        key = tuple(str(value) for value in labelvalues)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def value(self, *labelvalues: str) -> float:
+        """目前的計數"""
+        with self._lock:
+            return self._values.get(tuple(str(value) for value in labelvalues), 0)
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_labels(dict(zip(self.labelnames, key)))} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    """
+    帶標籤的固定桶直方圖
+    
+    以 perf_counter_ns 量測的奈秒數記錄，輸出時換算成秒。
+    每次記錄只需一次二分搜尋與幾個整數加法，可以常駐在生產環境。
+    """
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS_SECONDS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._bounds_ns = [int(bound * 1e9) for bound in self.buckets]
+        # 每組標籤：[各桶計數..., +Inf 桶計數], 總奈秒數, 總筆數
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+    
+    def observe_ns(self, value_ns: int, *labelvalues: str, count: int = 1) -> None:
+        """
+        記錄觀測值
+        
+        Args:
+            value_ns: 單筆耗時（奈秒）
+            labelvalues: 依 labelnames 順序的標籤值（字串）
+            count: 以相同耗時記錄的筆數（批次平均分攤時使用）
+        """
+        index = bisect.bisect_left(self._bounds_ns, value_ns)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self._bounds_ns) + 1), 0, 0]
+            series[0][index] += count
+            series[1] += value_ns * count
+            series[2] += count
+    
+    def snapshot(self, *labelvalues: str) -> Optional[Dict[str, float]]:
+        """單組標籤的總筆數與總秒數，沒有記錄時返回 None"""
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                return None
+            return {"count": series[2], "sum": series[1] / 1e9}
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((key, [list(series[0]), series[1], series[2]]) for key, series in self._series.items())
+        for key, (counts, total_ns, total) in items:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_labels(dict(labels, le=repr(bound)))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_labels(dict(labels, le='+Inf'))} {total}")
+            lines.append(f"{self.name}_sum{_labels(labels)} {_number(total_ns / 1e9)}")
+            lines.append(f"{self.name}_count{_labels(labels)} {total}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    指標註冊表，以 Prometheus 文字格式（0.0.4）輸出
+    
+    計數器與直方圖在熱路徑上直接記錄；佇列深度等即時狀態由呼叫端在輸出時一併傳入。
+    """
+    
+    def __init__(self):
+        self._metrics: List = []
+        self._lock = threading.Lock()
+    
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """建立並註冊計數器"""
+        return self._register(Counter(name, documentation, labelnames))
+    
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS_SECONDS) -> Histogram:
+        """建立並註冊直方圖"""
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+    
+    def render(self, collected: Iterable[CollectedMetric] = ()) -> str:
+        """
+        以 Prometheus 文字格式輸出所有指標
+        
+        Args:
+            collected: 額外輸出的即時指標
+        
+        Returns:
+            text/plain; version=0.0.4 格式的文字
+        """
+        with self._lock:
+            metrics = list(self._metrics)
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for name, metric_type, documentation, samples in collected:
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in samples:
+                lines.append(f"{name}{_labels(labels)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+    
+    def _register(self, metric):
+        with self._lock:
+            if any(existing.name == metric.name for existing in self._metrics):
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics.append(metric)
+        return metric
+
+
+# 行程內共用的指標註冊表與核心指標
+METRICS = MetricsRegistry()
+
+STAGE_DURATION = METRICS.histogram(
+    "tonesoul_stage_duration_seconds",
+    "Per-item duration of each pipeline stage, labelled by trace step tool.",
+    ("stage",)
+)
+MODULE_DURATION = METRICS.histogram(
+    "tonesoul_module_duration_seconds",
+    "Per-item duration of functional module dispatch, including worker hand-off.",
+    ("module",)
+)
+REQUEST_DURATION = METRICS.histogram(
+    "tonesoul_request_duration_seconds",
+    "End-to-end request duration by tone function.",
+    ("tone_function",)
+)
+REQUESTS = METRICS.counter(
+    "tonesoul_requests_total",
+    "Completed requests by tone function and routed module.",
+    ("tone_function", "next_module")
+)
+STEP_FAILURES = METRICS.counter(
+    "tonesoul_step_failures_total",
+    "Trace steps that finished with FAIL status, by stage.",
+    ("stage",)
+)
+REQUEST_ERRORS = METRICS.counter(
+    "tonesoul_request_errors_total",
+    "Requests that returned an error response, by processing status.",
+    ("status",)
+)
+
+
+def elapsed_ms(start_ns: int) -> int:
+    """從 time.perf_counter_ns() 取得的開始時間起經過的毫秒數（無條件捨去）"""
+    return (time.perf_counter_ns() - start_ns) // 1_000_000
+
+
+def duration_ms(start_ns: int) -> float:
+    """從 time.perf_counter_ns() 取得的開始時間起經過的毫秒數（保留小數，供延遲分位數使用）"""
+    return (time.perf_counter_ns() - start_ns) / 1_000_000
+
+
+def observe_stage(stage: str, start_ns: int, items: int = 1) -> float:
+    """
+    記錄從 start_ns 起的階段耗時，並返回每筆的毫秒數供 record_step() 使用
+    
+    Args:
+        stage: 階段名稱（追溯步驟的 tool）
+        start_ns: time.perf_counter_ns() 取得的開始時間
+        items: 本次整批處理的筆數，耗時平均分攤到每一筆
+    
+    Returns:
+        每筆的耗時（毫秒，保留小數；追溯鏈的 latency_ms 欄位才捨去成整數）
+    """
+    items = max(items, 1)
+    per_item_ns = (time.perf_counter_ns() - start_ns) // items
+    STAGE_DURATION.observe_ns(per_item_ns, stage, count=items)
+    return per_item_ns / 1_000_000
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    body = ",".join(
+        f'{key}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34)).replace(chr(10), chr(92) + "n")}"'
+        for key, value in labels.items()
+    )
+    return "{" + body + "}"
+
+
+def _number(value: float) -> str:
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
@@ -0,0 +1,129 @@
+# file: src/core/keyword_automaton.py
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
+
+from src.core.keyword_tables import KEYWORD_TABLES
+from src.core.response_templates import get_template_table
+
+# 掃描結果：分類名稱 -> [(起始位置, 命中的關鍵字), ...]，依命中結束位置排序
+KeywordHits = Dict[str, List[Tuple[int, str]]]
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick 多模式關鍵字自動機
+    
+    將所有分類的關鍵字編譯成一棵帶失敗連結的字典樹，對輸入語句只做一次線性掃描，
+    即可取得每個分類的全部命中（包含重疊命中）。掃描成本只與語句長度及命中數量有關，
+    不會隨關鍵字數量增加而成長。
+    """
+    
+    def __init__(self, tables: Dict[str, Iterable[str]]):
+        """
+        編譯關鍵字詞表
+        
+        Args:
+            tables: 分類名稱 -> 關鍵字列表；同一個關鍵字可以屬於多個分類
+        """
+        keyword_categories: Dict[str, List[str]] = {}
+        for category, keywords in tables.items():
+            for keyword in keywords:
+                if not keyword:
+                    raise ValueError(f"Empty keyword in category '{category}'")
+                categories = keyword_categories.setdefault(keyword, [])
+                if category not in categories:
+                    categories.append(category)
+        
+        self.categories = tuple(tables.keys())
+        self.pattern_count = len(keyword_categories)
+        
+        # 狀態 0 為根節點
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[Tuple[Tuple[int, str, Tuple[str, ...]], ...]] = [()]
+        
+        # 建立字典樹
+        for keyword, categories in keyword_categories.items():
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._outputs.append(())
+                    self._goto[state][char] = next_state
+                state = next_state
+            self._outputs[state] = ((len(keyword), keyword, tuple(categories)),)
+        
+        # 廣度優先建立失敗連結，並把後綴狀態的輸出合併進來
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail_state = self._fail[state]
+                while fail_state and char not in self._goto[fail_state]:
+                    fail_state = self._fail[fail_state]
+                self._fail[next_state] = self._goto[fail_state].get(char, 0)
+                self._outputs[next_state] += self._outputs[self._fail[next_state]]
+    
+    def scan(self, text: str) -> KeywordHits:
+        """
+        一次線性掃描取得所有分類的命中
+        
+        Args:
+            text: 待掃描的語句
+        
+        Returns:
+            分類名稱 -> [(起始位置, 關鍵字), ...]；沒有命中的分類不會出現在結果中
+        """
+        goto = self._goto
+        fail = self._fail
+        outputs = self._outputs
+        hits: KeywordHits = {}
+        state = 0
+        
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            
+            for length, keyword, categories in outputs[state]:
+                start = index - length + 1
+                for category in categories:
+                    hits.setdefault(category, []).append((start, keyword))
+        
+        return hits
+
+
+@lru_cache(maxsize=None)
+def get_keyword_automaton() -> KeywordAutomaton:
+    """獲取由 KEYWORD_TABLES 與回應模板規則編譯而成的共用自動機（整個行程只編譯一次）"""
+    return KeywordAutomaton(shared_keyword_tables())
+
+
+def shared_keyword_tables() -> Dict[str, List[str]]:
+    """
+    共用自動機編譯的關鍵字分類
+    
+    功能模組回應規則的關鍵字與回應一起定義在 response_templates.py，分類名稱為「模組前綴.規則名稱」，
+    只在這裡與 KEYWORD_TABLES 合併一次，因此設定檔取代的預設規則不會留在自動機中。
+    
+    Returns:
+        分類名稱到關鍵字列表的字典
+    
+    Raises:
+        ValueError: 模板規則的分類名稱與 KEYWORD_TABLES 的分類重複（會改變分類器與誓言偵測的行為）
+    """
+    template_tables = get_template_table().keyword_tables()
+    overlap = sorted(KEYWORD_TABLES.keys() & template_tables.keys())
+    if overlap:
+        raise ValueError(f"Response template rules collide with core keyword categories: {', '.join(overlap)}")
+    return {**KEYWORD_TABLES, **template_tables}
+
+
+def scan_keywords(text: str) -> KeywordHits:
+    """使用共用自動機掃描語句"""
+    return get_keyword_automaton().scan(text)
@@ -0,0 +1,28 @@
+# file: src/core/keyword_tables.py
+from typing import Dict, List
+
+# 語魂系統所有模組共用的關鍵字詞表
+#
+# 鍵為「模組.類別」形式的分類名稱，值為該類別的關鍵字列表。
+# 所有詞表在啟動時被編譯成同一個 KeywordAutomaton，一次線性掃描即可取得全部分類命中，
+# 新增關鍵字或類別只需修改此處，不會增加每個請求的掃描次數。
+KEYWORD_TABLES: Dict[str, List[str]] = {
+    # ToneBridge 初步意圖判斷
+    "bridge.request": ["請", "幫我"],
+    
+    # ToneFunctionClassifier 功能分類
+    "classifier.vow": ["我承諾", "我保證", "我發誓", "我答應"],
+    "classifier.appreciation": ["謝謝", "感謝", "太好了", "很棒", "讚"],
+    "classifier.complaint": ["討厭", "煩", "糟糕", "不滿", "抱怨"],
+    "classifier.instructional": ["如何", "怎麼做", "怎樣做", "怎麼辦"],
+    "classifier.factual": ["什麼", "為什麼", "哪裡", "誰", "何時"],
+    "classifier.opinion": ["怎麼樣", "覺得", "認為", "看法", "意見"],
+    "classifier.assistance": ["請幫我", "幫忙", "協助", "支援"],
+    "classifier.casual": ["你好", "嗨", "哈囉", "早安", "晚安"],
+    
+    # VowChecker 承諾解析與範圍推斷
+    "vow.commitment": ["我承諾", "我保證", "我發誓", "我答應"],
+    "vow.scope.time_bound": ["明天", "今天", "下週", "本週"],
+    "vow.scope.task_completion": ["完成", "交付", "實現", "做好"],
+    "vow.scope.quality_assurance": ["品質", "標準", "要求", "準時"],
+}
@@ -1,77 +1,77 @@
 # file: src/core/knowledge_base_module.py
+import functools
 import time
-from datetime import datetime
-from src.schemas.source_trace import TraceStep, TraceStatus, TrustLevel
+from typing import List, Optional, Tuple
+from src.core.knowledge_corpus import KnowledgeIndex, SearchHit
+from src.core.response_templates import TemplateTable
+from src.core.template_handler import TemplateHandlerModule
+from src.schemas.source_trace import TrustLevel
 
 
-class KnowledgeBaseModule:
+class KnowledgeBaseModule(TemplateHandlerModule):
     """知識庫模組 - 處理事實性查詢"""
     
-    def __init__(self):
-        self.module_name = "KnowledgeBaseModule"
-        self.version = "v0.1"
+    module_name = "KnowledgeBaseModule"
+    version = "v0.1"
+    processing_status = "knowledge_base_processed"
+    trust_level = TrustLevel.B
+    evidence = "Knowledge base queried for: '{sentence}...'"
+    failure_response = "抱歉，我在知識庫中找不到相關資訊。"
+    failure_evidence = "Knowledge base query failed"
     
-    def process(self, router_output: dict) -> dict:
+    def __init__(self, knowledge_index: Optional[KnowledgeIndex] = None, min_coverage: float = 0.5,
+                 min_similarity: float = 0.15, templates: Optional[TemplateTable] = None):
         """
-        處理知識庫查詢
-        
         Args:
-            router_output: ToneStrategicRouter 的輸出字典
-            
-        Returns:
-            包含處理結果和更新 SourceTrace 的字典
+            knowledge_index: 知識庫索引；設定時優先從索引中檢索答案
+            min_coverage: 檢索結果最低的查詢詞項命中比例（以 idf 加權）
+            min_similarity: 詞面檢索沒有結果時，向量檢索最低的餘弦相似度
+            templates: 編譯後的回應模板，預設使用共用模板
+        """
+        super().__init__(templates)
+        self.knowledge_index = knowledge_index
+        self.min_coverage = min_coverage
+        self.min_similarity = min_similarity
+    
+    def process_batch(self, router_outputs: List[dict]) -> List[dict]:
         """
-        start_time = time.time()
+        批次處理路由到本模組的多筆請求
         
-        # 提取必要資訊
-        original_sentence = router_output.get("original_sentence", "")
-        source_trace = router_output.get("source_trace")
+        詞面檢索沒有答案的句子合併成一次 search_similar()，以一次矩陣乘法完成整批的向量檢索。
         
-        if not source_trace:
-            raise ValueError("Missing source_trace in router_output")
+        Args:
+            router_outputs: ToneStrategicRouter 的輸出字典列表
         
+        Returns:
+            與輸入順序一致的處理結果列表
+        """
+        if self.knowledge_index is None or not router_outputs:
+            return super().process_batch(router_outputs)
+        start_ns = time.perf_counter_ns()
         try:
-            # 簡單的知識查詢處理邏輯
-            response = self._query_knowledge_base(original_sentence)
-            status = TraceStatus.SUCCESS
-            evidence = f"Knowledge base queried for: '{original_sentence[:50]}...'"
-            trust_level = TrustLevel.B
-            
-        except Exception as e:
-            response = "抱歉，我在知識庫中找不到相關資訊。"
-            status = TraceStatus.FAIL
-            evidence = f"Knowledge base query failed: {str(e)}"
-            trust_level = TrustLevel.C
-        
-        # 計算執行時間
-        latency_ms = int((time.time() - start_time) * 1000)
-        
-        # 記錄追溯步驟
-        kb_step = TraceStep(
-            tool=f"core.{self.module_name}.{self.version}",
-            status=status,
-            evidence=evidence,
-            trust_level=trust_level,
-            latency_ms=latency_ms,
-            ts=datetime.now()
-        )
-        source_trace.steps.append(kb_step)
-        
-        # 構建輸出
-        result = router_output.copy()
-        result.update({
-            "module_response": response,
-            "processing_status": "knowledge_base_processed",
-            "source_trace": source_trace
-        })
-        
-        return result
+            hits = self.knowledge_index.best_matches(
+                [router_output.get("original_sentence", "") for router_output in router_outputs],
+                self.min_coverage, self.min_similarity
+            )
+        except Exception:
+            # 批次檢索失敗時逐筆處理，由 process() 記錄各筆的失敗
+            return super().process_batch(router_outputs)
+        # 批次檢索的時間平均分攤到每筆的追溯步驟
+        share_ns = (time.perf_counter_ns() - start_ns) // len(router_outputs)
+        return [
+            self._handle(router_output, functools.partial(self._answer, hit), time.perf_counter_ns() - share_ns)
+            for router_output, hit in zip(router_outputs, hits)
+        ]
+    
+    def _respond(self, sentence: str, router_output: dict) -> Tuple[str, str]:
+        """先從知識庫索引檢索，沒有足夠相關的條目時使用回應模板"""
+        hit = None
+        if self.knowledge_index is not None:
+            hit = self.knowledge_index.best_match(sentence, self.min_coverage, self.min_similarity)
+        return self._answer(hit, sentence, router_output)
     
-    def _query_knowledge_base(self, query: str) -> str:
-        """查詢知識庫（基礎版本）"""
-        if "人工智慧" in query or "AI" in query:
-            return "人工智慧是一種模擬人類智能的技術，包括機器學習、深度學習等領域。"
-        elif "程式設計" in query:
-            return "程式設計是創建電腦程式的過程，涉及邏輯思維和問題解決能力。"
-        else:
-            return "這是一個有趣的問題，讓我為您查找相關資訊。"
\ No newline at end of file
+    def _answer(self, hit: Optional[SearchHit], sentence: str, router_output: dict) -> Tuple[str, str]:
+        """以檢索結果回答，沒有結果時使用回應模板"""
+        if hit is None:
+            return super()._respond(sentence, router_output)
+        return hit.answer, f"Knowledge base answered from entry {hit.doc_id} ({hit.method}={hit.score:.2f}) for: '{sentence[:50]}...'"
@@ -0,0 +1,391 @@
+# file: src/core/knowledge_corpus.py
+import json
+import os
+import re
+import unicodedata
+from array import array
+from collections import Counter
+from hashlib import blake2b
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.core.knowledge_embedding import EmbeddingIndex, build_embeddings
+
+# 索引目錄格式
+#
+#   meta.json              格式版本、文件數、BM25 參數
+#   terms.npy              u64[T]   排序後的詞項鍵
+#   idf.npy                f32[T]   各詞項的 BM25 idf
+#   postings_ptr.npy       i64[T+1] 第 t 個詞項的倒排列表為 postings_*[ptr[t]:ptr[t + 1]]
+#   postings_doc.npy       i32[P]   文件編號（每個詞項內遞增）
+#   postings_tf.npy        u16[P]   詞頻
+#   doc_norm.npy           f32[N]   k1 * (1 - b + b * 文件長度 / 平均長度)
+#   questions.npy / answers.npy                 u8[]    UTF-8 文字串接
+#   question_offsets.npy / answer_offsets.npy   i64[N+1]
+#   embedding*.npy ...     選用的稠密向量索引，見 src/core/knowledge_embedding.py
+#
+# 所有陣列以 np.load(mmap_mode="r") 載入，啟動時不讀取內容，由作業系統按需分頁；
+# 多個工作行程載入同一個索引時共用頁面快取。meta.json 最後寫入，未完成的建置無法被載入。
+INDEX_FORMAT = "tonesoul-bm25-v1"
+META_FILE = "meta.json"
+
+# 詞項鍵：CJK 連續字元切成字元二元組 (ord(a) << 21 | ord(b))，單獨的 CJK 字元為 ord(c)，
+# 英數字詞取 blake2b 前 8 位元組並設定最高位元，三者的值域互不重疊
+_CJK_RANGES = "\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"
+_TOKEN_PATTERN = re.compile(f"[{_CJK_RANGES}]+|[0-9a-z]+")
+_CJK_PATTERN = re.compile(f"[{_CJK_RANGES}]")
+_WORD_FLAG = 1 << 63
+
+
+class SearchHit(NamedTuple):
+    """一筆檢索結果"""
+    doc_id: int
+    score: float
+    coverage: float   # 命中的查詢詞項 idf 佔查詢總 idf 的比例（向量檢索結果為 0）
+    question: str
+    answer: str
+    method: str = "bm25"   # "bm25" 或 "cosine"
+
+
+def tokenize(text: str) -> List[int]:
+    """
+    將文字轉為詞項鍵
+    
+    先做 NFKC 正規化與小寫轉換，CJK 文字切成重疊的字元二元組，英數字以整個詞為單位，
+    標點與空白只作為分隔。
+    
+    Args:
+        text: 輸入文字
+    
+    Returns:
+        依出現順序的詞項鍵列表
+    """
+    keys = []
+    for run in _TOKEN_PATTERN.findall(unicodedata.normalize("NFKC", text).lower()):
+        if _CJK_PATTERN.match(run):
+            if len(run) == 1:
+                keys.append(ord(run))
+            else:
+                keys.extend(ord(a) << 21 | ord(b) for a, b in zip(run, run[1:]))
+        else:
+            keys.append(int.from_bytes(blake2b(run.encode("utf-8"), digest_size=8).digest(), "little") | _WORD_FLAG)
+    return keys
+
+
+def read_corpus(path: str, question_field: str = "question", answer_field: str = "answer") -> Iterator[Tuple[str, str]]:
+    """
+    逐行讀取 JSONL 語料
+    
+    Args:
+        path: JSONL 檔案路徑，每行一個物件
+        question_field: 問題（或標題）欄位
+        answer_field: 答案（或內容）欄位
+    
+    Returns:
+        (問題, 答案) 迭代器
+    
+    Raises:
+        ValueError: 某一行不是 JSON 物件或缺少答案欄位
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_number}: invalid JSON ({e.msg})")
+            if not isinstance(data, dict) or not isinstance(data.get(answer_field), str):
+                raise ValueError(f"{path}:{line_number}: missing string field {answer_field!r}")
+            question = data.get(question_field)
+            yield (question if isinstance(question, str) else ""), data[answer_field]
+
+
+def build_index(records: Iterable[Tuple[str, str]], output_dir: str, k1: float = 1.2, b: float = 0.75,
+                embedding_dim: int = 256, nlist: int = 0, nprobe: int = 8) -> Dict[str, Any]:
+    """
+    建立 BM25 倒排索引與稠密向量索引並寫入 output_dir
+    
+    問題與答案一起建立倒排索引與向量索引，檢索結果返回答案；向量以字元 n-gram 計算，
+    用來找出用詞不同的改寫問法。
+    
+    Args:
+        records: (問題, 答案) 迭代器
+        output_dir: 輸出目錄（不存在時建立）
+        k1: BM25 詞頻飽和參數
+        b: BM25 文件長度正規化參數
+        embedding_dim: 向量維度，0 表示不建立向量索引
+        nlist: 向量索引的 IVF 聚類數，0 表示全量掃描
+        nprobe: 查詢時預設掃描的聚類數
+    
+    Returns:
+        meta.json 的內容
+    
+    Raises:
+        ValueError: 語料為空
+    """
+    term_keys = array("Q")
+    postings_doc = array("i")
+    postings_tf = array("H")
+    doc_lengths = array("I")
+    questions: List[str] = []
+    answers: List[str] = []
+    
+    for doc_id, (question, answer) in enumerate(records):
+        tokens = tokenize(question + "\n" + answer)
+        counts = Counter(tokens)
+        term_keys.extend(counts.keys())
+        postings_tf.extend(min(count, 0xFFFF) for count in counts.values())
+        postings_doc.extend([doc_id] * len(counts))
+        doc_lengths.append(len(tokens))
+        questions.append(question)
+        answers.append(answer)
+    
+    documents = len(answers)
+    if documents == 0:
+        raise ValueError("The knowledge corpus is empty")
+    
+    # 依詞項穩定排序，每個詞項內的文件編號維持遞增
+    keys = np.frombuffer(term_keys, dtype=np.uint64)
+    order = np.argsort(keys, kind="stable")
+    terms, starts, document_frequency = np.unique(keys[order], return_index=True, return_counts=True)
+    pointers = np.append(starts, keys.size).astype(np.int64)
+    
+    lengths = np.frombuffer(doc_lengths, dtype=np.uint32).astype(np.float64)
+    average_length = float(lengths.mean()) or 1.0
+    idf = np.log1p((documents - document_frequency + 0.5) / (document_frequency + 0.5))
+    
+    os.makedirs(output_dir, exist_ok=True)
+    meta_path = os.path.join(output_dir, META_FILE)
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    
+    arrays = {
+        "terms": terms.astype(np.uint64),
+        "idf": idf.astype(np.float32),
+        "postings_ptr": pointers,
+        "postings_doc": np.frombuffer(postings_doc, dtype=np.int32)[order],
+        "postings_tf": np.frombuffer(postings_tf, dtype=np.uint16)[order],
+        "doc_norm": (k1 * (1.0 - b + b * lengths / average_length)).astype(np.float32),
+    }
+    for name, texts in (("question", questions), ("answer", answers)):
+        encoded = [text.encode("utf-8") for text in texts]
+        arrays[f"{name}s"] = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        arrays[f"{name}_offsets"] = np.concatenate(([0], np.cumsum([len(text) for text in encoded]))).astype(np.int64)
+    for name, values in arrays.items():
+        np.save(os.path.join(output_dir, f"{name}.npy"), values)
+    
+    meta = {
+        "format": INDEX_FORMAT,
+        "documents": documents,
+        "terms": int(terms.size),
+        "postings": int(keys.size),
+        "average_length": average_length,
+        "k1": k1,
+        "b": b
+    }
+    if embedding_dim > 0:
+        embedding_texts = [question + "\n" + answer for question, answer in zip(questions, answers)]
+        meta["embedding"] = build_embeddings(embedding_texts, output_dir, dim=embedding_dim, nlist=nlist, nprobe=nprobe)
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+class KnowledgeIndex:
+    """
+    記憶體映射的 BM25 知識庫索引
+    
+    以字元二元組倒排索引檢索中文問答語料：查詢的每個詞項以二分搜尋找到倒排列表，
+    各列表的 BM25 貢獻以 NumPy 一次算出後依文件加總，最後以 argpartition 選出前 k 名。
+    索引由 build_index() 離線建立一次，之後以 load() 映射載入；建置時一併計算的向量索引
+    在詞面檢索找不到足夠相符的條目時用來比對改寫的問法。
+    """
+    
+    def __init__(self, path: str, meta: Dict[str, Any], arrays: Dict[str, np.ndarray],
+                 embeddings: Optional[EmbeddingIndex] = None):
+        self.path = path
+        self.meta = meta
+        self.k1 = float(meta["k1"])
+        self.embeddings = embeddings
+        self._arrays = arrays
+        self._terms = arrays["terms"]
+        self._idf = arrays["idf"]
+        self._pointers = arrays["postings_ptr"]
+        self._postings_doc = arrays["postings_doc"]
+        self._postings_tf = arrays["postings_tf"]
+        self._doc_norm = arrays["doc_norm"]
+    
+    @classmethod
+    def load(cls, path: str) -> "KnowledgeIndex":
+        """
+        以記憶體映射載入索引目錄
+        
+        Raises:
+            ValueError: 目錄中沒有完整的索引或格式版本不符
+        """
+        meta_path = os.path.join(path, META_FILE)
+        if not os.path.exists(meta_path):
+            raise ValueError(f"{path} does not contain a complete knowledge index")
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format") != INDEX_FORMAT:
+            raise ValueError(f"Unsupported knowledge index format: {meta.get('format')!r}")
+        
+        names = ("terms", "idf", "postings_ptr", "postings_doc", "postings_tf", "doc_norm",
+                 "questions", "question_offsets", "answers", "answer_offsets")
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in names}
+        embeddings = EmbeddingIndex.load(path, meta["embedding"]) if meta.get("embedding") else None
+        return cls(path, meta, arrays, embeddings)
+    
+    def __len__(self) -> int:
+        return int(self.meta["documents"])
+    
+    def question(self, doc_id: int) -> str:
+        """第 doc_id 筆的問題"""
+        return self._text("question", doc_id)
+    
+    def answer(self, doc_id: int) -> str:
+        """第 doc_id 筆的答案"""
+        return self._text("answer", doc_id)
+    
+    def search(self, query: str, k: int = 5) -> List[SearchHit]:
+        """
+        以 BM25 檢索最相關的 k 筆
+        
+        Args:
+            query: 查詢文字
+            k: 返回的最大筆數
+        
+        Returns:
+            依分數由高到低排序的結果；查詢沒有任何詞項出現在語料中時返回空列表
+        """
+        query_terms = np.unique(np.asarray(tokenize(query), dtype=np.uint64))
+        if query_terms.size == 0 or k < 1:
+            return []
+        positions = self._match(query_terms)
+        if positions.size == 0:
+            return []
+        
+        starts = self._pointers[positions]
+        ends = self._pointers[positions + 1]
+        docs = np.concatenate([self._postings_doc[start:end] for start, end in zip(starts, ends)])
+        tf = np.concatenate([self._postings_tf[start:end] for start, end in zip(starts, ends)]).astype(np.float32)
+        idf = np.repeat(self._idf[positions], ends - starts)
+        contributions = idf * tf * (self.k1 + 1.0) / (tf + self._doc_norm[docs])
+        
+        # 覆蓋率以 idf 加權：「什麼」「如何」等常見二元組權重低，語料中沒有的詞項以 df = 0 的 idf 計入分母
+        documents = len(self)
+        unseen_idf = np.log1p((documents + 0.5) / 0.5)
+        query_idf = float(self._idf[positions].sum()) + (query_terms.size - positions.size) * unseen_idf
+        
+        # 候選文件少時以排序去重；高頻詞項讓候選數接近語料大小時改用稠密累加
+        if docs.size * 8 > documents:
+            scores = np.bincount(docs, weights=contributions, minlength=documents)
+            matched = np.bincount(docs, weights=idf, minlength=documents)
+            candidates = np.flatnonzero(matched)
+            scores, matched = scores[candidates], matched[candidates]
+        else:
+            candidates, inverse = np.unique(docs, return_inverse=True)
+            scores = np.bincount(inverse, weights=contributions)
+            matched = np.bincount(inverse, weights=idf)
+        
+        if candidates.size > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(candidates.size)
+        top = top[np.lexsort((candidates[top], -scores[top]))]
+        
+        return [
+            SearchHit(
+                doc_id=int(candidates[i]),
+                score=float(scores[i]),
+                coverage=float(matched[i] / query_idf),
+                question=self.question(int(candidates[i])),
+                answer=self.answer(int(candidates[i]))
+            )
+            for i in top
+        ]
+    
+    def search_similar(self, queries: Sequence[str], k: int = 5, nprobe: Optional[int] = None) -> List[List[SearchHit]]:
+        """
+        以向量索引批次檢索語意相近的 k 筆
+        
+        Args:
+            queries: 查詢文字列表
+            k: 每個查詢返回的最大筆數
+            nprobe: 掃描的 IVF 聚類數，預設使用建置時的設定
+        
+        Returns:
+            與 queries 順序一致的結果列表；索引沒有向量時每個查詢都是空列表
+        """
+        if self.embeddings is None:
+            return [[] for _ in queries]
+        return [
+            [
+                SearchHit(doc_id=int(doc_id), score=float(score), coverage=0.0,
+                          question=self.question(int(doc_id)), answer=self.answer(int(doc_id)), method="cosine")
+                for doc_id, score in zip(doc_ids, scores)
+            ]
+            for doc_ids, scores in self.embeddings.search(queries, k, nprobe)
+        ]
+    
+    def best_match(self, query: str, min_coverage: float = 0.5, min_similarity: float = 0.15) -> Optional[SearchHit]:
+        """
+        分數最高且命中足夠比例查詢詞項（以 idf 加權）的一筆，找不到時改用向量檢索
+        
+        只靠「如何」「什麼」等常見二元組命中的條目覆蓋率低，查詢中語料沒有的詞項權重最高，
+        因此「什麼是 + 語料沒有的主題」不會對到其他「什麼是」條目；
+        此時若向量索引中有相似度達到 min_similarity 的條目則返回該條目。
+        
+        Args:
+            query: 查詢文字
+            min_coverage: 最低的查詢詞項命中比例（以 idf 加權）
+            min_similarity: 向量檢索最低的餘弦相似度
+        
+        Returns:
+            符合條件的結果，沒有時返回 None
+        """
+        return self.best_matches([query], min_coverage, min_similarity)[0]
+    
+    def best_matches(self, queries: Sequence[str], min_coverage: float = 0.5,
+                     min_similarity: float = 0.15) -> List[Optional[SearchHit]]:
+        """
+        批次版的 best_match：詞面檢索逐筆進行，覆蓋率不足的查詢合併成一次向量檢索
+        
+        Args:
+            queries: 查詢文字列表
+            min_coverage: 最低的查詢詞項命中比例（以 idf 加權）
+            min_similarity: 向量檢索最低的餘弦相似度
+        
+        Returns:
+            與 queries 順序一致的結果列表，沒有符合條件的條目時為 None
+        """
+        matches: List[Optional[SearchHit]] = []
+        misses: List[int] = []
+        for i, query in enumerate(queries):
+            hits = self.search(query, k=1)
+            if hits and hits[0].coverage >= min_coverage:
+                matches.append(hits[0])
+            else:
+                matches.append(None)
+                misses.append(i)
+        if misses:
+            similar = self.search_similar([queries[i] for i in misses], k=1)
+            for i, hits in zip(misses, similar):
+                if hits and hits[0].score >= min_similarity:
+                    matches[i] = hits[0]
+        return matches
+    
+    def _match(self, query_terms: np.ndarray) -> np.ndarray:
+        """查詢詞項在 terms 中的位置（只保留存在的詞項）"""
+        if self._terms.size == 0:
+            return np.zeros(0, dtype=np.int64)
+        positions = np.searchsorted(self._terms, query_terms)
+        positions[positions >= self._terms.size] = 0
+        return positions[self._terms[positions] == query_terms]
+    
+    def _text(self, name: str, doc_id: int) -> str:
+        offsets = self._arrays[f"{name}_offsets"]
+        return bytes(self._arrays[f"{name}s"][offsets[doc_id]:offsets[doc_id + 1]]).decode("utf-8")
@@ -0,0 +1,130 @@
+# file: src/core/knowledge_decay.py
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from src.core.knowledge_graph import KnowledgeGraph
+
+logger = logging.getLogger(__name__)
+
+
+class KnowledgeDecay:
+    """
+    知識遺忘引擎
+    
+    每次執行時對所有節點的可信度做一次向量化的指數衰減：
+    confidence *= decay_factor ** (經過時間 / period_s)，經過時間從上次執行或該節點最後被存取時算起，
+    因此最近被使用的知識不會被扣掉使用前的時間。邊的權重依兩端節點衰減量的幾何平均同步衰減，
+    最後一次移除可信度低於 min_confidence 的節點與權重低於 min_edge_weight 的邊。
+    
+    可由背景執行緒依固定間隔執行；執行緒只在衰減與剪枝的期間持有進化模組的鎖。
+    請求處理路徑不需要這把鎖，讀取進化狀態的端點則在執行緒池中等待，因此事件迴圈不會被阻塞。
+    """
+    
+    def __init__(self, graph: KnowledgeGraph, period_s: float = 3600.0,
+                 min_confidence: float = 0.05, min_edge_weight: float = 0.05):
+        """
+        Args:
+            graph: 要衰減的知識圖譜
+            period_s: decay_factor 對應的時間長度（秒），預設為每小時乘上一次 decay_factor
+            min_confidence: 可信度低於此值的節點被移除
+            min_edge_weight: 權重低於此值的邊被移除
+        """
+        if period_s <= 0:
+            raise ValueError("period_s must be positive")
+        
+        self.graph = graph
+        self.period_s = period_s
+        self.min_confidence = min_confidence
+        self.min_edge_weight = min_edge_weight
+        self.last_run = time.time()
+        
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        
+        self.stats: Dict[str, Any] = {
+            "runs": 0,
+            "nodes_pruned": 0,
+            "edges_pruned": 0,
+            "errors": 0,
+            "last_run_at": None,
+            "last_duration_ms": None
+        }
+    
+    def run(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        執行一次衰減與剪枝（呼叫端負責持有保護圖譜的鎖）
+        
+        Args:
+            now: 目前時間（epoch 秒），預設為 time.time()
+        
+        Returns:
+            本次移除的節點數、邊數與耗時
+        """
+        start_ns = time.perf_counter_ns()
+        now = time.time() if now is None else now
+        graph = self.graph
+        
+        confidence = graph.column("confidence")
+        since = np.maximum(graph.column("last_accessed"), self.last_run)
+        elapsed = np.maximum(now - since, 0.0) / self.period_s
+        factors = np.power(graph.column("decay_factor"), elapsed, dtype=np.float64)
+        confidence *= factors
+        
+        sources, targets, weights = graph.edge_arrays()
+        weights *= np.sqrt(factors[sources] * factors[targets])
+        
+        nodes_pruned, edges_pruned = graph.prune(confidence >= self.min_confidence, self.min_edge_weight)
+        self.last_run = now
+        
+        duration_ms = (time.perf_counter_ns() - start_ns) / 1e6
+        self.stats["runs"] += 1
+        self.stats["nodes_pruned"] += nodes_pruned
+        self.stats["edges_pruned"] += edges_pruned
+        self.stats["last_run_at"] = now
+        self.stats["last_duration_ms"] = round(duration_ms, 3)
+        return {
+            "nodes_pruned": nodes_pruned,
+            "edges_pruned": edges_pruned,
+            "duration_ms": duration_ms
+        }
+    
+    def start(self, interval: float, lock) -> None:
+        """
+        啟動背景執行緒，每隔 interval 秒在 lock 內執行一次 run()
+        
+        Args:
+            interval: 執行間隔（秒）
+            lock: 保護知識圖譜的鎖（EvolutionPipeline.lock）
+        """
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, args=(interval, lock), name="tonesoul-knowledge-decay", daemon=True
+            )
+            self._thread.start()
+    
+    def close(self) -> None:
+        """停止背景執行緒"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """獲取衰減統計資訊"""
+        stats = dict(self.stats)
+        stats["scheduled"] = self._thread is not None
+        return stats
+    
+    def _run(self, interval: float, lock) -> None:
+        while not self._stop.wait(interval):
+            try:
+                with lock:
+                    self.run()
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"Knowledge decay failed: {str(e)}")
@@ -0,0 +1,282 @@
+# file: src/core/knowledge_embedding.py
+import os
+import re
+import unicodedata
+import zlib
+from array import array
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 嵌入檔案（與 BM25 索引放在同一目錄，參數記錄在 meta.json 的 "embedding" 欄位）
+#
+#   embedding_idf.npy   f32[D]      各雜湊維度的 idf
+#   embeddings.npy      f32[N, D]   L2 正規化的文件向量；使用 IVF 時依聚類連續排列
+#   embedding_ids.npy   i32[N]      第 i 列對應的文件編號（僅 IVF）
+#   centroids.npy       f32[C, D]   聚類中心（僅 IVF）
+#   list_ptr.npy        i64[C+1]    第 c 個聚類的列範圍為 embeddings[ptr[c]:ptr[c + 1]]（僅 IVF）
+EMBEDDING_FEATURES = "char-ngram-1-3-crc32"
+
+_WORD_PATTERN = re.compile(r"\w+")
+_BLOCK_ROWS = 16384
+_TRAINING_ROWS_PER_LIST = 64
+
+
+def ngram_features(text: str) -> List[str]:
+    """
+    文字的字元 n-gram（n = 1..3）
+    
+    NFKC 正規化並轉小寫後依非文字字元切段，每段前後補一個空白再取二元與三元組，
+    因此詞首與詞尾的 n-gram 與詞中不同；中文與英數字使用同一套規則。
+    
+    Args:
+        text: 輸入文字
+    
+    Returns:
+        n-gram 字串列表
+    """
+    grams = []
+    for run in _WORD_PATTERN.findall(unicodedata.normalize("NFKC", text).lower()):
+        padded = f" {run} "
+        grams.extend(run)
+        grams.extend(padded[i:i + 2] for i in range(len(padded) - 1))
+        grams.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def hash_vectors(texts: Sequence[str], dim: int) -> np.ndarray:
+    """
+    以帶正負號的特徵雜湊將 n-gram 計數投影到 dim 維
+    
+    crc32 的低位元決定維度、最高位元決定正負號，碰撞的 n-gram 期望上互相抵銷；
+    計數取 sign(x) * log1p(|x|) 壓低重複字元的影響。
+    
+    Args:
+        texts: 文字列表
+        dim: 向量維度
+    
+    Returns:
+        float32[len(texts), dim] 的未正規化向量
+    """
+    rows = array("i")
+    hashes = array("I")
+    for row, text in enumerate(texts):
+        grams = ngram_features(text)
+        hashes.extend(zlib.crc32(gram.encode("utf-8")) for gram in grams)
+        rows.extend([row] * len(grams))
+    
+    keys = np.frombuffer(hashes, dtype=np.uint32).astype(np.int64)
+    signs = np.where(keys >> 31, -1.0, 1.0)
+    cells = np.frombuffer(rows, dtype=np.int32).astype(np.int64) * dim + keys % dim
+    counts = np.bincount(cells, weights=signs, minlength=len(texts) * dim).reshape(len(texts), dim)
+    return (np.sign(counts) * np.log1p(np.abs(counts))).astype(np.float32)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def build_embeddings(texts: Sequence[str], output_dir: str, dim: int = 256, nlist: int = 0,
+                     nprobe: int = 8, iterations: int = 10, seed: int = 0) -> Dict[str, Any]:
+    """
+    離線計算文件向量並寫入 output_dir
+    
+    第一輪分塊計算雜湊向量並統計各維度的文件頻率，第二輪乘上 idf 後正規化。
+    nlist > 0 時以球面 k-means 訓練 nlist 個聚類中心，並把向量依聚類重新排列，
+    查詢時只需掃描 nprobe 個聚類的連續區段。
+    
+    Args:
+        texts: 文件文字，列號即文件編號
+        output_dir: 輸出目錄
+        dim: 向量維度
+        nlist: IVF 聚類數，0 表示不建立粗量化器（查詢時全量掃描）
+        nprobe: 預設掃描的聚類數
+        iterations: k-means 迭代次數
+        seed: k-means 初始化與取樣的隨機種子
+    
+    Returns:
+        寫入 meta.json "embedding" 欄位的參數
+    """
+    documents = len(texts)
+    if dim < 1 or documents == 0:
+        raise ValueError("Embeddings need a positive dimension and a non-empty corpus")
+    
+    final_path = os.path.join(output_dir, "embeddings.npy")
+    unsorted_path = os.path.join(output_dir, "embeddings.unsorted.npy") if nlist > 0 else final_path
+    matrix = np.lib.format.open_memmap(unsorted_path, mode="w+", dtype=np.float32, shape=(documents, dim))
+    
+    document_frequency = np.zeros(dim, dtype=np.int64)
+    for start in range(0, documents, _BLOCK_ROWS):
+        block = hash_vectors(texts[start:start + _BLOCK_ROWS], dim)
+        document_frequency += np.count_nonzero(block, axis=0)
+        matrix[start:start + len(block)] = block
+    idf = (np.log((1.0 + documents) / (1.0 + document_frequency)) + 1.0).astype(np.float32)
+    for start in range(0, documents, _BLOCK_ROWS):
+        matrix[start:start + _BLOCK_ROWS] = _normalize(matrix[start:start + _BLOCK_ROWS] * idf)
+    np.save(os.path.join(output_dir, "embedding_idf.npy"), idf)
+    
+    meta = {"features": EMBEDDING_FEATURES, "dim": dim, "nlist": 0, "nprobe": 0}
+    if nlist > 0:
+        nlist = min(nlist, documents)
+        centroids = _train_centroids(matrix, nlist, iterations, np.random.default_rng(seed))
+        assignments = np.concatenate([
+            np.argmax(matrix[start:start + _BLOCK_ROWS] @ centroids.T, axis=1)
+            for start in range(0, documents, _BLOCK_ROWS)
+        ])
+        order = np.argsort(assignments, kind="stable")
+        pointers = np.searchsorted(assignments[order], np.arange(nlist + 1)).astype(np.int64)
+        
+        ordered = np.lib.format.open_memmap(final_path, mode="w+", dtype=np.float32, shape=(documents, dim))
+        for start in range(0, documents, _BLOCK_ROWS):
+            ordered[start:start + _BLOCK_ROWS] = matrix[order[start:start + _BLOCK_ROWS]]
+        ordered.flush()
+        del ordered, matrix
+        os.remove(unsorted_path)
+        
+        np.save(os.path.join(output_dir, "embedding_ids.npy"), order.astype(np.int32))
+        np.save(os.path.join(output_dir, "centroids.npy"), centroids)
+        np.save(os.path.join(output_dir, "list_ptr.npy"), pointers)
+        meta.update({"nlist": nlist, "nprobe": max(1, min(nprobe, nlist))})
+    else:
+        matrix.flush()
+    return meta
+
+
+def _train_centroids(matrix: np.ndarray, nlist: int, iterations: int, rng: np.random.Generator) -> np.ndarray:
+    """以取樣的文件向量訓練球面 k-means 聚類中心"""
+    documents = matrix.shape[0]
+    sample_size = min(documents, nlist * _TRAINING_ROWS_PER_LIST)
+    sample = np.asarray(matrix[np.sort(rng.choice(documents, sample_size, replace=False))])
+    centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+    
+    for _ in range(iterations):
+        assignments = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, sample)
+        # 空的聚類保留原本的中心
+        occupied = np.bincount(assignments, minlength=nlist) > 0
+        centroids[occupied] = _normalize(sums[occupied])
+    return centroids.astype(np.float32)
+
+
+def _top_k(ids: np.ndarray, scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """依分數由高到低（同分依編號）取前 k 名"""
+    if ids.size > k:
+        keep = np.argpartition(-scores, k - 1)[:k]
+        ids, scores = ids[keep], scores[keep]
+    order = np.lexsort((ids, -scores))
+    return ids[order], scores[order]
+
+
+class EmbeddingIndex:
+    """
+    記憶體映射的稠密向量索引
+    
+    查詢向量與文件向量都經過 idf 加權與 L2 正規化，內積即餘弦相似度。
+    沒有粗量化器時分塊以矩陣乘法掃描全部文件；有粗量化器時先與聚類中心比較，
+    只掃描最接近的 nprobe 個聚類，多個查詢探測同一聚類時共用一次矩陣乘法。
+    """
+    
+    def __init__(self, meta: Dict[str, Any], arrays: Dict[str, np.ndarray]):
+        self.meta = meta
+        self.dim = int(meta["dim"])
+        self.nprobe = int(meta["nprobe"])
+        self._idf = arrays["embedding_idf"]
+        self._vectors = arrays["embeddings"]
+        self._ids = arrays.get("embedding_ids")
+        self._centroids = arrays.get("centroids")
+        self._pointers = arrays.get("list_ptr")
+    
+    @classmethod
+    def load(cls, path: str, meta: Dict[str, Any]) -> "EmbeddingIndex":
+        """
+        以記憶體映射載入嵌入檔案
+        
+        Args:
+            path: 索引目錄
+            meta: meta.json 的 "embedding" 欄位
+        
+        Raises:
+            ValueError: 特徵版本不符
+        """
+        if meta.get("features") != EMBEDDING_FEATURES:
+            raise ValueError(f"Unsupported embedding features: {meta.get('features')!r}")
+        names = ["embedding_idf", "embeddings"]
+        if meta.get("nlist"):
+            names += ["embedding_ids", "centroids", "list_ptr"]
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in names}
+        return cls(meta, arrays)
+    
+    def __len__(self) -> int:
+        return self._vectors.shape[0]
+    
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """將查詢文字轉為與文件相同空間的正規化向量"""
+        return _normalize(hash_vectors(texts, self.dim) * self._idf)
+    
+    def search(self, queries: Sequence[str], k: int = 5,
+               nprobe: Optional[int] = None) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        批次檢索每個查詢最相似的 k 筆文件
+        
+        Args:
+            queries: 查詢文字列表
+            k: 每個查詢返回的最大筆數
+            nprobe: 掃描的聚類數，預設使用建置時的設定；大於等於聚類數時等同全量掃描
+        
+        Returns:
+            與 queries 順序一致的 (文件編號, 餘弦相似度) 陣列組，依相似度由高到低排序
+        """
+        if not queries or k < 1:
+            return [(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)) for _ in queries]
+        matrix = self.embed(queries)
+        
+        nprobe = self.nprobe if nprobe is None else nprobe
+        if self._centroids is None or nprobe >= self._centroids.shape[0]:
+            results = self._scan(matrix, k)
+        else:
+            results = self._probe(matrix, k, max(1, nprobe))
+        
+        if self._ids is not None:
+            results = [_top_k(self._ids[rows].astype(np.int64), scores, k) for rows, scores in results]
+        return results
+    
+    def _scan(self, matrix: np.ndarray, k: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """分塊全量掃描，逐塊合併各查詢的前 k 名"""
+        best_rows = np.zeros((len(matrix), 0), dtype=np.int64)
+        best_scores = np.zeros((len(matrix), 0), dtype=np.float32)
+        for start in range(0, len(self), _BLOCK_ROWS):
+            scores = matrix @ self._vectors[start:start + _BLOCK_ROWS].T
+            rows = np.broadcast_to(np.arange(start, start + scores.shape[1]), scores.shape)
+            best_rows = np.concatenate((best_rows, rows), axis=1)
+            best_scores = np.concatenate((best_scores, scores), axis=1)
+            if best_rows.shape[1] > k:
+                keep = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                best_rows = np.take_along_axis(best_rows, keep, axis=1)
+                best_scores = np.take_along_axis(best_scores, keep, axis=1)
+        return [_top_k(rows, scores, k) for rows, scores in zip(best_rows, best_scores)]
+    
+    def _probe(self, matrix: np.ndarray, k: int, nprobe: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """只掃描各查詢最接近的 nprobe 個聚類，依聚類分組做矩陣乘法"""
+        probes = np.argpartition(-(matrix @ self._centroids.T), nprobe - 1, axis=1)[:, :nprobe]
+        collected_rows: List[List[np.ndarray]] = [[] for _ in range(len(matrix))]
+        collected_scores: List[List[np.ndarray]] = [[] for _ in range(len(matrix))]
+        
+        for cluster in np.unique(probes):
+            start, end = int(self._pointers[cluster]), int(self._pointers[cluster + 1])
+            if start == end:
+                continue
+            queries = np.flatnonzero((probes == cluster).any(axis=1))
+            scores = matrix[queries] @ self._vectors[start:end].T
+            rows = np.arange(start, end)
+            for position, query in enumerate(queries):
+                collected_rows[query].append(rows)
+                collected_scores[query].append(scores[position])
+        
+        return [
+            _top_k(np.concatenate(rows), np.concatenate(scores), k) if rows
+            else (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32))
+            for rows, scores in zip(collected_rows, collected_scores)
+        ]
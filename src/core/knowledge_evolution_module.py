@@ -0,0 +1,365 @@
+# file: src/core/knowledge_evolution_module.py
+import re
+import time
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+from src.core.instrumentation import elapsed_ms
+from src.core.knowledge_decay import KnowledgeDecay
+from src.core.knowledge_graph import KnowledgeGraph
+from src.schemas.source_trace import SourceTrace, TraceStatus, TrustLevel
+
+
+class KnowledgeEvolutionModule:
+    """
+    知識進化模組
+    
+    從處理追溯的證據中提取概念、定義與概念之間的關係，驗證後整合進知識圖譜，
+    並評估圖譜的可信度與連通性，找出需要補強或複查的知識。
+    圖譜存放在 KnowledgeGraph 的欄式陣列與 CSR 鄰接表中，每次整合只觸及相關節點，
+    全圖摘要則是向量化運算，節點與邊達到百萬級時仍可快速查詢。
+    久未使用的知識由 KnowledgeDecay 批次衰減並剪除。
+    """
+    
+    def __init__(self, decay_period_s: float = 3600.0, min_confidence: float = 0.05,
+                 min_edge_weight: float = 0.05):
+        """
+        Args:
+            decay_period_s: 節點 decay_factor 對應的時間長度（秒）
+            min_confidence: 衰減後可信度低於此值的節點被移除
+            min_edge_weight: 衰減後權重低於此值的連接被移除
+        """
+        # 知識圖譜；concept_index 為概念到節點列號的索引
+        self.knowledge_graph = KnowledgeGraph()
+        self.concept_index = self.knowledge_graph.concept_index
+        
+        # 遺忘衰減：由 ToneSoulService 排程，或呼叫 apply_decay() 手動執行
+        self.decay = KnowledgeDecay(self.knowledge_graph, period_s=decay_period_s,
+                                    min_confidence=min_confidence, min_edge_weight=min_edge_weight)
+        
+        # 知識提取模式：(關係類型, 正則表達式)
+        self.extraction_patterns = [
+            ("definition", re.compile(r"^(?P<subject>.+?)\s+is defined as\s+(?P<object>.+)$", re.IGNORECASE)),
+            ("related", re.compile(r"^(?P<subject>.+?)\s+is related to\s+(?P<object>.+)$", re.IGNORECASE)),
+            ("connected", re.compile(r"^(?P<subject>.+?)\s+is connected (?:with|to)\s+(?P<object>.+)$", re.IGNORECASE)),
+            ("definition", re.compile(r"^(?P<subject>.+?)(?:的定義是|是指)(?P<object>.+)$")),
+            ("related", re.compile(r"^(?P<subject>.+?)(?:與|和|跟)(?P<object>.+?)(?:有關|相關|有關聯)$")),
+        ]
+        
+        # 否定或矛盾標記：出現時該證據視為對既有知識的反駁
+        self.contradiction_markers = (" not ", "false", "incorrect", "wrong", "不是", "並非", "錯誤", "不正確")
+        
+        # 學習參數
+        self.trust_weights = {TrustLevel.A: 1.0, TrustLevel.B: 0.7, TrustLevel.C: 0.4}
+        self.validation_threshold = 0.5   # 驗證分數低於此值的知識不整合
+        self.integration_rate = 0.2       # 既有節點的可信度更新幅度
+        self.max_source_traces = 20       # 每個節點保留的來源追溯數
+        self.max_concept_length = 64
+        
+        # 進化統計
+        self.evolution_stats: Dict[str, int] = {
+            "traces_processed": 0,
+            "knowledge_extracted": 0,
+            "knowledge_validated": 0,
+            "knowledge_rejected": 0,
+            "nodes_created": 0,
+            "nodes_updated": 0,
+            "connections_created": 0,
+            "connections_strengthened": 0,
+            "contradictions_detected": 0
+        }
+        
+        # 初始化基礎知識
+        self._initialize_base_knowledge()
+    
+    def _initialize_base_knowledge(self):
+        """初始化對話相關的基礎知識（衰減因子為 1.0，不會被遺忘）"""
+        base_knowledge = [
+            ("greeting", "問候：開啟或延續對話的社交訊號"),
+            ("gratitude", "感謝：對他人協助或成果的正向回饋"),
+            ("complaint", "抱怨：對產品、服務或事件的不滿表達"),
+            ("empathy", "同理：理解並回應對方的情緒狀態"),
+            ("assistance", "協助：回應求助並提供具體支援"),
+            ("question", "提問：尋求事實、意見或操作方法"),
+            ("vow", "承諾：說話者對未來行為的自我約束")
+        ]
+        base_connections = [
+            ("greeting", "gratitude", 0.5),
+            ("complaint", "empathy", 0.8),
+            ("assistance", "question", 0.6),
+            ("assistance", "empathy", 0.5),
+            ("vow", "assistance", 0.4)
+        ]
+        
+        graph = self.knowledge_graph
+        for concept, content in base_knowledge:
+            row = graph.add_node(concept, content, domain="conversation", confidence=0.9, decay_factor=1.0)
+            graph.column("validation_count")[row] = 1
+        for source, target, weight in base_connections:
+            graph.connect(self.concept_index[source], self.concept_index[target], weight)
+    
+    def process_knowledge_evolution(self, source_trace: SourceTrace, context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        從追溯中提取知識並整合進知識圖譜
+        
+        Args:
+            source_trace: 完整的處理追溯
+            context: 互動上下文信息
+        
+        Returns:
+            提取、驗證與整合的結果統計
+        """
+        start_ns = time.perf_counter_ns()
+        domain = str(context.get("domain") or context.get("tone_function") or "general")
+        
+        # 提取知識
+        extracted = self._extract_knowledge(source_trace)
+        
+        # 驗證並整合；未通過驗證的反駁證據記為矛盾
+        validated = 0
+        touched_rows: List[int] = []
+        connections_updated = 0
+        for item in extracted:
+            if self._validate_knowledge(item):
+                validated += 1
+                rows, connected = self._integrate_knowledge(item, domain, source_trace.id)
+                touched_rows.extend(rows)
+                connections_updated += connected
+            else:
+                touched_rows.extend(self._record_contradiction(item))
+        
+        stats = self.evolution_stats
+        stats["traces_processed"] += 1
+        stats["knowledge_extracted"] += len(extracted)
+        stats["knowledge_validated"] += validated
+        stats["knowledge_rejected"] += len(extracted) - validated
+        
+        return {
+            "knowledge_extracted": len(extracted),
+            "knowledge_validated": validated,
+            "knowledge_integrated": validated,
+            "connections_updated": connections_updated,
+            "evolution_opportunities": self._count_opportunities(touched_rows),
+            "knowledge_graph_size": len(self.knowledge_graph),
+            "evolution_stats": dict(stats),
+            "processing_time_ms": elapsed_ms(start_ns)
+        }
+    
+    def _extract_knowledge(self, source_trace: SourceTrace) -> List[Dict[str, Any]]:
+        """以提取模式逐句比對步驟證據"""
+        extracted = []
+        for step in source_trace.steps:
+            for clause in re.split(r"[.。!！?？;；\n]+", step.evidence):
+                clause = clause.strip()
+                if not clause:
+                    continue
+                for relation, pattern in self.extraction_patterns:
+                    match = pattern.match(clause)
+                    if match is None:
+                        continue
+                    subject = self._normalize_concept(match.group("subject"))
+                    target = self._normalize_concept(match.group("object"))
+                    if subject and target and subject != target:
+                        extracted.append({
+                            "relation": relation,
+                            "subject": subject,
+                            "object": target,
+                            "evidence": clause,
+                            "score": self._score_evidence(step, clause)
+                        })
+                    break
+        return extracted
+    
+    def _normalize_concept(self, text: str) -> Optional[str]:
+        """概念正規化：小寫、去除冠詞與標點，過長的片段不視為概念"""
+        concept = re.sub(r"^(?:a|an|the)\s+", "", text.strip().strip("\"'`,，、：:").lower())
+        concept = re.sub(r"\s+", " ", concept)
+        if not concept or len(concept) > self.max_concept_length:
+            return None
+        return concept
+    
+    def _score_evidence(self, step, clause: str) -> float:
+        """依信任等級、步驟狀態與矛盾標記計算證據分數"""
+        score = self.trust_weights.get(step.trust_level, 0.4)
+        if step.status != TraceStatus.SUCCESS:
+            score *= 0.5
+        lowered = f" {clause.lower()} "
+        if any(marker in lowered for marker in self.contradiction_markers):
+            score = -score
+        return score
+    
+    def _validate_knowledge(self, item: Dict[str, Any]) -> bool:
+        """分數為正且達到驗證門檻的知識才整合"""
+        return item["score"] >= self.validation_threshold
+    
+    def _integrate_knowledge(self, item: Dict[str, Any], domain: str, trace_id: str) -> Tuple[List[int], int]:
+        """
+        把一筆已驗證的知識寫入圖譜
+        
+        Returns:
+            (觸及的節點列號, 新建或加強的連接數)
+        """
+        score = item["score"]
+        subject_content = item["object"] if item["relation"] == "definition" else item["evidence"]
+        subject = self._upsert_node(item["subject"], subject_content, domain, score, trace_id,
+                                    replace_content=item["relation"] == "definition")
+        target = self._upsert_node(item["object"], item["evidence"], domain, score, trace_id)
+        
+        if self.knowledge_graph.connect(subject, target, score):
+            self.evolution_stats["connections_created"] += 1
+        else:
+            self.evolution_stats["connections_strengthened"] += 1
+        return [subject, target], 1
+    
+    def _upsert_node(self, concept: str, content: str, domain: str, score: float, trace_id: str,
+                     replace_content: bool = False) -> int:
+        """新增節點，或以新的證據提高既有節點的可信度"""
+        graph = self.knowledge_graph
+        row = graph.row_of(concept)
+        if row is None:
+            self.evolution_stats["nodes_created"] += 1
+            row = graph.add_node(concept, content, domain=domain, confidence=score * 0.8, source_trace=trace_id)
+            graph.column("validation_count")[row] = 1
+            return row
+        
+        self.evolution_stats["nodes_updated"] += 1
+        confidence = graph.column("confidence")
+        if replace_content and score >= confidence[row]:
+            graph.contents[row] = content
+        confidence[row] += (1.0 - confidence[row]) * self.integration_rate * score
+        graph.column("validation_count")[row] += 1
+        graph.column("last_accessed")[row] = time.time()
+        self._add_source_trace(row, trace_id)
+        return row
+    
+    def _record_contradiction(self, item: Dict[str, Any]) -> List[int]:
+        """未通過驗證的知識：若反駁的是既有概念，記錄矛盾並降低可信度"""
+        if item["score"] >= 0:
+            return []
+        
+        graph = self.knowledge_graph
+        touched = []
+        for concept in (item["subject"], item["object"]):
+            row = graph.row_of(concept)
+            if row is None:
+                continue
+            graph.column("contradiction_count")[row] += 1
+            graph.column("confidence")[row] *= 1.0 - self.integration_rate * -item["score"]
+            touched.append(row)
+            self.evolution_stats["contradictions_detected"] += 1
+        return touched
+    
+    def _add_source_trace(self, row: int, trace_id: str):
+        traces = self.knowledge_graph.source_traces[row]
+        if trace_id in traces:
+            return
+        traces.append(trace_id)
+        if len(traces) > self.max_source_traces:
+            del traces[0]
+    
+    def _opportunity_masks(self) -> Dict[str, np.ndarray]:
+        """
+        各類進化機會的布林遮罩
+        
+        - weakly_supported: 可信度低於驗證門檻，需要更多證據
+        - contested: 矛盾次數多於驗證次數，需要複查
+        - isolated: 沒有任何連接，需要與其他知識建立關係
+        """
+        graph = self.knowledge_graph
+        confidence = graph.column("confidence")
+        validations = graph.column("validation_count")
+        contradictions = graph.column("contradiction_count")
+        return {
+            "weakly_supported": confidence < self.validation_threshold,
+            "contested": contradictions > validations,
+            "isolated": graph.degrees() == 0
+        }
+    
+    def _count_opportunities(self, rows: List[int]) -> int:
+        """本次觸及的節點中有多少個可信度不足或存在爭議（只讀取這些節點的欄位）"""
+        if not rows:
+            return 0
+        rows_array = np.unique(np.asarray(rows, dtype=np.int64))
+        graph = self.knowledge_graph
+        weakly_supported = graph.column("confidence")[rows_array] < self.validation_threshold
+        contested = graph.column("contradiction_count")[rows_array] > graph.column("validation_count")[rows_array]
+        return int(np.count_nonzero(weakly_supported | contested))
+    
+    def apply_decay(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        立即對整個知識圖譜執行一次遺忘衰減與剪枝
+        
+        Args:
+            now: 目前時間（epoch 秒），預設為 time.time()
+            
+        Returns:
+            本次移除的節點數、連接數與耗時
+        """
+        return self.decay.run(now)
+    
+    def get_neighbors(self, concept: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        查詢與概念相連的知識
+        
+        Args:
+            concept: 概念名稱
+            limit: 返回的最大數量
+        
+        Returns:
+            依連接權重由高到低排列的相關概念
+        """
+        graph = self.knowledge_graph
+        row = graph.row_of(self._normalize_concept(concept) or "")
+        if row is None:
+            return []
+        graph.column("last_accessed")[row] = time.time()
+        
+        neighbors, weights = graph.neighbors(row, limit=limit)
+        confidence = graph.column("confidence")
+        return [
+            {
+                "concept": graph.concepts[neighbor],
+                "weight": float(weight),
+                "confidence": float(confidence[neighbor])
+            }
+            for neighbor, weight in zip(neighbors.tolist(), weights.tolist())
+        ]
+    
+    def get_knowledge_summary(self) -> Dict[str, Any]:
+        """獲取知識圖譜摘要"""
+        graph = self.knowledge_graph
+        total_nodes = len(graph)
+        if total_nodes == 0:
+            return {
+                "total_knowledge_nodes": 0,
+                "total_connections": 0,
+                "average_confidence": 0.0,
+                "concept_distribution": {},
+                "degree_stats": graph.degree_stats(),
+                "evolution_stats": dict(self.evolution_stats),
+                "evolution_opportunities": {},
+                "decay": self.decay.get_stats(),
+                "knowledge_health_score": 0.0
+            }
+        
+        masks = self._opportunity_masks()
+        opportunities = {name: int(np.count_nonzero(mask)) for name, mask in masks.items()}
+        average_confidence = float(graph.column("confidence").mean())
+        connected_ratio = 1.0 - opportunities["isolated"] / total_nodes
+        contested_ratio = opportunities["contested"] / total_nodes
+        
+        # 健康度：可信度、連通性與一致性的加權平均
+        health_score = average_confidence * 0.5 + connected_ratio * 0.3 + (1.0 - contested_ratio) * 0.2
+        
+        return {
+            "total_knowledge_nodes": total_nodes,
+            "total_connections": graph.connection_count,
+            "average_confidence": min(max(average_confidence, 0.0), 1.0),
+            "concept_distribution": graph.domain_distribution(),
+            "degree_stats": graph.degree_stats(),
+            "evolution_stats": dict(self.evolution_stats),
+            "evolution_opportunities": opportunities,
+            "decay": self.decay.get_stats(),
+            "knowledge_health_score": min(max(health_score, 0.0), 1.0)
+        }
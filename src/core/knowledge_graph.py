@@ -0,0 +1,419 @@
+# file: src/core/knowledge_graph.py
+import random
+import time
+from datetime import datetime
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from src.schemas.evolution_object import KnowledgeNode
+
+# 節點欄位與其 NumPy 型別；每個欄位是一個依容量倍增的連續陣列
+NODE_COLUMNS: Dict[str, type] = {
+    "confidence": np.float32,
+    "validation_count": np.int32,
+    "contradiction_count": np.int32,
+    "decay_factor": np.float32,
+    "created_at": np.float64,
+    "last_accessed": np.float64,
+    "domain": np.int32,
+}
+
+
+class KnowledgeGraph(Mapping):
+    """
+    以欄式陣列與 CSR 鄰接表儲存的知識圖譜
+    
+    節點的可信度、驗證與矛盾次數、衰減因子、時間戳與領域各存在一個 NumPy 陣列中，
+    概念名稱、內容與來源追溯等字串資料放在平行的串列裡，節點以列號（row）定址。
+    邊是無向的，兩個方向各存一份：已合併的邊以壓縮稀疏列（CSR）格式存放，
+    新增的邊先寫入依起點分組的增量緩衝區，累積到門檻才與 CSR 一次合併重建。
+    因此新增節點與邊是攤銷常數時間，鄰居查詢只讀一段連續切片加上該節點的增量邊，
+    度數、可信度分佈等全圖統計都是向量化運算。
+    
+    作為 Mapping 時以節點 ID 為鍵，取值時才組出 KnowledgeNode。
+    """
+    
+    def __init__(self, initial_capacity: int = 1024, merge_threshold: int = 4096):
+        """
+        Args:
+            initial_capacity: 節點欄位的初始容量
+            merge_threshold: 增量緩衝區達到多少條有向邊時與 CSR 合併（大圖會依 CSR 大小按比例放寬）
+        """
+        self.merge_threshold = merge_threshold
+        self._size = 0
+        self._random = random.Random()
+        self._columns: Dict[str, np.ndarray] = {
+            name: np.zeros(max(initial_capacity, 1), dtype=dtype) for name, dtype in NODE_COLUMNS.items()
+        }
+        
+        # 字串資料與索引
+        self.node_ids: List[str] = []
+        self.concepts: List[str] = []
+        self.contents: List[str] = []
+        self.source_traces: List[List[str]] = []
+        self.concept_index: Dict[str, int] = {}  # 概念 -> 節點列號
+        self._rows_by_id: Dict[str, int] = {}
+        self.domains: List[str] = []
+        self._domain_codes: Dict[str, int] = {}
+        
+        # CSR：第 row 個節點的鄰居為 _indices[_indptr[row]:_indptr[row + 1]]（已排序）
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._indices = np.zeros(0, dtype=np.int32)
+        self._weights = np.zeros(0, dtype=np.float32)
+        
+        # 增量緩衝區：起點 -> {終點: 權重}，只存放 CSR 中還沒有的邊
+        self._delta: Dict[int, Dict[int, float]] = {}
+        self._delta_count = 0
+        self.merges = 0
+    
+    # Mapping 介面：節點 ID -> KnowledgeNode
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.node_ids)
+    
+    def __contains__(self, node_id) -> bool:
+        return node_id in self._rows_by_id
+    
+    def __getitem__(self, node_id: str) -> KnowledgeNode:
+        return self.node(self._rows_by_id[node_id])
+    
+    # 節點
+    
+    def column(self, name: str) -> np.ndarray:
+        """節點欄位的即時視圖（長度為節點數，可直接就地修改）"""
+        return self._columns[name][:self._size]
+    
+    def row_of(self, concept: str) -> Optional[int]:
+        """概念對應的節點列號，不存在時返回 None"""
+        return self.concept_index.get(concept)
+    
+    def add_node(self, concept: str, content: str, domain: str = "general", confidence: float = 0.5,
+                 source_trace: Optional[str] = None, decay_factor: float = 0.99) -> int:
+        """
+        新增節點
+        
+        Args:
+            concept: 概念名稱（圖中唯一）
+            content: 知識內容
+            domain: 所屬領域
+            confidence: 初始可信度
+            source_trace: 來源追溯 ID
+            decay_factor: 遺忘衰減因子
+        
+        Returns:
+            新節點的列號
+        
+        Raises:
+            ValueError: 概念已存在
+        """
+        if concept in self.concept_index:
+            raise ValueError(f"Concept {concept!r} already exists")
+        
+        row = self._size
+        if row == len(self._columns["confidence"]):
+            self._grow(row * 2)
+        
+        now = time.time()
+        columns = self._columns
+        columns["confidence"][row] = confidence
+        columns["validation_count"][row] = 0
+        columns["contradiction_count"][row] = 0
+        columns["decay_factor"][row] = decay_factor
+        columns["created_at"][row] = now
+        columns["last_accessed"][row] = now
+        columns["domain"][row] = self._domain_code(domain)
+        
+        # 128 位元隨機十六進位 ID；比 uuid.uuid4() 便宜，大量載入時差異明顯
+        node_id = f"{self._random.getrandbits(128):032x}"
+        self.node_ids.append(node_id)
+        self.concepts.append(concept)
+        self.contents.append(content)
+        self.source_traces.append([source_trace] if source_trace else [])
+        self.concept_index[concept] = row
+        self._rows_by_id[node_id] = row
+        self._size += 1
+        return row
+    
+    def node(self, row: int) -> KnowledgeNode:
+        """把第 row 個節點組成 KnowledgeNode（connections 以鄰居節點 ID 為鍵）"""
+        columns = self._columns
+        neighbors, weights = self.neighbors(row)
+        return KnowledgeNode(
+            id=self.node_ids[row],
+            concept=self.concepts[row],
+            content=self.contents[row],
+            confidence=float(columns["confidence"][row]),
+            source_traces=list(self.source_traces[row]),
+            connections={self.node_ids[neighbor]: float(weight) for neighbor, weight in zip(neighbors.tolist(), weights.tolist())},
+            validation_count=int(columns["validation_count"][row]),
+            contradiction_count=int(columns["contradiction_count"][row]),
+            created_at=datetime.fromtimestamp(columns["created_at"][row].item()),
+            last_accessed=datetime.fromtimestamp(columns["last_accessed"][row].item()),
+            decay_factor=float(columns["decay_factor"][row])
+        )
+    
+    def domain_distribution(self) -> Dict[str, int]:
+        """各領域的節點數"""
+        counts = np.bincount(self.column("domain"), minlength=len(self.domains))
+        return {domain: int(count) for domain, count in zip(self.domains, counts) if count}
+    
+    # 邊
+    
+    @property
+    def edge_count(self) -> int:
+        """有向邊數（每條無向邊計兩次）"""
+        return int(self._indices.size) + self._delta_count
+    
+    @property
+    def connection_count(self) -> int:
+        """無向邊數"""
+        return self.edge_count // 2
+    
+    def connect(self, a: int, b: int, weight: float) -> bool:
+        """
+        建立或加強 a、b 之間的無向邊
+        
+        已存在的邊以 1 - (1 - w)(1 - weight) 累加，權重維持在 [0, 1]。
+        
+        Returns:
+            是否為新建立的邊
+        """
+        if a == b:
+            raise ValueError("Self-loops are not supported")
+        created = self._connect_directed(a, b, weight)
+        self._connect_directed(b, a, weight)
+        if self._delta_count >= max(self.merge_threshold, self._indices.size // 4):
+            self.merge()
+        return created
+    
+    def add_edges(self, sources: np.ndarray, targets: np.ndarray, weights: np.ndarray) -> None:
+        """
+        批次加入無向邊（載入大量資料時使用），直接與 CSR 合併
+        
+        同一對節點重複出現或已存在時保留最大權重。
+        """
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        weights = np.asarray(weights, dtype=np.float32)
+        keep = sources != targets
+        sources, targets, weights = sources[keep], targets[keep], weights[keep]
+        self.merge(extra=(
+            np.concatenate([sources, targets]),
+            np.concatenate([targets, sources]),
+            np.concatenate([weights, weights])
+        ))
+    
+    def edge_weight(self, a: int, b: int) -> Optional[float]:
+        """a -> b 的權重，沒有這條邊時返回 None"""
+        position = self._find(a, b)
+        if position is not None:
+            return float(self._weights[position])
+        return self._delta.get(a, {}).get(b)
+    
+    def neighbors(self, row: int, limit: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        節點的鄰居
+        
+        Args:
+            row: 節點列號
+            limit: 只返回權重最高的前幾個鄰居
+        
+        Returns:
+            (鄰居列號, 權重)，依權重由高到低排序
+        """
+        if row + 1 < self._indptr.size:
+            start, end = self._indptr[row], self._indptr[row + 1]
+            indices, weights = self._indices[start:end], self._weights[start:end]
+        else:
+            indices, weights = self._indices[:0], self._weights[:0]
+        
+        delta = self._delta.get(row)
+        if delta:
+            indices = np.concatenate([indices, np.fromiter(delta.keys(), dtype=np.int32, count=len(delta))])
+            weights = np.concatenate([weights, np.fromiter(delta.values(), dtype=np.float32, count=len(delta))])
+        
+        if limit is not None and limit < weights.size:
+            top = np.argpartition(-weights, limit)[:limit]
+            indices, weights = indices[top], weights[top]
+        order = np.argsort(-weights, kind="stable")
+        return indices[order], weights[order]
+    
+    def degrees(self) -> np.ndarray:
+        """所有節點的度數"""
+        degrees = np.zeros(self._size, dtype=np.int64)
+        base_rows = self._indptr.size - 1
+        degrees[:base_rows] = np.diff(self._indptr)
+        if self._delta:
+            rows = np.fromiter(self._delta.keys(), dtype=np.int64, count=len(self._delta))
+            counts = np.fromiter((len(targets) for targets in self._delta.values()), dtype=np.int64, count=len(self._delta))
+            degrees[rows] += counts
+        return degrees
+    
+    def degree_stats(self) -> Dict[str, float]:
+        """度數的平均、最大值、中位數與孤立節點數"""
+        if self._size == 0:
+            return {"mean": 0.0, "max": 0, "median": 0.0, "isolated": 0}
+        degrees = self.degrees()
+        return {
+            "mean": float(degrees.mean()),
+            "max": int(degrees.max()),
+            "median": float(np.median(degrees)),
+            "isolated": int(np.count_nonzero(degrees == 0))
+        }
+    
+    def merge(self, extra: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None) -> None:
+        """
+        把增量緩衝區（與 extra 中的有向邊）合併進 CSR
+        
+        以 起點 * 節點數 + 終點 作為單一鍵排序後一次重建 indptr；重複的邊保留最大權重。
+        """
+        base_rows = self._indptr.size - 1
+        parts_src = [np.repeat(np.arange(base_rows, dtype=np.int64), np.diff(self._indptr))]
+        parts_dst = [self._indices.astype(np.int64)]
+        parts_w = [self._weights]
+        
+        if self._delta:
+            parts_src.append(np.fromiter(
+                (source for source, targets in self._delta.items() for _ in range(len(targets))),
+                dtype=np.int64, count=self._delta_count
+            ))
+            parts_dst.append(np.fromiter(
+                (target for targets in self._delta.values() for target in targets),
+                dtype=np.int64, count=self._delta_count
+            ))
+            parts_w.append(np.fromiter(
+                (weight for targets in self._delta.values() for weight in targets.values()),
+                dtype=np.float32, count=self._delta_count
+            ))
+        if extra is not None:
+            parts_src.append(extra[0])
+            parts_dst.append(extra[1])
+            parts_w.append(extra[2])
+        
+        sources = np.concatenate(parts_src)
+        targets = np.concatenate(parts_dst)
+        weights = np.concatenate(parts_w)
+        
+        keys = sources * self._size + targets
+        order = np.argsort(keys)
+        keys, weights = keys[order], weights[order]
+        if keys.size:
+            starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+            if starts.size < keys.size:
+                weights = np.maximum.reduceat(weights, starts)
+                keys = keys[starts]
+        sources, targets = np.divmod(keys, self._size) if self._size else (keys, keys)
+        
+        indptr = np.zeros(self._size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=self._size), out=indptr[1:])
+        self._indptr = indptr
+        self._indices = targets.astype(np.int32)
+        self._weights = weights.astype(np.float32)
+        self._delta = {}
+        self._delta_count = 0
+        self.merges += 1
+    
+    def edge_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        先合併增量緩衝區，再以平行陣列返回所有有向邊
+
+        Returns:
+            (起點, 終點, 權重)；權重是 CSR 的即時陣列，可直接就地修改
+        """
+        if self._delta or self._indptr.size - 1 != self._size:
+            self.merge()
+        sources = np.repeat(np.arange(self._size, dtype=np.int64), np.diff(self._indptr))
+        return sources, self._indices, self._weights
+
+    def prune(self, keep: np.ndarray, min_edge_weight: float = 0.0) -> Tuple[int, int]:
+        """
+        移除 keep 為 False 的節點、與其相連的邊，以及權重低於 min_edge_weight 的邊
+
+        保留的節點依原順序重新編號，concept_index 原地更新，持有它的呼叫端不需重新取得。
+
+        Returns:
+            (移除的節點數, 移除的無向邊數)
+        """
+        keep = np.asarray(keep, dtype=bool)
+        sources, targets, weights = self.edge_arrays()
+        edge_keep = keep[sources] & keep[targets] & (weights >= min_edge_weight)
+        removed_nodes = self._size - int(np.count_nonzero(keep))
+        removed_edges = (edge_keep.size - int(np.count_nonzero(edge_keep))) // 2
+        if removed_nodes == 0 and removed_edges == 0:
+            return 0, 0
+
+        # 舊列號 -> 新列號；保留的節點順序不變，因此每列的鄰居仍維持排序
+        kept_rows = np.flatnonzero(keep)
+        remap = np.full(self._size, -1, dtype=np.int64)
+        remap[kept_rows] = np.arange(kept_rows.size)
+        new_size = int(kept_rows.size)
+        sources = remap[sources[edge_keep]]
+        indptr = np.zeros(new_size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=new_size), out=indptr[1:])
+        self._indptr = indptr
+        self._indices = remap[targets[edge_keep]].astype(np.int32)
+        self._weights = weights[edge_keep]
+
+        if removed_nodes:
+            for name, column in self._columns.items():
+                compacted = np.zeros(max(len(column), 1), dtype=column.dtype)
+                compacted[:new_size] = column[:self._size][keep]
+                self._columns[name] = compacted
+            mask = keep.tolist()
+            self.node_ids = [value for value, kept in zip(self.node_ids, mask) if kept]
+            self.concepts = [value for value, kept in zip(self.concepts, mask) if kept]
+            self.contents = [value for value, kept in zip(self.contents, mask) if kept]
+            self.source_traces = [value for value, kept in zip(self.source_traces, mask) if kept]
+            self.concept_index.clear()
+            self.concept_index.update(zip(self.concepts, range(new_size)))
+            self._rows_by_id = dict(zip(self.node_ids, range(new_size)))
+            self._size = new_size
+        return removed_nodes, removed_edges
+
+    # 內部工具
+    
+    def _connect_directed(self, a: int, b: int, weight: float) -> bool:
+        position = self._find(a, b)
+        if position is not None:
+            current = float(self._weights[position])
+            self._weights[position] = 1.0 - (1.0 - current) * (1.0 - weight)
+            return False
+        
+        targets = self._delta.setdefault(a, {})
+        current = targets.get(b)
+        if current is not None:
+            targets[b] = 1.0 - (1.0 - current) * (1.0 - weight)
+            return False
+        targets[b] = float(weight)
+        self._delta_count += 1
+        return True
+    
+    def _find(self, a: int, b: int) -> Optional[int]:
+        """a -> b 在 CSR 中的位置"""
+        if a + 1 >= self._indptr.size:
+            return None
+        start, end = int(self._indptr[a]), int(self._indptr[a + 1])
+        if start == end:
+            return None
+        position = start + int(np.searchsorted(self._indices[start:end], b))
+        if position < end and self._indices[position] == b:
+            return position
+        return None
+    
+    def _grow(self, capacity: int) -> None:
+        for name, column in self._columns.items():
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+    
+    def _domain_code(self, domain: str) -> int:
+        code = self._domain_codes.get(domain)
+        if code is None:
+            code = self._domain_codes[domain] = len(self.domains)
+            self.domains.append(domain)
+        return code
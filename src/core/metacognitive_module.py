@@ -8,6 +8,7 @@ from enum import Enum
 
 from src.schemas.source_trace import SourceTrace, TraceStep, TraceStatus, TrustLevel
 from src.schemas.evolution_object import MetacognitiveInsight, SystemEvolutionState
+from src.core.quantile_sketch import DDSketch
 
 
 class CognitiveState(str, Enum):
@@ -36,6 +37,8 @@ class MetacognitiveModule:
         
         # 自我監控指標
         self.decision_confidence_history: deque = deque(maxlen=500)
+        # 全部決策信心度的分佈（記憶體固定，不受歷史長度限制）
+        self.decision_confidence_sketch = DDSketch()
         self.error_pattern_analysis: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
         self.cognitive_load_metrics: Dict[str, float] = {}
         
@@ -314,6 +317,7 @@ class MetacognitiveModule:
         
         # 記錄信心度歷史
         self.decision_confidence_history.append(confidence)
+        self.decision_confidence_sketch.add(confidence)
         
         return confidence
     
@@ -563,6 +567,7 @@ class MetacognitiveModule:
         summary = {
             "current_state": self.current_cognitive_state.value,
             "recent_confidence_trend": self._calculate_confidence_trend(),
+            "decision_confidence_distribution": self.decision_confidence_sketch.summary(),
             "cognitive_load_summary": self.cognitive_load_metrics.copy(),
             "bias_frequency": self._calculate_bias_frequency(recent_history),
             "reflection_frequency": len([r for r in recent_history if r.get("reflection_triggered", False)]),
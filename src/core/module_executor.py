@@ -0,0 +1,158 @@
+# file: src/core/module_executor.py
+import concurrent.futures
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.core.instrumentation import MODULE_DURATION, duration_ms
+from src.schemas.source_trace import TraceStatus, TrustLevel
+
+logger = logging.getLogger(__name__)
+
+
+class ModuleExecutor:
+    """
+    功能模組執行層
+    
+    在工作執行緒池上逐筆調用功能模組，並以每筆請求路由策略的 timeout_ms 作為該筆的期限。
+    逾時的請求改由回退模組（預設處理模組）處理，並在追溯鏈中記錄一個 FAIL 步驟，
+    讓每個請求的尾端延遲受路由表約束；同一批中的其他請求不受影響。
+    
+    Python 執行緒無法被強制中止：尚未開始的工作會被取消，已在執行的工作繼續跑完但結果被丟棄。
+    工作執行緒拿到的是追溯鏈的副本，逾時後才完成的模組不會再修改原本的追溯鏈。
+    因此有副作用的模組（預設為寫入 VowStore 的 vow_checker_module）不套用期限：
+    否則使用者拿到忽略誓言的回退回應，誓言卻仍被背景中的工作記錄下來。
+    """
+    
+    def __init__(self, modules: Dict[str, Any], fallback_module: str = "default_handler_module",
+                 max_workers: int = 32, default_timeout_ms: int = 3000,
+                 unbounded_modules: Iterable[str] = ("vow_checker_module",)):
+        """
+        Args:
+            modules: 模組名稱到功能模組的對照表
+            fallback_module: 找不到模組或模組逾時時使用的回退模組，於呼叫端執行緒直接執行
+            max_workers: 工作執行緒數量
+            default_timeout_ms: 路由策略未提供 timeout_ms 時使用的期限
+            unbounded_modules: 有副作用、必須執行完成而不回退的模組，於呼叫端執行緒直接執行
+        """
+        if fallback_module not in modules:
+            raise ValueError(f"Fallback module {fallback_module} is not registered")
+        
+        self.modules = modules
+        self.fallback_module = fallback_module
+        self.default_timeout_ms = default_timeout_ms
+        self.unbounded_modules = frozenset(unbounded_modules)
+        self._pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="tonesoul-module"
+        )
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {
+            "dispatched": 0,
+            "timeouts": 0
+        }
+        self.timeouts_by_module: Dict[str, int] = defaultdict(int)
+    
+    def dispatch(self, next_module: str, router_outputs: List[dict]) -> List[dict]:
+        """
+        將同一路由目標的請求交給對應的功能模組，並套用路由期限
+        
+        每筆請求依自己的 timeout_ms 計時（從分派開始算起），只有逾時的請求回退。
+        每筆請求的分派耗時（含工作執行緒交接與逾時回退）記錄到 tonesoul_module_duration_seconds。
+        
+        Args:
+            next_module: 路由決定的模組名稱
+            router_outputs: ToneStrategicRouter 的輸出字典列表
+        
+        Returns:
+            與輸入順序一致的處理結果列表
+        """
+        if next_module not in self.modules:
+            logger.warning(f"Module {next_module} not found, using default handler")
+            next_module = self.fallback_module
+        
+        start_ns = time.perf_counter_ns()
+        try:
+            return self._dispatch(next_module, router_outputs)
+        finally:
+            items = max(len(router_outputs), 1)
+            MODULE_DURATION.observe_ns((time.perf_counter_ns() - start_ns) // items, next_module, count=items)
+    
+    def shutdown(self, wait: bool = False) -> None:
+        """關閉工作執行緒池並取消尚未開始的工作"""
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """獲取執行統計資訊"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["timeouts_by_module"] = dict(self.timeouts_by_module)
+        return stats
+    
+    def _dispatch(self, next_module: str, router_outputs: List[dict]) -> List[dict]:
+        with self._lock:
+            self.stats["dispatched"] += 1
+        
+        timeouts_ms = [self._timeout_ms(router_output) for router_output in router_outputs]
+        if next_module == self.fallback_module or next_module in self.unbounded_modules or not any(timeouts_ms):
+            return self._call(next_module, router_outputs)
+        
+        # 每筆請求各自提交，工作執行緒只修改追溯鏈的副本，期限內完成時才採用它的結果
+        start_ns = time.perf_counter_ns()
+        futures = [
+            self._pool.submit(self._call, next_module, [self._isolate(router_output)])
+            for router_output in router_outputs
+        ]
+        results: List[Optional[dict]] = [None] * len(router_outputs)
+        timed_out: List[int] = []
+        for index, (future, timeout_ms) in enumerate(zip(futures, timeouts_ms)):
+            remaining = None
+            if timeout_ms:
+                remaining = max(timeout_ms / 1000 - (time.perf_counter_ns() - start_ns) / 1e9, 0.0)
+            try:
+                results[index] = future.result(timeout=remaining)[0]
+            except concurrent.futures.TimeoutError:
+                future.cancel()
+                timed_out.append(index)
+                self._record_timeout(router_outputs[index], next_module, timeout_ms, duration_ms(start_ns))
+        
+        if timed_out:
+            with self._lock:
+                self.stats["timeouts"] += len(timed_out)
+                self.timeouts_by_module[next_module] += len(timed_out)
+            logger.warning(f"{len(timed_out)} of {len(router_outputs)} requests for {next_module} exceeded "
+                           f"their deadline, falling back to {self.fallback_module}")
+            fallback_results = self._call(self.fallback_module, [router_outputs[index] for index in timed_out])
+            for index, result in zip(timed_out, fallback_results):
+                results[index] = result
+        return results
+    
+    def _record_timeout(self, router_output: dict, next_module: str, timeout_ms: int, elapsed: float) -> None:
+        source_trace = router_output.get("source_trace")
+        if source_trace is not None:
+            source_trace.record_step(
+                tool="core.ModuleExecutor.v0.1",
+                status=TraceStatus.FAIL,
+                evidence=f"{next_module} exceeded its {timeout_ms}ms deadline after {int(elapsed)}ms; "
+                         f"fell back to {self.fallback_module}",
+                trust_level=TrustLevel.C,
+                latency_ms=elapsed
+            )
+    
+    def _call(self, module_name: str, router_outputs: List[dict]) -> List[dict]:
+        module = self.modules[module_name]
+        # VowChecker 使用特殊的方法名
+        if module_name == "vow_checker_module":
+            return module.process_vow_batch(router_outputs)
+        return module.process_batch(router_outputs)
+    
+    def _timeout_ms(self, router_output: dict) -> Optional[int]:
+        return router_output.get("next_strategy", {}).get("timeout_ms", self.default_timeout_ms)
+    
+    @staticmethod
+    def _isolate(router_output: dict) -> dict:
+        source_trace = router_output.get("source_trace")
+        if source_trace is None:
+            return router_output
+        return dict(router_output, source_trace=source_trace.fork())
@@ -0,0 +1,43 @@
+# file: src/core/module_registry.py
+from typing import Any, Dict, Optional
+
+from src.core.qa_module import QAModule
+from src.core.knowledge_base_module import KnowledgeBaseModule
+from src.core.knowledge_corpus import KnowledgeIndex
+from src.core.reflection_module import ReflectionModule
+from src.core.empathy_module import EmpathyModule
+from src.core.gratitude_handler_module import GratitudeHandlerModule
+from src.core.complaint_handler_module import ComplaintHandlerModule
+from src.core.action_executor_module import ActionExecutorModule
+from src.core.assistance_module import AssistanceModule
+from src.core.conversation_module import ConversationModule
+from src.core.statement_processor_module import StatementProcessorModule
+from src.core.default_handler_module import DefaultHandlerModule
+from src.core.vow_checker import VowChecker
+
+
+def create_functional_modules(vow_checker: VowChecker, knowledge_index: Optional[KnowledgeIndex] = None) -> Dict[str, Any]:
+    """
+    建立路由目標名稱到功能模組的對照表
+    
+    Args:
+        vow_checker: 處理 vow_checker_module 路由的承諾檢查器
+        knowledge_index: QAModule 與 KnowledgeBaseModule 共用的知識庫索引
+    
+    Returns:
+        模組名稱到功能模組實例的字典
+    """
+    return {
+        "qa_module": QAModule(knowledge_index),
+        "knowledge_base_module": KnowledgeBaseModule(knowledge_index),
+        "reflection_module": ReflectionModule(),
+        "empathy_module": EmpathyModule(),
+        "gratitude_handler_module": GratitudeHandlerModule(),
+        "complaint_handler_module": ComplaintHandlerModule(),
+        "action_executor_module": ActionExecutorModule(),
+        "assistance_module": AssistanceModule(),
+        "conversation_module": ConversationModule(),
+        "statement_processor_module": StatementProcessorModule(),
+        "default_handler_module": DefaultHandlerModule(),
+        "vow_checker_module": vow_checker  # VowChecker 特殊處理
+    }
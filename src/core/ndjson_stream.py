@@ -0,0 +1,189 @@
+# file: src/core/ndjson_stream.py
+import asyncio
+import concurrent.futures
+import json
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+# 單行的最大位元組數，超過的行整行捨棄並返回錯誤，避免一行無換行的上傳佔滿記憶體
+MAX_LINE_BYTES = 64 * 1024
+
+# 單個句子的最大字元數（與 /v1/process 的限制相同）
+MAX_SENTENCE_LENGTH = 500
+
+# 讀取端放入佇列的結束標記
+_END = object()
+
+
+async def iter_lines(chunks: AsyncIterable[bytes], max_line_bytes: int = MAX_LINE_BYTES) -> AsyncIterator[Optional[bytes]]:
+    """
+    將位元組區塊流逐行切分
+    
+    Args:
+        chunks: 請求主體的位元組區塊
+        max_line_bytes: 單行的最大位元組數
+    
+    Returns:
+        逐行產生不含換行符的位元組；超過長度上限的行產生 None
+    """
+    buffer = bytearray()
+    overflow = False
+    async for chunk in chunks:
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            if end < 0:
+                if not overflow:
+                    buffer += chunk[start:]
+                    if len(buffer) > max_line_bytes:
+                        overflow = True
+                        buffer.clear()
+                break
+            if not overflow:
+                buffer += chunk[start:end]
+                overflow = len(buffer) > max_line_bytes
+            yield None if overflow else bytes(buffer)
+            buffer.clear()
+            overflow = False
+            start = end + 1
+    if overflow:
+        yield None
+    elif buffer:
+        yield bytes(buffer)
+
+
+def parse_line(raw: bytes, max_sentence_length: int = MAX_SENTENCE_LENGTH) -> Tuple[str, Optional[str]]:
+    """
+    解析一行輸入
+    
+    以 `{` 開頭的行視為 JSON 物件（{"sentence": ..., "trace_id": ...}），
+    以 `"` 開頭的行視為 JSON 字串，其他行整行即為句子。
+    
+    Returns:
+        (句子, 追溯 ID)
+    
+    Raises:
+        ValueError: 無法解析或句子長度不符
+    """
+    text = raw.decode("utf-8").strip()
+    trace_id = None
+    if text.startswith("{"):
+        data = json.loads(text)
+        sentence = data.get("sentence")
+        trace_id = data.get("trace_id")
+        if trace_id is not None and not isinstance(trace_id, str):
+            raise ValueError("trace_id must be a string")
+    elif text.startswith('"'):
+        sentence = json.loads(text)
+    else:
+        sentence = text
+    
+    if not isinstance(sentence, str) or not sentence.strip():
+        raise ValueError("sentence must be a non-empty string")
+    if len(sentence) > max_sentence_length:
+        raise ValueError(f"sentence exceeds {max_sentence_length} characters")
+    return sentence, trace_id
+
+
+class NDJSONStreamProcessor:
+    """
+    逐行串流處理器
+    
+    讀取端邊接收請求主體邊切行解析，放入有界佇列；處理端從佇列取出目前已到達的行
+    （最多 batch_size 行）交給批次處理流程，並依輸入順序產生每行一筆的 NDJSON 結果。
+    佇列滿時讀取端停止讀取請求主體，上傳方會受到背壓，因此記憶體用量與輸入總行數無關。
+    """
+    
+    def __init__(self, process_batch: Callable[[List[str], List[Optional[str]]], Dict[str, Any]],
+                 executor: Optional[concurrent.futures.Executor] = None,
+                 batch_size: int = 64, max_buffered_lines: int = 1024,
+                 max_line_bytes: int = MAX_LINE_BYTES, max_sentence_length: int = MAX_SENTENCE_LENGTH):
+        """
+        Args:
+            process_batch: 批次處理函數，返回包含 results 列表的字典（例如 ToneSoulService.process_batch）
+            executor: 執行 process_batch 的執行緒池
+            batch_size: 每次交給 process_batch 的最大行數
+            max_buffered_lines: 已解析、尚未處理的行數上限
+            max_line_bytes: 單行的最大位元組數
+            max_sentence_length: 單個句子的最大字元數
+        """
+        if batch_size < 1 or max_buffered_lines < 1:
+            raise ValueError("batch_size and max_buffered_lines must be at least 1")
+        
+        self.process_batch = process_batch
+        self.executor = executor
+        self.batch_size = batch_size
+        self.max_buffered_lines = max_buffered_lines
+        self.max_line_bytes = max_line_bytes
+        self.max_sentence_length = max_sentence_length
+    
+    async def process(self, chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+        """
+        處理位元組區塊流
+        
+        Args:
+            chunks: 請求主體的位元組區塊
+        
+        Returns:
+            逐批產生 NDJSON 位元組，每行一筆結果並附帶輸入行號 line（從 1 起算，空行不產生結果）
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_buffered_lines)
+        reader = asyncio.create_task(self._read(chunks, queue))
+        try:
+            finished = False
+            while not finished:
+                batch = [await queue.get()]
+                if batch[0] is _END:
+                    break
+                while len(batch) < self.batch_size:
+                    try:
+                        item = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        break
+                    if item is _END:
+                        finished = True
+                        break
+                    batch.append(item)
+                yield await self._run_batch(batch)
+            # 讀取端的例外（例如上傳中斷）在此拋出
+            await reader
+        finally:
+            reader.cancel()
+    
+    async def _read(self, chunks: AsyncIterable[bytes], queue: asyncio.Queue) -> None:
+        line_number = 0
+        try:
+            async for raw in iter_lines(chunks, self.max_line_bytes):
+                line_number += 1
+                if raw is None:
+                    await queue.put((line_number, None, None, f"line exceeds {self.max_line_bytes} bytes"))
+                    continue
+                if not raw.strip():
+                    continue
+                try:
+                    sentence, trace_id = parse_line(raw, self.max_sentence_length)
+                except ValueError as e:
+                    await queue.put((line_number, None, None, str(e)))
+                    continue
+                await queue.put((line_number, sentence, trace_id, None))
+        finally:
+            await queue.put(_END)
+    
+    async def _run_batch(self, batch: List[Tuple[int, Optional[str], Optional[str], Optional[str]]]) -> bytes:
+        valid = [item for item in batch if item[3] is None]
+        results = iter([])
+        if valid:
+            loop = asyncio.get_running_loop()
+            output = await loop.run_in_executor(
+                self.executor, self.process_batch,
+                [item[1] for item in valid], [item[2] for item in valid]
+            )
+            results = iter(output["results"])
+        
+        lines = []
+        for line_number, _, _, error in batch:
+            if error is None:
+                result = dict(next(results), line=line_number)
+            else:
+                result = {"success": False, "line": line_number, "error": error}
+            lines.append(json.dumps(result, ensure_ascii=False))
+        return ("\n".join(lines) + "\n").encode("utf-8")
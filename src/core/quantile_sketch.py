@@ -0,0 +1,215 @@
+# file: src/core/quantile_sketch.py
+import math
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# 對外公布的預設分位數
+DEFAULT_QUANTILES: Tuple[float, ...] = (0.5, 0.95, 0.99)
+
+
+class DDSketch:
+    """
+    DDSketch 風格的串流分位數草圖
+    
+    將正數依對數刻度分桶，任何分位數估計值與真實值的相對誤差不超過 relative_accuracy。
+    桶數上限為 max_buckets，超過時把最低的桶合併，犧牲低分位數的精度以保留尾端延遲；
+    因此記憶體與資料量無關。相同參數的草圖可以直接合併。
+    小於等於 0 的值（例如 0ms 延遲或 0.0 信心度）計入零值桶。
+    """
+    
+    __slots__ = ("relative_accuracy", "max_buckets", "_gamma", "_log_gamma",
+                 "_bins", "_zero_count", "count", "sum", "min", "max")
+    
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        if not 0.0 < relative_accuracy < 1.0:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        if max_buckets < 2:
+            raise ValueError("max_buckets must be at least 2")
+        
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._bins: Dict[int, int] = {}
+        self._zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+    
+    def add(self, value: float) -> None:
+        """加入一筆資料"""
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        
+        if value <= 0:
+            self._zero_count += 1
+            return
+        
+        key = math.ceil(math.log(value) / self._log_gamma)
+        self._bins[key] = self._bins.get(key, 0) + 1
+        if len(self._bins) > self.max_buckets:
+            self._collapse()
+    
+    def merge(self, other: "DDSketch") -> None:
+        """將另一個相同參數的草圖併入本草圖"""
+        if other._gamma != self._gamma:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for key, count in other._bins.items():
+            self._bins[key] = self._bins.get(key, 0) + count
+        self._zero_count += other._zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        if len(self._bins) > self.max_buckets:
+            self._collapse()
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        估計分位數
+        
+        Args:
+            q: 0 到 1 之間的分位數
+        
+        Returns:
+            估計值；沒有資料時返回 None
+        """
+        if not 0.0 <= q <= 1.0:
+            raise ValueError("q must be between 0 and 1")
+        if self.count == 0:
+            return None
+        if q == 0.0:
+            return self.min
+        if q == 1.0:
+            return self.max
+        
+        rank = q * (self.count - 1)
+        seen = self._zero_count
+        if rank < seen:
+            return 0.0
+        
+        for key in sorted(self._bins):
+            seen += self._bins[key]
+            if rank < seen:
+                estimate = 2 * self._gamma ** key / (self._gamma + 1)
+                # 估計值不會超出實際觀察到的範圍
+                return min(max(estimate, self.min), self.max)
+        return self.max
+    
+    def mean(self) -> Optional[float]:
+        """平均值；沒有資料時返回 None"""
+        return self.sum / self.count if self.count else None
+    
+    def summary(self, quantiles: Iterable[float] = DEFAULT_QUANTILES) -> Dict[str, Any]:
+        """以 p50 / p95 / p99 等鍵返回摘要"""
+        result: Dict[str, Any] = {
+            "count": self.count,
+            "mean": self.mean(),
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None
+        }
+        for q in quantiles:
+            result[_quantile_label(q)] = self.quantile(q)
+        return result
+    
+    def _collapse(self) -> None:
+        """合併最低的桶直到桶數回到上限"""
+        keys = sorted(self._bins)
+        excess = len(keys) - self.max_buckets
+        target = keys[excess]
+        for key in keys[:excess]:
+            self._bins[target] += self._bins.pop(key)
+
+
+class QuantileRegistry:
+    """
+    依名稱管理多個 DDSketch（例如每個管線階段或每個 ToneFunction 一個）
+    
+    每個草圖的記憶體有上限，總記憶體只隨名稱數量成長。
+    """
+    
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self._sketches: Dict[str, DDSketch] = {}
+        self._lock = threading.Lock()
+    
+    def record(self, name: str, value: float) -> None:
+        """將一筆資料記錄到指定名稱的草圖"""
+        with self._lock:
+            sketch = self._sketches.get(name)
+            if sketch is None:
+                sketch = DDSketch(self.relative_accuracy, self.max_buckets)
+                self._sketches[name] = sketch
+            sketch.add(value)
+    
+    def merge(self, other: "QuantileRegistry") -> None:
+        """併入另一個註冊表（例如其他工作行程的統計）"""
+        with other._lock:
+            incoming = list(other._sketches.items())
+        with self._lock:
+            for name, sketch in incoming:
+                if name not in self._sketches:
+                    self._sketches[name] = DDSketch(self.relative_accuracy, self.max_buckets)
+                self._sketches[name].merge(sketch)
+    
+    def get(self, name: str) -> Optional[DDSketch]:
+        """取得指定名稱的草圖"""
+        return self._sketches.get(name)
+    
+    def snapshot(self, quantiles: Iterable[float] = DEFAULT_QUANTILES) -> Dict[str, Dict[str, Any]]:
+        """所有草圖的摘要，依名稱排序"""
+        quantiles = tuple(quantiles)
+        with self._lock:
+            return {name: self._sketches[name].summary(quantiles) for name in sorted(self._sketches)}
+
+
+class LatencyMetrics:
+    """
+    請求路徑上的延遲分佈
+    
+    每條完成的追溯鏈依步驟的 tool 名稱記錄各管線階段的延遲，
+    並依 ToneFunction 記錄整筆請求的延遲。
+    """
+    
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        self.stages = QuantileRegistry(relative_accuracy, max_buckets)
+        self.tone_functions = QuantileRegistry(relative_accuracy, max_buckets)
+    
+    def record(self, steps: Iterable[Any], tone_function: str, total_latency: float) -> None:
+        """
+        記錄一筆完成的請求
+        
+        Args:
+            steps: 追溯步驟（需有 tool 與 duration_ms 屬性）
+            tone_function: ToneFunction 的值
+            total_latency: 整筆請求的處理時間（毫秒，保留小數）
+        """
+        # 使用未捨去的 duration_ms：次毫秒的階段捨去成整數後全是 0，分位數沒有意義
+        for step in steps:
+            self.stages.record(step.tool, step.duration_ms)
+        self.tone_functions.record(tone_function, total_latency)
+    
+    def merge(self, other: "LatencyMetrics") -> None:
+        """併入另一組延遲統計"""
+        self.stages.merge(other.stages)
+        self.tone_functions.merge(other.tone_functions)
+    
+    def snapshot(self, quantiles: Iterable[float] = DEFAULT_QUANTILES) -> Dict[str, Any]:
+        """各階段與各 ToneFunction 的延遲摘要（毫秒）"""
+        quantiles = tuple(quantiles)
+        return {
+            "stages": self.stages.snapshot(quantiles),
+            "tone_functions": self.tone_functions.snapshot(quantiles)
+        }
+
+
+def _quantile_label(q: float) -> str:
+    """0.5 -> p50, 0.999 -> p99.9"""
+    label = f"{q * 100:.4f}".rstrip("0").rstrip(".")
+    return f"p{label}"
@@ -0,0 +1,243 @@
+# file: src/core/response_templates.py
+import json
+import os
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+# 功能模組的回應模板
+#
+# 鍵為模組名稱，值包含：
+#   prefix     規則關鍵字分類的前綴，分類名稱為「prefix.規則名稱」
+#   default    沒有任何規則命中時的回應
+#   rules      依優先序排列的規則，每條規則有 name、keywords 與 response，命中多條時取排在最前面的一條
+#   responses  (可選) 由模組程式依其他條件選用的具名回應
+#
+# 規則的關鍵字與 KEYWORD_TABLES 一起編譯進共用的 KeywordAutomaton（見 shared_keyword_tables()），因此每個請求仍只掃描一次；
+# 設定 TONESOUL_RESPONSE_TEMPLATES 指向相同結構的 JSON 檔案時，檔案中的模組整筆取代此處的預設值。
+RESPONSE_TEMPLATES: Dict[str, Dict[str, Any]] = {
+    "QAModule": {
+        "prefix": "qa",
+        "default": "感謝您的提問，我會盡力為您提供幫助。",
+        "rules": [
+            {"name": "how", "keywords": ["如何"], "response": "這是一個很好的問題。建議您可以通過以下步驟來解決..."},
+            {"name": "what", "keywords": ["什麼"], "response": "根據我的理解，這個概念是指..."},
+        ],
+    },
+    "KnowledgeBaseModule": {
+        "prefix": "knowledge",
+        "default": "這是一個有趣的問題，讓我為您查找相關資訊。",
+        "rules": [
+            {"name": "ai", "keywords": ["人工智慧", "AI"],
+             "response": "人工智慧是一種模擬人類智能的技術，包括機器學習、深度學習等領域。"},
+            {"name": "programming", "keywords": ["程式設計"],
+             "response": "程式設計是創建電腦程式的過程，涉及邏輯思維和問題解決能力。"},
+        ],
+    },
+    "ReflectionModule": {
+        "prefix": "reflection",
+        "default": "讓我仔細思考這個問題的各個層面...",
+        "rules": [
+            {"name": "opinion", "keywords": ["怎麼樣", "覺得"], "response": "這是一個值得深思的問題。從多個角度來看，我認為..."},
+            {"name": "view", "keywords": ["意見", "看法"], "response": "基於我的理解和分析，我的看法是..."},
+        ],
+    },
+    "EmpathyModule": {
+        "prefix": "empathy",
+        "default": "我能感受到您的情感。無論您現在感受如何，我都在這裡支持您。",
+        "rules": [
+            {"name": "sadness", "keywords": ["難過", "傷心", "沮喪"],
+             "response": "我能感受到您的難過。情感是人類寶貴的體驗，請允許自己感受這些情緒。"},
+            {"name": "anger", "keywords": ["生氣", "憤怒", "不滿"],
+             "response": "我理解您的憤怒。有時候表達情感是很重要的，我在這裡傾聽您。"},
+            {"name": "anxiety", "keywords": ["焦慮", "擔心", "害怕"],
+             "response": "我感受到您的擔憂。焦慮是正常的情感反應，讓我們一起面對這些感受。"},
+        ],
+    },
+    "GratitudeHandlerModule": {
+        "prefix": "gratitude",
+        "default": "感謝您的正面回饋，這激勵我持續改進。",
+        "rules": [
+            {"name": "thanks", "keywords": ["謝謝", "感謝"], "response": "不客氣！能夠幫助您是我的榮幸。如果還有其他需要，請隨時告訴我。"},
+            {"name": "praise", "keywords": ["太好了", "很棒"], "response": "很高興能得到您的認可！我會繼續努力提供更好的服務。"},
+            {"name": "like", "keywords": ["讚"], "response": "謝謝您的讚美！這對我來說意義重大。"},
+        ],
+    },
+    "ComplaintHandlerModule": {
+        "prefix": "complaint",
+        "default": "我聽到了您的關切。請讓我了解更多細節，以便我能更好地幫助您。",
+        "rules": [
+            {"name": "apology", "keywords": ["糟糕", "爛"], "response": "我深表歉意讓您有這樣的體驗。請告訴我具體的問題，我會盡力改善。"},
+            {"name": "annoyance", "keywords": ["討厭", "煩"], "response": "我理解您的困擾。讓我們找出問題的根源，並尋求解決方案。"},
+            {"name": "feedback", "keywords": ["不滿", "抱怨"], "response": "感謝您提出這個問題。您的反饋對我們的改進非常重要。"},
+        ],
+    },
+    "ActionExecutorModule": {
+        "prefix": "action",
+        "default": "我已經記錄了您的行動請求，正在處理中。",
+        "rules": [
+            {"name": "open", "keywords": ["開啟", "打開"], "response": "我已經嘗試開啟您要求的項目。請檢查是否成功。"},
+            {"name": "close", "keywords": ["關閉"], "response": "我已經嘗試關閉指定的項目。"},
+            {"name": "run", "keywords": ["執行", "運行"], "response": "我已經開始執行您要求的操作。"},
+            {"name": "stop", "keywords": ["停止"], "response": "我已經嘗試停止相關的操作。"},
+        ],
+    },
+    "AssistanceModule": {
+        "prefix": "assistance",
+        "default": "我理解您需要幫助。請讓我知道我能為您做些什麼。",
+        "rules": [
+            {"name": "help", "keywords": ["幫我", "幫忙"], "response": "當然！我很樂意幫助您。請告訴我您需要什麼樣的協助。"},
+            {"name": "assist", "keywords": ["協助"], "response": "我在這裡為您提供協助。請詳細說明您遇到的問題。"},
+            {"name": "support", "keywords": ["支援"], "response": "我會全力支援您。讓我們一起解決這個問題。"},
+        ],
+    },
+    "ConversationModule": {
+        "prefix": "conversation",
+        "default": "很有趣的話題！我很享受和您的對話。",
+        "rules": [
+            {"name": "greeting", "keywords": ["你好", "嗨"], "response": "你好！很高興見到您。今天過得怎麼樣？"},
+            {"name": "weather", "keywords": ["天氣"], "response": "是的，天氣確實是個不錯的話題。希望您今天有個美好的天氣！"},
+            {"name": "morning", "keywords": ["早安"], "response": "早安！希望您今天有個美好的開始。"},
+            {"name": "night", "keywords": ["晚安"], "response": "晚安！祝您有個甜美的夢境。"},
+        ],
+    },
+    "StatementProcessorModule": {
+        "prefix": "statement",
+        "default": "我已經記錄了您的陳述。如果您有更多想法，我很樂意聆聽。",
+        "rules": [
+            {"name": "opinion", "keywords": ["我認為", "我覺得"], "response": "我理解您的觀點。這是一個很有見地的想法。"},
+            {"name": "fact", "keywords": ["事實上", "實際上"], "response": "感謝您分享這個資訊。我會將此納入考慮。"},
+            {"name": "thought", "keywords": ["我想"], "response": "我聽到了您的想法。請繼續分享您的見解。"},
+        ],
+    },
+    "DefaultHandlerModule": {
+        "prefix": "default",
+        "default": "我理解您的輸入，但我需要更多資訊來提供最佳的回應。請告訴我更多詳細資訊。",
+        "rules": [],
+        "responses": {
+            "empty": "我沒有收到明確的輸入。請告訴我您需要什麼幫助。",
+            "long": "您提供了很多資訊。讓我仔細理解您的需求，然後為您提供適當的回應。",
+        },
+    },
+}
+
+
+class ModuleTemplates:
+    """
+    一個模組編譯後的回應模板
+    
+    規則在編譯時展開成「分類名稱 -> (優先序, 回應)」的字典，選擇回應時只走訪本次請求的關鍵字命中，
+    成本與命中數量有關，與規則數量無關。
+    """
+    
+    def __init__(self, module_name: str, config: Dict[str, Any]):
+        """
+        Args:
+            module_name: 模組名稱
+            config: RESPONSE_TEMPLATES 中該模組的設定
+        
+        Raises:
+            ValueError: 設定缺少必要欄位或規則名稱重複
+        """
+        prefix = config.get("prefix")
+        default = config.get("default")
+        if not isinstance(prefix, str) or not prefix or not isinstance(default, str):
+            raise ValueError(f"Templates for {module_name} need a 'prefix' and a 'default' response")
+        
+        self.module_name = module_name
+        self.prefix = prefix
+        self.default = default
+        self.responses: Dict[str, str] = dict(config.get("responses", {}))
+        self.keyword_tables: Dict[str, List[str]] = {}
+        self._rules: Dict[str, Tuple[int, str]] = {}
+        
+        for priority, rule in enumerate(config.get("rules", [])):
+            name, keywords, response = rule.get("name"), rule.get("keywords"), rule.get("response")
+            if not isinstance(name, str) or not isinstance(response, str) or not keywords \
+                    or not all(isinstance(keyword, str) for keyword in keywords):
+                raise ValueError(f"Invalid template rule #{priority} for {module_name}")
+            category = f"{prefix}.{name}"
+            if category in self._rules:
+                raise ValueError(f"Duplicate template rule '{category}' for {module_name}")
+            self._rules[category] = (priority, response)
+            self.keyword_tables[category] = list(keywords)
+    
+    def __len__(self) -> int:
+        return len(self._rules)
+    
+    def select(self, keyword_hits: Dict[str, Any]) -> str:
+        """
+        選擇命中規則中優先序最高的回應
+        
+        Args:
+            keyword_hits: 共用自動機的掃描結果
+        
+        Returns:
+            預先建立的回應字串；沒有規則命中時返回 default
+        """
+        best = None
+        for category in keyword_hits:
+            rule = self._rules.get(category)
+            if rule is not None and (best is None or rule[0] < best[0]):
+                best = rule
+        return self.default if best is None else best[1]
+
+
+class TemplateTable:
+    """所有模組編譯後的回應模板"""
+    
+    def __init__(self, templates: Dict[str, Dict[str, Any]]):
+        """
+        Args:
+            templates: 與 RESPONSE_TEMPLATES 相同結構的設定
+        """
+        self.modules: Dict[str, ModuleTemplates] = {
+            module_name: ModuleTemplates(module_name, config) for module_name, config in templates.items()
+        }
+    
+    def __getitem__(self, module_name: str) -> ModuleTemplates:
+        return self.modules[module_name]
+    
+    def __contains__(self, module_name: str) -> bool:
+        return module_name in self.modules
+    
+    def keyword_tables(self) -> Dict[str, List[str]]:
+        """
+        所有規則的關鍵字分類，用於編譯共用自動機
+        
+        Raises:
+            ValueError: 兩個模組的規則分類名稱重複（例如使用相同的 prefix）
+        """
+        tables: Dict[str, List[str]] = {}
+        for module_name, templates in self.modules.items():
+            overlap = sorted(tables.keys() & templates.keyword_tables.keys())
+            if overlap:
+                raise ValueError(f"Template rules of {module_name} collide with other modules: {', '.join(overlap)}")
+            tables.update(templates.keyword_tables)
+        return tables
+
+
+def load_response_templates(path: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    讀取回應模板設定
+    
+    Args:
+        path: JSON 設定檔路徑，預設為環境變數 TONESOUL_RESPONSE_TEMPLATES；未設定時只使用預設模板
+    
+    Returns:
+        預設模板與設定檔合併後的設定（設定檔中的模組整筆取代預設值）
+    """
+    path = path or os.environ.get("TONESOUL_RESPONSE_TEMPLATES")
+    templates = dict(RESPONSE_TEMPLATES)
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            overrides = json.load(f)
+        if not isinstance(overrides, dict):
+            raise ValueError(f"{path}: response templates must be a JSON object keyed by module name")
+        templates.update(overrides)
+    return templates
+
+
+@lru_cache(maxsize=None)
+def get_template_table() -> TemplateTable:
+    """獲取編譯後的共用回應模板（整個行程只讀取與編譯一次）"""
+    return TemplateTable(load_response_templates())
@@ -0,0 +1,164 @@
+# file: src/core/result_cache.py
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from src.schemas.source_trace import TraceStatus, TrustLevel
+
+# 有副作用的路由目標（例如建立誓言）不快取，每次都必須實際執行
+UNCACHEABLE_MODULES = frozenset({"vow_checker_module"})
+
+# 快取命中時寫入追溯鏈的工具名稱
+CACHE_TOOL = "core.ResultCache.v0.1"
+
+
+def normalize_sentence(sentence: str) -> str:
+    """
+    快取鍵使用的句子正規化：Unicode NFC 並去除前後空白
+    
+    服務端以正規化後的句子執行處理流程，因此相同鍵的結果必定一致。
+    """
+    return unicodedata.normalize("NFC", sentence).strip()
+
+
+class ResultCache:
+    """
+    以正規化句子為鍵的有界 LRU / TTL 結果快取
+    
+    保存分類、路由策略與 module_response；命中時不重新執行感知、分類、路由與功能模組，
+    而是在新的追溯鏈上記錄一個 core.ResultCache 步驟，註明結果來自哪一條原始追溯鏈。
+    只有整條追溯鏈都成功且路由目標沒有副作用的結果會被快取。
+    """
+    
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 300.0):
+        """
+        Args:
+            max_entries: 最多保留的項目數，超過時淘汰最久未使用的項目
+            ttl_seconds: 項目的存活時間（秒）
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "expirations": 0
+        }
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        查詢快取
+        
+        Args:
+            key: normalize_sentence() 的結果
+        
+        Returns:
+            快取的結果，未命中或已過期時返回 None
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                self.stats["expirations"] += 1
+                entry = None
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry[1]
+    
+    def put(self, key: str, final_output: Dict[str, Any]) -> bool:
+        """
+        保存一筆處理結果（不可快取的結果會被略過）
+        
+        Args:
+            key: normalize_sentence() 的結果
+            final_output: 功能模組的輸出
+        
+        Returns:
+            是否已保存
+        """
+        next_strategy = final_output.get("next_strategy", {})
+        source_trace = final_output["source_trace"]
+        if next_strategy.get("next_module") in UNCACHEABLE_MODULES:
+            return False
+        if any(step.status != TraceStatus.SUCCESS for step in source_trace.steps):
+            return False
+        
+        entry = {
+            "intent_type": final_output.get("intent_type", "unknown"),
+            "tone_function": final_output.get("tone_function"),
+            "next_strategy": dict(next_strategy),
+            "module_response": final_output.get("module_response"),
+            "processing_status": final_output.get("processing_status", "completed"),
+            "source_trace_id": source_trace.id
+        }
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, entry)
+            self._entries.move_to_end(key)
+            self.stats["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+        return True
+    
+    def replay(self, entry: Dict[str, Any], sentence: str, source_trace) -> Dict[str, Any]:
+        """
+        以快取結果構建功能模組格式的輸出，並在新的追溯鏈上記錄命中
+        
+        Args:
+            entry: get() 返回的快取結果
+            sentence: 本次請求的原始句子
+            source_trace: 本次請求的新追溯鏈
+        
+        Returns:
+            與功能模組輸出格式相同的字典
+        """
+        start_time = time.perf_counter()
+        result = {
+            "original_sentence": sentence,
+            "intent_type": entry["intent_type"],
+            "tone_function": entry["tone_function"],
+            "next_strategy": dict(entry["next_strategy"]),
+            "module_response": entry["module_response"],
+            "processing_status": entry["processing_status"],
+            "source_trace": source_trace
+        }
+        source_trace.record_step(
+            tool=CACHE_TOOL,
+            status=TraceStatus.SUCCESS,
+            evidence=f"Cache hit: replayed {entry['next_strategy'].get('next_module')} result "
+                     f"from trace {entry['source_trace_id']}",
+            trust_level=TrustLevel.B,
+            latency_ms=(time.perf_counter() - start_time) * 1000
+        )
+        return result
+    
+    def clear(self) -> None:
+        """清空快取"""
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """獲取命中與未命中等統計資訊"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["size"] = len(self._entries)
+        stats["max_entries"] = self.max_entries
+        stats["ttl_seconds"] = self.ttl_seconds
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,187 @@
+# file: src/core/sampling_profiler.py
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Optional
+
+# 模組名稱到管線階段與進化模組名稱的對照；樣本歸屬於堆疊中最內層的對應框架，
+# 因此在功能模組內的樣本算在該模組，只停留在服務層（例如等待准入或記錄日誌）的樣本算在 ToneSoulService
+STAGE_MODULES: Dict[str, str] = {
+    "src.main": "ToneSoulService",
+    "src.core.single_flight": "SingleFlight",
+    "src.core.admission_scheduler": "AdmissionScheduler",
+    "src.core.module_executor": "ModuleExecutor",
+    "src.core.evolution_pipeline": "EvolutionPipeline",
+    "src.core.tone_bridge": "ToneBridge",
+    "src.core.tone_function_classifier": "ToneFunctionClassifier",
+    "src.core.tone_strategic_router": "ToneStrategicRouter",
+    "src.core.vow_checker": "VowChecker",
+    "src.core.qa_module": "QAModule",
+    "src.core.knowledge_base_module": "KnowledgeBaseModule",
+    "src.core.knowledge_corpus": "KnowledgeIndex",
+    "src.core.knowledge_embedding": "KnowledgeIndex",
+    "src.core.reflection_module": "ReflectionModule",
+    "src.core.empathy_module": "EmpathyModule",
+    "src.core.gratitude_handler_module": "GratitudeHandlerModule",
+    "src.core.complaint_handler_module": "ComplaintHandlerModule",
+    "src.core.action_executor_module": "ActionExecutorModule",
+    "src.core.assistance_module": "AssistanceModule",
+    "src.core.conversation_module": "ConversationModule",
+    "src.core.statement_processor_module": "StatementProcessorModule",
+    "src.core.default_handler_module": "DefaultHandlerModule",
+    "src.core.template_handler": "TemplateHandlerModule",
+    "src.core.response_templates": "TemplateHandlerModule",
+    "src.core.adaptive_learning_module": "AdaptiveLearningModule",
+    "src.core.metacognitive_module": "MetacognitiveModule",
+    "src.core.knowledge_evolution_module": "KnowledgeEvolutionModule",
+    "src.core.knowledge_graph": "KnowledgeEvolutionModule",
+    "src.core.knowledge_decay": "KnowledgeEvolutionModule",
+    "src.core.result_cache": "ResultCache",
+    "src.core.trace_log": "TraceLog",
+}
+
+# 只保留經過本專案程式碼的堆疊，閒置的執行緒池與事件迴圈不計入
+PROJECT_PACKAGE = "src."
+
+
+class ProfilerBusy(Exception):
+    """已有分析工作進行中，或距離上一次分析結束未滿冷卻時間"""
+    
+    def __init__(self, retry_after: float):
+        super().__init__(f"A profiling session is already running or cooling down; retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class ProfileSession:
+    """
+    一次取樣分析工作
+    
+    背景執行緒每隔 interval_ms 以 sys._current_frames() 讀取所有執行緒的堆疊，
+    不需要在被分析的程式碼中安插任何鉤子，未分析時沒有額外開銷。
+    取樣的是牆鐘時間，等待准入或等待共用結果的執行緒也會被取樣。
+    """
+    
+    def __init__(self, profiler: "SamplingProfiler", interval_ms: float, max_depth: int):
+        self._profiler = profiler
+        self.interval_ms = interval_ms
+        self.max_depth = max_depth
+        self.ticks = 0
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._started_ns = time.perf_counter_ns()
+        self._thread = threading.Thread(target=self._sample_loop, name="tonesoul-profiler", daemon=True)
+        self._thread.start()
+    
+    def stop(self) -> Dict[str, Any]:
+        """
+        停止取樣並彙整結果
+        
+        Returns:
+            包含取樣次數、各階段樣本數與 collapsed-stack 文字（可直接交給 flamegraph.pl 或 speedscope）的字典
+        """
+        self._stop.set()
+        self._thread.join()
+        self._profiler._release()
+        
+        stages: Counter = Counter()
+        for stack, count in self.stacks.items():
+            stages[stack.split(";", 1)[0]] += count
+        return {
+            "duration_s": round((time.perf_counter_ns() - self._started_ns) / 1e9, 3),
+            "interval_ms": self.interval_ms,
+            "ticks": self.ticks,
+            "samples": sum(self.stacks.values()),
+            "stages": dict(stages.most_common()),
+            "collapsed": "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+        }
+    
+    def _sample_loop(self) -> None:
+        interval = self.interval_ms / 1000
+        own_id = threading.get_ident()
+        while not self._stop.wait(interval):
+            self.ticks += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = self._collapse(frame)
+                if stack is not None:
+                    self.stacks[stack] += 1
+    
+    def _collapse(self, frame) -> Optional[str]:
+        frames = []
+        stage = None
+        in_project = False
+        while frame is not None and len(frames) < self.max_depth:
+            code = frame.f_code
+            module = frame.f_globals.get("__name__", "")
+            if module.startswith(PROJECT_PACKAGE):
+                in_project = True
+                if stage is None:
+                    stage = STAGE_MODULES.get(module)
+            frames.append(f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        if not in_project:
+            return None
+        frames.append(stage or "other")
+        return ";".join(reversed(frames))
+
+
+class SamplingProfiler:
+    """
+    低開銷的統計取樣分析器
+    
+    同一時間只允許一個分析工作，上一個工作結束後須等待 cooldown_s 秒才能開始下一個，
+    避免重複觸發時取樣執行緒本身拖慢線上流量。
+    """
+    
+    def __init__(self, cooldown_s: float = 10.0, max_depth: int = 64):
+        """
+        Args:
+            cooldown_s: 兩次分析工作之間的最短間隔（秒）
+            max_depth: 每個堆疊保留的最大框架數
+        """
+        self.cooldown_s = cooldown_s
+        self.max_depth = max_depth
+        self._lock = threading.Lock()
+        self._active = False
+        self._last_finished: Optional[float] = None
+        self.stats: Dict[str, int] = {
+            "sessions": 0,
+            "rejected": 0
+        }
+    
+    def start(self, interval_ms: float = 10.0) -> ProfileSession:
+        """
+        開始一個分析工作
+        
+        Args:
+            interval_ms: 取樣間隔（毫秒）
+        
+        Returns:
+            進行中的分析工作，呼叫 stop() 取得結果
+        
+        Raises:
+            ProfilerBusy: 已有分析工作進行中或仍在冷卻時間內
+        """
+        with self._lock:
+            retry_after = self._retry_after()
+            if retry_after > 0:
+                self.stats["rejected"] += 1
+                raise ProfilerBusy(retry_after)
+            self._active = True
+            self.stats["sessions"] += 1
+        return ProfileSession(self, interval_ms, self.max_depth)
+    
+    def _retry_after(self) -> float:
+        if self._active:
+            return max(self.cooldown_s, 1.0)
+        if self._last_finished is None:
+            return 0.0
+        return max(self._last_finished + self.cooldown_s - time.monotonic(), 0.0)
+    
+    def _release(self) -> None:
+        with self._lock:
+            self._active = False
+            self._last_finished = time.monotonic()
@@ -0,0 +1,96 @@
+# file: src/core/single_flight.py
+import asyncio
+import concurrent.futures
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+# 跟隨者的追溯鏈副本上記錄共用執行的工具名稱
+COALESCE_TOOL = "core.SingleFlight.v0.1"
+
+
+class SingleFlight:
+    """
+    同鍵請求合併（single-flight）
+    
+    同一個鍵同時只有一次執行：第一個呼叫者（領頭者）實際執行，
+    執行期間到達的同鍵呼叫者（跟隨者）等待並共用同一個結果或例外。
+    執行完成後鍵即移除，之後的呼叫會重新執行，因此不會返回過時的結果。
+    """
+    
+    def __init__(self):
+        self._calls: Dict[Hashable, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {
+            "executions": 0,
+            "coalesced": 0
+        }
+    
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        執行或加入同鍵的執行
+        
+        Args:
+            key: 合併鍵
+            fn: 領頭者執行的函數
+        
+        Returns:
+            (結果, 是否為共用其他呼叫者的結果)
+        """
+        future, leader = self._join(key)
+        if leader:
+            self._run(key, future, fn)
+        return future.result(), not leader
+    
+    async def do_async(self, key: Hashable, fn: Callable[[], Any],
+                       executor: Optional[concurrent.futures.Executor] = None) -> Tuple[Any, bool]:
+        """
+        執行或加入同鍵的執行（非同步版本，領頭者在 executor 上執行 fn）
+        
+        呼叫者被取消時不影響共用的執行，其他等待者仍會取得結果。
+        
+        Returns:
+            (結果, 是否為共用其他呼叫者的結果)
+        """
+        future, leader = self._join(key)
+        if leader:
+            asyncio.get_running_loop().run_in_executor(executor, self._run, key, future, fn)
+        result = await asyncio.shield(asyncio.wrap_future(future))
+        return result, not leader
+    
+    def in_flight(self) -> int:
+        """目前執行中的鍵數"""
+        with self._lock:
+            return len(self._calls)
+    
+    def get_stats(self) -> Dict[str, int]:
+        """獲取實際執行次數與被合併的呼叫次數"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["in_flight"] = len(self._calls)
+        return stats
+    
+    def _join(self, key: Hashable) -> Tuple[concurrent.futures.Future, bool]:
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.stats["coalesced"] += 1
+                return future, False
+            future = concurrent.futures.Future()
+            self._calls[key] = future
+            self.stats["executions"] += 1
+            return future, True
+    
+    def _run(self, key: Hashable, future: concurrent.futures.Future, fn: Callable[[], Any]) -> None:
+        try:
+            result = fn()
+        except Exception as e:
+            self._forget(key)
+            future.set_exception(e)
+        else:
+            self._forget(key)
+            future.set_result(result)
+    
+    def _forget(self, key: Hashable) -> None:
+        # 先移除鍵再公布結果，之後到達的呼叫者會開始新的執行
+        with self._lock:
+            self._calls.pop(key, None)
@@ -0,0 +1,87 @@
+# file: src/core/sliding_window.py
+from array import array
+from typing import Dict, Iterable, List, Tuple
+
+# AdaptiveLearningModule 使用的固定視窗大小
+DEFAULT_WINDOWS: Tuple[int, ...] = (10, 20, 50, 100)
+
+
+class SlidingWindowMetric:
+    """
+    環形緩衝區上的滑動視窗統計
+    
+    每個視窗維護一個累計和：新值進入時加上，離開該視窗的舊值同時減去，
+    因此新增一筆資料與查詢任一視窗的總和、平均都是常數時間，且不需要切片或複製串列。
+    緩衝區每繞一圈會依實際內容重新計算一次累計和，避免浮點誤差累積。
+    """
+    
+    __slots__ = ("windows", "capacity", "count", "_buffer", "_position", "_sums")
+    
+    def __init__(self, windows: Iterable[int] = DEFAULT_WINDOWS):
+        self.windows: Tuple[int, ...] = tuple(sorted(set(windows)))
+        if not self.windows or self.windows[0] < 1:
+            raise ValueError("windows must be positive integers")
+        
+        self.capacity = self.windows[-1]
+        self.count = 0
+        self._buffer = array("d", [0.0] * self.capacity)
+        self._position = 0
+        self._sums: Dict[int, float] = {window: 0.0 for window in self.windows}
+    
+    def __len__(self) -> int:
+        """目前保留的資料筆數（不超過最大視窗）"""
+        return min(self.count, self.capacity)
+    
+    def push(self, value: float) -> None:
+        """加入一筆新資料"""
+        buffer = self._buffer
+        capacity = self.capacity
+        position = self._position
+        
+        for window in self.windows:
+            total = self._sums[window] + value
+            if self.count >= window:
+                # 第 window 筆之前的資料離開這個視窗
+                total -= buffer[(position - window) % capacity]
+            self._sums[window] = total
+        
+        buffer[position] = value
+        self.count += 1
+        self._position = (position + 1) % capacity
+        
+        if self._position == 0:
+            self._resync()
+    
+    def sum(self, window: int) -> float:
+        """最近 window 筆資料的總和（資料不足時為全部資料的總和）"""
+        return self._sums[window]
+    
+    def size(self, window: int) -> int:
+        """最近 window 筆資料實際包含的筆數"""
+        return min(self.count, window)
+    
+    def mean(self, window: int) -> float:
+        """最近 window 筆資料的平均值，沒有資料時返回 0.0"""
+        size = self.size(window)
+        return self._sums[window] / size if size else 0.0
+    
+    def last(self) -> float:
+        """最新的一筆資料"""
+        if not self.count:
+            raise IndexError("no values recorded")
+        return self._buffer[(self._position - 1) % self.capacity]
+    
+    def recent(self, n: int) -> List[float]:
+        """最近 n 筆資料（由舊到新，不超過目前保留的筆數）"""
+        n = min(n, len(self))
+        return [self._buffer[(self._position - offset) % self.capacity] for offset in range(n, 0, -1)]
+    
+    def _resync(self) -> None:
+        """依緩衝區內容重新計算各視窗的累計和"""
+        buffer = self._buffer
+        capacity = self.capacity
+        for window in self.windows:
+            total = 0.0
+            for offset in range(1, min(window, self.count) + 1):
+                total += buffer[(self._position - offset) % capacity]
+            self._sums[window] = total
@@ -0,0 +1,435 @@
+# file: src/core/state_coordinator.py
+import itertools
+import logging
+import multiprocessing
+import os
+import socket
+import threading
+import time
+from collections import deque
+from multiprocessing.managers import BaseManager
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from src.core.quantile_sketch import DDSketch
+from src.core.sliding_window import SlidingWindowMetric
+from src.schemas.vow_object import VowObject
+
+logger = logging.getLogger(__name__)
+
+# 同步時保留的最近資料筆數，與 SlidingWindowMetric 的最大視窗及信心度歷史的長度一致
+METRIC_HISTORY = 100
+CONFIDENCE_HISTORY = 500
+
+# 與協調者失聯時最多暫存的待同步誓言數量
+MAX_PENDING_VOWS = 10000
+
+# 超過此秒數未同步的工作行程不再阻擋誓言更新紀錄的修剪；它回來時改取全部較新的誓言
+STALE_WORKER_SECONDS = 300.0
+
+
+class StateCoordinator:
+    """
+    多工作行程共用的進化與誓言狀態
+    
+    由協調者行程持有，各工作行程定期呼叫 sync() 送出自上次同步後的增量，並取回合併後的全域狀態：
+    互動次數與學習模式使用次數相加，模式成功率依各行程貢獻的使用次數加權平均，
+    性能指標與決策信心度保留全域最近的資料，誓言的新增與狀態變更則轉發給其他行程。
+    
+    每次誓言更新取得遞增的序號作為版本，vows 依誓言 id 只保留最新的版本；vow_log 依序記錄
+    (序號, 誓言 id)，游標即為工作行程已套用到的序號。同一誓言在游標之後有多次更新時只轉發最新版本，
+    最新版本來自請求的行程本身時不轉發，因此各行程會收斂到協調者最後收到的狀態。
+    所有活躍行程都已確認的序號之前的紀錄會被修剪；游標早於保留範圍的行程改由 vows 取得較新的誓言。
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.total_interactions = 0
+        # pattern_type -> {"usage_count": 全域使用次數, "workers": {worker_id: (貢獻的使用次數, 成功率)}}
+        self.patterns: Dict[str, Dict[str, Any]] = {}
+        self.metrics: Dict[str, Deque[float]] = {}
+        self.decision_confidence: Deque[float] = deque(maxlen=CONFIDENCE_HISTORY)
+        self.decision_confidence_sketch = DDSketch()
+        # 誓言 id -> (版本序號, 來源 worker_id, 誓言資料)
+        self.vows: Dict[str, Tuple[int, str, Dict[str, Any]]] = {}
+        # (序號, 誓言 id)，依序號遞增；只保留尚未被所有活躍行程確認的部分
+        self.vow_log: Deque[Tuple[int, str]] = deque()
+        self.vow_sequence = 0
+        self.vow_cursors: Dict[str, int] = {}
+        self.workers: Dict[str, float] = {}
+    
+    def sync(self, worker_id: str, delta: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        合併一個工作行程的增量並返回全域狀態
+        
+        Args:
+            worker_id: 工作行程識別碼
+            delta: StateSyncClient 收集的增量
+        
+        Returns:
+            合併後的全域狀態，vows 只包含游標之後由其他行程新增或更新的誓言（每個誓言只含最新版本）
+        """
+        with self._lock:
+            now = time.time()
+            self.workers[worker_id] = now
+            self.total_interactions += delta["interactions"]
+            
+            for pattern_type, update in delta["patterns"].items():
+                entry = self.patterns.setdefault(pattern_type, {"usage_count": 0, "workers": {}})
+                entry["usage_count"] += update["usage_delta"]
+                contributed, _ = entry["workers"].get(worker_id, (0, 0.0))
+                entry["workers"][worker_id] = (contributed + update["usage_delta"], update["success_rate"])
+            
+            for name, values in delta["metrics"].items():
+                self.metrics.setdefault(name, deque(maxlen=METRIC_HISTORY)).extend(values)
+            
+            for value in delta["decision_confidence"]:
+                self.decision_confidence.append(value)
+                self.decision_confidence_sketch.add(value)
+            
+            vows = self._merge_vows(worker_id, delta["vow_cursor"], delta["vows"])
+            self._trim_vow_log(now)
+            
+            # 返回副本，避免序列化時其他連線執行緒同時修改
+            confidence_sketch = DDSketch()
+            confidence_sketch.merge(self.decision_confidence_sketch)
+            
+            return {
+                "total_interactions": self.total_interactions,
+                "patterns": {
+                    pattern_type: {
+                        "usage_count": entry["usage_count"],
+                        "success_rate": self._merged_success_rate(entry)
+                    }
+                    for pattern_type, entry in self.patterns.items()
+                },
+                "metrics": {name: list(values) for name, values in self.metrics.items()},
+                "decision_confidence": list(self.decision_confidence),
+                "decision_confidence_sketch": confidence_sketch,
+                "vows": vows,
+                "vow_cursor": self.vow_sequence,
+                "workers": len(self.workers)
+            }
+    
+    def _merge_vows(self, worker_id: str, cursor: int, updates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """記錄一個行程送來的誓言更新，並返回游標之後其他行程的最新版本"""
+        self.vow_cursors[worker_id] = cursor
+        for vow_data in updates:
+            self.vows[vow_data["id"]] = (self.vow_sequence, worker_id, vow_data)
+            self.vow_log.append((self.vow_sequence, vow_data["id"]))
+            self.vow_sequence += 1
+        
+        if self.vow_log and cursor >= self.vow_log[0][0]:
+            start = cursor - self.vow_log[0][0]
+            changed = dict.fromkeys(vow_id for _, vow_id in itertools.islice(self.vow_log, start, None))
+        else:
+            # 游標早於保留的紀錄（新行程或長時間失聯）：改由最新版本中找出較新的誓言
+            changed = [vow_id for vow_id, (version, _, _) in self.vows.items() if version >= cursor]
+        
+        vows = []
+        for vow_id in changed:
+            _, origin, vow_data = self.vows[vow_id]
+            if origin != worker_id:
+                vows.append(vow_data)
+        return vows
+    
+    def _trim_vow_log(self, now: float) -> None:
+        """修剪所有活躍行程都已確認的誓言更新紀錄"""
+        active = [
+            cursor for worker_id, cursor in self.vow_cursors.items()
+            if now - self.workers[worker_id] < STALE_WORKER_SECONDS
+        ]
+        acknowledged = min(active, default=self.vow_sequence)
+        while self.vow_log and self.vow_log[0][0] < acknowledged:
+            self.vow_log.popleft()
+    
+    @staticmethod
+    def _merged_success_rate(entry: Dict[str, Any]) -> float:
+        """各行程成功率依其貢獻的使用次數加權平均"""
+        workers = entry["workers"].values()
+        total_usage = sum(usage for usage, _ in workers)
+        if total_usage > 0:
+            return sum(usage * rate for usage, rate in workers) / total_usage
+        return sum(rate for _, rate in workers) / len(workers) if workers else 0.0
+
+
+class _CoordinatorServerManager(BaseManager):
+    """協調者行程端的管理器"""
+
+
+class _CoordinatorClientManager(BaseManager):
+    """工作行程端的管理器"""
+
+
+_CoordinatorClientManager.register("get_coordinator")
+
+
+def create_coordinator_server(address: Tuple[str, int], authkey: bytes):
+    """
+    建立提供 StateCoordinator 的伺服器（尚未開始服務）
+    
+    Args:
+        address: 綁定的 (host, port)，port 為 0 時自動選擇
+        authkey: 連線驗證金鑰
+    
+    Returns:
+        multiprocessing 管理器伺服器，呼叫 serve_forever() 開始服務，address 為實際位址
+    """
+    coordinator = StateCoordinator()
+    _CoordinatorServerManager.register("get_coordinator", callable=lambda: coordinator)
+    return _CoordinatorServerManager(address=address, authkey=authkey).get_server()
+
+
+def _serve(address: Tuple[str, int], authkey: bytes, ready) -> None:
+    server = create_coordinator_server(address, authkey)
+    ready.send(server.address)
+    ready.close()
+    server.serve_forever()
+
+
+def start_coordinator_process(address: Tuple[str, int], authkey: bytes) -> Tuple[multiprocessing.Process, Tuple[str, int]]:
+    """
+    在獨立行程中啟動協調者
+    
+    Args:
+        address: 綁定的 (host, port)，port 為 0 時自動選擇
+        authkey: 連線驗證金鑰
+    
+    Returns:
+        (協調者行程, 實際綁定的位址)
+    """
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=_serve, args=(address, authkey, sender),
+                                      name="tonesoul-coordinator", daemon=True)
+    process.start()
+    sender.close()
+    if not receiver.poll(10):
+        process.terminate()
+        raise RuntimeError("State coordinator failed to start")
+    return process, tuple(receiver.recv())
+
+
+def parse_address(value: str) -> Tuple[str, int]:
+    """將 host:port 字串轉換為位址"""
+    host, _, port = value.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+class StateSyncClient:
+    """
+    工作行程端的狀態同步器
+    
+    背景執行緒每隔 interval 秒收集本行程自上次同步後的增量（互動次數、學習模式使用次數與成功率、
+    性能指標、決策信心度與新增或狀態改變的誓言）送交協調者，並以取回的全域狀態取代本地狀態；
+    收集與套用之間本地新增的資料會疊加在全域狀態之上，留待下一次同步送出。
+    收集與套用都在進化模組的鎖內進行，與協調者的通訊則在鎖外。
+    """
+    
+    def __init__(self, address: Tuple[str, int], authkey: bytes, adaptive_learning, metacognitive,
+                 vow_store, lock, interval: float = 2.0, worker_id: Optional[str] = None):
+        """
+        Args:
+            address: 協調者位址
+            authkey: 連線驗證金鑰
+            adaptive_learning: 本行程的 AdaptiveLearningModule
+            metacognitive: 本行程的 MetacognitiveModule
+            vow_store: 本行程的 VowStore
+            lock: 保護進化模組狀態的鎖（EvolutionPipeline.lock）
+            interval: 同步間隔（秒）
+            worker_id: 工作行程識別碼，預設為主機名稱與 PID
+        """
+        self.address = address
+        self.authkey = authkey
+        self.adaptive_learning = adaptive_learning
+        self.metacognitive = metacognitive
+        self.vow_store = vow_store
+        self.lock = lock
+        self.interval = interval
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        
+        self._coordinator = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        
+        # 上次套用全域狀態時的本地基準，增量 = 目前值 - 基準
+        with self.lock:
+            self._base = self._marks()
+        self._vow_cursor = 0
+        # 誓言 id -> 尚未送出的本地變更（同一誓言多次變更只送出最新狀態）
+        self._pending_vows: Dict[str, VowObject] = {}
+        self._vow_lock = threading.Lock()
+        vow_store.add_listener(self._on_vow_changed)
+        
+        self.stats: Dict[str, Any] = {
+            "worker_id": self.worker_id,
+            "syncs": 0,
+            "failures": 0,
+            "workers": 0,
+            "last_sync_at": None,
+            "last_error": None
+        }
+    
+    def start(self) -> None:
+        """啟動背景同步執行緒"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="tonesoul-state-sync", daemon=True)
+            self._thread.start()
+    
+    def close(self) -> None:
+        """停止背景執行緒並做最後一次同步"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.sync_now()
+    
+    def sync_now(self) -> bool:
+        """
+        立即同步一次
+        
+        Returns:
+            是否同步成功；失敗時本次增量保留到下一次同步
+        """
+        with self.lock:
+            marks = self._marks()
+            delta = self._collect(marks)
+        with self._vow_lock:
+            pending, self._pending_vows = self._pending_vows, {}
+        delta["vows"] = [vow.model_dump(mode="json") for vow in pending.values()]
+        delta["vow_cursor"] = self._vow_cursor
+        
+        try:
+            if self._coordinator is None:
+                manager = _CoordinatorClientManager(address=self.address, authkey=self.authkey)
+                manager.connect()
+                self._coordinator = manager.get_coordinator()
+            shared = self._coordinator.sync(self.worker_id, delta)
+        except Exception as e:
+            self._coordinator = None
+            with self._vow_lock:
+                pending.update(self._pending_vows)
+                self._pending_vows = dict(list(pending.items())[-MAX_PENDING_VOWS:])
+            self.stats["failures"] += 1
+            self.stats["last_error"] = str(e)
+            logger.warning(f"State sync with coordinator failed: {str(e)}")
+            return False
+        
+        with self.lock:
+            self._apply(shared, marks)
+        # 與回呼相同的上鎖順序（儲存庫的鎖在外）；本地在收集之後又變更的誓言留待下一次同步送出，
+        # 不以較舊的全域版本覆蓋
+        remote = [VowObject.model_validate(vow_data) for vow_data in shared["vows"]]
+        with self.vow_store.lock, self._vow_lock:
+            for vow in remote:
+                if vow.id not in self._pending_vows:
+                    self.vow_store.add(vow, notify=False)
+        self._vow_cursor = shared["vow_cursor"]
+        
+        self.stats["syncs"] += 1
+        self.stats["workers"] = shared["workers"]
+        self.stats["last_sync_at"] = time.time()
+        self.stats["last_error"] = None
+        return True
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """獲取同步統計資訊"""
+        stats = dict(self.stats)
+        stats["pending_vows"] = len(self._pending_vows)
+        return stats
+    
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sync_now()
+    
+    def _on_vow_changed(self, vow: VowObject) -> None:
+        with self._vow_lock:
+            if vow.id in self._pending_vows or len(self._pending_vows) < MAX_PENDING_VOWS:
+                self._pending_vows[vow.id] = vow
+    
+    def _marks(self) -> Dict[str, Any]:
+        """目前本地狀態的計數"""
+        adaptive = self.adaptive_learning
+        return {
+            "interactions": adaptive.system_state.total_interactions,
+            "usage": {pattern.pattern_type.value: pattern.usage_count for pattern in adaptive.learning_patterns.values()},
+            "metric_counts": {name: metric.count for name, metric in adaptive.performance_metrics.items()},
+            "confidence_count": self.metacognitive.decision_confidence_sketch.count
+        }
+    
+    def _collect(self, marks: Dict[str, Any]) -> Dict[str, Any]:
+        """以 marks 與上次套用時的基準相減得到增量"""
+        base = self._base
+        adaptive = self.adaptive_learning
+        
+        patterns = {}
+        for pattern in adaptive.learning_patterns.values():
+            key = pattern.pattern_type.value
+            patterns[key] = {
+                "usage_delta": marks["usage"][key] - base["usage"].get(key, 0),
+                "success_rate": pattern.success_rate
+            }
+        
+        metrics = {}
+        for name, metric in adaptive.performance_metrics.items():
+            new_values = marks["metric_counts"][name] - base["metric_counts"].get(name, 0)
+            metrics[name] = metric.recent(min(new_values, METRIC_HISTORY))
+        
+        new_confidence = marks["confidence_count"] - base["confidence_count"]
+        history = self.metacognitive.decision_confidence_history
+        
+        return {
+            "interactions": marks["interactions"] - base["interactions"],
+            "patterns": patterns,
+            "metrics": metrics,
+            "decision_confidence": list(history)[-new_confidence:] if new_confidence > 0 else []
+        }
+    
+    def _apply(self, shared: Dict[str, Any], marks: Dict[str, Any]) -> None:
+        """以全域狀態取代本地狀態，並疊加收集之後本地新增的資料"""
+        adaptive = self.adaptive_learning
+        metacognitive = self.metacognitive
+        base = {"usage": {}, "metric_counts": {}}
+        
+        extra = adaptive.system_state.total_interactions - marks["interactions"]
+        adaptive.system_state.total_interactions = shared["total_interactions"] + extra
+        base["interactions"] = shared["total_interactions"]
+        
+        for pattern in adaptive.learning_patterns.values():
+            key = pattern.pattern_type.value
+            merged = shared["patterns"].get(key)
+            if merged is None:
+                base["usage"][key] = marks["usage"].get(key, pattern.usage_count)
+                continue
+            extra = pattern.usage_count - marks["usage"].get(key, pattern.usage_count)
+            pattern.usage_count = merged["usage_count"] + extra
+            pattern.success_rate = merged["success_rate"]
+            base["usage"][key] = merged["usage_count"]
+        
+        for name, values in shared["metrics"].items():
+            local = adaptive.performance_metrics.get(name)
+            windows = local.windows if local is not None else None
+            extra_values = []
+            if local is not None:
+                extra_values = local.recent(min(local.count - marks["metric_counts"].get(name, 0), METRIC_HISTORY))
+            metric = SlidingWindowMetric(windows) if windows else SlidingWindowMetric()
+            for value in values:
+                metric.push(value)
+            base["metric_counts"][name] = metric.count
+            for value in extra_values:
+                metric.push(value)
+            adaptive.performance_metrics[name] = metric
+        if "success_rate" in shared["metrics"]:
+            adaptive.system_state.overall_performance_score = adaptive.performance_metrics["success_rate"].mean(100)
+        
+        history = metacognitive.decision_confidence_history
+        new_confidence = metacognitive.decision_confidence_sketch.count - marks["confidence_count"]
+        extra_values = list(history)[-new_confidence:] if new_confidence > 0 else []
+        sketch = shared["decision_confidence_sketch"]
+        base["confidence_count"] = sketch.count
+        for value in extra_values:
+            sketch.add(value)
+        metacognitive.decision_confidence_sketch = sketch
+        history.clear()
+        history.extend(shared["decision_confidence"])
+        history.extend(extra_values)
+        
+        self._base = base
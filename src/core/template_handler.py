@@ -0,0 +1,132 @@
+# file: src/core/template_handler.py
+import time
+from typing import Callable, List, Optional, Tuple
+from src.core.instrumentation import observe_stage
+from src.core.keyword_automaton import KeywordAutomaton, scan_keywords
+from src.core.response_templates import ModuleTemplates, TemplateTable, get_template_table
+from src.schemas.source_trace import TraceStatus, TrustLevel
+
+
+class TemplateHandlerModule:
+    """
+    模板驅動的功能模組
+    
+    處理流程、追溯記錄與錯誤處理由本類別統一實作，回應由 response_templates 中該模組的規則決定：
+    沿用 ToneBridge 附帶的關鍵字命中（沒有時才掃描一次），以命中的分類查出優先序最高的預建回應。
+    子類別只需以類別屬性設定模組名稱、處理狀態、信任等級與證據文字；
+    需要其他資料來源的模組（例如知識庫檢索）覆寫 _respond()。
+    """
+    
+    module_name = "TemplateHandlerModule"
+    version = "v0.1"
+    processing_status = "processed"
+    trust_level = TrustLevel.B
+    evidence = "Template response generated"      # 可使用 {sentence}（原句前 50 字）
+    failure_response = "抱歉，我目前無法處理這個請求。"
+    failure_evidence = "Template response generation failed"
+    
+    def __init__(self, templates: Optional[TemplateTable] = None):
+        """
+        Args:
+            templates: 編譯後的回應模板，預設使用 get_template_table() 的共用模板；
+                       傳入其他模板時，其規則關鍵字不在共用自動機中，改由本模組自行編譯與掃描
+        """
+        shared = get_template_table()
+        self.templates: ModuleTemplates = (templates or shared)[self.module_name]
+        self._automaton: Optional[KeywordAutomaton] = None
+        if templates is not None and templates is not shared:
+            self._automaton = KeywordAutomaton(self.templates.keyword_tables)
+    
+    def process(self, router_output: dict) -> dict:
+        """
+        處理路由到本模組的請求
+        
+        Args:
+            router_output: ToneStrategicRouter 的輸出字典
+        
+        Returns:
+            包含處理結果和更新 SourceTrace 的字典
+        """
+        return self._handle(router_output, self._respond, time.perf_counter_ns())
+    
+    def _handle(self, router_output: dict, respond: Callable[[str, dict], Tuple[str, str]], start_ns: int) -> dict:
+        """
+        以 respond 產生回應並記錄追溯步驟
+        
+        Args:
+            router_output: ToneStrategicRouter 的輸出字典
+            respond: 產生 (回應, 追溯證據) 的函式，簽名同 _respond()
+            start_ns: 計時起點（perf_counter_ns）；批次處理時已扣除分攤到本筆的批次檢索時間
+        
+        Returns:
+            包含處理結果和更新 SourceTrace 的字典
+        """
+        # 提取必要資訊
+        original_sentence = router_output.get("original_sentence", "")
+        source_trace = router_output.get("source_trace")
+        
+        if not source_trace:
+            raise ValueError("Missing source_trace in router_output")
+        
+        try:
+            response, evidence = respond(original_sentence, router_output)
+            status = TraceStatus.SUCCESS
+            trust_level = self.trust_level
+        
+        except Exception as e:
+            response = self.failure_response
+            status = TraceStatus.FAIL
+            evidence = f"{self.failure_evidence}: {str(e)}"
+            trust_level = TrustLevel.C
+        
+        # 計算執行時間
+        latency_ms = observe_stage(f"core.{self.module_name}.{self.version}", start_ns)
+        
+        # 記錄追溯步驟
+        source_trace.record_step(
+            tool=f"core.{self.module_name}.{self.version}",
+            status=status,
+            evidence=evidence,
+            trust_level=trust_level,
+            latency_ms=latency_ms
+        )
+        
+        # 構建輸出
+        result = router_output.copy()
+        result.update({
+            "module_response": response,
+            "processing_status": self.processing_status,
+            "source_trace": source_trace
+        })
+        
+        return result
+    
+    def process_batch(self, router_outputs: List[dict]) -> List[dict]:
+        """
+        批次處理路由到本模組的多筆請求
+        
+        Args:
+            router_outputs: ToneStrategicRouter 的輸出字典列表
+        
+        Returns:
+            與輸入順序一致的處理結果列表
+        """
+        return [self.process(router_output) for router_output in router_outputs]
+    
+    def _respond(self, sentence: str, router_output: dict) -> Tuple[str, str]:
+        """
+        以回應模板產生回應
+        
+        Args:
+            sentence: 原句
+            router_output: ToneStrategicRouter 的輸出字典（讀取其中的 keyword_hits）
+        
+        Returns:
+            (回應, 追溯證據)
+        """
+        if self._automaton is not None:
+            return self.templates.select(self._automaton.scan(sentence)), self.evidence.format(sentence=sentence[:50])
+        keyword_hits = router_output.get("keyword_hits")
+        if keyword_hits is None:
+            keyword_hits = scan_keywords(sentence)
+        return self.templates.select(keyword_hits), self.evidence.format(sentence=sentence[:50])
@@ -1,8 +1,11 @@
 # file: src/core/tone_function_classifier.py
 import time
-from datetime import datetime
 from enum import Enum
-from src.schemas.source_trace import SourceTrace, TraceStep, TraceStatus, TrustLevel
+from typing import List, Optional
+from src.core.instrumentation import observe_stage
+from src.core.keyword_automaton import KeywordHits, scan_keywords
+from src.core.keyword_tables import KEYWORD_TABLES
+from src.schemas.source_trace import TraceStatus, TrustLevel
 
 
 class ToneFunction(str, Enum):
@@ -34,15 +37,15 @@ class ToneFunctionClassifier:
     """語魂系統的理解中枢，負責將初步分析結果轉化為明確的功能意圖"""
     
     def __init__(self):
-        # 定義關鍵字模式
-        self.vow_keywords = ["我承諾", "我保證", "我發誓", "我答應"]
-        self.appreciation_keywords = ["謝謝", "感謝", "太好了", "很棒", "讚"]
-        self.complaint_keywords = ["討厭", "煩", "糟糕", "不滿", "抱怨"]
-        self.instructional_keywords = ["如何", "怎麼做", "怎樣做", "怎麼辦"]
-        self.factual_keywords = ["什麼", "為什麼", "哪裡", "誰", "何時"]
-        self.opinion_keywords = ["怎麼樣", "覺得", "認為", "看法", "意見"]
-        self.assistance_keywords = ["請幫我", "幫忙", "協助", "支援"]
-        self.casual_keywords = ["你好", "嗨", "哈囉", "早安", "晚安"]
+        # 關鍵字模式（定義於 keyword_tables，與其他模組共用同一個自動機）
+        self.vow_keywords = KEYWORD_TABLES["classifier.vow"]
+        self.appreciation_keywords = KEYWORD_TABLES["classifier.appreciation"]
+        self.complaint_keywords = KEYWORD_TABLES["classifier.complaint"]
+        self.instructional_keywords = KEYWORD_TABLES["classifier.instructional"]
+        self.factual_keywords = KEYWORD_TABLES["classifier.factual"]
+        self.opinion_keywords = KEYWORD_TABLES["classifier.opinion"]
+        self.assistance_keywords = KEYWORD_TABLES["classifier.assistance"]
+        self.casual_keywords = KEYWORD_TABLES["classifier.casual"]
     
     def classify(self, bridge_output: dict) -> dict:
         """
@@ -54,59 +57,79 @@ class ToneFunctionClassifier:
         Returns:
             更新後的字典，包含 tone_function 和更新的 source_trace
         """
-        start_time = time.time()
-        
-        # 提取必要資訊
-        intent_type = bridge_output.get("intent_type", "")
-        sentence = bridge_output.get("original_sentence", "")
-        source_trace = bridge_output.get("source_trace")
-        
-        if not source_trace:
-            raise ValueError("Missing source_trace in bridge_output")
-        
-        try:
-            # 執行分類邏輯
-            tone_function = self._classify_function(intent_type, sentence)
-            status = TraceStatus.SUCCESS
-            evidence = f"Classified as {tone_function.value} based on intent_type='{intent_type}'"
-            trust_level = TrustLevel.C
+        return self.classify_batch([bridge_output])[0]
+    
+    def classify_batch(self, bridge_outputs: List[dict]) -> List[dict]:
+        """
+        批次分析多筆 ToneBridge 輸出，整批只計時一次
+        
+        Args:
+            bridge_outputs: ToneBridge 返回的字典列表
+            
+        Returns:
+            與輸入順序一致的分類結果列表
+        """
+        start_ns = time.perf_counter_ns()
+        
+        classifications = []
+        for bridge_output in bridge_outputs:
+            # 提取必要資訊
+            intent_type = bridge_output.get("intent_type", "")
+            sentence = bridge_output.get("original_sentence", "")
+            
+            if not bridge_output.get("source_trace"):
+                raise ValueError("Missing source_trace in bridge_output")
+            
+            try:
+                # 執行分類邏輯
+                tone_function = self._classify_function(
+                    intent_type, sentence, bridge_output.get("keyword_hits")
+                )
+                status = TraceStatus.SUCCESS
+                evidence = f"Classified as {tone_function.value} based on intent_type='{intent_type}'"
+                
+            except Exception as e:
+                tone_function = ToneFunction.UNKNOWN
+                status = TraceStatus.FAIL
+                evidence = f"Classification failed: {str(e)}"
+            
+            classifications.append((tone_function, status, evidence))
+        
+        # 計算執行時間（整批平均分攤到每一筆）
+        latency_ms = observe_stage("core.ToneFunctionClassifier.v0.1", start_ns, len(bridge_outputs))
+        
+        results = []
+        for bridge_output, (tone_function, status, evidence) in zip(bridge_outputs, classifications):
+            source_trace = bridge_output["source_trace"]
+            
+            # 記錄追溯步驟
+            source_trace.record_step(
+                tool="core.ToneFunctionClassifier.v0.1",
+                status=status,
+                evidence=evidence,
+                trust_level=TrustLevel.C,
+                latency_ms=latency_ms
+            )
             
-        except Exception as e:
-            tone_function = ToneFunction.UNKNOWN
-            status = TraceStatus.FAIL
-            evidence = f"Classification failed: {str(e)}"
-            trust_level = TrustLevel.C
-        
-        # 計算執行時間
-        latency_ms = int((time.time() - start_time) * 1000)
-        
-        # 記錄追溯步驟
-        classification_step = TraceStep(
-            tool="core.ToneFunctionClassifier.v0.1",
-            status=status,
-            evidence=evidence,
-            trust_level=trust_level,
-            latency_ms=latency_ms,
-            ts=datetime.now()
-        )
-        source_trace.steps.append(classification_step)
-        
-        # 構建輸出
-        result = bridge_output.copy()
-        result.update({
-            "tone_function": tone_function,
-            "source_trace": source_trace
-        })
-        
-        return result
+            # 構建輸出
+            result = bridge_output.copy()
+            result.update({
+                "tone_function": tone_function,
+                "source_trace": source_trace
+            })
+            results.append(result)
+        
+        return results
     
-    def _classify_function(self, intent_type: str, sentence: str) -> ToneFunction:
+    def _classify_function(self, intent_type: str, sentence: str,
+                           keyword_hits: Optional[KeywordHits] = None) -> ToneFunction:
         """
         基於優先級的多層次分類邏輯
         
         Args:
             intent_type: ToneBridge 識別的意圖類型
             sentence: 原始句子
+            keyword_hits: (可選) ToneBridge 附帶的關鍵字命中，未提供時會重新掃描
             
         Returns:
             分類結果
@@ -115,37 +138,37 @@ class ToneFunctionClassifier:
         if not sentence or not sentence.strip():
             return ToneFunction.UNKNOWN
         
-        sentence = sentence.strip()
+        hits = keyword_hits if keyword_hits is not None else scan_keywords(sentence)
         
         # 第一優先級：明確的關鍵字模式
         
         # 承諾類關鍵字
-        if any(keyword in sentence for keyword in self.vow_keywords):
+        if "classifier.vow" in hits:
             return ToneFunction.VOW_DECLARATION
         
         # 感謝類關鍵字
-        if any(keyword in sentence for keyword in self.appreciation_keywords):
+        if "classifier.appreciation" in hits:
             return ToneFunction.APPRECIATION
         
         # 抱怨類關鍵字
-        if any(keyword in sentence for keyword in self.complaint_keywords):
+        if "classifier.complaint" in hits:
             return ToneFunction.COMPLAINT
         
         # 協助請求關鍵字
-        if any(keyword in sentence for keyword in self.assistance_keywords):
+        if "classifier.assistance" in hits:
             return ToneFunction.ASSISTANCE_SEEKING
         
         # 第二優先級：基於 intent_type 的分類
         
         if intent_type == "question":
             # 尋求意見問題（優先檢查）
-            if any(keyword in sentence for keyword in self.opinion_keywords):
+            if "classifier.opinion" in hits:
                 return ToneFunction.OPINION_SEEKING
             # 指導性問題
-            elif any(keyword in sentence for keyword in self.instructional_keywords):
+            elif "classifier.instructional" in hits:
                 return ToneFunction.INSTRUCTIONAL
             # 事實性問題
-            elif any(keyword in sentence for keyword in self.factual_keywords):
+            elif "classifier.factual" in hits:
                 return ToneFunction.FACTUAL_INQUIRY
             # 其他問題視為尋求意見
             else:
@@ -156,7 +179,7 @@ class ToneFunctionClassifier:
         
         elif intent_type == "statement":
             # 檢查是否為閒聊
-            if any(keyword in sentence for keyword in self.casual_keywords):
+            if "classifier.casual" in hits:
                 return ToneFunction.CASUAL_CHAT
             # 其他陳述視為宣告
             else:
@@ -1,9 +1,9 @@
 # file: src/core/tone_strategic_router.py
 import time
-from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List
+from src.core.instrumentation import observe_stage
 from src.core.tone_function_classifier import ToneFunction
-from src.schemas.source_trace import SourceTrace, TraceStep, TraceStatus, TrustLevel
+from src.schemas.source_trace import TraceStatus, TrustLevel
 
 
 class RoutingStrategy:
@@ -103,59 +103,77 @@ class ToneStrategicRouter:
         Returns:
             包含路由決策和更新 SourceTrace 的字典
         """
-        start_time = time.time()
-        
-        # 提取必要資訊
-        tone_function = classifier_output.get("tone_function")
-        source_trace = classifier_output.get("source_trace")
+        return self.route_batch([classifier_output])[0]
+    
+    def route_batch(self, classifier_outputs: List[dict]) -> List[dict]:
+        """
+        批次做出路由決策，整批只計時一次
         
-        if not source_trace:
-            raise ValueError("Missing source_trace in classifier_output")
+        Args:
+            classifier_outputs: ToneFunctionClassifier 返回的字典列表
+            
+        Returns:
+            與輸入順序一致的路由結果列表
+        """
+        start_ns = time.perf_counter_ns()
         
-        try:
-            # 執行路由邏輯
-            strategy = self._determine_strategy(tone_function)
-            status = TraceStatus.SUCCESS
+        decisions = []
+        for classifier_output in classifier_outputs:
+            # 提取必要資訊
+            tone_function = classifier_output.get("tone_function")
             
-            if tone_function in self.routing_table:
-                evidence = f"Routing to {strategy.next_module} based on function {tone_function.value}"
-            else:
-                evidence = f"Using fallback strategy: routing to {strategy.next_module} for unknown function {tone_function}"
+            if not classifier_output.get("source_trace"):
+                raise ValueError("Missing source_trace in classifier_output")
             
-            trust_level = TrustLevel.B  # 路由決策有較高的信任度
+            try:
+                # 執行路由邏輯
+                strategy = self._determine_strategy(tone_function)
+                status = TraceStatus.SUCCESS
+                
+                if tone_function in self.routing_table:
+                    evidence = f"Routing to {strategy.next_module} based on function {tone_function.value}"
+                else:
+                    evidence = f"Using fallback strategy: routing to {strategy.next_module} for unknown function {tone_function}"
+                
+                trust_level = TrustLevel.B  # 路由決策有較高的信任度
+                
+            except Exception as e:
+                strategy = self.fallback_strategy
+                status = TraceStatus.FAIL
+                evidence = f"Routing failed: {str(e)}. Using fallback strategy."
+                trust_level = TrustLevel.C
             
-        except Exception as e:
-            strategy = self.fallback_strategy
-            status = TraceStatus.FAIL
-            evidence = f"Routing failed: {str(e)}. Using fallback strategy."
-            trust_level = TrustLevel.C
-        
-        # 計算執行時間
-        latency_ms = int((time.time() - start_time) * 1000)
+            decisions.append((strategy, status, evidence, trust_level))
         
-        # 記錄追溯步驟
-        routing_step = TraceStep(
-            tool="core.ToneStrategicRouter.v0.1",
-            status=status,
-            evidence=evidence,
-            trust_level=trust_level,
-            latency_ms=latency_ms,
-            ts=datetime.now()
-        )
-        source_trace.steps.append(routing_step)
+        # 計算執行時間（整批平均分攤到每一筆）
+        latency_ms = observe_stage("core.ToneStrategicRouter.v0.1", start_ns, len(classifier_outputs))
         
-        # 構建最終輸出
-        result = classifier_output.copy()
-        result.update({
-            "next_strategy": {
-                "next_module": strategy.next_module,
-                "priority": strategy.priority,
-                "timeout_ms": strategy.timeout_ms
-            },
-            "source_trace": source_trace
-        })
+        results = []
+        for classifier_output, (strategy, status, evidence, trust_level) in zip(classifier_outputs, decisions):
+            source_trace = classifier_output["source_trace"]
+            
+            # 記錄追溯步驟
+            source_trace.record_step(
+                tool="core.ToneStrategicRouter.v0.1",
+                status=status,
+                evidence=evidence,
+                trust_level=trust_level,
+                latency_ms=latency_ms
+            )
+            
+            # 構建最終輸出
+            result = classifier_output.copy()
+            result.update({
+                "next_strategy": {
+                    "next_module": strategy.next_module,
+                    "priority": strategy.priority,
+                    "timeout_ms": strategy.timeout_ms
+                },
+                "source_trace": source_trace
+            })
+            results.append(result)
         
-        return result
+        return results
     
     def _determine_strategy(self, tone_function: ToneFunction) -> RoutingStrategy:
         """
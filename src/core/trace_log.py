@@ -0,0 +1,536 @@
+# file: src/core/trace_log.py
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+from datetime import datetime
+from hashlib import blake2b
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple, Union
+
+from src.schemas.source_trace import (
+    CompactTraceStep, SourceTrace, TraceRecorder, TraceStatus, TraceStep, TrustLevel
+)
+
+logger = logging.getLogger(__name__)
+
+# 分段檔案格式
+#
+#   檔頭:  SEGMENT_MAGIC (8 bytes)
+#   紀錄:  body_len:u32  crc32(body):u32  body
+#   body:  id_len:u16  id  step_count:u16  steps...
+#   step:  status:u8  trust_level:u8  latency_ms:u32  ts_ns:i64
+#          tool_len:u16  evidence_len:u32  digest_len:u16  tool  evidence  digest
+#
+# 所有整數皆為 little-endian；ts_ns 為牆上時鐘的 epoch 奈秒；
+# digest_len 為 NO_DIGEST 時表示 input_digest 為 None。
+#
+# 分段檔名為 traces-<序號>-<寫入者>.log，寫入者預設為行程 pid，多個工作行程共用同一目錄時
+# 各自寫入自己的分段；檔案以獨佔模式建立，序號已被佔用時改用下一個序號。
+#
+# 分段封存（輪替或關閉）時，寫入者在旁邊寫入同名的 .idx 索引檔：
+#   檔頭:  INDEX_MAGIC (8 bytes)
+#   項目:  id_hash:u64  record_offset:u64，依 (id_hash, record_offset) 排序
+# id_hash 為 trace id 的 blake2b 前 8 位元組，record_offset 為紀錄標頭在分段中的位移。
+# 索引檔先寫入暫存檔再改名，存在即代表完整；沒有索引檔的分段（寫入中或行程中斷）由讀取器掃描。
+SEGMENT_MAGIC = b"TSTRACE1"
+SEGMENT_PREFIX = "traces-"
+SEGMENT_SUFFIX = ".log"
+INDEX_MAGIC = b"TSTRIDX1"
+INDEX_SUFFIX = ".idx"
+INDEX_ENTRY = struct.Struct("<QQ")
+RECORD_HEADER = struct.Struct("<II")
+ID_HEADER = struct.Struct("<H")
+STEP_COUNT = struct.Struct("<H")
+STEP_HEADER = struct.Struct("<BBIqHIH")
+NO_DIGEST = 0xFFFF
+
+_STATUS_CODES = {status: code for code, status in enumerate(TraceStatus)}
+_STATUS_VALUES = list(TraceStatus)
+_TRUST_CODES = {level: code for code, level in enumerate(TrustLevel)}
+_TRUST_VALUES = list(TrustLevel)
+
+TraceLike = Union[SourceTrace, TraceRecorder]
+
+
+def encode_trace(source_trace: TraceLike) -> bytes:
+    """
+    將追溯鏈編碼成一筆帶長度前綴與 CRC 的紀錄
+    
+    Args:
+        source_trace: SourceTrace 或 TraceRecorder
+    
+    Returns:
+        可直接寫入分段檔案的位元組
+    """
+    trace_id = source_trace.id.encode("utf-8")
+    parts = [ID_HEADER.pack(len(trace_id)), trace_id, STEP_COUNT.pack(len(source_trace.steps))]
+    
+    for step in source_trace.steps:
+        if isinstance(step, CompactTraceStep):
+            ts_ns = step.wall_time_ns
+        else:
+            ts_ns = int(step.ts.timestamp() * 1_000_000_000)
+        tool = step.tool.encode("utf-8")
+        evidence = step.evidence.encode("utf-8")
+        digest = step.input_digest.encode("utf-8") if step.input_digest is not None else b""
+        parts.append(STEP_HEADER.pack(
+            _STATUS_CODES[TraceStatus(step.status)],
+            _TRUST_CODES[TrustLevel(step.trust_level)],
+            step.latency_ms,
+            ts_ns,
+            len(tool),
+            len(evidence),
+            len(digest) if step.input_digest is not None else NO_DIGEST
+        ))
+        parts.extend((tool, evidence, digest))
+    
+    body = b"".join(parts)
+    return RECORD_HEADER.pack(len(body), zlib.crc32(body)) + body
+
+
+def decode_trace(body: Union[bytes, memoryview]) -> SourceTrace:
+    """
+    將紀錄內容解碼成公開的 SourceTrace
+    
+    Args:
+        body: 紀錄的 body 部分（不含長度與 CRC）
+    
+    Returns:
+        解碼後的 SourceTrace
+    """
+    body = memoryview(body)
+    (id_len,) = ID_HEADER.unpack_from(body, 0)
+    offset = ID_HEADER.size
+    trace_id = bytes(body[offset:offset + id_len]).decode("utf-8")
+    offset += id_len
+    (step_count,) = STEP_COUNT.unpack_from(body, offset)
+    offset += STEP_COUNT.size
+    
+    steps = []
+    for _ in range(step_count):
+        status, trust_level, latency_ms, ts_ns, tool_len, evidence_len, digest_len = \
+            STEP_HEADER.unpack_from(body, offset)
+        offset += STEP_HEADER.size
+        tool = bytes(body[offset:offset + tool_len]).decode("utf-8")
+        offset += tool_len
+        evidence = bytes(body[offset:offset + evidence_len]).decode("utf-8")
+        offset += evidence_len
+        input_digest = None
+        if digest_len != NO_DIGEST:
+            input_digest = bytes(body[offset:offset + digest_len]).decode("utf-8")
+            offset += digest_len
+        steps.append(TraceStep.model_construct(
+            tool=tool,
+            status=_STATUS_VALUES[status],
+            input_digest=input_digest,
+            evidence=evidence,
+            trust_level=_TRUST_VALUES[trust_level],
+            latency_ms=latency_ms,
+            ts=datetime.fromtimestamp(ts_ns / 1_000_000_000)
+        ))
+    
+    return SourceTrace.model_construct(id=trace_id, steps=steps)
+
+
+def _segment_paths(directory: str) -> List[str]:
+    """目錄中所有寫入者的分段檔案路徑，依序號（同序號再依檔名）排序"""
+    if not os.path.isdir(directory):
+        return []
+    names = sorted(
+        (name for name in os.listdir(directory)
+         if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)),
+        key=lambda name: (_segment_sequence(name), name)
+    )
+    return [os.path.join(directory, name) for name in names]
+
+
+def _segment_sequence(path: str) -> int:
+    """分段檔案名稱中的序號（不含寫入者的舊檔名也適用）"""
+    stem = os.path.basename(path)[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]
+    return int(stem.split("-", 1)[0])
+
+
+def _index_path(segment_path: str) -> str:
+    """分段檔案對應的索引檔路徑"""
+    return segment_path[:-len(SEGMENT_SUFFIX)] + INDEX_SUFFIX
+
+
+def _id_hash(trace_id: str) -> int:
+    """索引檔使用的 trace id 雜湊"""
+    return int.from_bytes(blake2b(trace_id.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class TraceLog:
+    """
+    只追加的持久化追溯日誌
+    
+    請求執行緒只把完成的追溯鏈放進有界佇列；背景寫入執行緒把累積的紀錄
+    編碼後以一次 write 批次提交（group commit），並依大小與時間輪替分段檔案。
+    多個 TraceLog（例如各個工作行程）可以共用同一目錄，每個只追加自己建立的分段。
+    分段封存時寫入 .idx 索引檔，讀取器查詢已封存的分段時不需掃描紀錄。
+    """
+    
+    def __init__(self, directory: str, max_segment_bytes: int = 64 * 1024 * 1024,
+                 max_segment_age: float = 3600.0, max_queue_size: int = 10000,
+                 max_batch_size: int = 512, fsync: bool = False, writer_id: Optional[str] = None):
+        if max_segment_bytes <= len(SEGMENT_MAGIC):
+            raise ValueError("max_segment_bytes is too small")
+        if max_queue_size < 1:
+            raise ValueError("max_queue_size must be at least 1")
+        
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_age = max_segment_age
+        self.max_queue_size = max_queue_size
+        self.max_batch_size = max_batch_size
+        self.fsync = fsync
+        self.writer_id = writer_id or str(os.getpid())
+        
+        os.makedirs(directory, exist_ok=True)
+        
+        self._queue: Deque[TraceLike] = deque()
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._running = False
+        self._worker: Optional[threading.Thread] = None
+        
+        # 以下狀態只由寫入執行緒存取
+        self._segment_file = None
+        self._segment_path: Optional[str] = None
+        self._segment_index: List[Tuple[int, int]] = []
+        self._segment_size = 0
+        self._segment_opened_at = 0.0
+        existing = _segment_paths(directory)
+        self._next_sequence = _segment_sequence(existing[-1]) + 1 if existing else 0
+        
+        self.stats: Dict[str, int] = {
+            "appended": 0,
+            "written": 0,
+            "dropped": 0,
+            "commits": 0,
+            "bytes_written": 0,
+            "segments_opened": 0,
+            "errors": 0
+        }
+    
+    def start(self) -> None:
+        """啟動背景寫入執行緒（重複調用無副作用）"""
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+            self._worker = threading.Thread(target=self._run, name="tonesoul-trace-log", daemon=True)
+            self._worker.start()
+    
+    def append(self, source_trace: TraceLike) -> bool:
+        """
+        提交一份完成的追溯鏈（不阻塞）
+        
+        Args:
+            source_trace: 已完成、之後不會再被修改的追溯鏈
+        
+        Returns:
+            是否被接受；佇列已滿時丟棄並返回 False
+        """
+        if not self._running:
+            self.start()
+        
+        with self._condition:
+            if len(self._queue) >= self.max_queue_size:
+                self.stats["dropped"] += 1
+                return False
+            self._queue.append(source_trace)
+            self.stats["appended"] += 1
+            self._condition.notify_all()
+            return True
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """等待已接受的紀錄全部寫入檔案"""
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not self._queue and self._in_flight == 0, timeout=timeout
+            )
+    
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """寫完剩餘紀錄後停止背景執行緒並關閉目前的分段檔案"""
+        self.flush(timeout)
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._worker is not None:
+            self._worker.join(timeout)
+            self._worker = None
+        self._close_segment()
+    
+    def reader(self) -> "TraceLogReader":
+        """建立讀取同一目錄的 TraceLogReader"""
+        return TraceLogReader(self.directory)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """獲取寫入統計資訊"""
+        with self._condition:
+            stats = dict(self.stats)
+            stats["queue_size"] = len(self._queue)
+        stats["directory"] = self.directory
+        stats["running"] = self._running
+        return stats
+    
+    def _run(self) -> None:
+        """寫入執行緒主迴圈：每次取出所有待寫紀錄並以單次 write 提交"""
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._queue or not self._running)
+                if not self._queue and not self._running:
+                    return
+                batch = []
+                while self._queue and len(batch) < self.max_batch_size:
+                    batch.append(self._queue.popleft())
+                self._in_flight = len(batch)
+            
+            written = 0
+            errors = 0
+            try:
+                written = self._commit(batch)
+            except Exception as e:
+                errors = len(batch)
+                logger.error(f"Trace log commit failed: {str(e)}")
+            
+            with self._condition:
+                self.stats["written"] += written
+                self.stats["errors"] += errors
+                self.stats["commits"] += 1
+                self._in_flight = 0
+                self._condition.notify_all()
+    
+    def _commit(self, batch: List[TraceLike]) -> int:
+        """編碼一批紀錄並寫入，必要時先輪替分段"""
+        buffer = bytearray()
+        written = 0
+        for source_trace in batch:
+            try:
+                record = encode_trace(source_trace)
+            except Exception as e:
+                logger.error(f"Failed to encode trace {source_trace.id}: {str(e)}")
+                continue
+            # 單筆紀錄不會跨分段：放不下時先寫出已累積的內容再輪替
+            if self._should_rotate(len(buffer), len(record)):
+                if buffer:
+                    self._write(buffer)
+                    buffer = bytearray()
+                self._open_segment()
+            self._segment_index.append((_id_hash(source_trace.id), self._segment_size + len(buffer)))
+            buffer += record
+            written += 1
+        if buffer:
+            self._write(buffer)
+        return written
+    
+    def _should_rotate(self, buffered: int, incoming: int) -> bool:
+        """目前的分段是否已超過大小或時間上限（空分段不因大小輪替，避免超大紀錄無限輪替）"""
+        if self._segment_file is None:
+            return True
+        used = self._segment_size + buffered
+        if used + incoming > self.max_segment_bytes and used > len(SEGMENT_MAGIC):
+            return True
+        return time.monotonic() - self._segment_opened_at >= self.max_segment_age
+    
+    def _write(self, data: bytearray) -> None:
+        self._segment_file.write(data)
+        self._segment_file.flush()
+        if self.fsync:
+            os.fsync(self._segment_file.fileno())
+        self._segment_size += len(data)
+        self.stats["bytes_written"] += len(data)
+    
+    def _open_segment(self) -> None:
+        self._close_segment()
+        # 以獨佔模式建立，不會追加到其他寫入者（或同 pid 的前一個行程）的分段中
+        while True:
+            name = f"{SEGMENT_PREFIX}{self._next_sequence:08d}-{self.writer_id}{SEGMENT_SUFFIX}"
+            self._next_sequence += 1
+            try:
+                self._segment_file = open(os.path.join(self.directory, name), "xb")
+                break
+            except FileExistsError:
+                continue
+        self._segment_path = self._segment_file.name
+        self._segment_file.write(SEGMENT_MAGIC)
+        self._segment_file.flush()
+        self._segment_size = len(SEGMENT_MAGIC)
+        self._segment_opened_at = time.monotonic()
+        self.stats["segments_opened"] += 1
+    
+    def _close_segment(self) -> None:
+        if self._segment_file is not None:
+            self._segment_file.close()
+            self._segment_file = None
+            self._write_index()
+    
+    def _write_index(self) -> None:
+        """寫入剛封存分段的索引檔；失敗時讀取器改為掃描該分段"""
+        entries, self._segment_index = sorted(self._segment_index), []
+        index_path = _index_path(self._segment_path)
+        try:
+            with open(index_path + ".tmp", "wb") as f:
+                f.write(INDEX_MAGIC)
+                f.write(b"".join(INDEX_ENTRY.pack(id_hash, offset) for id_hash, offset in entries))
+                if self.fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(index_path + ".tmp", index_path)
+        except OSError as e:
+            logger.error(f"Failed to write trace index {index_path}: {str(e)}")
+
+
+class TraceLogReader:
+    """
+    以 mmap 讀取追溯日誌
+    
+    依紀錄標頭逐筆跳躍，只解碼需要的紀錄。已封存的分段以二分搜尋其 .idx 索引檔，
+    不會把 trace id 載入記憶體；只有尚未封存的分段（每個寫入者通常只有一個）
+    在第一次查詢時建立記憶體中的 trace id -> 位移索引，之後只增量掃描新增的部分，
+    分段封存後即丟棄。每次讀取都重新列出目錄，因此能查到共用同一目錄的所有寫入者（工作行程）的紀錄。
+    """
+    
+    def __init__(self, directory: str):
+        self.directory = directory
+        # 未封存分段的路徑 -> (已索引到的位移, trace id -> 最後一筆紀錄的位移)
+        self._indexes: Dict[str, Tuple[int, Dict[str, int]]] = {}
+        self._lock = threading.Lock()
+    
+    def segments(self) -> List[str]:
+        """依寫入順序排列的分段檔案路徑"""
+        return _segment_paths(self.directory)
+    
+    def scan(self) -> Iterator[SourceTrace]:
+        """依寫入順序逐筆讀取所有追溯鏈"""
+        for path in self.segments():
+            with _MappedSegment(path) as mapped:
+                if mapped is None:
+                    continue
+                for _, offset, length in self._iter_records(path, mapped, len(SEGMENT_MAGIC)):
+                    yield decode_trace(mapped[offset:offset + length])
+    
+    def get(self, trace_id: str) -> Optional[SourceTrace]:
+        """
+        依 trace id 查詢追溯鏈
+        
+        Args:
+            trace_id: 追溯 ID
+        
+        Returns:
+            最新寫入的同 id 追溯鏈，找不到時返回 None
+        """
+        id_hash = _id_hash(trace_id)
+        for path in reversed(self.segments()):
+            offsets = self._indexed_offsets(path, id_hash)
+            if offsets is not None and not offsets:
+                continue
+            with _MappedSegment(path) as mapped:
+                if mapped is None:
+                    continue
+                if offsets is None:
+                    offset = self._refresh_index(path, mapped).get(trace_id)
+                    offsets = [] if offset is None else [offset]
+                # 雜湊可能碰撞，逐一確認紀錄的 id；同 id 取最後寫入的一筆
+                for offset in reversed(offsets):
+                    record = next(self._iter_records(path, mapped, offset), None)
+                    if record is not None and record[0] == trace_id:
+                        _, start, length = record
+                        return decode_trace(mapped[start:start + length])
+        return None
+    
+    def _indexed_offsets(self, path: str, id_hash: int) -> Optional[List[int]]:
+        """
+        以二分搜尋分段的索引檔
+        
+        Returns:
+            雜湊相符的紀錄位移（遞增）；分段尚未封存或索引檔無效時返回 None
+        """
+        index_path = _index_path(path)
+        try:
+            f = open(index_path, "rb")
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            self._indexes.pop(path, None)
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            if size < len(INDEX_MAGIC) or (size - len(INDEX_MAGIC)) % INDEX_ENTRY.size:
+                logger.warning(f"Ignoring invalid trace index {index_path}")
+                return None
+            with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as mapped:
+                if mapped[:len(INDEX_MAGIC)] != INDEX_MAGIC:
+                    logger.warning(f"Ignoring invalid trace index {index_path}")
+                    return None
+                count = (size - len(INDEX_MAGIC)) // INDEX_ENTRY.size
+                low, high = 0, count
+                while low < high:
+                    middle = (low + high) // 2
+                    if INDEX_ENTRY.unpack_from(mapped, len(INDEX_MAGIC) + middle * INDEX_ENTRY.size)[0] < id_hash:
+                        low = middle + 1
+                    else:
+                        high = middle
+                offsets = []
+                while low < count:
+                    entry_hash, offset = INDEX_ENTRY.unpack_from(mapped, len(INDEX_MAGIC) + low * INDEX_ENTRY.size)
+                    if entry_hash != id_hash:
+                        break
+                    offsets.append(offset)
+                    low += 1
+                return offsets
+    
+    def _refresh_index(self, path: str, mapped: mmap.mmap) -> Dict[str, int]:
+        with self._lock:
+            scanned_to, index = self._indexes.get(path, (len(SEGMENT_MAGIC), {}))
+            for trace_id, offset, length in self._iter_records(path, mapped, scanned_to):
+                index[trace_id] = offset - RECORD_HEADER.size
+                scanned_to = offset + length
+            self._indexes[path] = (scanned_to, index)
+            return index
+    
+    def _iter_records(self, path: str, mapped: mmap.mmap, offset: int) -> Iterator[Tuple[str, int, int]]:
+        """逐筆產生 (trace id, body 位移, body 長度)，遇到寫到一半或損壞的紀錄即停止"""
+        size = len(mapped)
+        while offset + RECORD_HEADER.size <= size:
+            length, crc = RECORD_HEADER.unpack_from(mapped, offset)
+            start = offset + RECORD_HEADER.size
+            if start + length > size:
+                break
+            body = mapped[start:start + length]
+            if zlib.crc32(body) != crc:
+                logger.warning(f"Corrupt trace record in {path} at offset {offset}")
+                break
+            (id_len,) = ID_HEADER.unpack_from(body, 0)
+            trace_id = body[ID_HEADER.size:ID_HEADER.size + id_len].decode("utf-8")
+            yield trace_id, start, length
+            offset = start + length
+
+
+class _MappedSegment:
+    """以唯讀 mmap 開啟分段檔案的 context manager；檔頭不符時產生 None"""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+        self._mapped = None
+    
+    def __enter__(self) -> Optional[mmap.mmap]:
+        self._file = open(self.path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        if size < len(SEGMENT_MAGIC):
+            return None
+        self._mapped = mmap.mmap(self._file.fileno(), size, access=mmap.ACCESS_READ)
+        if self._mapped[:len(SEGMENT_MAGIC)] != SEGMENT_MAGIC:
+            logger.warning(f"Skipping {self.path}: not a trace log segment")
+            return None
+        return self._mapped
+    
+    def __exit__(self, *exc_info) -> None:
+        if self._mapped is not None:
+            self._mapped.close()
+        self._file.close()
@@ -2,14 +2,23 @@
 import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
+from src.core.instrumentation import observe_stage
+from src.core.keyword_automaton import KeywordHits, scan_keywords
+from src.core.vow_store import VowStore
 from src.schemas.vow_object import VowObject, WithdrawalConditions, VowStatus, VowPriority
-from src.schemas.source_trace import SourceTrace, TraceStep, TraceStatus, TrustLevel
+from src.schemas.source_trace import TraceStatus, TrustLevel
 
 
 class VowChecker:
     """系統的契約官，負責承諾的解析、創建和管理"""
     
-    def __init__(self):
+    def __init__(self, vow_store: Optional[VowStore] = None):
+        """
+        Args:
+            vow_store: (可選) 新創建的誓言會存入此儲存庫以供後續查詢與過期處理
+        """
+        self.vow_store = vow_store
+        
         # 承諾解析模式
         self.commitment_patterns = {
             "我承諾": {"priority": VowPriority.HIGH, "confidence": 0.9},
@@ -53,7 +62,7 @@ class VowChecker:
         Returns:
             包含新創建的 VowObject 和更新 SourceTrace 的字典
         """
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         
         # 提取必要資訊
         original_sentence = classifier_output.get("original_sentence", "")
@@ -64,10 +73,12 @@ class VowChecker:
         
         try:
             # 解析承諾內容
-            vow_data = self._parse_commitment(original_sentence)
+            vow_data = self._parse_commitment(original_sentence, classifier_output.get("keyword_hits"))
             
             # 創建 VowObject
             vow_object = self._create_vow_object(vow_data, source_trace.id)
+            if self.vow_store is not None:
+                self.vow_store.add(vow_object)
             
             status = TraceStatus.SUCCESS
             evidence = f"Created VowObject {vow_object.id} with commitment: '{vow_object.commitment}'"
@@ -81,18 +92,16 @@ class VowChecker:
             trust_level = TrustLevel.C
         
         # 計算執行時間
-        latency_ms = int((time.time() - start_time) * 1000)
+        latency_ms = observe_stage("core.VowChecker.v0.1", start_ns)
         
         # 記錄追溯步驟
-        vow_step = TraceStep(
+        source_trace.record_step(
             tool="core.VowChecker.v0.1",
             status=status,
             evidence=evidence,
             trust_level=trust_level,
-            latency_ms=latency_ms,
-            ts=datetime.now()
+            latency_ms=latency_ms
         )
-        source_trace.steps.append(vow_step)
         
         # 構建輸出
         result = classifier_output.copy()
@@ -104,12 +113,25 @@ class VowChecker:
         
         return result
     
-    def _parse_commitment(self, sentence: str) -> Dict[str, Any]:
+    def process_vow_batch(self, classifier_outputs: List[dict]) -> List[dict]:
+        """
+        批次處理多筆承諾宣告
+        
+        Args:
+            classifier_outputs: ToneFunctionClassifier 的輸出字典列表
+            
+        Returns:
+            與輸入順序一致的處理結果列表
+        """
+        return [self.process_vow(classifier_output) for classifier_output in classifier_outputs]
+    
+    def _parse_commitment(self, sentence: str, keyword_hits: Optional[KeywordHits] = None) -> Dict[str, Any]:
         """
         解析承諾內容的核心邏輯
         
         Args:
             sentence: 原始承諾語句
+            keyword_hits: (可選) ToneBridge 對同一語句的關鍵字命中，未提供時會重新掃描
             
         Returns:
             解析後的承諾資料
@@ -117,12 +139,16 @@ class VowChecker:
         if not sentence or not sentence.strip():
             raise ValueError("Empty sentence provided")
         
-        sentence = sentence.strip()
+        hits = keyword_hits if keyword_hits is not None else scan_keywords(sentence)
+        
+        # 找到承諾關鍵字（依 commitment_patterns 的順序），記錄其第一次出現的位置
+        first_positions = {}
+        for start, keyword in hits.get("vow.commitment", []):
+            first_positions.setdefault(keyword, start)
         
-        # 找到承諾關鍵字
         commitment_keyword = None
         for keyword in self.commitment_patterns:
-            if keyword in sentence:
+            if keyword in first_positions:
                 commitment_keyword = keyword
                 break
         
@@ -130,14 +156,14 @@ class VowChecker:
             raise ValueError("No commitment keyword found in sentence")
         
         # 提取承諾內容（關鍵字之後的部分）
-        keyword_index = sentence.find(commitment_keyword)
-        commitment_content = sentence[keyword_index + len(commitment_keyword):].strip()
+        content_start = first_positions[commitment_keyword] + len(commitment_keyword)
+        commitment_content = sentence[content_start:].strip()
         
         if not commitment_content:
             raise ValueError("No commitment content found after keyword")
         
-        # 智慧範圍推斷（基礎版本）
-        scope = self._infer_scope(commitment_content)
+        # 智慧範圍推斷（基礎版本），只計入承諾內容中的命中
+        scope = self._infer_scope(commitment_content, hits, content_start)
         
         # 期限推斷（基礎版本）
         deadline = self._extract_deadline(commitment_content)
@@ -178,31 +204,31 @@ class VowChecker:
             confidence_score=vow_data["confidence"]
         )
     
-    def _infer_scope(self, commitment_content: str) -> List[str]:
+    def _infer_scope(self, commitment_content: str, keyword_hits: Optional[KeywordHits] = None,
+                     content_start: int = 0) -> List[str]:
         """
         智慧推斷承諾範圍（基礎版本）
         
         Args:
             commitment_content: 承諾內容
+            keyword_hits: (可選) 整句的關鍵字命中，未提供時會掃描 commitment_content
+            content_start: 承諾內容在整句中的起始位置，在此之前的命中不計入
             
         Returns:
             推斷的範圍列表
         """
         # TODO: 未來實作智慧推斷邏輯
         # 目前使用簡單的關鍵字匹配
-        scope = ["general"]
-        
-        # 時間相關
-        if any(word in commitment_content for word in ["明天", "今天", "下週", "本週"]):
-            scope.append("time_bound")
+        if keyword_hits is None:
+            keyword_hits = scan_keywords(commitment_content)
+            content_start = 0
         
-        # 工作相關
-        if any(word in commitment_content for word in ["完成", "交付", "實現", "做好"]):
-            scope.append("task_completion")
+        scope = ["general"]
         
-        # 品質相關
-        if any(word in commitment_content for word in ["品質", "標準", "要求", "準時"]):
-            scope.append("quality_assurance")
+        # 時間相關、工作相關、品質相關
+        for scope_name in ("time_bound", "task_completion", "quality_assurance"):
+            if any(start >= content_start for start, _ in keyword_hits.get(f"vow.scope.{scope_name}", [])):
+                scope.append(scope_name)
         
         return scope
     
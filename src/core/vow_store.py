@@ -0,0 +1,307 @@
+# file: src/core/vow_store.py
+import heapq
+import itertools
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from src.schemas.vow_object import VowObject, VowPriority, VowStatus
+
+
+class VowStore:
+    """
+    行程內的誓言儲存庫
+    
+    依狀態、優先級、範圍標籤與 source_trace_id 建立二級索引，查詢時只走訪最小的候選集合；
+    生效中且有期限的誓言另外放在以 deadline 排序的最小堆，過期處理每筆只需 O(log n)，
+    查詢「N 小時內到期」也只走訪堆中期限不晚於查詢範圍的部分。
+    
+    誓言的狀態只能透過 update_status / fulfill / withdraw 修改，以保持索引一致。
+    """
+    
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._vows: Dict[str, VowObject] = {}
+        
+        # 誓言加入或狀態改變時通知的回呼（例如跨行程同步）
+        self._listeners: List[Callable[[VowObject], None]] = []
+        
+        # 索引值使用 dict 當作有序集合，保留誓言加入的順序
+        self._by_status: Dict[VowStatus, Dict[str, None]] = defaultdict(dict)
+        self._by_priority: Dict[VowPriority, Dict[str, None]] = defaultdict(dict)
+        self._by_status_priority: Dict[Tuple[VowStatus, VowPriority], Dict[str, None]] = defaultdict(dict)
+        self._by_scope: Dict[str, Dict[str, None]] = defaultdict(dict)
+        self._by_trace: Dict[str, Dict[str, None]] = defaultdict(dict)
+        
+        # (deadline, 序號, vow_id)；誓言不再生效時不立即刪除，取出時再略過（惰性刪除）
+        self._deadline_heap: List[Tuple[datetime, int, str]] = []
+        self._heap_sequence = itertools.count()
+        # vow_id -> 目前有效的堆紀錄序號；不在此對照表中的堆紀錄都已失效
+        self._live_heap_entries: Dict[str, int] = {}
+        self._stale_entries = 0
+        
+        self.stats: Dict[str, int] = {
+            "added": 0,
+            "expired": 0,
+            "sweeps": 0
+        }
+    
+    def __len__(self) -> int:
+        return len(self._vows)
+    
+    def add(self, vow: VowObject, notify: bool = True) -> None:
+        """
+        加入一個誓言並建立索引（同 id 的誓言會被取代）
+        
+        Args:
+            vow: 要儲存的 VowObject
+            notify: 是否通知已註冊的回呼（複製其他行程的誓言時為 False）
+        """
+        with self._lock:
+            if vow.id in self._vows:
+                self._unindex(self._vows[vow.id])
+            self._vows[vow.id] = vow
+            self._index(vow)
+            self.stats["added"] += 1
+            if notify:
+                self._notify(vow)
+    
+    @property
+    def lock(self) -> threading.RLock:
+        """儲存庫的鎖（可重入）；需要與回呼維持相同上鎖順序的外部操作先取得它"""
+        return self._lock
+    
+    def add_listener(self, listener: Callable[[VowObject], None]) -> None:
+        """註冊誓言加入或狀態改變（含過期）時的回呼（在儲存庫的鎖內調用，應保持輕量）"""
+        self._listeners.append(listener)
+    
+    def get(self, vow_id: str) -> Optional[VowObject]:
+        """依 id 取得誓言"""
+        return self._vows.get(vow_id)
+    
+    def remove(self, vow_id: str) -> Optional[VowObject]:
+        """移除誓言並返回它，不存在時返回 None"""
+        with self._lock:
+            vow = self._vows.pop(vow_id, None)
+            if vow is not None:
+                self._unindex(vow)
+            return vow
+    
+    def update_status(self, vow_id: str, status: VowStatus) -> VowObject:
+        """
+        更新誓言狀態並維護索引
+        
+        Args:
+            vow_id: 誓言 ID
+            status: 新的狀態
+        
+        Returns:
+            更新後的誓言
+        """
+        with self._lock:
+            vow = self._vows.get(vow_id)
+            if vow is None:
+                raise KeyError(f"Vow {vow_id} not found")
+            if vow.status == status:
+                return vow
+            
+            self._unindex(vow)
+            if status == VowStatus.FULFILLED:
+                vow.fulfill()
+            elif status == VowStatus.WITHDRAWN:
+                vow.withdraw()
+            else:
+                vow.status = status
+            self._index(vow)
+            self._notify(vow)
+            return vow
+    
+    def fulfill(self, vow_id: str) -> VowObject:
+        """標記誓言為已履行"""
+        return self.update_status(vow_id, VowStatus.FULFILLED)
+    
+    def withdraw(self, vow_id: str) -> VowObject:
+        """撤回誓言"""
+        return self.update_status(vow_id, VowStatus.WITHDRAWN)
+    
+    def query(self, status: Optional[VowStatus] = None, priority: Optional[VowPriority] = None,
+              scope: Optional[str] = None, source_trace_id: Optional[str] = None,
+              limit: Optional[int] = None) -> Tuple[int, List[VowObject]]:
+        """
+        依索引查詢誓言，未指定的條件不過濾
+        
+        Args:
+            status: 誓言狀態
+            priority: 誓言優先級
+            scope: 範圍標籤
+            source_trace_id: 關聯的追溯 ID
+            limit: 最多返回幾筆（依加入順序）
+        
+        Returns:
+            (符合條件的總數, 誓言列表)
+        """
+        with self._lock:
+            candidates = []
+            if status is not None and priority is not None:
+                candidates.append(self._by_status_priority.get((status, priority), {}))
+            elif status is not None:
+                candidates.append(self._by_status.get(status, {}))
+            elif priority is not None:
+                candidates.append(self._by_priority.get(priority, {}))
+            if scope is not None:
+                candidates.append(self._by_scope.get(scope, {}))
+            if source_trace_id is not None:
+                candidates.append(self._by_trace.get(source_trace_id, {}))
+            
+            if not candidates:
+                candidates.append(self._vows)
+            
+            # 從最小的候選集合出發，其他集合只做成員檢查
+            candidates.sort(key=len)
+            smallest, others = candidates[0], candidates[1:]
+            
+            if not others:
+                total = len(smallest)
+                ids = itertools.islice(smallest, limit)
+                return total, [self._vows[vow_id] for vow_id in ids]
+            
+            total = 0
+            matches = []
+            for vow_id in smallest:
+                if all(vow_id in other for other in others):
+                    total += 1
+                    if limit is None or len(matches) < limit:
+                        matches.append(self._vows[vow_id])
+            return total, matches
+    
+    def expiring_within(self, hours: float, now: Optional[datetime] = None,
+                        limit: Optional[int] = None) -> List[VowObject]:
+        """
+        查詢在 now 到 now + hours 之間到期的生效中誓言，依期限排序
+        
+        只走訪堆中期限不晚於查詢範圍的節點：子節點的期限不早於父節點，
+        一旦父節點超出範圍整棵子樹都可略過。
+        
+        Args:
+            hours: 查詢範圍（小時）
+            now: 基準時間，預設為現在
+            limit: 最多返回幾筆
+        
+        Returns:
+            依期限由近到遠排序的誓言列表
+        """
+        now = now or datetime.now()
+        horizon = now + timedelta(hours=hours)
+        
+        with self._lock:
+            heap = self._deadline_heap
+            found = []
+            stack = [0] if heap else []
+            while stack:
+                position = stack.pop()
+                deadline, _, vow_id = heap[position]
+                if deadline > horizon:
+                    continue
+                if deadline >= now and self._is_live_entry(heap[position]):
+                    found.append((deadline, self._vows[vow_id]))
+                for child in (2 * position + 1, 2 * position + 2):
+                    if child < len(heap):
+                        stack.append(child)
+        
+        found.sort(key=lambda item: item[0])
+        vows = [vow for _, vow in found]
+        return vows if limit is None else vows[:limit]
+    
+    def expire_due(self, now: Optional[datetime] = None) -> List[VowObject]:
+        """
+        將期限已過的生效中誓言標記為 EXPIRED
+        
+        Args:
+            now: 基準時間，預設為現在
+        
+        Returns:
+            本次被標記為過期的誓言
+        """
+        now = now or datetime.now()
+        expired = []
+        
+        with self._lock:
+            heap = self._deadline_heap
+            while heap and heap[0][0] < now:
+                entry = heapq.heappop(heap)
+                if not self._is_live_entry(entry):
+                    self._stale_entries -= 1
+                    continue
+                vow = self._vows[entry[2]]
+                del self._live_heap_entries[vow.id]
+                self._unindex(vow)
+                vow.status = VowStatus.EXPIRED
+                self._index(vow)
+                self._notify(vow)
+                expired.append(vow)
+            
+            self.stats["expired"] += len(expired)
+            self.stats["sweeps"] += 1
+        
+        return expired
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """獲取儲存庫統計資訊"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["total_vows"] = len(self._vows)
+            stats["by_status"] = {status.value: len(ids) for status, ids in self._by_status.items() if ids}
+            stats["by_priority"] = {priority.value: len(ids) for priority, ids in self._by_priority.items() if ids}
+            stats["deadline_heap_size"] = len(self._deadline_heap)
+        return stats
+    
+    def _notify(self, vow: VowObject) -> None:
+        for listener in self._listeners:
+            listener(vow)
+    
+    def _is_live_entry(self, entry: Tuple[datetime, int, str]) -> bool:
+        """堆中的紀錄是否仍對應一個生效中、期限未變的誓言"""
+        _, sequence, vow_id = entry
+        return self._live_heap_entries.get(vow_id) == sequence
+    
+    def _index(self, vow: VowObject) -> None:
+        self._by_status[vow.status][vow.id] = None
+        self._by_priority[vow.priority][vow.id] = None
+        self._by_status_priority[(vow.status, vow.priority)][vow.id] = None
+        for tag in vow.scope:
+            self._by_scope[tag][vow.id] = None
+        self._by_trace[vow.source_trace_id][vow.id] = None
+        
+        if vow.status == VowStatus.ACTIVE and vow.deadline is not None:
+            sequence = next(self._heap_sequence)
+            heapq.heappush(self._deadline_heap, (vow.deadline, sequence, vow.id))
+            self._live_heap_entries[vow.id] = sequence
+    
+    def _unindex(self, vow: VowObject) -> None:
+        self._discard(self._by_status, vow.status, vow.id)
+        self._discard(self._by_priority, vow.priority, vow.id)
+        self._discard(self._by_status_priority, (vow.status, vow.priority), vow.id)
+        for tag in vow.scope:
+            self._discard(self._by_scope, tag, vow.id)
+        self._discard(self._by_trace, vow.source_trace_id, vow.id)
+        
+        if self._live_heap_entries.pop(vow.id, None) is not None:
+            # 堆中的紀錄留待之後略過；失效紀錄過多時重建堆以控制記憶體
+            self._stale_entries += 1
+            if self._stale_entries > 1024 and self._stale_entries * 2 > len(self._deadline_heap):
+                self._compact_heap()
+    
+    def _compact_heap(self) -> None:
+        """移除堆中已失效的紀錄"""
+        self._deadline_heap = [entry for entry in self._deadline_heap if self._is_live_entry(entry)]
+        heapq.heapify(self._deadline_heap)
+        self._stale_entries = 0
+    
+    @staticmethod
+    def _discard(index: Dict[Hashable, Dict[str, None]], key: Hashable, vow_id: str) -> None:
+        bucket = index.get(key)
+        if bucket is not None:
+            bucket.pop(vow_id, None)
+            if not bucket:
+                del index[key]
@@ -1,8 +1,19 @@
 # file: src/main.py
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, Field
-from typing import Dict, Any, List, Optional
+from fastapi import FastAPI, Header, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from starlette.requests import ClientDisconnect
+from pydantic import BaseModel, Field, model_validator
+from typing import Annotated, AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, Any, Iterator, List, Optional
+import asyncio
+import hmac
+import json
 import logging
+import os
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from datetime import datetime
 
 # 導入核心服務
@@ -10,38 +21,73 @@ from src.core.tone_bridge import ToneBridge
 from src.core.tone_function_classifier import ToneFunctionClassifier, ToneFunction
 from src.core.tone_strategic_router import ToneStrategicRouter
 from src.core.vow_checker import VowChecker
+from src.core.vow_store import VowStore
+from src.core.module_executor import ModuleExecutor
+from src.core.admission_scheduler import AdmissionScheduler, AdmissionRejected
+from src.core.quantile_sketch import LatencyMetrics
+from src.core.result_cache import ResultCache, UNCACHEABLE_MODULES, normalize_sentence
+from src.core.single_flight import SingleFlight, COALESCE_TOOL
+from src.core.ndjson_stream import NDJSONStreamProcessor
+from src.core.conversation_session import ConversationSession
+from src.core.sampling_profiler import SamplingProfiler, ProfilerBusy
+from src.core.instrumentation import (
+    METRICS, REQUEST_DURATION, REQUEST_ERRORS, REQUESTS, STEP_FAILURES, duration_ms, elapsed_ms
+)
 
 # 導入功能模組
-from src.core.qa_module import QAModule
-from src.core.knowledge_base_module import KnowledgeBaseModule
-from src.core.reflection_module import ReflectionModule
-from src.core.empathy_module import EmpathyModule
-from src.core.gratitude_handler_module import GratitudeHandlerModule
-from src.core.complaint_handler_module import ComplaintHandlerModule
-from src.core.action_executor_module import ActionExecutorModule
-from src.core.assistance_module import AssistanceModule
-from src.core.conversation_module import ConversationModule
-from src.core.statement_processor_module import StatementProcessorModule
-from src.core.default_handler_module import DefaultHandlerModule
+from src.core.module_registry import create_functional_modules
+from src.core.knowledge_corpus import KnowledgeIndex
 
 # 導入進化模組
 from src.core.adaptive_learning_module import AdaptiveLearningModule
 from src.core.metacognitive_module import MetacognitiveModule
 from src.core.knowledge_evolution_module import KnowledgeEvolutionModule
+from src.core.evolution_pipeline import EvolutionPipeline, OverflowPolicy
+from src.core.state_coordinator import StateSyncClient, parse_address
+
+# 導入追溯日誌
+from src.core.trace_log import TraceLog
 
 # 導入數據模型
-from src.schemas.source_trace import SourceTrace, TraceStep
-from src.schemas.vow_object import VowObject
+from src.schemas.source_trace import SourceTrace, TraceStep, TraceStatus, TrustLevel
+from src.schemas.vow_object import VowObject, VowPriority, VowStatus
 
 # 配置日誌
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 單次批次請求允許的最大句子數
+MAX_BATCH_SIZE = 1000
+
+# 誓言查詢單次返回的最大筆數
+MAX_VOW_QUERY_LIMIT = 1000
+
 # API 數據模型
 class ProcessRequest(BaseModel):
     """處理請求的數據模型"""
     sentence: str = Field(..., description="用戶輸入的句子", min_length=1, max_length=500)
     trace_id: Optional[str] = Field(None, description="可選的追溯 ID")
+    sync_evolution: bool = Field(False, description="是否同步執行進化處理並在響應中返回 evolution_insights")
+
+class BatchProcessRequest(BaseModel):
+    """批次處理請求的數據模型"""
+    sentences: List[Annotated[str, Field(min_length=1, max_length=500)]] = Field(
+        ..., description="用戶輸入的句子列表", min_length=1, max_length=MAX_BATCH_SIZE
+    )
+    trace_ids: Optional[List[Optional[str]]] = Field(None, description="可選的追溯 ID 列表，與 sentences 一一對應")
+    
+    @model_validator(mode="after")
+    def check_trace_ids_length(self):
+        if self.trace_ids is not None and len(self.trace_ids) != len(self.sentences):
+            raise ValueError("trace_ids must have the same length as sentences")
+        return self
+
+class SessionTurnRequest(BaseModel):
+    """WebSocket 會話中一個回合的數據模型"""
+    sentence: str = Field(..., description="用戶輸入的句子", min_length=1, max_length=500)
+    trace_id: Optional[str] = Field(None, description="可選的追溯 ID")
+    stream_trace: Optional[bool] = Field(None, description="本回合是否逐階段推送追溯步驟（預設沿用會話設定）")
+    user_satisfaction: Optional[float] = Field(None, ge=0.0, le=1.0, description="用戶滿意度，設定後沿用到之後的回合")
 
 class TraceStepResponse(BaseModel):
     """追溯步驟的響應模型"""
@@ -65,6 +111,24 @@ class ProcessResponse(BaseModel):
     vow_object: Optional[Dict[str, Any]] = Field(None, description="誓言物件（如果適用）")
     source_trace: List[TraceStepResponse] = Field(..., description="完整的追溯鏈")
     total_latency_ms: int = Field(..., description="總處理時間")
+    evolution_insights: Optional[Dict[str, Any]] = Field(None, description="進化處理結果（僅在同步進化時返回）")
+
+class BatchProcessResponse(BaseModel):
+    """批次處理響應的數據模型"""
+    success: bool = Field(..., description="整批是否全部處理成功")
+    total: int = Field(..., description="批次中的句子數量")
+    results: List[ProcessResponse] = Field(..., description="逐筆處理結果，順序與輸入一致")
+    total_latency_ms: int = Field(..., description="整批處理時間")
+
+class TraceLookupResponse(BaseModel):
+    """追溯鏈查詢響應模型"""
+    trace_id: str = Field(..., description="追溯 ID")
+    source_trace: List[TraceStepResponse] = Field(..., description="持久化的追溯鏈")
+
+class VowListResponse(BaseModel):
+    """誓言查詢響應模型"""
+    total: int = Field(..., description="符合條件的誓言總數")
+    vows: List[Dict[str, Any]] = Field(..., description="誓言列表（受 limit 限制）")
 
 class HealthResponse(BaseModel):
     """健康檢查響應模型"""
@@ -72,13 +136,35 @@ class HealthResponse(BaseModel):
     timestamp: datetime
     version: str
 
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    邊讀取請求主體邊輸出的串流響應
+    
+    StreamingResponse 預設另以一個任務監聽 http.disconnect，該任務會吞掉尚未讀取的請求主體；
+    這裡改由讀取請求主體的 request.stream() 自行偵測斷線。
+    """
+    
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """應用生命週期：關閉時先處理完背景任務、背景進化管線與追溯日誌中的剩餘工作"""
+    yield
+    await tonesoul_service.drain_background_tasks()
+    tonesoul_service.shutdown()
+
 # 創建 FastAPI 應用
 app = FastAPI(
     title="ToneSoul System API",
     description="語魂系統 - 具備道德記憶的 AI 處理系統",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 class ToneSoulService:
@@ -86,142 +172,639 @@ class ToneSoulService:
     
     def __init__(self):
         # 初始化核心服務
-        self.bridge = ToneBridge()
+        self.bridge = ToneBridge(compact_trace=True)
         self.classifier = ToneFunctionClassifier()
         self.router = ToneStrategicRouter()
-        self.vow_checker = VowChecker()
+        self.vow_store = VowStore()
+        self.vow_checker = VowChecker(vow_store=self.vow_store)
+        
+        # 各管線階段與各 ToneFunction 的延遲分佈
+        self.latency_metrics = LatencyMetrics()
         
         # 初始化進化模組
         self.adaptive_learning = AdaptiveLearningModule()
         self.metacognitive = MetacognitiveModule()
-        self.knowledge_evolution = KnowledgeEvolutionModule()
+        self.knowledge_evolution = KnowledgeEvolutionModule(
+            decay_period_s=float(os.environ.get("TONESOUL_KNOWLEDGE_DECAY_PERIOD", "3600")),
+            min_confidence=float(os.environ.get("TONESOUL_KNOWLEDGE_MIN_CONFIDENCE", "0.05")),
+            min_edge_weight=float(os.environ.get("TONESOUL_KNOWLEDGE_MIN_EDGE_WEIGHT", "0.05"))
+        )
+        
+        # 進化處理預設在背景管線執行，不計入請求延遲
+        self.evolution_pipeline = EvolutionPipeline(
+            self.adaptive_learning,
+            self.metacognitive,
+            self.knowledge_evolution,
+            max_queue_size=int(os.environ.get("TONESOUL_EVOLUTION_QUEUE_SIZE", "1000")),
+            batch_size=int(os.environ.get("TONESOUL_EVOLUTION_BATCH_SIZE", "32")),
+            overflow_policy=OverflowPolicy(os.environ.get("TONESOUL_EVOLUTION_OVERFLOW", "drop")),
+            sample_rate=float(os.environ.get("TONESOUL_EVOLUTION_SAMPLE_RATE", "0.1"))
+        )
+        
+        # 背景執行緒定期衰減並剪除久未使用的知識（0 表示停用）
+        decay_interval = float(os.environ.get("TONESOUL_KNOWLEDGE_DECAY_INTERVAL", "300"))
+        if decay_interval > 0:
+            self.knowledge_evolution.decay.start(decay_interval, self.evolution_pipeline.lock)
+        
+        # 多工作行程部署時（scripts/start_server.py --workers）透過協調者共用學習與誓言狀態
+        coordinator_address = os.environ.get("TONESOUL_COORDINATOR_ADDRESS")
+        if coordinator_address:
+            self.state_sync = StateSyncClient(
+                parse_address(coordinator_address),
+                os.environ.get("TONESOUL_COORDINATOR_AUTHKEY", "").encode(),
+                self.adaptive_learning,
+                self.metacognitive,
+                self.vow_store,
+                lock=self.evolution_pipeline.lock,
+                interval=float(os.environ.get("TONESOUL_SYNC_INTERVAL", "2"))
+            )
+            self.state_sync.start()
+        else:
+            self.state_sync = None
+        
+        # 設定 TONESOUL_TRACE_LOG_DIR 時將每條完成的追溯鏈寫入持久化日誌
+        trace_log_dir = os.environ.get("TONESOUL_TRACE_LOG_DIR")
+        if trace_log_dir:
+            self.trace_log = TraceLog(
+                trace_log_dir,
+                max_segment_bytes=int(os.environ.get("TONESOUL_TRACE_LOG_SEGMENT_MB", "64")) * 1024 * 1024,
+                max_segment_age=float(os.environ.get("TONESOUL_TRACE_LOG_SEGMENT_AGE", "3600"))
+            )
+            self.trace_reader = self.trace_log.reader()
+        else:
+            self.trace_log = None
+            self.trace_reader = None
+        
+        # 設定 TONESOUL_KNOWLEDGE_INDEX 時，QAModule 與 KnowledgeBaseModule 從記憶體映射的知識庫索引檢索答案
+        knowledge_index_dir = os.environ.get("TONESOUL_KNOWLEDGE_INDEX")
+        self.knowledge_index = KnowledgeIndex.load(knowledge_index_dir) if knowledge_index_dir else None
         
         # 初始化功能模組
-        self.modules = {
-            "qa_module": QAModule(),
-            "knowledge_base_module": KnowledgeBaseModule(),
-            "reflection_module": ReflectionModule(),
-            "empathy_module": EmpathyModule(),
-            "gratitude_handler_module": GratitudeHandlerModule(),
-            "complaint_handler_module": ComplaintHandlerModule(),
-            "action_executor_module": ActionExecutorModule(),
-            "assistance_module": AssistanceModule(),
-            "conversation_module": ConversationModule(),
-            "statement_processor_module": StatementProcessorModule(),
-            "default_handler_module": DefaultHandlerModule(),
-            "vow_checker_module": self.vow_checker  # VowChecker 特殊處理
-        }
+        self.modules = create_functional_modules(self.vow_checker, self.knowledge_index)
+        
+        # 功能模組在工作執行緒池上執行，逾時依路由策略的 timeout_ms 回退到預設處理模組
+        self.module_executor = ModuleExecutor(
+            self.modules,
+            max_workers=int(os.environ.get("TONESOUL_MODULE_WORKERS", "32"))
+        )
+        
+        # 路由與模組執行之間的准入排程：依路由優先級加權出列，過載時先卸載低優先級
+        self.scheduler = AdmissionScheduler(
+            max_concurrency=int(os.environ.get("TONESOUL_MAX_CONCURRENCY", "16")),
+            max_queue_depth=int(os.environ.get("TONESOUL_ADMISSION_QUEUE_DEPTH", "256")),
+            max_wait_ms=float(os.environ.get("TONESOUL_ADMISSION_MAX_WAIT_MS", "1000"))
+        )
+        
+        # 非同步 API 在此有界執行緒池上執行 CPU 密集的處理階段，不阻塞事件迴圈
+        self.stage_executor = ThreadPoolExecutor(
+            max_workers=int(os.environ.get("TONESOUL_STAGE_WORKERS", "32")),
+            thread_name_prefix="tonesoul-stage"
+        )
+        self._background_tasks: set = set()
+        
+        # 相同句子的分類、路由與模組回應快取（0 表示停用）；有副作用的誓言路由不快取
+        cache_size = int(os.environ.get("TONESOUL_RESULT_CACHE_SIZE", "10000"))
+        if cache_size > 0:
+            self.result_cache = ResultCache(
+                max_entries=cache_size,
+                ttl_seconds=float(os.environ.get("TONESOUL_RESULT_CACHE_TTL", "300"))
+            )
+        else:
+            self.result_cache = None
+        
+        # 同時處理中的相同句子只執行一次處理流程，其他請求共用結果（設為 0 停用）
+        if os.environ.get("TONESOUL_COALESCE_REQUESTS", "1") != "0":
+            self.single_flight = SingleFlight()
+        else:
+            self.single_flight = None
+        
+        # 設定 TONESOUL_ADMIN_TOKEN 時開放管理端點（取樣分析器），未設定時不啟用
+        self.admin_token = os.environ.get("TONESOUL_ADMIN_TOKEN") or None
+        self.profiler = SamplingProfiler(
+            cooldown_s=float(os.environ.get("TONESOUL_PROFILE_COOLDOWN", "10"))
+        )
         
         logger.info("ToneSoul System initialized with all modules and evolution capabilities")
     
-    def process_sentence(self, sentence: str, trace_id: Optional[str] = None) -> Dict[str, Any]:
+    def process_sentence(self, sentence: str, trace_id: Optional[str] = None,
+                         context: Optional[Dict[str, Any]] = None,
+                         sync_evolution: bool = False) -> Dict[str, Any]:
         """
         處理用戶輸入的完整流程
         
         Args:
             sentence: 用戶輸入的句子
             trace_id: 可選的追溯 ID
+            context: 可選的互動上下文（例如 user_satisfaction）
+            sync_evolution: 為 True 時同步執行進化處理並返回 evolution_insights，
+                否則交給背景進化管線
             
         Returns:
             完整的處理結果
         """
-        start_time = datetime.now()
+        start_ns = time.perf_counter_ns()
+        context = context or {}
         
         try:
-            # 第一步：ToneBridge 感知
-            logger.info(f"Processing sentence: '{sentence[:50]}...'")
-            bridge_output = self.bridge.analyze(sentence, trace_id)
-            
-            # 第二步：ToneFunctionClassifier 理解
-            classifier_output = self.classifier.classify(bridge_output)
-            
-            # 第三步：ToneStrategicRouter 決策
-            router_output = self.router.route(classifier_output)
-            
-            # 第四步：功能模組執行
-            next_module = router_output["next_strategy"]["next_module"]
-            
-            if next_module in self.modules:
-                module = self.modules[next_module]
-                # VowChecker 使用特殊的方法名
-                if next_module == "vow_checker_module":
-                    final_output = module.process_vow(router_output)
-                else:
-                    final_output = module.process(router_output)
-            else:
-                # 回退到預設處理模組
-                logger.warning(f"Module {next_module} not found, using default handler")
-                final_output = self.modules["default_handler_module"].process(router_output)
+            final_output = self._lookup_cached(sentence, trace_id)
+            if final_output is None:
+                final_output = self._execute_coalesced(sentence, trace_id)
             
             # 計算總處理時間
-            total_latency = int((datetime.now() - start_time).total_seconds() * 1000)
+            total_latency = duration_ms(start_ns)
             
             # 執行進化處理
-            evolution_context = {
-                "original_sentence": sentence,
-                "intent_type": final_output.get("intent_type", "unknown"),
-                "tone_function": final_output.get("tone_function", ToneFunction.UNKNOWN).value,
-                "processing_success": True,
-                "user_satisfaction": context.get("user_satisfaction", 0.8),  # 默認滿意度
-                "response_time": total_latency
-            }
+            evolution_insights = self._run_evolution(final_output, context, total_latency, sync_evolution)
+            return self._complete(final_output, total_latency, evolution_insights)
             
-            # 自適應學習
-            learning_results = self.adaptive_learning.process_interaction(
-                final_output["source_trace"], evolution_context
-            )
+        except Exception as e:
+            logger.error(f"Processing failed: {str(e)}")
+            error_latency = elapsed_ms(start_ns)
+            return self._build_error_response(sentence, trace_id, e, error_latency)
+    
+    async def process_sentence_async(self, sentence: str, trace_id: Optional[str] = None,
+                                     context: Optional[Dict[str, Any]] = None,
+                                     sync_evolution: bool = False) -> Dict[str, Any]:
+        """
+        處理用戶輸入的完整流程（非同步版本）
+        
+        各處理階段在 stage_executor 上執行，等待期間事件迴圈可以繼續服務其他連線；
+        非同步進化時，把工作交給背景管線的步驟以背景任務執行，不計入響應時間。
+        
+        Args:
+            sentence: 用戶輸入的句子
+            trace_id: 可選的追溯 ID
+            context: 可選的互動上下文（例如 user_satisfaction）
+            sync_evolution: 為 True 時等待進化處理完成並返回 evolution_insights
             
-            # 元認知監控
-            metacognitive_results = self.metacognitive.monitor_cognitive_process(
-                final_output["source_trace"], evolution_context
-            )
+        Returns:
+            完整的處理結果（與 process_sentence 相同）
+        """
+        loop = asyncio.get_running_loop()
+        start_ns = time.perf_counter_ns()
+        context = context or {}
+        
+        try:
+            final_output = self._lookup_cached(sentence, trace_id)
+            if final_output is None:
+                final_output = await self._execute_coalesced_async(sentence, trace_id)
             
-            # 知識進化
-            knowledge_evolution_results = self.knowledge_evolution.process_knowledge_evolution(
-                final_output["source_trace"], evolution_context
-            )
+            total_latency = duration_ms(start_ns)
             
-            # 構建響應
-            response = {
-                "success": True,
-                "trace_id": final_output["source_trace"].id,
-                "original_sentence": sentence,
-                "intent_type": final_output.get("intent_type", "unknown"),
-                "tone_function": final_output.get("tone_function", ToneFunction.UNKNOWN).value,
-                "next_strategy": final_output.get("next_strategy", {}),
-                "module_response": final_output.get("module_response", "處理完成"),
-                "processing_status": final_output.get("processing_status", "completed"),
-                "vow_object": self._serialize_vow_object(final_output.get("vow_object")),
-                "source_trace": self._serialize_trace_steps(final_output["source_trace"].steps),
-                "total_latency_ms": total_latency,
-                # 進化能力結果
-                "evolution_insights": {
-                    "adaptive_learning": learning_results,
-                    "metacognitive_analysis": metacognitive_results,
-                    "knowledge_evolution": knowledge_evolution_results
-                }
-            }
+            if sync_evolution:
+                evolution_insights = await loop.run_in_executor(
+                    self.stage_executor, self._run_evolution, final_output, context, total_latency, True
+                )
+            else:
+                evolution_insights = None
+                self._spawn_background(loop.run_in_executor(
+                    self.stage_executor, self._run_evolution, final_output, context, total_latency
+                ))
+            return self._complete(final_output, total_latency, evolution_insights)
             
-            logger.info(f"Processing completed successfully in {total_latency}ms")
-            return response
+        except Exception as e:
+            logger.error(f"Processing failed: {str(e)}")
+            error_latency = elapsed_ms(start_ns)
+            return self._build_error_response(sentence, trace_id, e, error_latency)
+    
+    async def process_batch_async(self, sentences: List[str], trace_ids: Optional[List[Optional[str]]] = None,
+                                  context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """批次處理多個句子（非同步版本，整批在 stage_executor 上執行）"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.stage_executor, self.process_batch, sentences, trace_ids, context)
+    
+    async def process_session_turn(self, session: ConversationSession, sentence: str,
+                                   trace_id: Optional[str] = None,
+                                   on_step: Optional[Callable[[str, Dict[str, Any]], Awaitable[None]]] = None
+                                   ) -> Dict[str, Any]:
+        """
+        處理 WebSocket 會話中的一個回合
+        
+        Args:
+            session: 連線的會話狀態，互動上下文跨回合沿用
+            sentence: 用戶輸入的句子
+            trace_id: 可選的追溯 ID
+            on_step: 提供時逐階段執行，並在每個階段完成後以 (trace_id, 序列化的追溯步驟) 呼叫
+            
+        Returns:
+            完整的處理結果（與 process_sentence 相同）
+        """
+        context = session.begin_turn()
+        if on_step is None:
+            response = await self.process_sentence_async(sentence, trace_id, context)
+        else:
+            response = await self._process_with_steps(sentence, trace_id, context, on_step)
+        session.record_turn(response)
+        return response
+    
+    async def _process_with_steps(self, sentence: str, trace_id: Optional[str], context: Dict[str, Any],
+                                  on_step: Callable[[str, Dict[str, Any]], Awaitable[None]]) -> Dict[str, Any]:
+        """逐階段執行處理流程，每個階段完成時推送新增的追溯步驟（不參與請求合併）"""
+        loop = asyncio.get_running_loop()
+        start_ns = time.perf_counter_ns()
+        published = 0
+        publishing = False
+        
+        async def publish(source_trace) -> None:
+            nonlocal published, publishing
+            publishing = True
+            for step in self._serialize_trace_steps(source_trace.steps[published:]):
+                await on_step(source_trace.id, step)
+            publishing = False
+            published = len(source_trace.steps)
+        
+        try:
+            final_output = self._lookup_cached(sentence, trace_id)
+            if final_output is None:
+                stage_output = await loop.run_in_executor(
+                    self.stage_executor, self.bridge.analyze, self._pipeline_text(sentence), trace_id
+                )
+                await publish(stage_output["source_trace"])
+                for stage in (self.classifier.classify, self.router.route):
+                    stage_output = await loop.run_in_executor(self.stage_executor, stage, stage_output)
+                    await publish(stage_output["source_trace"])
+                
+                next_module = stage_output["next_strategy"]["next_module"]
+                final_outputs = await loop.run_in_executor(
+                    self.stage_executor, self._dispatch_batch, next_module, [stage_output]
+                )
+                final_output = final_outputs[0]
+                self._store_cached(sentence, final_output)
+            await publish(final_output["source_trace"])
+            
+            total_latency = duration_ms(start_ns)
+            self._spawn_background(loop.run_in_executor(
+                self.stage_executor, self._run_evolution, final_output, context, total_latency
+            ))
+            return self._complete(final_output, total_latency, None)
             
         except Exception as e:
+            if publishing:
+                # 推送失敗（例如連線已中斷）不是處理錯誤，交由呼叫端處理
+                raise
             logger.error(f"Processing failed: {str(e)}")
-            error_latency = int((datetime.now() - start_time).total_seconds() * 1000)
+            error_latency = elapsed_ms(start_ns)
+            return self._build_error_response(sentence, trace_id, e, error_latency)
+    
+    def process_stream(self, chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+        """
+        串流處理以換行分隔的句子
+        
+        邊讀取邊以小批次執行 process_batch，並依輸入順序產生每行一筆的 NDJSON 結果；
+        已讀取、尚未處理的行數有上限，記憶體用量不隨輸入行數增加。
+        
+        Args:
+            chunks: 請求主體的位元組區塊
+            
+        Returns:
+            NDJSON 位元組的非同步產生器
+        """
+        processor = NDJSONStreamProcessor(
+            self.process_batch,
+            executor=self.stage_executor,
+            batch_size=int(os.environ.get("TONESOUL_STREAM_BATCH_SIZE", "64")),
+            max_buffered_lines=int(os.environ.get("TONESOUL_STREAM_BUFFER_LINES", "1024"))
+        )
+        return processor.process(chunks)
+    
+    async def drain_background_tasks(self) -> None:
+        """等待尚未完成的背景任務"""
+        if self._background_tasks:
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
+    
+    def shutdown(self) -> None:
+        """關閉執行緒池，並處理完背景進化管線與追溯日誌中的剩餘工作"""
+        self.stage_executor.shutdown(wait=True)
+        self.module_executor.shutdown()
+        self.evolution_pipeline.shutdown()
+        self.knowledge_evolution.decay.close()
+        if self.state_sync is not None:
+            self.state_sync.close()
+        if self.trace_log is not None:
+            self.trace_log.close()
+    
+    def process_batch(self, sentences: List[str], trace_ids: Optional[List[Optional[str]]] = None,
+                      context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        批次處理多個句子
+        
+        ToneBridge、ToneFunctionClassifier 與 ToneStrategicRouter 整批各執行一次，
+        之後依 next_module 分組，每個功能模組對其分組只調用一次。
+        
+        Args:
+            sentences: 用戶輸入的句子列表
+            trace_ids: 可選的追溯 ID 列表，與 sentences 一一對應
+            context: 可選的互動上下文，套用到整批的每一個句子
             
+        Returns:
+            包含逐筆結果（依輸入順序）與整批處理時間的字典
+        """
+        start_ns = time.perf_counter_ns()
+        context = context or {}
+        if trace_ids is None:
+            trace_ids = [None] * len(sentences)
+        
+        logger.info(f"Processing batch of {len(sentences)} sentences")
+        results: List[Optional[Dict[str, Any]]] = [None] * len(sentences)
+        
+        try:
+            # 前三個階段整批執行
+            bridge_outputs = self.bridge.analyze_batch(sentences, trace_ids)
+            classifier_outputs = self.classifier.classify_batch(bridge_outputs)
+            router_outputs = self.router.route_batch(classifier_outputs)
+        except Exception as e:
+            logger.error(f"Batch processing failed: {str(e)}")
+            error_latency = elapsed_ms(start_ns)
             return {
                 "success": False,
-                "trace_id": trace_id or "error",
-                "original_sentence": sentence,
-                "intent_type": "error",
-                "tone_function": "error",
-                "next_strategy": {},
-                "module_response": f"處理失敗: {str(e)}",
-                "processing_status": "error",
-                "vow_object": None,
-                "source_trace": [],
+                "total": len(sentences),
+                "results": [
+                    self._build_error_response(sentence, trace_id, e, error_latency)
+                    for sentence, trace_id in zip(sentences, trace_ids)
+                ],
                 "total_latency_ms": error_latency
             }
+        
+        # 依 next_module 分組，保留原始索引以便還原輸入順序
+        groups: Dict[str, List[int]] = defaultdict(list)
+        for index, router_output in enumerate(router_outputs):
+            groups[router_output["next_strategy"]["next_module"]].append(index)
+        
+        for next_module, indices in groups.items():
+            try:
+                final_outputs = self._dispatch_batch(next_module, [router_outputs[i] for i in indices])
+            except Exception as e:
+                logger.error(f"Batch dispatch to {next_module} failed: {str(e)}")
+                error_latency = elapsed_ms(start_ns)
+                for i in indices:
+                    results[i] = self._build_error_response(sentences[i], trace_ids[i], e, error_latency)
+                continue
+            
+            for i, final_output in zip(indices, final_outputs):
+                item_latency = sum(step.duration_ms for step in final_output["source_trace"].steps)
+                self._run_evolution(final_output, context, item_latency)
+                self._record_latency(final_output, item_latency)
+                self._persist_trace(final_output)
+                results[i] = self._build_response(final_output, item_latency)
+        
+        total_latency = elapsed_ms(start_ns)
+        logger.info(f"Batch of {len(sentences)} sentences completed in {total_latency}ms")
+        
+        return {
+            "success": all(result["success"] for result in results),
+            "total": len(sentences),
+            "results": results,
+            "total_latency_ms": total_latency
+        }
+    
+    def _route_sentence(self, sentence: str, trace_id: Optional[str]) -> dict:
+        """執行 ToneBridge 感知、ToneFunctionClassifier 理解與 ToneStrategicRouter 決策"""
+        logger.info(f"Processing sentence: '{sentence[:50]}...'")
+        bridge_output = self.bridge.analyze(sentence, trace_id)
+        classifier_output = self.classifier.classify(bridge_output)
+        return self.router.route(classifier_output)
+    
+    def _execute(self, sentence: str, trace_id: Optional[str]) -> dict:
+        """執行感知、理解、決策與功能模組，並保存可快取的結果"""
+        # 第一至三步：感知、理解、決策
+        router_output = self._route_sentence(self._pipeline_text(sentence), trace_id)
+        
+        # 第四步：功能模組執行
+        next_module = router_output["next_strategy"]["next_module"]
+        final_output = self._dispatch_batch(next_module, [router_output])[0]
+        self._store_cached(sentence, final_output)
+        return final_output
+    
+    def _execute_coalesced(self, sentence: str, trace_id: Optional[str]) -> dict:
+        """與同時處理中的相同句子共用一次 _execute"""
+        if self.single_flight is None:
+            return self._execute(sentence, trace_id)
+        
+        trace_id = trace_id or str(uuid.uuid4())
+        final_output, shared = self.single_flight.do(
+            normalize_sentence(sentence), lambda: self._execute(sentence, trace_id)
+        )
+        if not shared:
+            return final_output
+        if final_output["next_strategy"].get("next_module") in UNCACHEABLE_MODULES:
+            # 有副作用的路由（例如建立誓言）每個請求都必須自行執行
+            return self._execute(sentence, trace_id)
+        return self._share_result(final_output, sentence, trace_id)
+    
+    async def _execute_coalesced_async(self, sentence: str, trace_id: Optional[str]) -> dict:
+        """_execute_coalesced 的非同步版本，處理流程在 stage_executor 上執行"""
+        loop = asyncio.get_running_loop()
+        if self.single_flight is None:
+            return await loop.run_in_executor(self.stage_executor, self._execute, sentence, trace_id)
+        
+        trace_id = trace_id or str(uuid.uuid4())
+        final_output, shared = await self.single_flight.do_async(
+            normalize_sentence(sentence), lambda: self._execute(sentence, trace_id), self.stage_executor
+        )
+        if not shared:
+            return final_output
+        if final_output["next_strategy"].get("next_module") in UNCACHEABLE_MODULES:
+            return await loop.run_in_executor(self.stage_executor, self._execute, sentence, trace_id)
+        return self._share_result(final_output, sentence, trace_id)
+    
+    def _share_result(self, final_output: Dict[str, Any], sentence: str, trace_id: str) -> Dict[str, Any]:
+        """為共用結果的請求建立自己的追溯鏈副本與輸出"""
+        leader_trace = final_output["source_trace"]
+        source_trace = leader_trace.fork(trace_id)
+        source_trace.record_step(
+            tool=COALESCE_TOOL,
+            status=TraceStatus.SUCCESS,
+            evidence=f"Coalesced with in-flight trace {leader_trace.id}",
+            trust_level=TrustLevel.B,
+            latency_ms=0
+        )
+        return dict(
+            final_output,
+            original_sentence=sentence,
+            next_strategy=dict(final_output["next_strategy"]),
+            source_trace=source_trace
+        )
+    
+    def _pipeline_text(self, sentence: str) -> str:
+        """啟用結果快取或請求合併時處理流程使用正規化後的句子，確保相同鍵的結果一致"""
+        if self.result_cache is None and self.single_flight is None:
+            return sentence
+        return normalize_sentence(sentence)
+    
+    def _lookup_cached(self, sentence: str, trace_id: Optional[str]) -> Optional[dict]:
+        """快取命中時返回以新追溯鏈重播的模組輸出，否則返回 None"""
+        if self.result_cache is None:
+            return None
+        entry = self.result_cache.get(normalize_sentence(sentence))
+        if entry is None:
+            return None
+        return self.result_cache.replay(entry, sentence, self.bridge.new_trace(trace_id))
+    
+    def _store_cached(self, sentence: str, final_output: Dict[str, Any]) -> None:
+        """保存可快取的模組輸出，並讓響應保留用戶的原始句子"""
+        if self.result_cache is not None:
+            self.result_cache.put(normalize_sentence(sentence), final_output)
+        final_output["original_sentence"] = sentence
+    
+    def _complete(self, final_output: Dict[str, Any], total_latency: float,
+                  evolution_insights: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """記錄延遲、持久化追溯鏈並構建響應"""
+        self._record_latency(final_output, total_latency)
+        self._persist_trace(final_output)
+        
+        response = self._build_response(final_output, total_latency)
+        response["evolution_insights"] = evolution_insights
+        
+        logger.info(f"Processing completed successfully in {total_latency:.1f}ms")
+        return response
+    
+    def _spawn_background(self, future: asyncio.Future) -> None:
+        """保留背景任務的參照直到完成，並記錄失敗"""
+        self._background_tasks.add(future)
+        
+        def _done(finished: asyncio.Future) -> None:
+            self._background_tasks.discard(finished)
+            if not finished.cancelled() and finished.exception() is not None:
+                logger.error(f"Background evolution failed: {finished.exception()}")
+        
+        future.add_done_callback(_done)
+    
+    def _dispatch_batch(self, next_module: str, router_outputs: List[dict]) -> List[dict]:
+        """將同一路由目標的請求經准入排程後一次交給對應的功能模組（受路由期限約束）"""
+        priority = router_outputs[0]["next_strategy"].get("priority", "medium")
+        with self.scheduler.admit(priority):
+            return self.module_executor.dispatch(next_module, router_outputs)
+    
+    def _run_evolution(self, final_output: Dict[str, Any], context: Dict[str, Any],
+                       total_latency: float, sync: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        對單筆處理結果執行進化處理
+        
+        Args:
+            final_output: 功能模組的輸出
+            context: 互動上下文
+            total_latency: 該筆請求的處理時間（毫秒）
+            sync: 是否同步執行
+            
+        Returns:
+            同步執行時返回進化洞察，交給背景管線時返回 None
+        """
+        evolution_context = {
+            "original_sentence": final_output.get("original_sentence", ""),
+            "intent_type": final_output.get("intent_type", "unknown"),
+            "tone_function": final_output.get("tone_function", ToneFunction.UNKNOWN).value,
+            "processing_success": True,
+            "user_satisfaction": context.get("user_satisfaction", 0.8),  # 默認滿意度
+            "response_time": total_latency
+        }
+        
+        if sync:
+            return self.evolution_pipeline.process_now(final_output["source_trace"], evolution_context)
+        
+        self.evolution_pipeline.submit(final_output["source_trace"], evolution_context)
+        return None
+    
+    def _record_latency(self, final_output: Dict[str, Any], total_latency: float) -> None:
+        """將各步驟與整筆請求未捨去的延遲記錄到分位數草圖，並更新 /metrics 的請求與失敗步驟計數"""
+        steps = final_output["source_trace"].steps
+        tone_function = final_output.get("tone_function", ToneFunction.UNKNOWN).value
+        self.latency_metrics.record(steps, tone_function, total_latency)
+        
+        REQUEST_DURATION.observe_ns(int(total_latency * 1_000_000), tone_function)
+        REQUESTS.inc(tone_function, final_output.get("next_strategy", {}).get("next_module", "unknown"))
+        for step in steps:
+            if step.status == TraceStatus.FAIL:
+                STEP_FAILURES.inc(step.tool)
+    
+    def collect_metrics(self) -> Iterator[tuple]:
+        """產生 /metrics 輸出時才讀取的即時指標（排程佇列、模組逾時、快取與進化管線）"""
+        scheduler = self.scheduler.get_stats()
+        yield ("tonesoul_admission_active", "gauge", "Requests currently holding an admission slot.",
+               [({}, scheduler["active"])])
+        yield ("tonesoul_admission_queue_depth", "gauge", "Requests waiting for admission, by priority.",
+               [({"priority": priority}, stats["queue_depth"]) for priority, stats in scheduler["priorities"].items()])
+        yield ("tonesoul_admission_shed_total", "counter", "Requests shed by the admission scheduler.",
+               [({"priority": priority, "reason": reason}, stats[f"shed_{reason}"])
+                for priority, stats in scheduler["priorities"].items() for reason in ("queue_depth", "wait_time")])
+        
+        executor = self.module_executor.get_stats()
+        yield ("tonesoul_module_timeouts_total", "counter", "Module dispatches that exceeded their deadline.",
+               [({"module": module}, count) for module, count in sorted(executor["timeouts_by_module"].items())])
+        
+        if self.result_cache is not None:
+            cache = self.result_cache.get_stats()
+            yield ("tonesoul_result_cache_requests_total", "counter", "Result cache lookups by outcome.",
+                   [({"outcome": "hit"}, cache["hits"]), ({"outcome": "miss"}, cache["misses"])])
+            yield ("tonesoul_result_cache_entries", "gauge", "Entries held by the result cache.",
+                   [({}, cache["size"])])
+        if self.single_flight is not None:
+            yield ("tonesoul_coalesced_requests_total", "counter", "Requests that shared an in-flight execution.",
+                   [({}, self.single_flight.get_stats()["coalesced"])])
+        
+        evolution = self.evolution_pipeline.get_stats()
+        yield ("tonesoul_evolution_queue_depth", "gauge", "Traces waiting for background evolution processing.",
+               [({}, evolution["queue_size"])])
+        
+        decay = self.knowledge_evolution.decay.get_stats()
+        yield ("tonesoul_knowledge_nodes", "gauge", "Nodes held by the knowledge graph.",
+               [({}, len(self.knowledge_evolution.knowledge_graph))])
+        yield ("tonesoul_knowledge_pruned_total", "counter", "Knowledge graph nodes and connections removed by decay.",
+               [({"kind": "node"}, decay["nodes_pruned"]), ({"kind": "connection"}, decay["edges_pruned"])])
+    
+    def _persist_trace(self, final_output: Dict[str, Any]) -> None:
+        """將完成的追溯鏈交給追溯日誌（未啟用時不做任何事）"""
+        if self.trace_log is not None:
+            self.trace_log.append(final_output["source_trace"])
+    
+    def get_trace(self, trace_id: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        從追溯日誌查詢已持久化的追溯鏈
+        
+        Args:
+            trace_id: 追溯 ID
+            
+        Returns:
+            序列化的追溯步驟，找不到時返回 None
+        """
+        source_trace = self.trace_reader.get(trace_id)
+        if source_trace is None:
+            return None
+        return self._serialize_trace_steps(source_trace.steps)
+    
+    def _build_response(self, final_output: Dict[str, Any], total_latency: float) -> Dict[str, Any]:
+        """由模組輸出構建響應"""
+        return {
+            "success": True,
+            "trace_id": final_output["source_trace"].id,
+            "original_sentence": final_output.get("original_sentence", ""),
+            "intent_type": final_output.get("intent_type", "unknown"),
+            "tone_function": final_output.get("tone_function", ToneFunction.UNKNOWN).value,
+            "next_strategy": final_output.get("next_strategy", {}),
+            "module_response": final_output.get("module_response", "處理完成"),
+            "processing_status": final_output.get("processing_status", "completed"),
+            "vow_object": self._serialize_vow_object(final_output.get("vow_object")),
+            "source_trace": self._serialize_trace_steps(final_output["source_trace"].steps),
+            "total_latency_ms": int(total_latency)
+        }
+    
+    def _build_error_response(self, sentence: str, trace_id: Optional[str], error: Exception,
+                              error_latency: int) -> Dict[str, Any]:
+        """構建處理失敗時的響應"""
+        processing_status = "rejected" if isinstance(error, AdmissionRejected) else "error"
+        REQUEST_ERRORS.inc(processing_status)
+        return {
+            "success": False,
+            "trace_id": trace_id or "error",
+            "original_sentence": sentence,
+            "intent_type": "error",
+            "tone_function": "error",
+            "next_strategy": {},
+            "module_response": f"處理失敗: {str(error)}",
+            "processing_status": processing_status,
+            "vow_object": None,
+            "source_trace": [],
+            "total_latency_ms": error_latency
+        }
     
     def _serialize_vow_object(self, vow_object: Optional[VowObject]) -> Optional[Dict[str, Any]]:
         """序列化 VowObject"""
@@ -288,11 +871,15 @@ async def process_sentence(request: ProcessRequest):
         完整的處理結果，包含追溯鏈
     """
     try:
-        result = tonesoul_service.process_sentence(
+        result = await tonesoul_service.process_sentence_async(
             sentence=request.sentence,
-            trace_id=request.trace_id
+            trace_id=request.trace_id,
+            sync_evolution=request.sync_evolution
         )
         
+        if result["processing_status"] == "rejected":
+            # 過載時被准入排程卸載
+            raise HTTPException(status_code=503, detail=result["module_response"], headers={"Retry-After": "1"})
         if not result["success"]:
             raise HTTPException(status_code=500, detail=result["module_response"])
         
@@ -304,6 +891,142 @@ async def process_sentence(request: ProcessRequest):
         logger.error(f"API endpoint error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+@app.post("/v1/process/batch", response_model=BatchProcessResponse)
+async def process_batch(request: BatchProcessRequest):
+    """
+    批次處理端點 - 一次處理多個句子並按輸入順序返回逐筆結果
+    
+    Args:
+        request: 包含句子列表的批次請求
+        
+    Returns:
+        逐筆的處理結果與追溯鏈
+    """
+    try:
+        result = await tonesoul_service.process_batch_async(
+            sentences=request.sentences,
+            trace_ids=request.trace_ids
+        )
+        return BatchProcessResponse(**result)
+        
+    except Exception as e:
+        logger.error(f"Batch API endpoint error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+@app.post("/v1/process/stream")
+async def process_stream(request: Request):
+    """
+    串流處理端點 - 請求主體為換行分隔的句子（純文字或 NDJSON），邊上傳邊返回 NDJSON 結果
+    
+    每行可以是純文字句子、JSON 字串或 {"sentence": ..., "trace_id": ...} 物件；
+    每筆結果帶有輸入行號 line，無法解析的行返回 success 為 false 的錯誤結果。
+    """
+    return DuplexStreamingResponse(
+        tonesoul_service.process_stream(request.stream()),
+        media_type="application/x-ndjson"
+    )
+
+@app.websocket("/v1/session")
+async def session_endpoint(websocket: WebSocket, stream_trace: bool = False):
+    """
+    WebSocket 會話端點 - 一條連線即一個會話，逐幀接收句子並推送結果
+    
+    每個文字幀可以是純文字句子或 SessionTurnRequest 格式的 JSON 物件。
+    stream_trace 為 True 時，每個處理階段完成後先推送 trace_step 訊息，最後推送 result 訊息。
+    """
+    await websocket.accept()
+    session = ConversationSession(stream_trace=stream_trace)
+    await websocket.send_json({"type": "session", "session_id": session.session_id})
+    
+    async def send_step(trace_id: str, step: Dict[str, Any]) -> None:
+        await websocket.send_json({"type": "trace_step", "turn": session.turns, "trace_id": trace_id, "step": step})
+    
+    try:
+        while True:
+            frame = (await websocket.receive_text()).strip()
+            try:
+                if frame.startswith("{"):
+                    turn = SessionTurnRequest(**json.loads(frame))
+                else:
+                    turn = SessionTurnRequest(sentence=frame)
+            except (ValueError, TypeError) as e:
+                await websocket.send_json({"type": "error", "error": str(e)})
+                continue
+            
+            session.update_context(user_satisfaction=turn.user_satisfaction)
+            stream_steps = session.stream_trace if turn.stream_trace is None else turn.stream_trace
+            response = await tonesoul_service.process_session_turn(
+                session, turn.sentence, turn.trace_id, send_step if stream_steps else None
+            )
+            await websocket.send_json({"type": "result", "session_id": session.session_id,
+                                       "turn": session.turns, **response})
+    except WebSocketDisconnect:
+        logger.info(f"Session {session.session_id} closed after {session.turns} turns")
+
+@app.get("/v1/traces/{trace_id}", response_model=TraceLookupResponse)
+async def get_trace(trace_id: str):
+    """從持久化追溯日誌查詢一條追溯鏈（需設定 TONESOUL_TRACE_LOG_DIR）"""
+    if tonesoul_service.trace_log is None:
+        raise HTTPException(status_code=503, detail="Trace log is not enabled")
+    
+    # 查詢會讀取分段檔案，在 stage_executor 上執行以免阻塞事件迴圈
+    loop = asyncio.get_running_loop()
+    steps = await loop.run_in_executor(tonesoul_service.stage_executor, tonesoul_service.get_trace, trace_id)
+    if steps is None:
+        raise HTTPException(status_code=404, detail=f"Trace {trace_id} not found")
+    
+    return TraceLookupResponse(trace_id=trace_id, source_trace=steps)
+
+@app.get("/v1/vows", response_model=VowListResponse)
+async def list_vows(
+    status: Optional[VowStatus] = None,
+    priority: Optional[VowPriority] = None,
+    scope: Optional[str] = None,
+    source_trace_id: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=MAX_VOW_QUERY_LIMIT)
+):
+    """依狀態、優先級、範圍標籤或追溯 ID 查詢已建立的誓言"""
+    vow_store = tonesoul_service.vow_store
+    vow_store.expire_due()
+    total, vows = vow_store.query(
+        status=status, priority=priority, scope=scope, source_trace_id=source_trace_id, limit=limit
+    )
+    return VowListResponse(
+        total=total,
+        vows=[tonesoul_service._serialize_vow_object(vow) for vow in vows]
+    )
+
+@app.get("/v1/vows/expiring", response_model=VowListResponse)
+async def list_expiring_vows(
+    within_hours: float = Query(24.0, gt=0),
+    limit: int = Query(100, ge=1, le=MAX_VOW_QUERY_LIMIT)
+):
+    """查詢在指定小時數內到期的生效中誓言，依期限排序"""
+    vow_store = tonesoul_service.vow_store
+    vow_store.expire_due()
+    vows = vow_store.expiring_within(within_hours)
+    return VowListResponse(
+        total=len(vows),
+        vows=[tonesoul_service._serialize_vow_object(vow) for vow in vows[:limit]]
+    )
+
+@app.get("/v1/vows/stats")
+async def get_vow_stats():
+    """獲取誓言儲存庫統計資訊"""
+    vow_store = tonesoul_service.vow_store
+    vow_store.expire_due()
+    return vow_store.get_stats()
+
+@app.get("/v1/vows/{vow_id}")
+async def get_vow(vow_id: str):
+    """依 ID 查詢單一誓言"""
+    vow_store = tonesoul_service.vow_store
+    vow_store.expire_due()
+    vow = vow_store.get(vow_id)
+    if vow is None:
+        raise HTTPException(status_code=404, detail=f"Vow {vow_id} not found")
+    return tonesoul_service._serialize_vow_object(vow)
+
 @app.get("/v1/modules", response_model=Dict[str, List[str]])
 async def list_modules():
     """列出所有可用的功能模組"""
@@ -313,28 +1036,65 @@ async def list_modules():
         "evolution_modules": ["adaptive_learning", "metacognitive", "knowledge_evolution"]
     }
 
+@app.get("/v1/metrics/latency")
+async def get_latency_metrics():
+    """獲取各管線階段與各 ToneFunction 的延遲分位數（毫秒）與模組逾時統計"""
+    metrics = tonesoul_service.latency_metrics.snapshot()
+    metrics["module_executor"] = tonesoul_service.module_executor.get_stats()
+    return metrics
+
+@app.get("/v1/metrics/scheduler")
+async def get_scheduler_metrics():
+    """獲取准入排程各優先級的佇列深度、等待時間分位數與卸載次數"""
+    return tonesoul_service.scheduler.get_stats()
+
+@app.get("/v1/metrics/cache")
+async def get_cache_metrics():
+    """獲取結果快取的命中、未命中、淘汰與過期統計，以及請求合併的執行與合併次數"""
+    metrics = {"enabled": False}
+    if tonesoul_service.result_cache is not None:
+        metrics = {"enabled": True, **tonesoul_service.result_cache.get_stats()}
+    if tonesoul_service.single_flight is not None:
+        metrics["single_flight"] = tonesoul_service.single_flight.get_stats()
+    return metrics
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_prometheus_metrics():
+    """以 Prometheus 文字格式輸出各階段與各模組的延遲直方圖、請求與錯誤計數"""
+    return PlainTextResponse(
+        METRICS.render(tonesoul_service.collect_metrics()),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+# 以下三個端點持有進化管線的鎖（背景進化與知識遺忘也會長時間持有），
+# 因此宣告為一般函數，由 FastAPI 在執行緒池中執行，等待鎖時不阻塞事件迴圈
 @app.get("/v1/evolution/status")
-async def get_evolution_status():
+def get_evolution_status():
     """獲取系統進化狀態"""
     try:
-        return {
-            "adaptive_learning": tonesoul_service.adaptive_learning.get_learning_insights(),
-            "metacognitive": tonesoul_service.metacognitive.get_cognitive_summary(),
-            "knowledge_evolution": tonesoul_service.knowledge_evolution.get_knowledge_summary(),
-            "system_version": "1.0.0-evolution",
-            "evolution_enabled": True
-        }
+        with tonesoul_service.evolution_pipeline.lock:
+            return {
+                "adaptive_learning": tonesoul_service.adaptive_learning.get_learning_insights(),
+                "metacognitive": tonesoul_service.metacognitive.get_cognitive_summary(),
+                "knowledge_evolution": tonesoul_service.knowledge_evolution.get_knowledge_summary(),
+                "evolution_pipeline": tonesoul_service.evolution_pipeline.get_stats(),
+                "state_sync": tonesoul_service.state_sync.get_stats() if tonesoul_service.state_sync else None,
+                "latency_quantiles": tonesoul_service.latency_metrics.snapshot(),
+                "system_version": "1.0.0-evolution",
+                "evolution_enabled": True
+            }
     except Exception as e:
         logger.error(f"Evolution status error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to get evolution status: {str(e)}")
 
 @app.get("/v1/evolution/insights")
-async def get_evolution_insights():
+def get_evolution_insights():
     """獲取進化洞察"""
     try:
-        learning_insights = tonesoul_service.adaptive_learning.get_learning_insights()
-        cognitive_summary = tonesoul_service.metacognitive.get_cognitive_summary()
-        knowledge_summary = tonesoul_service.knowledge_evolution.get_knowledge_summary()
+        with tonesoul_service.evolution_pipeline.lock:
+            learning_insights = tonesoul_service.adaptive_learning.get_learning_insights()
+            cognitive_summary = tonesoul_service.metacognitive.get_cognitive_summary()
+            knowledge_summary = tonesoul_service.knowledge_evolution.get_knowledge_summary()
         
         return {
             "learning_patterns": learning_insights.get("most_active_patterns", []),
@@ -350,7 +1110,7 @@ async def get_evolution_insights():
         raise HTTPException(status_code=500, detail=f"Failed to get evolution insights: {str(e)}")
 
 @app.post("/v1/evolution/reflect")
-async def trigger_reflection():
+def trigger_reflection():
     """手動觸發系統反思"""
     try:
         # 創建一個虛擬的追溯來觸發反思
@@ -376,9 +1136,10 @@ async def trigger_reflection():
             "purpose": "system_health_check"
         }
         
-        reflection_results = tonesoul_service.metacognitive.monitor_cognitive_process(
-            reflection_trace, reflection_context
-        )
+        with tonesoul_service.evolution_pipeline.lock:
+            reflection_results = tonesoul_service.metacognitive.monitor_cognitive_process(
+                reflection_trace, reflection_context
+            )
         
         return {
             "reflection_triggered": True,
@@ -390,6 +1151,39 @@ async def trigger_reflection():
         logger.error(f"Manual reflection error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to trigger reflection: {str(e)}")
 
+@app.post("/v1/admin/profile")
+async def profile_live_traffic(
+    seconds: float = Query(10.0, gt=0, le=60),
+    interval_ms: float = Query(10.0, ge=1, le=1000),
+    output_format: str = Query("json", alias="format", pattern="^(json|collapsed)$"),
+    x_admin_token: Optional[str] = Header(None)
+):
+    """
+    對線上流量執行取樣分析
+    
+    在指定秒數內定期取樣所有執行緒的堆疊，依管線階段與進化模組彙整，
+    返回可直接產生火焰圖的 collapsed-stack 文字。需設定 TONESOUL_ADMIN_TOKEN 並以 X-Admin-Token 標頭驗證。
+    """
+    if tonesoul_service.admin_token is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not hmac.compare_digest((x_admin_token or "").encode(), tonesoul_service.admin_token.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    
+    try:
+        session = tonesoul_service.profiler.start(interval_ms)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(max(int(e.retry_after), 1))})
+    
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        # 客戶端中斷時也要停止取樣執行緒
+        result = await asyncio.get_running_loop().run_in_executor(None, session.stop)
+    
+    if output_format == "collapsed":
+        return PlainTextResponse(result["collapsed"])
+    return result
+
 # 啟動配置
 if __name__ == "__main__":
     import uvicorn
@@ -1,7 +1,8 @@
+import time
 from datetime import datetime
 from enum import Enum
-from typing import List
-from pydantic import BaseModel, Field
+from typing import List, Optional
+from pydantic import BaseModel, Field, PrivateAttr
 
 
 class TraceStatus(str, Enum):
@@ -29,6 +30,13 @@ class TraceStep(BaseModel):
     trust_level: TrustLevel = Field(..., description="該證據的信任等級")
     latency_ms: int = Field(..., description="該步驟的執行耗時 (毫秒)")
     ts: datetime = Field(..., description="該步驟完成時的 ISO8601 時間戳")
+    
+    _duration_ms: Optional[float] = PrivateAttr(None)
+    
+    @property
+    def duration_ms(self) -> float:
+        """未捨去的執行耗時（毫秒），不屬於序列化的欄位；沒有記錄時等於 latency_ms"""
+        return float(self.latency_ms) if self._duration_ms is None else self._duration_ms
 
 
 class SourceTrace(BaseModel):
@@ -37,4 +45,126 @@ class SourceTrace(BaseModel):
     它是一個不可變的列表, 記錄了從初始請求到最終輸出的完整責任鏈。
     """
     id: str = Field(..., description="本次追溯鏈的唯一 UUID")
-    steps: List[TraceStep] = Field(..., description="組成追溯鏈的步驟列表")
\ No newline at end of file
+    steps: List[TraceStep] = Field(..., description="組成追溯鏈的步驟列表")
+    
+    def record_step(self, tool: str, status: TraceStatus, evidence: str, trust_level: TrustLevel,
+                    latency_ms: float, input_digest: Optional[str] = None) -> TraceStep:
+        """
+        追加一個追溯步驟（與 TraceRecorder.record_step 介面一致）
+        
+        步驟內容來自內部模組，因此略過 Pydantic 驗證直接構建。
+        latency_ms 可帶小數：latency_ms 欄位捨去成整數，未捨去的值保留在 duration_ms。
+        """
+        step = TraceStep.model_construct(
+            tool=tool,
+            status=status,
+            input_digest=input_digest,
+            evidence=evidence,
+            trust_level=trust_level,
+            latency_ms=int(latency_ms),
+            ts=datetime.now()
+        )
+        step._duration_ms = float(latency_ms)
+        self.steps.append(step)
+        return step
+    
+    def fork(self, id: Optional[str] = None) -> "SourceTrace":
+        """返回步驟列表獨立的副本，副本追加的步驟不影響原追溯鏈；可指定副本的 id"""
+        return SourceTrace.model_construct(id=id or self.id, steps=list(self.steps))
+    
+    def to_source_trace(self) -> "SourceTrace":
+        """返回公開的 SourceTrace 物件（本身即是）"""
+        return self
+
+
+# 單調時鐘與牆上時鐘的差值，用於把 monotonic_ns 時間戳換算成 datetime
+_WALL_CLOCK_OFFSET_NS = time.time_ns() - time.monotonic_ns()
+
+
+class CompactTraceStep:
+    """
+    熱路徑使用的精簡追溯步驟
+    
+    欄位與 TraceStep 相同但不經過 Pydantic 驗證，時間戳以 monotonic_ns 記錄，
+    只有在讀取 ts 或轉換成 TraceStep 時才換算成 datetime。
+    latency_ms 可帶小數：latency_ms 捨去成整數，未捨去的值保留在 duration_ms。
+    """
+    __slots__ = ("tool", "status", "input_digest", "evidence", "trust_level", "latency_ms", "duration_ms", "ts_ns")
+    
+    def __init__(self, tool: str, status: TraceStatus, evidence: str, trust_level: TrustLevel,
+                 latency_ms: float, input_digest: Optional[str] = None, ts_ns: Optional[int] = None):
+        self.tool = tool
+        self.status = status
+        self.input_digest = input_digest
+        self.evidence = evidence
+        self.trust_level = trust_level
+        self.latency_ms = int(latency_ms)
+        self.duration_ms = float(latency_ms)
+        self.ts_ns = time.monotonic_ns() if ts_ns is None else ts_ns
+    
+    @property
+    def ts(self) -> datetime:
+        """步驟完成時的本地時間"""
+        return datetime.fromtimestamp(self.wall_time_ns / 1e9)
+    
+    @property
+    def wall_time_ns(self) -> int:
+        """步驟完成時的牆上時鐘 epoch 奈秒"""
+        return self.ts_ns + _WALL_CLOCK_OFFSET_NS
+    
+    def to_trace_step(self) -> TraceStep:
+        """轉換成公開的 TraceStep 模型"""
+        step = TraceStep.model_construct(
+            tool=self.tool,
+            status=self.status,
+            input_digest=self.input_digest,
+            evidence=self.evidence,
+            trust_level=self.trust_level,
+            latency_ms=self.latency_ms,
+            ts=self.ts
+        )
+        step._duration_ms = self.duration_ms
+        return step
+
+
+class TraceRecorder:
+    """
+    熱路徑使用的追溯鏈記錄器
+    
+    與 SourceTrace 具有相同的 id / steps / record_step 介面，
+    在 API 邊界或序列化時才透過 to_source_trace() 轉換成公開的 SourceTrace。
+    """
+    __slots__ = ("id", "steps")
+    
+    def __init__(self, id: str, steps: Optional[List[CompactTraceStep]] = None):
+        self.id = id
+        self.steps: List[CompactTraceStep] = steps if steps is not None else []
+    
+    def record_step(self, tool: str, status: TraceStatus, evidence: str, trust_level: TrustLevel,
+                    latency_ms: float, input_digest: Optional[str] = None) -> CompactTraceStep:
+        """追加一個精簡追溯步驟"""
+        step = CompactTraceStep(tool, status, evidence, trust_level, latency_ms, input_digest)
+        self.steps.append(step)
+        return step
+    
+    def fork(self, id: Optional[str] = None) -> "TraceRecorder":
+        """返回步驟列表獨立的副本，副本追加的步驟不影響原追溯鏈；可指定副本的 id"""
+        return TraceRecorder(id or self.id, list(self.steps))
+    
+    def to_source_trace(self) -> SourceTrace:
+        """轉換成公開的 SourceTrace 模型"""
+        return SourceTrace.model_construct(
+            id=self.id,
+            steps=[
+                step.to_trace_step() if isinstance(step, CompactTraceStep) else step
+                for step in self.steps
+            ]
+        )
+    
+    def model_dump(self, **kwargs):
+        """以 SourceTrace 的格式序列化"""
+        return self.to_source_trace().model_dump(**kwargs)
+    
+    def model_dump_json(self, **kwargs) -> str:
+        """以 SourceTrace 的格式序列化成 JSON"""
+        return self.to_source_trace().model_dump_json(**kwargs)
\ No newline at end of file
@@ -0,0 +1,89 @@
+# file: tests/test_admission_scheduler.py
+import threading
+import time
+import pytest
+from src.core.admission_scheduler import AdmissionScheduler, AdmissionRejected
+
+
+def _wait_for_queue(scheduler, depth):
+    deadline = time.time() + 5
+    while scheduler.get_stats()["queued"] < depth:
+        assert time.time() < deadline
+        time.sleep(0.001)
+
+
+def _queue_worker(scheduler, priority, order, errors):
+    try:
+        with scheduler.admit(priority):
+            order.append(priority)
+    except AdmissionRejected as e:
+        errors.append(e)
+
+
+def test_weighted_fair_dequeue():
+    """測試名額釋放時依權重在各優先級佇列間輪流出列"""
+    scheduler = AdmissionScheduler(max_concurrency=1, max_wait_ms=5000)
+    order, errors, threads = [], [], []
+    
+    scheduler.acquire("high")
+    for priority in ["low"] * 4 + ["high"] * 8:
+        thread = threading.Thread(target=_queue_worker, args=(scheduler, priority, order, errors))
+        thread.start()
+        threads.append(thread)
+        _wait_for_queue(scheduler, len(threads))
+    
+    scheduler.release()
+    for thread in threads:
+        thread.join(5)
+    
+    assert not errors
+    # 權重 4:1，每 5 個名額中高優先級取得 4 個，低優先級不會被餓死
+    assert order[:5].count("high") == 4
+    assert order[:10].count("low") == 2
+    
+    stats = scheduler.get_stats()
+    assert stats["active"] == 0
+    assert stats["priorities"]["high"]["admitted"] == 9
+    assert stats["priorities"]["low"]["wait_ms"]["count"] == 4
+    
+    print("✅ Weighted fair dequeue test passed")
+
+
+def test_low_priority_shed_first():
+    """測試佇列已滿時先卸載低優先級，等待過久的請求被卸載"""
+    scheduler = AdmissionScheduler(max_concurrency=1, max_queue_depth=1, max_wait_ms=5000)
+    order, errors = [], []
+    scheduler.acquire("medium")
+    
+    low = threading.Thread(target=_queue_worker, args=(scheduler, "low", order, errors))
+    low.start()
+    _wait_for_queue(scheduler, 1)
+    
+    high = threading.Thread(target=_queue_worker, args=(scheduler, "high", order, errors))
+    high.start()
+    low.join(5)
+    
+    # 高優先級擠掉排隊中的低優先級
+    assert [error.reason for error in errors] == ["queue_depth"]
+    assert errors[0].priority == "low"
+    
+    # 佇列中已沒有更低的優先級時拒絕新請求
+    with pytest.raises(AdmissionRejected):
+        scheduler.acquire("low")
+    
+    scheduler.release()
+    high.join(5)
+    assert order == ["high"]
+    
+    # 等待超過該優先級的期限時被卸載
+    scheduler = AdmissionScheduler(max_concurrency=1, max_wait_ms=20)
+    scheduler.acquire("high")
+    with pytest.raises(AdmissionRejected) as excinfo:
+        scheduler.acquire("low")
+    assert excinfo.value.reason == "wait_time"
+    stats = scheduler.get_stats()
+    assert stats["priorities"]["low"]["shed_wait_time"] == 1
+    assert stats["priorities"]["high"]["max_wait_ms"] == 80
+    assert stats["queued"] == 0
+    
+    print("✅ Load shedding test passed")
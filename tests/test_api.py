@@ -347,4 +347,412 @@ def test_concurrent_requests():
     successful_requests = sum(1 for r in results if r["success"])
     assert successful_requests == 5
     
-    print(f"✅ Concurrent requests test passed: {successful_requests}/5 successful")
\ No newline at end of file
+    print(f"✅ Concurrent requests test passed: {successful_requests}/5 successful")
+
+
+def test_process_batch_preserves_input_order():
+    """測試批次處理端點按輸入順序返回逐筆結果"""
+    sentences = [
+        "謝謝你的幫助。",
+        "如何學習程式設計？",
+        "我承諾明天會完成這個重要任務。",
+        "謝謝你！",
+        "你好，天氣不錯。"
+    ]
+    
+    response = client.post("/v1/process/batch", json={"sentences": sentences})
+    assert response.status_code == 200
+    
+    data = response.json()
+    assert data["success"] == True
+    assert data["total"] == len(sentences)
+    assert [item["original_sentence"] for item in data["results"]] == sentences
+    
+    # 同一模組的請求被分組處理，但結果仍各自對應
+    assert data["results"][0]["tone_function"] == "appreciation"
+    assert data["results"][1]["tone_function"] == "instructional"
+    assert data["results"][2]["vow_object"] is not None
+    assert data["results"][3]["next_strategy"]["next_module"] == "gratitude_handler_module"
+    
+    # 每筆都有自己完整的追溯鏈
+    trace_ids = {item["trace_id"] for item in data["results"]}
+    assert len(trace_ids) == len(sentences)
+    for item in data["results"]:
+        assert len(item["source_trace"]) == 4
+        assert item["source_trace"][0]["tool"] == "core.ToneBridge.v0.1"
+    
+    print(f"✅ Batch processing test passed: {data['total']} items in {data['total_latency_ms']}ms")
+
+
+def test_process_batch_with_trace_ids():
+    """測試批次處理使用自定義的追溯 ID"""
+    request_data = {
+        "sentences": ["早安", "這個系統有問題。"],
+        "trace_ids": ["batch-trace-1", None]
+    }
+    
+    response = client.post("/v1/process/batch", json=request_data)
+    assert response.status_code == 200
+    
+    results = response.json()["results"]
+    assert results[0]["trace_id"] == "batch-trace-1"
+    assert results[1]["trace_id"] != "batch-trace-1"
+    
+    # trace_ids 長度不一致應該被拒絕
+    response = client.post("/v1/process/batch", json={"sentences": ["早安"], "trace_ids": ["a", "b"]})
+    assert response.status_code == 422
+    
+    # 空批次應該被拒絕
+    response = client.post("/v1/process/batch", json={"sentences": []})
+    assert response.status_code == 422
+    
+    print("✅ Batch trace ID test passed")
+
+
+def test_process_with_sync_evolution():
+    """測試同步進化處理時響應中包含 evolution_insights"""
+    response = client.post("/v1/process", json={"sentence": "謝謝你的幫助。", "sync_evolution": True})
+    assert response.status_code == 200
+    
+    data = response.json()
+    insights = data["evolution_insights"]
+    assert insights is not None
+    assert "adaptive_learning" in insights
+    assert "metacognitive_analysis" in insights
+    assert "knowledge_evolution" in insights
+    
+    # 預設情況下進化處理交給背景管線，響應中不包含洞察
+    response = client.post("/v1/process", json={"sentence": "謝謝你的幫助。"})
+    assert response.json()["evolution_insights"] is None
+    
+    status = client.get("/v1/evolution/status").json()
+    assert status["evolution_pipeline"]["accepted"] >= 1
+    
+    print("✅ Sync evolution test passed")
+
+def test_trace_lookup_endpoint(tmp_path, monkeypatch):
+    """測試啟用追溯日誌後可查詢已處理請求的追溯鏈"""
+    from src.main import tonesoul_service
+    from src.core.trace_log import TraceLog
+    
+    # 未啟用追溯日誌時返回 503
+    assert client.get("/v1/traces/anything").status_code == 503
+    
+    trace_log = TraceLog(str(tmp_path))
+    monkeypatch.setattr(tonesoul_service, "trace_log", trace_log)
+    monkeypatch.setattr(tonesoul_service, "trace_reader", trace_log.reader())
+    
+    response = client.post("/v1/process", json={"sentence": "我承諾明天完成報告", "trace_id": "audit-trace"})
+    assert response.status_code == 200
+    assert trace_log.flush(timeout=5)
+    
+    response = client.get("/v1/traces/audit-trace")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["trace_id"] == "audit-trace"
+    assert [step["tool"] for step in data["source_trace"]] == [
+        step["tool"] for step in client.post("/v1/process", json={"sentence": "我承諾明天完成報告"}).json()["source_trace"]
+    ]
+    
+    assert client.get("/v1/traces/unknown-trace").status_code == 404
+    trace_log.close()
+    
+    print("✅ Trace lookup endpoint test passed")
+
+
+def test_vow_query_endpoints():
+    """測試承諾建立後可透過誓言查詢端點取得"""
+    response = client.post("/v1/process", json={"sentence": "我發誓明天完成報告"})
+    assert response.status_code == 200
+    vow = response.json()["vow_object"]
+    assert vow is not None
+    
+    response = client.get(f"/v1/vows/{vow['id']}")
+    assert response.status_code == 200
+    assert response.json()["commitment"] == vow["commitment"]
+    
+    data = client.get("/v1/vows", params={"status": "active", "priority": "critical"}).json()
+    assert vow["id"] in [item["id"] for item in data["vows"]]
+    assert data["total"] >= 1
+    
+    data = client.get("/v1/vows/expiring", params={"within_hours": 48}).json()
+    assert vow["id"] in [item["id"] for item in data["vows"]]
+    
+    assert client.get("/v1/vows/missing-vow").status_code == 404
+    assert client.get("/v1/vows", params={"priority": "urgent"}).status_code == 422
+    assert client.get("/v1/vows/stats").json()["total_vows"] >= 1
+    
+    print("✅ Vow query endpoints test passed")
+
+
+def test_latency_metrics_endpoint():
+    """測試延遲分位數端點包含各階段與各 ToneFunction 的統計"""
+    response = client.post("/v1/process", json={"sentence": "謝謝你的幫助。"})
+    assert response.status_code == 200
+    tools = [step["tool"] for step in response.json()["source_trace"]]
+    
+    data = client.get("/v1/metrics/latency").json()
+    for tool in tools:
+        assert data["stages"][tool]["count"] >= 1
+        assert {"p50", "p95", "p99"} <= set(data["stages"][tool])
+    assert data["tone_functions"]["appreciation"]["count"] >= 1
+    
+    status = client.get("/v1/evolution/status").json()
+    assert "core.ToneBridge.v0.1" in status["latency_quantiles"]["stages"]
+    assert "decision_confidence_distribution" in status["metacognitive"]
+    
+    print("✅ Latency metrics endpoint test passed")
+
+
+def test_prometheus_metrics_endpoint():
+    """測試 /metrics 以 Prometheus 文字格式輸出各階段直方圖與請求計數，且追溯鏈記錄實測延遲"""
+    response = client.post("/v1/process", json={"sentence": "如何設定每日提醒？"})
+    assert response.status_code == 200
+    data = response.json()
+    bridge_step = data["source_trace"][0]
+    assert bridge_step["tool"] == "core.ToneBridge.v0.1"
+    assert bridge_step["latency_ms"] < 15
+    
+    metrics = client.get("/metrics")
+    assert metrics.status_code == 200
+    assert metrics.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = metrics.text
+    assert '# TYPE tonesoul_stage_duration_seconds histogram' in text
+    for step in data["source_trace"]:
+        assert f'tonesoul_stage_duration_seconds_count{{stage="{step["tool"]}"}}' in text
+    next_module = data["next_strategy"]["next_module"]
+    assert f'tonesoul_module_duration_seconds_count{{module="{next_module}"}}' in text
+    assert f'tonesoul_requests_total{{tone_function="{data["tone_function"]}",next_module="{next_module}"}}' in text
+    assert 'tonesoul_admission_queue_depth{priority="high"} 0' in text
+    
+    print("✅ Prometheus metrics endpoint test passed")
+
+
+def test_admin_profile_endpoint(monkeypatch):
+    """測試取樣分析端點需以管理權杖啟用，並限制同時進行的分析工作"""
+    from src.main import tonesoul_service
+    from src.core.sampling_profiler import SamplingProfiler
+    
+    # 未設定 TONESOUL_ADMIN_TOKEN 時端點不存在
+    assert client.post("/v1/admin/profile?seconds=0.1").status_code == 404
+    
+    monkeypatch.setattr(tonesoul_service, "admin_token", "secret")
+    monkeypatch.setattr(tonesoul_service, "profiler", SamplingProfiler(cooldown_s=60))
+    assert client.post("/v1/admin/profile?seconds=0.1").status_code == 403
+    
+    headers = {"X-Admin-Token": "secret"}
+    response = client.post("/v1/admin/profile?seconds=0.2&interval_ms=5", headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["ticks"] > 0
+    assert {"samples", "stages", "collapsed"} <= set(data)
+    
+    # 冷卻時間內的第二次分析被拒絕
+    response = client.post("/v1/admin/profile?seconds=0.1&format=collapsed", headers=headers)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    
+    print("✅ Admin profile endpoint test passed")
+
+
+def test_scheduler_metrics_endpoint():
+    """測試准入排程統計包含各優先級的佇列深度與等待時間"""
+    response = client.post("/v1/process", json={"sentence": "我承諾明天完成報告"})
+    assert response.status_code == 200
+    assert response.json()["next_strategy"]["priority"] == "high"
+    
+    data = client.get("/v1/metrics/scheduler").json()
+    assert set(data["priorities"]) == {"high", "medium", "low"}
+    assert data["priorities"]["high"]["admitted"] >= 1
+    assert data["priorities"]["high"]["queue_depth"] == 0
+    assert "p99" in data["priorities"]["high"]["wait_ms"]
+    
+    print("✅ Scheduler metrics endpoint test passed")
+
+
+def test_result_cache_replays_repeated_sentences():
+    """測試重複句子命中結果快取，且每次都有新的追溯鏈"""
+    sentence = "這是快取測試用的一句陳述。"
+    first = client.post("/v1/process", json={"sentence": sentence}).json()
+    before = client.get("/v1/metrics/cache").json()
+    second = client.post("/v1/process", json={"sentence": f"  {sentence}"}).json()
+    after = client.get("/v1/metrics/cache").json()
+    
+    assert before["enabled"] is True
+    assert after["hits"] == before["hits"] + 1
+    assert second["original_sentence"] == f"  {sentence}"
+    assert second["trace_id"] != first["trace_id"]
+    assert second["module_response"] == first["module_response"]
+    assert second["tone_function"] == first["tone_function"]
+    assert [step["tool"] for step in second["source_trace"]] == ["core.ResultCache.v0.1"]
+    
+    # 誓言路由有副作用，每次都必須實際執行
+    vow_sentence = "我承諾會準時回覆快取測試"
+    client.post("/v1/process", json={"sentence": vow_sentence})
+    vow_response = client.post("/v1/process", json={"sentence": vow_sentence}).json()
+    assert vow_response["vow_object"] is not None
+    
+    print("✅ Result cache API test passed")
+
+
+def test_process_stream_endpoint():
+    """測試串流端點逐行返回 NDJSON 結果"""
+    
+    def body():
+        yield "謝謝你的幫助。\n".encode("utf-8")
+        yield json.dumps({"sentence": "什麼是語魂系統？", "trace_id": "stream-trace"}).encode("utf-8") + b"\n"
+        yield b"\n{oops\n"
+    
+    response = client.post("/v1/process/stream", content=body(),
+                           headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [record["line"] for record in records] == [1, 2, 4]
+    assert records[0]["success"] is True
+    assert records[0]["tone_function"] == "appreciation"
+    assert records[1]["trace_id"] == "stream-trace"
+    assert records[2]["success"] is False
+    
+    print("✅ Stream endpoint test passed")
+
+
+def test_websocket_session():
+    """測試 WebSocket 會話跨回合處理句子並逐階段推送追溯步驟"""
+    with client.websocket_connect("/v1/session") as websocket:
+        hello = websocket.receive_json()
+        assert hello["type"] == "session"
+        
+        websocket.send_text("謝謝你的幫助，會話測試。")
+        first = websocket.receive_json()
+        assert first["type"] == "result" and first["turn"] == 1
+        assert first["session_id"] == hello["session_id"]
+        assert first["tone_function"] == "appreciation"
+        
+        websocket.send_text('{"sentence": "什麼是會話？", "stream_trace": true, "trace_id": "ws-trace"}')
+        steps = []
+        message = websocket.receive_json()
+        while message["type"] == "trace_step":
+            assert message["trace_id"] == "ws-trace" and message["turn"] == 2
+            steps.append(message["step"]["tool"])
+            message = websocket.receive_json()
+        assert message["type"] == "result" and message["turn"] == 2
+        assert steps == [step["tool"] for step in message["source_trace"]]
+        assert steps[0] == "core.ToneBridge.v0.1" and len(steps) >= 4
+        
+        websocket.send_text('{"sentence": ""}')
+        assert websocket.receive_json()["type"] == "error"
+    
+    print("✅ WebSocket session test passed")
+
+
+def test_concurrent_duplicate_sentences_are_coalesced(monkeypatch):
+    """測試同時到達的相同句子共用一次處理流程，但各自擁有追溯 ID 與追溯鏈"""
+    import asyncio
+    import time
+    import httpx
+    from src.main import tonesoul_service
+    
+    module = tonesoul_service.modules["gratitude_handler_module"]
+    original = module.process_batch
+    calls = []
+    
+    def slow_process_batch(router_outputs):
+        calls.append(len(router_outputs))
+        time.sleep(0.2)
+        return original(router_outputs)
+    
+    monkeypatch.setattr(module, "process_batch", slow_process_batch)
+    tonesoul_service.result_cache.clear()
+    
+    async def fire():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as async_client:
+            return await asyncio.gather(*[
+                async_client.post("/v1/process", json={"sentence": "謝謝你，合併測試。"}) for _ in range(4)
+            ])
+    
+    responses = [response.json() for response in asyncio.run(fire())]
+    
+    assert calls == [1]
+    assert len({data["trace_id"] for data in responses}) == 4
+    assert len({data["module_response"] for data in responses}) == 1
+    coalesced = [data for data in responses if data["source_trace"][-1]["tool"] == "core.SingleFlight.v0.1"]
+    assert len(coalesced) == 3
+    
+    metrics = client.get("/v1/metrics/cache").json()
+    assert metrics["single_flight"]["coalesced"] >= 3
+    
+    print("✅ Request coalescing API test passed")
+
+
+def test_concurrent_requests_overlap_on_event_loop(monkeypatch):
+    """測試同一個事件迴圈上的並行請求不會互相阻塞"""
+    import asyncio
+    import time
+    import httpx
+    from src.main import tonesoul_service
+    
+    module = tonesoul_service.modules["gratitude_handler_module"]
+    original = module.process_batch
+    
+    def slow_process_batch(router_outputs):
+        time.sleep(0.2)  # 模擬等待 I/O 的功能模組
+        return original(router_outputs)
+    
+    monkeypatch.setattr(module, "process_batch", slow_process_batch)
+    tonesoul_service.result_cache.clear()
+    
+    async def fire():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as async_client:
+            start = time.perf_counter()
+            responses = await asyncio.gather(*[
+                async_client.post("/v1/process", json={"sentence": f"謝謝你的幫助，第{i}次。"}) for i in range(4)
+            ])
+            return time.perf_counter() - start, responses
+    
+    elapsed, responses = asyncio.run(fire())
+    assert all(response.status_code == 200 for response in responses)
+    # 四個請求依序執行至少需要 0.8 秒
+    assert elapsed < 0.6
+    
+    print("✅ Event loop concurrency test passed")
+
+
+def test_evolution_status_waits_for_lock_off_event_loop():
+    """測試背景工作持有進化管線的鎖時，進化狀態請求在執行緒池中等待，同一事件迴圈上的其他請求不受阻塞"""
+    import asyncio
+    import threading
+    import time
+    import httpx
+    from src.main import tonesoul_service
+    
+    locked = threading.Event()
+    
+    def hold_lock():
+        # 模擬背景進化批次或知識遺忘長時間持有鎖
+        with tonesoul_service.evolution_pipeline.lock:
+            locked.set()
+            time.sleep(1.0)
+    
+    async def fire():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as async_client:
+            start = time.perf_counter()
+            status_request = asyncio.ensure_future(async_client.get("/v1/evolution/status"))
+            await asyncio.sleep(0.1)
+            health = await async_client.get("/health")
+            return time.perf_counter() - start, health, await status_request
+    
+    holder = threading.Thread(target=hold_lock)
+    holder.start()
+    assert locked.wait(5)
+    elapsed, health, status = asyncio.run(fire())
+    holder.join()
+    
+    assert health.status_code == 200 and status.status_code == 200
+    assert elapsed < 0.5
+    
+    print("✅ Evolution status lock test passed")
@@ -0,0 +1,114 @@
+# file: tests/test_cli.py
+import json
+from src.cli import CHECKPOINT_FILE, main
+
+
+def _write_inputs(tmp_path):
+    corpus = tmp_path / "corpus.jsonl"
+    sentences = ["謝謝你的幫助。", "什麼是語魂系統？", "我承諾明天完成報告", "這個服務太糟糕了"] * 5
+    lines = [json.dumps({"sentence": s, "id": i}, ensure_ascii=False) for i, s in enumerate(sentences)]
+    lines.insert(7, "{not json")
+    corpus.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    notes = tmp_path / "notes.txt"
+    notes.write_text("你好\n\n今天很開心\n", encoding="utf-8")
+    return [str(corpus), str(notes)]
+
+
+def _read_records(output_dir):
+    records = []
+    for shard in sorted(output_dir.glob("part-*.jsonl")):
+        records.extend(json.loads(line) for line in shard.read_text(encoding="utf-8").splitlines())
+    return records
+
+
+def _stable(records):
+    return [{k: v for k, v in record.items() if k not in ("trace_id", "vow_object")} for record in records]
+
+
+def test_batch_cli_writes_ordered_shards(tmp_path, capsys):
+    """測試批次命令列依輸入順序輸出分片，錯誤行不中斷處理"""
+    inputs = _write_inputs(tmp_path)
+    output_dir = tmp_path / "out"
+    
+    code = main(["batch", *inputs, "-o", str(output_dir), "--workers", "2",
+                 "--chunk-size", "4", "--shard-lines", "10", "--id-field", "id"])
+    assert code == 0
+    summary = json.loads(capsys.readouterr().out)
+    assert summary["records"] == 23 and summary["errors"] == 1
+    assert summary["modules"]["vow_checker_module"] == 5
+    assert len(summary["shards"]) == 3
+    
+    records = _read_records(output_dir)
+    assert [(r["source"].rsplit("/", 1)[-1], r["line"]) for r in records][:9] == [
+        ("corpus.jsonl", i) for i in range(1, 10)
+    ]
+    assert records[7]["success"] is False
+    assert records[0]["tone_function"] == "appreciation" and records[0]["id"] == "0"
+    assert records[2]["vow_object"]["status"]
+    assert records[-1]["sentence"] == "今天很開心" and records[-1]["line"] == 3
+    
+    # 已有檢查點時必須明確續跑
+    assert main(["batch", *inputs, "-o", str(output_dir), "--workers", "2",
+                 "--chunk-size", "4", "--shard-lines", "10", "--id-field", "id"]) == 1
+    
+    print("✅ Batch CLI ordered output test passed")
+
+
+def test_batch_cli_resumes_from_checkpoint(tmp_path, capsys):
+    """測試中斷後從檢查點續跑：捨棄寫了一半的內容，只處理未完成的分塊"""
+    inputs = _write_inputs(tmp_path)
+    full_dir = tmp_path / "full"
+    args = ["--workers", "2", "--chunk-size", "3", "--id-field", "id"]
+    assert main(["batch", *inputs, "-o", str(full_dir), *args]) == 0
+    expected = _stable(_read_records(full_dir))
+    
+    # 模擬在第三個分塊寫到一半時中斷
+    checkpoint_path = full_dir / CHECKPOINT_FILE
+    checkpoint = json.loads(checkpoint_path.read_text(encoding="utf-8"))
+    shard = full_dir / "part-00000.jsonl"
+    kept = shard.read_bytes().split(b"\n")[:6]
+    offset = len(b"\n".join(kept) + b"\n")
+    shard.write_bytes(b"\n".join(kept) + b"\n" + b'{"partial": ')
+    checkpoint.update(watermark=2, done=[], shard_records=6, shard_offset=offset, counts={})
+    checkpoint_path.write_text(json.dumps(checkpoint), encoding="utf-8")
+    capsys.readouterr()
+    
+    assert main(["batch", *inputs, "-o", str(full_dir), *args, "--resume"]) == 0
+    summary = json.loads(capsys.readouterr().out)
+    assert summary["records"] == 23 - 6
+    assert _stable(_read_records(full_dir)) == expected
+    
+    # 不同的參數不能沿用檢查點
+    assert main(["batch", *inputs, "-o", str(full_dir), "--chunk-size", "5", "--resume"]) == 1
+    
+    unordered_dir = tmp_path / "unordered"
+    assert main(["batch", *inputs, "-o", str(unordered_dir), *args, "--unordered"]) == 0
+    unordered = _stable(_read_records(unordered_dir))
+    key = lambda record: (record["source"], record["line"])
+    assert sorted(unordered, key=key) == sorted(expected, key=key)
+    
+    print("✅ Batch CLI resume test passed")
+
+
+def test_index_cli_feeds_batch_answers(tmp_path, capsys):
+    """測試 index 子命令建立知識庫索引，並讓 batch 的問答模組從索引回答"""
+    corpus = tmp_path / "faq.jsonl"
+    corpus.write_text("\n".join(json.dumps(entry, ensure_ascii=False) for entry in [
+        {"question": "什麼是語魂系統？", "answer": "語魂系統是語氣感知與誓言追蹤的對話框架。"},
+        {"question": "如何重設密碼？", "answer": "請在登入頁面點選忘記密碼。"},
+    ]) + "\n", encoding="utf-8")
+    index_dir = tmp_path / "index"
+    
+    assert main(["index", str(corpus), "-o", str(index_dir)]) == 0
+    assert json.loads(capsys.readouterr().out)["documents"] == 2
+    
+    inputs = tmp_path / "questions.txt"
+    inputs.write_text("什麼是語魂系統？\n", encoding="utf-8")
+    output_dir = tmp_path / "out"
+    assert main(["batch", str(inputs), "-o", str(output_dir), "--workers", "1",
+                 "--knowledge-index", str(index_dir)]) == 0
+    assert _read_records(output_dir)[0]["module_response"] == "語魂系統是語氣感知與誓言追蹤的對話框架。"
+    
+    assert main(["index", str(tmp_path / "missing.jsonl"), "-o", str(tmp_path / "bad")]) == 1
+    
+    print("✅ Index CLI test passed")
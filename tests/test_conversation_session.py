@@ -0,0 +1,30 @@
+# file: tests/test_conversation_session.py
+from src.core.conversation_session import ConversationSession, MAX_SESSION_HISTORY
+
+
+def test_session_context_carries_across_turns():
+    """測試會話上下文跨回合沿用，且歷史記錄有上限"""
+    session = ConversationSession(stream_trace=True)
+    session.update_context(user_satisfaction=0.9)
+    
+    context = session.begin_turn()
+    assert context["session_id"] == session.session_id
+    assert context["turn"] == 1 and context["previous_tone_function"] is None
+    session.record_turn({"success": True, "trace_id": "t-1", "tone_function": "appreciation",
+                         "next_strategy": {"next_module": "gratitude_handler_module"}})
+    
+    session.update_context(user_satisfaction=None)
+    context = session.begin_turn()
+    assert context["user_satisfaction"] == 0.9
+    assert context["previous_tone_function"] == "appreciation"
+    
+    for i in range(MAX_SESSION_HISTORY + 5):
+        session.begin_turn()
+        session.record_turn({"success": True, "trace_id": f"t-{i}"})
+    
+    summary = session.get_summary()
+    assert summary["turns"] == MAX_SESSION_HISTORY + 7
+    assert len(summary["history"]) == MAX_SESSION_HISTORY
+    assert summary["history"][-1]["turn"] == summary["turns"]
+    
+    print("✅ Conversation session test passed")
@@ -0,0 +1,161 @@
+# file: tests/test_evolution_pipeline.py
+import threading
+import uuid
+from datetime import datetime
+from src.core.evolution_pipeline import EvolutionPipeline, OverflowPolicy
+from src.core.adaptive_learning_module import AdaptiveLearningModule
+from src.core.metacognitive_module import MetacognitiveModule
+from src.schemas.source_trace import SourceTrace, TraceStep, TraceStatus, TrustLevel
+
+
+class RecordingModule:
+    """記錄調用的假進化模組，可選擇阻塞以模擬緩慢的背景處理"""
+    
+    def __init__(self, gate: threading.Event = None):
+        self.gate = gate
+        self.seen = []
+    
+    def _record(self, source_trace, context):
+        if self.gate is not None:
+            self.gate.wait(timeout=5)
+        self.seen.append(source_trace.id)
+        return {"trace_id": source_trace.id}
+    
+    process_interaction = _record
+    monitor_cognitive_process = _record
+    process_knowledge_evolution = _record
+
+
+def make_trace(trace_id: str = None) -> SourceTrace:
+    return SourceTrace(
+        id=trace_id or str(uuid.uuid4()),
+        steps=[
+            TraceStep(
+                tool="core.ToneBridge.v0.1",
+                status=TraceStatus.SUCCESS,
+                evidence="test",
+                trust_level=TrustLevel.B,
+                latency_ms=1,
+                ts=datetime.now()
+            )
+        ]
+    )
+
+
+def make_pipeline(gate=None, **kwargs) -> EvolutionPipeline:
+    return EvolutionPipeline(RecordingModule(gate), RecordingModule(), RecordingModule(), **kwargs)
+
+
+def test_background_processing_and_flush():
+    """測試背景執行緒分批處理所有提交的工作"""
+    pipeline = make_pipeline(batch_size=4)
+    trace_ids = [f"trace-{i}" for i in range(10)]
+    
+    for trace_id in trace_ids:
+        assert pipeline.submit(make_trace(trace_id), {"response_time": 1})
+    
+    assert pipeline.flush(timeout=5)
+    assert pipeline.adaptive_learning.seen == trace_ids
+    assert pipeline.knowledge_evolution.seen == trace_ids
+    
+    stats = pipeline.get_stats()
+    assert stats["processed"] == 10
+    assert stats["batches"] >= 3  # batch_size=4 時至少需要三批
+    assert stats["queue_size"] == 0
+    
+    pipeline.shutdown()
+    assert not pipeline.get_stats()["running"]
+    
+    print(f"✅ Background processing test passed: {stats['batches']} batches")
+
+
+def test_drop_policy_when_queue_full():
+    """測試 DROP 策略在佇列滿時丟棄新工作"""
+    gate = threading.Event()
+    pipeline = make_pipeline(gate=gate, max_queue_size=2, batch_size=1,
+                             overflow_policy=OverflowPolicy.DROP)
+    
+    # 第一筆被背景執行緒取出後卡在 gate，之後兩筆填滿佇列
+    assert pipeline.submit(make_trace(), {})
+    for _ in range(50):
+        if pipeline.get_stats()["in_flight"] == 1:
+            break
+        threading.Event().wait(0.01)
+    assert pipeline.submit(make_trace(), {})
+    assert pipeline.submit(make_trace(), {})
+    assert not pipeline.submit(make_trace(), {})
+    
+    stats = pipeline.get_stats()
+    assert stats["dropped"] == 1
+    assert stats["queue_size"] == 2
+    
+    gate.set()
+    assert pipeline.flush(timeout=5)
+    assert pipeline.get_stats()["processed"] == 3
+    pipeline.shutdown()
+    
+    print("✅ Drop policy test passed")
+
+
+def test_sample_policy_evicts_oldest():
+    """測試 SAMPLE 策略以新工作取代最舊的工作"""
+    gate = threading.Event()
+    pipeline = make_pipeline(gate=gate, max_queue_size=1, batch_size=1,
+                             overflow_policy=OverflowPolicy.SAMPLE, sample_rate=1.0)
+    
+    assert pipeline.submit(make_trace("first"), {})
+    for _ in range(50):
+        if pipeline.get_stats()["in_flight"] == 1:
+            break
+        threading.Event().wait(0.01)
+    assert pipeline.submit(make_trace("old"), {})
+    assert pipeline.submit(make_trace("new"), {})
+    
+    gate.set()
+    assert pipeline.flush(timeout=5)
+    assert pipeline.adaptive_learning.seen == ["first", "new"]
+    assert pipeline.get_stats()["evicted"] == 1
+    pipeline.shutdown()
+    
+    print("✅ Sample policy test passed")
+
+
+def test_block_policy_waits_for_room():
+    """測試 BLOCK 策略阻塞提交者直到佇列有空位"""
+    gate = threading.Event()
+    pipeline = make_pipeline(gate=gate, max_queue_size=1, batch_size=1,
+                             overflow_policy=OverflowPolicy.BLOCK, block_timeout=0.05)
+    
+    assert pipeline.submit(make_trace(), {})
+    for _ in range(50):
+        if pipeline.get_stats()["in_flight"] == 1:
+            break
+        threading.Event().wait(0.01)
+    assert pipeline.submit(make_trace(), {})
+    
+    # 佇列已滿且背景執行緒被卡住，短暫阻塞後逾時
+    assert not pipeline.submit(make_trace(), {})
+    
+    # 放行之後阻塞中的提交可以完成
+    pipeline.block_timeout = 5
+    gate.set()
+    assert pipeline.submit(make_trace(), {})
+    assert pipeline.flush(timeout=5)
+    assert pipeline.get_stats()["processed"] == 3
+    pipeline.shutdown()
+    
+    print("✅ Block policy test passed")
+
+
+def test_process_now_returns_insights():
+    """測試同步進化處理使用真實模組並返回洞察"""
+    pipeline = EvolutionPipeline(AdaptiveLearningModule(), MetacognitiveModule(), RecordingModule())
+    
+    insights = pipeline.process_now(make_trace(), {"user_satisfaction": 0.9, "response_time": 5})
+    
+    assert "learning_opportunities_detected" in insights["adaptive_learning"]
+    assert "cognitive_state" in insights["metacognitive_analysis"]
+    assert "knowledge_evolution" in insights
+    assert pipeline.adaptive_learning.system_state.total_interactions == 1
+    
+    print("✅ Synchronous evolution test passed")
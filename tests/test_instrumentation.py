@@ -0,0 +1,52 @@
+# file: tests/test_instrumentation.py
+import time
+from src.core.instrumentation import MetricsRegistry, STAGE_DURATION, observe_stage
+
+
+def test_histogram_and_counter_render_prometheus_text():
+    """測試直方圖的累積桶、總和與計數，以及計數器標籤的跳脫"""
+    registry = MetricsRegistry()
+    histogram = registry.histogram("demo_duration_seconds", "Demo durations.", ("stage",), buckets=(0.001, 0.01))
+    counter = registry.counter("demo_total", "Demo counter.", ("name",))
+    
+    histogram.observe_ns(500_000, "a")              # 0.5ms
+    histogram.observe_ns(5_000_000, "a", count=2)   # 5ms ×2
+    histogram.observe_ns(50_000_000, "a")           # 50ms，落在 +Inf
+    counter.inc('say "hi"\n')
+    counter.inc('say "hi"\n', amount=2)
+    
+    text = registry.render([("demo_active", "gauge", "Demo gauge.", [({}, 3)])])
+    lines = text.splitlines()
+    assert "# TYPE demo_duration_seconds histogram" in lines
+    assert 'demo_duration_seconds_bucket{stage="a",le="0.001"} 1' in lines
+    assert 'demo_duration_seconds_bucket{stage="a",le="0.01"} 3' in lines
+    assert 'demo_duration_seconds_bucket{stage="a",le="+Inf"} 4' in lines
+    assert 'demo_duration_seconds_count{stage="a"} 4' in lines
+    assert 'demo_duration_seconds_sum{stage="a"} 0.0605' in lines
+    assert 'demo_total{name="say \\"hi\\"\\n"} 3' in lines
+    assert "# TYPE demo_active gauge" in lines and "demo_active 3" in lines
+    assert text.endswith("\n")
+    
+    try:
+        registry.counter("demo_total", "Duplicate.")
+        assert False, "duplicate metric names should be rejected"
+    except ValueError:
+        pass
+    
+    print("✅ Prometheus text rendering test passed")
+
+
+def test_observe_stage_splits_batch_time_per_item():
+    """測試 observe_stage 以奈秒計時、整批平均分攤，並返回每筆毫秒數"""
+    before = STAGE_DURATION.snapshot("test.Stage") or {"count": 0, "sum": 0.0}
+    
+    start_ns = time.perf_counter_ns()
+    time.sleep(0.02)
+    latency_ms = observe_stage("test.Stage", start_ns, items=4)
+    
+    after = STAGE_DURATION.snapshot("test.Stage")
+    assert after["count"] - before["count"] == 4
+    assert after["sum"] - before["sum"] >= 0.02
+    assert 5 <= latency_ms < 20
+    
+    print("✅ Stage timing test passed")
@@ -0,0 +1,71 @@
+# file: tests/test_keyword_automaton.py
+from src.core.keyword_automaton import KeywordAutomaton, get_keyword_automaton, shared_keyword_tables
+from src.core.tone_bridge import ToneBridge
+from src.core.vow_checker import VowChecker
+
+
+def brute_force_scan(tables, text):
+    """逐詞比對的參考實作"""
+    hits = {}
+    for category, keywords in tables.items():
+        found = sorted(
+            (start, keyword)
+            for keyword in keywords
+            for start in range(len(text))
+            if text.startswith(keyword, start)
+        )
+        if found:
+            hits[category] = found
+    return hits
+
+
+def test_overlapping_and_shared_keywords():
+    """測試重疊命中與同一關鍵字屬於多個分類"""
+    automaton = KeywordAutomaton({
+        "a": ["he", "she", "hers"],
+        "b": ["he"],
+    })
+    hits = automaton.scan("ushers")
+    
+    assert sorted(hits["a"]) == [(1, "she"), (2, "he"), (2, "hers")]
+    assert hits["b"] == [(2, "he")]
+    assert automaton.pattern_count == 3
+    
+    print("✅ Overlapping keyword test passed")
+
+
+def test_matches_brute_force_on_keyword_tables():
+    """測試共用自動機的結果與逐詞比對一致"""
+    automaton = get_keyword_automaton()
+    sentences = [
+        "我保證明天完成這個任務並確保品質",
+        "請幫我看看這個，謝謝！",
+        "你覺得人工智慧怎麼樣？",
+        "我認為事實上天氣很糟糕，真討厭",
+        "AI 如何學習程式設計？",
+        "沒有任何關鍵字",
+        "",
+    ]
+    
+    for sentence in sentences:
+        hits = {category: sorted(found) for category, found in automaton.scan(sentence).items()}
+        assert hits == brute_force_scan(shared_keyword_tables(), sentence), sentence
+    
+    print("✅ Brute force comparison test passed")
+
+
+def test_bridge_attaches_hits_and_vow_scope_uses_positions():
+    """測試 ToneBridge 附帶命中，VowChecker 只計入承諾內容中的命中"""
+    bridge_output = ToneBridge().analyze("今天很忙，但我保證會交付")
+    
+    assert "vow.commitment" in bridge_output["keyword_hits"]
+    
+    vow_data = VowChecker()._parse_commitment(
+        bridge_output["original_sentence"], bridge_output["keyword_hits"]
+    )
+    
+    # 「今天」出現在承諾關鍵字之前，不屬於承諾範圍
+    assert vow_data["content"] == "會交付"
+    assert vow_data["scope"] == ["general", "task_completion"]
+    
+    print("✅ Bridge keyword hits test passed")
@@ -0,0 +1,109 @@
+# file: tests/test_knowledge_corpus.py
+import math
+from collections import Counter
+
+import pytest
+
+from src.core.knowledge_base_module import KnowledgeBaseModule
+from src.core.knowledge_corpus import KnowledgeIndex, build_index, tokenize
+from src.core.qa_module import QAModule
+from src.schemas.source_trace import SourceTrace
+
+ENTRIES = [
+    ("什麼是人工智慧？", "人工智慧是模擬人類智能的技術，包括機器學習與深度學習。"),
+    ("如何重設密碼？", "請在登入頁面點選「忘記密碼」，依照郵件指示設定新密碼。"),
+    ("如何申請退款？", "請到訂單頁面選擇申請退款，款項會在七個工作天內退回。"),
+    ("客服中心在哪裡？", "客服中心位於總公司一樓，營業時間為上午九點到下午六點。"),
+    ("What is Python?", "Python 是一種廣泛使用的程式語言。"),
+]
+
+
+def _reference_scores(query, k1=1.2, b=0.75):
+    docs = [Counter(tokenize(question + "\n" + answer)) for question, answer in ENTRIES]
+    lengths = [sum(doc.values()) for doc in docs]
+    average = sum(lengths) / len(lengths)
+    scores = {}
+    for term in set(tokenize(query)):
+        df = sum(1 for doc in docs if term in doc)
+        if df == 0:
+            continue
+        idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+        for doc_id, doc in enumerate(docs):
+            tf = doc.get(term, 0)
+            if tf:
+                norm = k1 * (1 - b + b * lengths[doc_id] / average)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+    return scores
+
+
+def test_bm25_index_matches_reference(tmp_path):
+    """測試建置、記憶體映射載入後的 BM25 分數與排序和直接計算一致"""
+    meta = build_index(ENTRIES, str(tmp_path / "index"), embedding_dim=0)
+    index = KnowledgeIndex.load(str(tmp_path / "index"))
+    assert meta["documents"] == len(index) == len(ENTRIES)
+    
+    for query in ("人工智慧是什麼", "密碼忘記了怎麼重設", "退款", "python 程式語言", "客服中心營業時間"):
+        expected = _reference_scores(query)
+        hits = index.search(query, k=3)
+        assert [hit.doc_id for hit in hits] == sorted(expected, key=lambda doc_id: (-expected[doc_id], doc_id))[:3]
+        for hit in hits:
+            assert hit.score == pytest.approx(expected[hit.doc_id], rel=1e-5)
+            assert (hit.question, hit.answer) == ENTRIES[hit.doc_id]
+    
+    assert index.search("天氣晴朗") == []
+    assert index.best_match("如何重設密碼").doc_id == 1
+    assert index.best_match("如何煮咖啡") is None  # 只命中「如何」，覆蓋率不足
+    
+    print("✅ BM25 knowledge index test passed")
+
+
+def test_modules_answer_from_index(tmp_path):
+    """測試 QAModule 與 KnowledgeBaseModule 優先從知識庫索引回答，找不到時使用內建回應"""
+    build_index(ENTRIES, str(tmp_path / "index"))
+    index = KnowledgeIndex.load(str(tmp_path / "index"))
+    
+    kb_result = KnowledgeBaseModule(index).process({
+        "original_sentence": "什麼是人工智慧？",
+        "source_trace": SourceTrace(id="test-kb-index", steps=[])
+    })
+    assert kb_result["module_response"] == ENTRIES[0][1]
+    assert "entry 0" in kb_result["source_trace"].steps[0].evidence
+    
+    qa_result = QAModule(index).process({
+        "original_sentence": "我想申請退款",
+        "source_trace": SourceTrace(id="test-qa-index", steps=[])
+    })
+    assert qa_result["module_response"] == ENTRIES[2][1]
+    
+    fallback = QAModule(index).process({
+        "original_sentence": "如何學習程式設計？",
+        "source_trace": SourceTrace(id="test-qa-fallback", steps=[])
+    })
+    assert fallback["module_response"] == QAModule().process({
+        "original_sentence": "如何學習程式設計？",
+        "source_trace": SourceTrace(id="test-qa-plain", steps=[])
+    })["module_response"]
+    
+    print("✅ Knowledge index module test passed")
+
+
+def test_generic_bigrams_do_not_clear_coverage(tmp_path):
+    """測試只命中「什麼是」等常見二元組的干擾條目不會被當成答案"""
+    entries = ENTRIES + [("什麼是區塊鏈？", "區塊鏈是一種分散式帳本技術。")]
+    build_index(entries, str(tmp_path / "index"), embedding_dim=0)
+    index = KnowledgeIndex.load(str(tmp_path / "index"))
+    
+    for query in ("什麼是AI？", "什麼是GPU", "如何煮咖啡"):
+        hits = index.search(query, k=1)
+        assert hits == [] or hits[0].coverage < 0.5, query
+        assert index.best_match(query) is None, query
+    assert index.best_match("什麼是區塊鏈").doc_id == len(entries) - 1
+    assert index.best_match("如何重設密碼").doc_id == 1
+    
+    result = KnowledgeBaseModule(index).process({
+        "original_sentence": "什麼是GPU？",
+        "source_trace": SourceTrace(id="test-kb-distractor", steps=[])
+    })
+    assert result["module_response"] != entries[-1][1]
+    
+    print("✅ Generic bigram coverage test passed")
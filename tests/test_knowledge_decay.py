@@ -0,0 +1,64 @@
+# file: tests/test_knowledge_decay.py
+import threading
+import time
+
+import numpy as np
+
+from src.core.knowledge_decay import KnowledgeDecay
+from src.core.knowledge_graph import KnowledgeGraph
+
+
+def test_decay_is_elapsed_time_exponential_and_prunes():
+    """測試可信度依經過時間指數衰減、最近存取的節點只從存取時間起算，並剪除低於門檻的節點與邊"""
+    graph = KnowledgeGraph()
+    decay = KnowledgeDecay(graph, period_s=10.0, min_confidence=0.15, min_edge_weight=0.5)
+    start = decay.last_run
+    
+    stale = graph.add_node("stale", "x", confidence=0.8, decay_factor=0.5)
+    fresh = graph.add_node("fresh", "x", confidence=0.8, decay_factor=0.5)
+    fixed = graph.add_node("fixed", "x", confidence=0.8, decay_factor=1.0)
+    graph.column("last_accessed")[:] = start - 100
+    graph.column("last_accessed")[fresh] = start + 10
+    graph.connect(stale, fixed, 0.8)
+    graph.connect(fresh, fixed, 0.8)
+    
+    # stale 衰減兩個週期、fresh 從存取時間起只衰減一個週期、fixed 不衰減
+    result = decay.run(now=start + 20)
+    assert np.allclose(graph.column("confidence"), [0.2, 0.4, 0.8])
+    assert (result["nodes_pruned"], result["edges_pruned"]) == (0, 1)
+    assert graph.edge_weight(stale, fixed) is None  # 0.8 * sqrt(0.25) = 0.4 < 0.5
+    assert np.isclose(graph.edge_weight(fresh, fixed), 0.8 * np.sqrt(0.5))
+    
+    result = decay.run(now=start + 30)
+    assert (result["nodes_pruned"], result["edges_pruned"]) == (1, 1)
+    assert graph.concept_index == {"fresh": 0, "fixed": 1}
+    assert np.allclose(graph.column("confidence"), [0.2, 0.8])
+    assert graph.connection_count == 0
+    assert decay.stats["runs"] == 2 and decay.stats["nodes_pruned"] == 1 and decay.stats["edges_pruned"] == 2
+    
+    print("✅ Knowledge decay test passed")
+
+
+def test_scheduled_decay_runs_under_lock():
+    """測試背景排程在指定的鎖內執行衰減，並可停止"""
+    graph = KnowledgeGraph()
+    graph.add_node("concept", "x", confidence=0.9)
+    decay = KnowledgeDecay(graph, period_s=3600.0)
+    lock = threading.RLock()
+    
+    with lock:
+        decay.start(0.01, lock)
+        time.sleep(0.05)
+        assert decay.stats["runs"] == 0  # 持有鎖期間不會執行
+    
+    deadline = time.time() + 5
+    while decay.stats["runs"] == 0 and time.time() < deadline:
+        time.sleep(0.01)
+    decay.close()
+    
+    stats = decay.get_stats()
+    assert stats["runs"] >= 1 and stats["errors"] == 0
+    assert stats["scheduled"] is False
+    assert len(graph) == 1
+    
+    print("✅ Scheduled knowledge decay test passed")
@@ -0,0 +1,111 @@
+# file: tests/test_knowledge_embedding.py
+import random
+
+import numpy as np
+
+from src.core.knowledge_corpus import KnowledgeIndex, build_index
+from src.core.knowledge_embedding import hash_vectors
+from src.core.qa_module import QAModule
+from src.schemas.source_trace import SourceTrace
+
+ENTRIES = [
+    ("什麼是人工智慧？", "人工智慧是模擬人類智能的技術，包括機器學習與深度學習。"),
+    ("如何重設密碼？", "請在登入頁面點選「忘記密碼」，依照郵件指示設定新密碼。"),
+    ("如何申請退款？", "請到訂單頁面選擇申請退款，款項會在七個工作天內退回。"),
+    ("客服中心在哪裡？", "客服中心位於總公司一樓，營業時間為上午九點到下午六點。"),
+    ("What is Python?", "Python 是一種廣泛使用的程式語言。"),
+]
+
+
+def test_flat_and_ivf_search_match_brute_force(tmp_path):
+    """測試全量掃描與 IVF 探測全部聚類的結果都和直接計算的餘弦相似度一致"""
+    rng = random.Random(5)
+    chars = [chr(code) for code in range(0x4E00, 0x4E00 + 300)]
+    entries = [("".join(rng.choices(chars, k=6)), "".join(rng.choices(chars, k=20))) for _ in range(400)]
+    build_index(entries, str(tmp_path / "flat"), embedding_dim=64)
+    build_index(entries, str(tmp_path / "ivf"), embedding_dim=64, nlist=8, nprobe=2)
+    flat = KnowledgeIndex.load(str(tmp_path / "flat"))
+    ivf = KnowledgeIndex.load(str(tmp_path / "ivf"))
+    
+    idf = np.load(str(tmp_path / "flat" / "embedding_idf.npy"))
+    documents = hash_vectors([question + "\n" + answer for question, answer in entries], 64) * idf
+    documents /= np.linalg.norm(documents, axis=1, keepdims=True)
+    queries = [entries[i][0][:4] + "嗎" for i in range(0, 400, 40)]
+    
+    flat_hits = flat.search_similar(queries, k=5)
+    ivf_hits = ivf.search_similar(queries, k=5, nprobe=8)
+    for query, hits, probed in zip(queries, flat_hits, ivf_hits):
+        vector = flat.embeddings.embed([query])[0]
+        expected = np.argsort(-(documents @ vector), kind="stable")[:5]
+        assert [hit.doc_id for hit in hits] == expected.tolist()
+        assert np.allclose([hit.score for hit in hits], (documents @ vector)[expected], atol=1e-5)
+        assert [hit.doc_id for hit in probed] == expected.tolist()
+        assert all(hit.method == "cosine" for hit in hits)
+    
+    # 只探測部分聚類時結果是全量掃描的子集
+    partial = ivf.search_similar(queries, k=5)
+    assert all(len(hits) == 5 for hits in partial)
+    assert ivf.embeddings.nprobe == 2 and ivf.meta["embedding"]["nlist"] == 8
+    
+    print("✅ Embedding index search test passed")
+
+
+def test_paraphrase_falls_back_to_vector_search(tmp_path):
+    """測試詞面覆蓋不足的改寫問法由向量檢索回答，無關問題與停用向量索引時使用內建回應"""
+    build_index(ENTRIES, str(tmp_path / "index"))
+    build_index(ENTRIES, str(tmp_path / "lexical"), embedding_dim=0)
+    index = KnowledgeIndex.load(str(tmp_path / "index"))
+    lexical = KnowledgeIndex.load(str(tmp_path / "lexical"))
+    
+    assert index.search("密碼忘記了怎麼辦", k=1)[0].coverage < 0.5
+    hit = index.best_match("密碼忘記了怎麼辦")
+    assert hit.doc_id == 1 and hit.method == "cosine"
+    assert index.best_match("今天天氣如何") is None
+    assert lexical.embeddings is None and lexical.best_match("密碼忘記了怎麼辦") is None
+    
+    def answer(knowledge_index, sentence):
+        return QAModule(knowledge_index).process({
+            "original_sentence": sentence,
+            "source_trace": SourceTrace(id="test-embedding", steps=[])
+        })
+    
+    result = answer(index, "密碼忘記了怎麼辦")
+    assert result["module_response"] == ENTRIES[1][1]
+    assert "cosine=" in result["source_trace"].steps[0].evidence
+    assert answer(lexical, "密碼忘記了怎麼辦")["module_response"] != ENTRIES[1][1]
+    
+    print("✅ Embedding paraphrase fallback test passed")
+
+
+def test_process_batch_searches_vectors_once(tmp_path, monkeypatch):
+    """測試批次處理把詞面檢索沒有答案的句子合併成一次向量檢索，結果與逐筆處理一致"""
+    build_index(ENTRIES, str(tmp_path / "index"))
+    index = KnowledgeIndex.load(str(tmp_path / "index"))
+    calls = []
+    search_similar = index.search_similar
+    
+    def counting_search_similar(queries, k=5, nprobe=None):
+        calls.append(list(queries))
+        return search_similar(queries, k, nprobe)
+    
+    monkeypatch.setattr(index, "search_similar", counting_search_similar)
+    sentences = [ENTRIES[0][0], "密碼忘記了怎麼辦", "今天天氣如何", ENTRIES[2][0]]
+    
+    def router_outputs():
+        return [
+            {"original_sentence": sentence, "source_trace": SourceTrace(id=f"test-batch-{i}", steps=[])}
+            for i, sentence in enumerate(sentences)
+        ]
+    
+    module = QAModule(index)
+    expected = [module.process(router_output)["module_response"] for router_output in router_outputs()]
+    calls.clear()
+    
+    results = module.process_batch(router_outputs())
+    assert calls == [["密碼忘記了怎麼辦", "今天天氣如何"]]
+    assert [result["module_response"] for result in results] == expected
+    assert results[1]["module_response"] == ENTRIES[1][1]
+    assert "cosine=" in results[1]["source_trace"].steps[0].evidence
+    assert all(len(result["source_trace"].steps) == 1 for result in results)
+    
+    print("✅ Embedding batch search test passed")
@@ -0,0 +1,64 @@
+# file: tests/test_knowledge_graph.py
+import random
+
+import numpy as np
+
+from src.core.knowledge_graph import KnowledgeGraph
+
+
+def test_incremental_edges_match_reference_after_merges():
+    """測試增量緩衝區與 CSR 合併後的鄰居、權重與度數和參考字典一致"""
+    rng = random.Random(11)
+    graph = KnowledgeGraph(initial_capacity=4, merge_threshold=32)
+    reference = {}
+    
+    for step in range(400):
+        if len(graph) < 60 and (len(graph) < 2 or rng.random() < 0.3):
+            row = graph.add_node(f"concept-{len(graph)}", "content")
+            reference[row] = {}
+            continue
+        a, b = rng.sample(range(len(graph)), 2)
+        weight = rng.uniform(0.1, 0.9)
+        created = graph.connect(a, b, weight)
+        assert created == (b not in reference[a])
+        for source, target in ((a, b), (b, a)):
+            current = reference[source].get(target)
+            reference[source][target] = weight if current is None else 1 - (1 - current) * (1 - weight)
+    
+    assert graph.merges > 0
+    degrees = graph.degrees()
+    for row, expected in reference.items():
+        neighbors, weights = graph.neighbors(row)
+        assert sorted(neighbors.tolist()) == sorted(expected)
+        assert np.allclose([expected[target] for target in neighbors.tolist()], weights, rtol=1e-5)
+        assert list(weights) == sorted(weights, reverse=True)
+        assert degrees[row] == len(expected)
+    assert graph.connection_count == sum(len(targets) for targets in reference.values()) // 2
+    
+    print("✅ Knowledge graph incremental edge test passed")
+
+
+def test_bulk_edges_and_node_view():
+    """測試批次載入邊時去除重複與自環，並以 Mapping 介面取得 KnowledgeNode"""
+    graph = KnowledgeGraph()
+    for name in ("a", "b", "c", "d"):
+        graph.add_node(name, f"{name} content", domain="letters" if name != "d" else "other")
+    
+    graph.connect(0, 1, 0.5)
+    graph.add_edges([0, 1, 2, 3], [1, 2, 2, 0], [0.2, 0.7, 0.9, 0.4])
+    
+    assert graph.edge_weight(0, 1) == np.float32(0.5)  # 重複的邊保留較大權重
+    assert graph.edge_weight(2, 2) is None
+    assert graph.connection_count == 3
+    assert graph.degree_stats() == {"mean": 1.5, "max": 2, "median": 1.5, "isolated": 0}
+    assert graph.domain_distribution() == {"letters": 3, "other": 1}
+    
+    neighbors, weights = graph.neighbors(graph.row_of("a"), limit=1)
+    assert neighbors.tolist() == [1]
+    
+    node = graph[graph.node_ids[0]]
+    assert node.concept == "a"
+    assert node.connections == {graph.node_ids[1]: 0.5, graph.node_ids[3]: np.float32(0.4)}
+    assert len(graph) == 4 and graph.node_ids[3] in graph
+    
+    print("✅ Knowledge graph bulk edge test passed")
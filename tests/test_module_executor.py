@@ -0,0 +1,141 @@
+# file: tests/test_module_executor.py
+import threading
+import time
+from src.core.module_executor import ModuleExecutor
+from src.core.default_handler_module import DefaultHandlerModule
+from src.core.gratitude_handler_module import GratitudeHandlerModule
+from src.schemas.source_trace import TraceRecorder, TraceStatus, TrustLevel
+
+
+class SlowModule:
+    """在測試釋放前一直阻塞的功能模組"""
+    
+    def __init__(self):
+        self.release = threading.Event()
+        self.finished = threading.Event()
+    
+    def process_batch(self, router_outputs):
+        if any(router_output["original_sentence"] != "快" for router_output in router_outputs):
+            self.release.wait(5)
+        for router_output in router_outputs:
+            router_output["source_trace"].record_step(
+                tool="core.SlowModule.v0.1",
+                status=TraceStatus.SUCCESS,
+                evidence="late result",
+                trust_level=TrustLevel.A,
+                latency_ms=5000
+            )
+        self.finished.set()
+        return router_outputs
+
+
+class SlowVowModule:
+    """超過期限才完成、並會保存誓言的誓言檢查模組"""
+    
+    def __init__(self):
+        self.saved = []
+    
+    def process_vow_batch(self, router_outputs):
+        time.sleep(0.2)
+        for router_output in router_outputs:
+            self.saved.append(router_output["original_sentence"])
+            router_output["module_response"] = "vow recorded"
+        return router_outputs
+
+
+def _router_output(next_module, timeout_ms, sentence="測試句子"):
+    trace = TraceRecorder("executor-trace")
+    trace.record_step(tool="core.ToneBridge.v0.1", status=TraceStatus.SUCCESS, evidence="bridge",
+                      trust_level=TrustLevel.C, latency_ms=1)
+    return {
+        "original_sentence": sentence,
+        "next_strategy": {"next_module": next_module, "priority": "medium", "timeout_ms": timeout_ms},
+        "source_trace": trace
+    }
+
+
+def test_timeout_falls_back_to_default_handler():
+    """測試模組逾時時回退到預設處理模組並記錄 FAIL 步驟"""
+    slow = SlowModule()
+    executor = ModuleExecutor({"slow_module": slow, "default_handler_module": DefaultHandlerModule()})
+    router_output = _router_output("slow_module", 50)
+    
+    result = executor.dispatch("slow_module", [router_output])[0]
+    
+    assert result["processing_status"] == "default_processed"
+    tools = [step.tool for step in result["source_trace"].steps]
+    assert tools == ["core.ToneBridge.v0.1", "core.ModuleExecutor.v0.1", "core.DefaultHandlerModule.v0.1"]
+    fail_step = result["source_trace"].steps[1]
+    assert fail_step.status == TraceStatus.FAIL
+    assert fail_step.latency_ms >= 50
+    assert "slow_module" in fail_step.evidence
+    
+    # 逾時後才完成的模組不會修改原本的追溯鏈
+    slow.release.set()
+    assert slow.finished.wait(5)
+    assert len(router_output["source_trace"].steps) == 3
+    
+    stats = executor.get_stats()
+    assert stats["timeouts"] == 1
+    assert stats["timeouts_by_module"] == {"slow_module": 1}
+    executor.shutdown()
+    
+    print("✅ Module timeout fallback test passed")
+
+
+def test_dispatch_within_deadline_and_unknown_module():
+    """測試期限內完成的模組正常返回，未知模組回退到預設處理模組"""
+    executor = ModuleExecutor({
+        "gratitude_handler_module": GratitudeHandlerModule(),
+        "default_handler_module": DefaultHandlerModule()
+    })
+    
+    result = executor.dispatch("gratitude_handler_module", [_router_output("gratitude_handler_module", 1500)])[0]
+    assert result["source_trace"].steps[-1].tool == "core.GratitudeHandlerModule.v0.1"
+    assert result["source_trace"].steps[-1].status == TraceStatus.SUCCESS
+    
+    result = executor.dispatch("missing_module", [_router_output("missing_module", 1500)])[0]
+    assert result["processing_status"] == "default_processed"
+    assert executor.get_stats()["timeouts"] == 0
+    executor.shutdown()
+    
+    print("✅ Module dispatch test passed")
+
+
+def test_deadline_applies_per_request():
+    """測試同一批請求各自計時，只有逾時的請求回退"""
+    slow = SlowModule()
+    executor = ModuleExecutor({"slow_module": slow, "default_handler_module": DefaultHandlerModule()})
+    router_outputs = [
+        _router_output("slow_module", 50, "快"),
+        _router_output("slow_module", 50, "慢"),
+        _router_output("slow_module", 50, "快"),
+    ]
+    
+    results = executor.dispatch("slow_module", router_outputs)
+    
+    assert [result["original_sentence"] for result in results] == ["快", "慢", "快"]
+    assert [result["source_trace"].steps[-1].tool for result in results] == [
+        "core.SlowModule.v0.1", "core.DefaultHandlerModule.v0.1", "core.SlowModule.v0.1"
+    ]
+    assert results[1]["source_trace"].steps[1].status == TraceStatus.FAIL
+    assert executor.get_stats()["timeouts"] == 1
+    slow.release.set()
+    executor.shutdown()
+    
+    print("✅ Per-request deadline test passed")
+
+
+def test_vow_checker_is_not_timed_out():
+    """測試有副作用的誓言檢查模組不套用期限，回應與保存的誓言一致"""
+    vow_module = SlowVowModule()
+    executor = ModuleExecutor({"vow_checker_module": vow_module, "default_handler_module": DefaultHandlerModule()})
+    
+    result = executor.dispatch("vow_checker_module", [_router_output("vow_checker_module", 50, "我承諾明天完成")])[0]
+    
+    assert result["module_response"] == "vow recorded"
+    assert vow_module.saved == ["我承諾明天完成"]
+    assert executor.get_stats()["timeouts"] == 0
+    executor.shutdown()
+    
+    print("✅ Vow checker deadline exemption test passed")
@@ -0,0 +1,57 @@
+# file: tests/test_ndjson_stream.py
+import asyncio
+import json
+from src.core.ndjson_stream import NDJSONStreamProcessor, iter_lines, parse_line
+
+
+async def _chunks(parts):
+    for part in parts:
+        yield part
+
+
+async def _collect(iterator):
+    return [item async for item in iterator]
+
+
+def test_line_splitting_and_parsing():
+    """測試跨區塊切行、過長行與各種行格式的解析"""
+    parts = [b"first\nsec", b"ond\n", b"x" * 20, b"y\nlast"]
+    lines = asyncio.run(_collect(iter_lines(_chunks(parts), max_line_bytes=16)))
+    assert lines == [b"first", b"second", None, b"last"]
+    
+    assert parse_line("  你好  \r".encode("utf-8")) == ("你好", None)
+    assert parse_line(b'"quoted"') == ("quoted", None)
+    assert parse_line(json.dumps({"sentence": "句子", "trace_id": "t-1"}).encode("utf-8")) == ("句子", "t-1")
+    for bad in [b'{"trace_id": "t"}', b'{"sentence": 1}', b"{not json", "長" .encode("utf-8") * 501]:
+        try:
+            parse_line(bad)
+            assert False, f"{bad!r} should be rejected"
+        except ValueError:
+            pass
+    
+    print("✅ NDJSON line parsing test passed")
+
+
+def test_processor_keeps_order_and_bounds_batches():
+    """測試串流處理依輸入順序輸出、錯誤行不中斷串流，且每批不超過 batch_size"""
+    batch_sizes = []
+    
+    def process_batch(sentences, trace_ids):
+        batch_sizes.append(len(sentences))
+        return {"results": [{"success": True, "original_sentence": s, "trace_id": t} for s, t in zip(sentences, trace_ids)]}
+    
+    processor = NDJSONStreamProcessor(process_batch, batch_size=3, max_buffered_lines=2)
+    body = [f"句子{i}\n".encode("utf-8") for i in range(10)]
+    body.insert(4, b"\n{broken\n")
+    body.append(b'{"sentence": "last", "trace_id": "trace-last"}')
+    
+    output = b"".join(asyncio.run(_collect(processor.process(_chunks(body)))))
+    records = [json.loads(line) for line in output.decode("utf-8").splitlines()]
+    
+    assert [record["line"] for record in records] == [1, 2, 3, 4, 6, 7, 8, 9, 10, 11, 12, 13]
+    assert records[4] == {"success": False, "line": 6, "error": records[4]["error"]}
+    assert [r["original_sentence"] for r in records if r["success"]][:4] == ["句子0", "句子1", "句子2", "句子3"]
+    assert records[-1]["trace_id"] == "trace-last"
+    assert max(batch_sizes) <= 3 and sum(batch_sizes) == 11
+    
+    print("✅ NDJSON stream processor test passed")
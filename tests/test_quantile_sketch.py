@@ -0,0 +1,80 @@
+# file: tests/test_quantile_sketch.py
+import math
+import random
+from src.core.quantile_sketch import DDSketch, LatencyMetrics, QuantileRegistry
+from src.schemas.source_trace import TraceRecorder, TraceStatus, TrustLevel
+
+
+def test_quantiles_within_relative_accuracy():
+    """測試分位數估計值在相對誤差範圍內"""
+    rng = random.Random(7)
+    sketch = DDSketch(relative_accuracy=0.01)
+    values = sorted(rng.lognormvariate(3, 1.5) for _ in range(20000))
+    for value in values:
+        sketch.add(value)
+    
+    for q in (0.5, 0.9, 0.95, 0.99):
+        expected = values[int(q * (len(values) - 1))]
+        assert abs(sketch.quantile(q) - expected) <= expected * 0.01 + 1e-9
+    
+    assert sketch.count == len(values)
+    assert sketch.quantile(0.0) == values[0]
+    assert sketch.quantile(1.0) == values[-1]
+    assert DDSketch().quantile(0.5) is None
+    
+    print("✅ Quantile accuracy test passed")
+
+
+def test_merge_and_bounded_buckets():
+    """測試草圖合併結果與單一草圖一致，且桶數不超過上限"""
+    rng = random.Random(11)
+    values = [rng.expovariate(0.01) for _ in range(5000)] + [0.0] * 100
+    
+    whole = DDSketch()
+    left, right = DDSketch(), DDSketch()
+    for index, value in enumerate(values):
+        whole.add(value)
+        (left if index % 2 else right).add(value)
+    left.merge(right)
+    
+    summary = whole.summary()
+    merged = left.summary()
+    assert math.isclose(merged.pop("mean"), summary.pop("mean"))
+    assert merged == summary
+    assert set(summary) == {"count", "min", "max", "p50", "p95", "p99"}
+    
+    # 桶數上限只犧牲低分位數，尾端估計值維持精確
+    bounded = DDSketch(max_buckets=32)
+    for value in values:
+        bounded.add(value)
+    assert len(bounded._bins) <= 32
+    assert abs(bounded.quantile(0.99) - whole.quantile(0.99)) <= whole.quantile(0.99) * 1e-9
+    
+    registry = QuantileRegistry()
+    registry.record("core.ToneBridge.v0.1", 3)
+    registry.record("core.ToneBridge.v0.1", 5)
+    snapshot = registry.snapshot()
+    assert snapshot["core.ToneBridge.v0.1"]["count"] == 2
+    assert snapshot["core.ToneBridge.v0.1"]["max"] == 5
+    
+    print("✅ Sketch merge test passed")
+
+
+def test_latency_metrics_keep_sub_millisecond_durations():
+    """測試延遲統計使用未捨去的步驟耗時，次毫秒的階段不會全部記成 0"""
+    metrics = LatencyMetrics()
+    for i in range(200):
+        trace = TraceRecorder(f"trace-{i}")
+        trace.record_step(tool="core.ToneBridge.v0.1", status=TraceStatus.SUCCESS, evidence="bridge",
+                          trust_level=TrustLevel.C, latency_ms=0.05 + i / 1000)
+        metrics.record(trace.steps, "appreciation", 0.4 + i / 1000)
+    
+    assert trace.steps[0].latency_ms == 0
+    assert trace.to_source_trace().model_dump()["steps"][0]["latency_ms"] == 0
+    snapshot = metrics.snapshot()
+    stage = snapshot["stages"]["core.ToneBridge.v0.1"]
+    assert stage["count"] == 200
+    assert 0.1 < stage["p50"] < 0.2 and stage["max"] > stage["p50"] > 0
+    assert snapshot["tone_functions"]["appreciation"]["p50"] > 0.4
+    
+    print("✅ Sub-millisecond latency metrics test passed")
@@ -0,0 +1,126 @@
+# file: tests/test_response_templates.py
+import json
+
+import pytest
+
+from src.core.empathy_module import EmpathyModule
+from src.core.keyword_automaton import KeywordAutomaton, get_keyword_automaton, scan_keywords, shared_keyword_tables
+from src.core.response_templates import RESPONSE_TEMPLATES, TemplateTable, get_template_table, load_response_templates
+from src.schemas.source_trace import SourceTrace
+
+
+def test_large_rule_table_selects_highest_priority_hit():
+    """測試數千條規則時仍依優先序選出命中規則的預建回應，且不合法的設定會被拒絕"""
+    rules = [{"name": f"rule{i}", "keywords": [f"關鍵{i:04d}"], "response": f"回應{i}"} for i in range(5000)]
+    table = TemplateTable({"BulkModule": {"prefix": "bulk", "default": "預設", "rules": rules}})
+    templates = table["BulkModule"]
+    automaton = KeywordAutomaton(table.keyword_tables())
+    
+    assert len(templates) == 5000
+    assert templates.select(automaton.scan("先說關鍵4321再說關鍵0042")) == "回應42"
+    assert templates.select(automaton.scan("關鍵4999")) == "回應4999"
+    assert templates.select(automaton.scan("沒有命中")) == "預設"
+    
+    with pytest.raises(ValueError):
+        TemplateTable({"BulkModule": {"prefix": "bulk", "default": "預設", "rules": rules[:2] + rules[:1]}})
+    with pytest.raises(ValueError):
+        TemplateTable({"BulkModule": {"prefix": "bulk", "rules": rules}})
+    
+    print("✅ Large template table test passed")
+
+
+def test_module_uses_configured_templates(tmp_path):
+    """測試從 JSON 設定檔取代單一模組的模板，其他模組沿用預設值"""
+    config = tmp_path / "templates.json"
+    config.write_text(json.dumps({
+        "EmpathyModule": {
+            "prefix": "empathy",
+            "default": "我在這裡陪您。",
+            "rules": [
+                {"name": "tired", "keywords": ["好累"], "response": "辛苦了，先好好休息一下。"},
+                {"name": "sadness", "keywords": ["難過"], "response": "難過的時候可以慢慢說。"},
+            ]
+        }
+    }, ensure_ascii=False), encoding="utf-8")
+    
+    templates = load_response_templates(str(config))
+    assert templates["GratitudeHandlerModule"] == RESPONSE_TEMPLATES["GratitudeHandlerModule"]
+    table = TemplateTable(templates)
+    module = EmpathyModule(templates=table)
+    
+    # 路由附帶的是共用自動機的命中，其中沒有自訂規則的分類，模組須自行掃描
+    def respond(sentence):
+        return module.process({
+            "original_sentence": sentence,
+            "keyword_hits": scan_keywords(sentence),
+            "source_trace": SourceTrace(id="test-templates", steps=[])
+        })["module_response"]
+    
+    assert respond("今天好累又難過") == "辛苦了，先好好休息一下。"
+    assert respond("我很難過") == "難過的時候可以慢慢說。"
+    assert respond("我很焦慮") == "我在這裡陪您。"
+    assert EmpathyModule().process({
+        "original_sentence": "我很焦慮",
+        "source_trace": SourceTrace(id="test-default-templates", steps=[])
+    })["module_response"] == RESPONSE_TEMPLATES["EmpathyModule"]["rules"][2]["response"]
+    
+    print("✅ Configured template test passed")
+
+
+def test_overridden_rules_leave_shared_automaton(tmp_path, monkeypatch):
+    """測試設定檔取代的預設規則不會留在共用自動機中"""
+    config = tmp_path / "templates.json"
+    config.write_text(json.dumps({
+        "EmpathyModule": {
+            "prefix": "empathy",
+            "default": "我在這裡陪您。",
+            "rules": [{"name": "tired", "keywords": ["好累"], "response": "辛苦了，先好好休息一下。"}]
+        }
+    }, ensure_ascii=False), encoding="utf-8")
+    monkeypatch.setenv("TONESOUL_RESPONSE_TEMPLATES", str(config))
+    get_template_table.cache_clear()
+    get_keyword_automaton.cache_clear()
+    try:
+        hits = scan_keywords("今天好累，我很焦慮")
+        assert "empathy.tired" in hits
+        assert "empathy.anxiety" not in hits
+        assert EmpathyModule().process({
+            "original_sentence": "我很焦慮",
+            "source_trace": SourceTrace(id="test-overridden-templates", steps=[])
+        })["module_response"] == "我在這裡陪您。"
+    finally:
+        monkeypatch.delenv("TONESOUL_RESPONSE_TEMPLATES")
+        get_template_table.cache_clear()
+        get_keyword_automaton.cache_clear()
+    
+    print("✅ Overridden template rules test passed")
+
+
+def test_colliding_template_categories_are_rejected(tmp_path, monkeypatch):
+    """測試模板規則的分類名稱與核心分類或其他模組重複時拋出 ValueError，而不是默默取代"""
+    config = tmp_path / "templates.json"
+    config.write_text(json.dumps({
+        "EmpathyModule": {
+            "prefix": "classifier",
+            "default": "我在這裡陪您。",
+            "rules": [{"name": "vow", "keywords": ["好累"], "response": "辛苦了。"}]
+        }
+    }, ensure_ascii=False), encoding="utf-8")
+    monkeypatch.setenv("TONESOUL_RESPONSE_TEMPLATES", str(config))
+    get_template_table.cache_clear()
+    try:
+        with pytest.raises(ValueError, match="classifier.vow"):
+            shared_keyword_tables()
+    finally:
+        monkeypatch.delenv("TONESOUL_RESPONSE_TEMPLATES")
+        get_template_table.cache_clear()
+    
+    table = TemplateTable({
+        "EmpathyModule": RESPONSE_TEMPLATES["EmpathyModule"],
+        "OtherModule": {"prefix": "empathy", "default": "預設",
+                        "rules": [{"name": "sadness", "keywords": ["哭"], "response": "別哭。"}]}
+    })
+    with pytest.raises(ValueError, match="empathy.sadness"):
+        table.keyword_tables()
+    
+    print("✅ Colliding template category test passed")
@@ -0,0 +1,72 @@
+# file: tests/test_result_cache.py
+import time
+from src.core.result_cache import ResultCache, normalize_sentence
+from src.core.tone_function_classifier import ToneFunction
+from src.schemas.source_trace import TraceRecorder, TraceStatus, TrustLevel
+
+
+def _final_output(next_module, status=TraceStatus.SUCCESS):
+    trace = TraceRecorder("original-trace")
+    trace.record_step(tool="core.ToneBridge.v0.1", status=TraceStatus.SUCCESS, evidence="bridge",
+                      trust_level=TrustLevel.C, latency_ms=1)
+    trace.record_step(tool="core.TestModule.v0.1", status=status, evidence="module",
+                      trust_level=TrustLevel.B, latency_ms=1)
+    return {
+        "original_sentence": "謝謝你",
+        "intent_type": "statement",
+        "tone_function": ToneFunction.APPRECIATION,
+        "next_strategy": {"next_module": next_module, "priority": "low", "timeout_ms": 1000},
+        "module_response": "不客氣！",
+        "processing_status": "gratitude_processed",
+        "source_trace": trace
+    }
+
+
+def test_hit_replays_result_on_fresh_trace():
+    """測試命中時以新的追溯鏈重播結果並記錄 core.ResultCache 步驟"""
+    cache = ResultCache(max_entries=10, ttl_seconds=60)
+    key = normalize_sentence("  謝謝你 ")
+    assert key == "謝謝你"
+    
+    assert cache.get(key) is None
+    assert cache.put(key, _final_output("gratitude_handler_module"))
+    
+    entry = cache.get(normalize_sentence("謝謝你"))
+    result = cache.replay(entry, " 謝謝你", TraceRecorder("fresh-trace"))
+    
+    assert result["original_sentence"] == " 謝謝你"
+    assert result["module_response"] == "不客氣！"
+    assert result["tone_function"] == ToneFunction.APPRECIATION
+    assert result["source_trace"].id == "fresh-trace"
+    assert [step.tool for step in result["source_trace"].steps] == ["core.ResultCache.v0.1"]
+    assert "original-trace" in result["source_trace"].steps[0].evidence
+    
+    stats = cache.get_stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["size"] == 1
+    assert stats["hit_rate"] == 0.5
+    
+    print("✅ Result cache replay test passed")
+
+
+def test_bounds_and_uncacheable_results():
+    """測試 LRU 淘汰、TTL 過期，以及誓言路由與失敗追溯鏈不被快取"""
+    cache = ResultCache(max_entries=2, ttl_seconds=60)
+    assert not cache.put("vow", _final_output("vow_checker_module"))
+    assert not cache.put("timeout", _final_output("qa_module", status=TraceStatus.FAIL))
+    assert len(cache) == 0
+    
+    cache.put("a", _final_output("qa_module"))
+    cache.put("b", _final_output("qa_module"))
+    cache.get("a")
+    cache.put("c", _final_output("qa_module"))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get_stats()["evictions"] == 1
+    
+    short = ResultCache(max_entries=2, ttl_seconds=0.01)
+    short.put("a", _final_output("qa_module"))
+    time.sleep(0.02)
+    assert short.get("a") is None
+    assert short.get_stats()["expirations"] == 1
+    
+    print("✅ Result cache bounds test passed")
@@ -0,0 +1,55 @@
+# file: tests/test_sampling_profiler.py
+import threading
+import time
+from src.core.sampling_profiler import SamplingProfiler, ProfilerBusy
+from src.core.tone_bridge import ToneBridge
+
+
+def test_profiler_attributes_samples_to_pipeline_stages():
+    """測試取樣分析器把工作執行緒的堆疊歸屬到管線階段，並輸出 collapsed-stack 格式"""
+    bridge = ToneBridge()
+    stop = threading.Event()
+    
+    def busy():
+        while not stop.is_set():
+            bridge.analyze_batch(["我需要幫忙處理這個問題"] * 50)
+    
+    worker = threading.Thread(target=busy)
+    worker.start()
+    try:
+        session = SamplingProfiler(cooldown_s=0).start(interval_ms=2)
+        time.sleep(0.3)
+        result = session.stop()
+    finally:
+        stop.set()
+        worker.join()
+    
+    assert result["ticks"] > 0
+    assert result["stages"].get("ToneBridge", 0) > 0
+    lines = result["collapsed"].splitlines()
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    bridge_stacks = [line for line in lines if line.startswith("ToneBridge;")]
+    assert bridge_stacks and "analyze_batch (tone_bridge.py:" in bridge_stacks[0]
+    
+    print("✅ Sampling profiler stage attribution test passed")
+
+
+def test_profiler_rejects_concurrent_and_cooldown_sessions():
+    """測試同時只允許一個分析工作，且結束後須等待冷卻時間"""
+    profiler = SamplingProfiler(cooldown_s=30)
+    session = profiler.start(interval_ms=5)
+    try:
+        profiler.start()
+        assert False, "concurrent session should be rejected"
+    except ProfilerBusy as e:
+        assert e.retry_after >= 1
+    session.stop()
+    
+    try:
+        profiler.start()
+        assert False, "session within the cooldown should be rejected"
+    except ProfilerBusy as e:
+        assert 0 < e.retry_after <= 30
+    assert profiler.stats == {"sessions": 1, "rejected": 2}
+    
+    print("✅ Sampling profiler rate limit test passed")
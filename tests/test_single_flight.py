@@ -0,0 +1,72 @@
+# file: tests/test_single_flight.py
+import asyncio
+import threading
+import time
+from src.core.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    """測試同鍵的並行呼叫只執行一次，且例外會傳給所有等待者"""
+    flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+    
+    def work():
+        calls.append(1)
+        release.wait(5)
+        return "result"
+    
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("key", work))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    while flight.get_stats()["coalesced"] < 4:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+    
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+    assert all(result == "result" for result, _ in results)
+    assert flight.in_flight() == 0
+    
+    # 執行完成後的呼叫會重新執行
+    assert flight.do("key", lambda: "fresh") == ("fresh", False)
+    
+    def fail():
+        raise RuntimeError("boom")
+    
+    try:
+        flight.do("key", fail)
+        assert False, "exception should propagate"
+    except RuntimeError:
+        pass
+    assert flight.get_stats() == {"executions": 3, "coalesced": 4, "in_flight": 0}
+    
+    print("✅ Single-flight coalescing test passed")
+
+
+def test_async_callers_share_execution():
+    """測試非同步呼叫者共用同一次執行，取消其中一個不影響其他呼叫者"""
+    flight = SingleFlight()
+    calls = []
+    
+    def work():
+        calls.append(1)
+        time.sleep(0.05)
+        return len(calls)
+    
+    async def run():
+        tasks = [asyncio.create_task(flight.do_async("key", work)) for _ in range(4)]
+        await asyncio.sleep(0.01)
+        tasks[1].cancel()
+        return await asyncio.gather(*tasks, return_exceptions=True)
+    
+    results = asyncio.run(run())
+    
+    assert len(calls) == 1
+    assert isinstance(results[1], asyncio.CancelledError)
+    assert [results[i] for i in (0, 2, 3)] == [(1, False), (1, True), (1, True)]
+    
+    print("✅ Async single-flight test passed")
@@ -0,0 +1,44 @@
+# file: tests/test_sliding_window.py
+import math
+import random
+from src.core.sliding_window import SlidingWindowMetric
+
+
+def test_window_sums_match_list_slices():
+    """測試各視窗的累計和與串列切片計算結果一致"""
+    rng = random.Random(3)
+    metric = SlidingWindowMetric()
+    values = []
+    
+    for _ in range(537):
+        value = rng.uniform(0, 2000)
+        metric.push(value)
+        values.append(value)
+        
+        for window in (10, 20, 50, 100):
+            expected = values[-window:]
+            assert math.isclose(metric.sum(window), sum(expected), rel_tol=1e-9, abs_tol=1e-6)
+            assert math.isclose(metric.mean(window), sum(expected) / len(expected), rel_tol=1e-9, abs_tol=1e-6)
+        
+        assert metric.last() == value
+    
+    assert len(metric) == 100
+    assert metric.count == 537
+    
+    print("✅ Sliding window sum test passed")
+
+
+def test_empty_and_partial_windows():
+    """測試資料不足時的視窗統計"""
+    metric = SlidingWindowMetric(windows=(3, 5))
+    assert len(metric) == 0
+    assert metric.mean(5) == 0.0
+    
+    for value in (1.0, 2.0):
+        metric.push(value)
+    
+    assert metric.size(5) == 2
+    assert metric.mean(5) == 1.5
+    assert metric.sum(3) == 3.0
+    
+    print("✅ Partial window test passed")
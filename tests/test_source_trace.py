@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from src.schemas.source_trace import SourceTrace, TraceStep, TraceStatus, TrustLevel
+from src.schemas.source_trace import SourceTrace, TraceRecorder, TraceStep, TraceStatus, TrustLevel
 
 
 def test_create_source_trace_successfully():
@@ -127,4 +127,66 @@ def test_data_validation_and_error_handling():
             ts=datetime.now()
         )
     
-    print("Data validation tests passed successfully!")
\ No newline at end of file
+    print("Data validation tests passed successfully!")
+
+def test_trace_recorder_converts_to_source_trace():
+    """
+    測試精簡的 TraceRecorder 能轉換成內容一致的 SourceTrace。
+    """
+    before = datetime.now()
+    recorder = TraceRecorder(id="compact-trace")
+    recorder.record_step(
+        tool="core.ToneBridge.v0.1",
+        status=TraceStatus.SUCCESS,
+        evidence="Analyzed sentence.",
+        trust_level=TrustLevel.C,
+        latency_ms=3
+    )
+    recorder.record_step(
+        tool="core.ToneFunctionClassifier.v0.1",
+        status=TraceStatus.FAIL,
+        evidence="Classification failed",
+        trust_level=TrustLevel.B,
+        latency_ms=1,
+        input_digest="sha256-abc"
+    )
+    
+    # 熱路徑上的讀取介面與 SourceTrace 一致
+    assert len(recorder.steps) == 2
+    assert recorder.steps[1].status == TraceStatus.FAIL
+    
+    source_trace = recorder.to_source_trace()
+    assert isinstance(source_trace, SourceTrace)
+    assert source_trace.id == "compact-trace"
+    assert [step.tool for step in source_trace.steps] == [step.tool for step in recorder.steps]
+    assert source_trace.steps[1].input_digest == "sha256-abc"
+    assert isinstance(source_trace.steps[0], TraceStep)
+    
+    # 單調時鐘時間戳換算成牆上時間
+    assert abs((source_trace.steps[0].ts - before).total_seconds()) < 5
+    assert source_trace.steps[0].ts <= source_trace.steps[1].ts
+    
+    # 序列化結果與 SourceTrace 相同
+    assert recorder.model_dump_json() == source_trace.model_dump_json()
+    
+    print("✅ TraceRecorder conversion test passed")
+
+
+def test_source_trace_record_step():
+    """
+    測試 SourceTrace.record_step 與 TraceRecorder 擁有相同的介面。
+    """
+    source_trace = SourceTrace(id=str(uuid.uuid4()), steps=[])
+    step = source_trace.record_step(
+        tool="core.VowChecker.v0.1",
+        status=TraceStatus.SUCCESS,
+        evidence="Created VowObject",
+        trust_level=TrustLevel.B,
+        latency_ms=2
+    )
+    
+    assert source_trace.steps == [step]
+    assert source_trace.to_source_trace() is source_trace
+    assert "core.VowChecker.v0.1" in source_trace.model_dump_json()
+    
+    print("✅ SourceTrace.record_step test passed")
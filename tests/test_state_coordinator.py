@@ -0,0 +1,167 @@
+# file: tests/test_state_coordinator.py
+import threading
+import uuid
+from datetime import datetime
+from src.core.adaptive_learning_module import AdaptiveLearningModule
+from src.core.metacognitive_module import MetacognitiveModule
+from src.core.state_coordinator import StateCoordinator, StateSyncClient, create_coordinator_server
+from src.core.vow_store import VowStore
+from src.schemas.source_trace import SourceTrace, TraceStep, TraceStatus, TrustLevel
+from src.schemas.vow_object import VowObject, VowStatus, WithdrawalConditions
+
+AUTHKEY = b"test-coordinator"
+
+
+def make_trace() -> SourceTrace:
+    return SourceTrace(
+        id=str(uuid.uuid4()),
+        steps=[
+            TraceStep(
+                tool="core.ToneBridge.v0.1",
+                status=TraceStatus.SUCCESS,
+                evidence="test",
+                trust_level=TrustLevel.B,
+                latency_ms=12,
+                ts=datetime.now()
+            )
+        ]
+    )
+
+
+class Worker:
+    """模擬一個工作行程的進化模組與誓言儲存庫"""
+    
+    def __init__(self, address, worker_id):
+        self.adaptive = AdaptiveLearningModule()
+        self.metacognitive = MetacognitiveModule()
+        self.vow_store = VowStore()
+        self.lock = threading.RLock()
+        self.sync = StateSyncClient(address, AUTHKEY, self.adaptive, self.metacognitive, self.vow_store,
+                                    lock=self.lock, worker_id=worker_id)
+    
+    def interact(self, count):
+        for _ in range(count):
+            trace = make_trace()
+            self.adaptive.process_interaction(trace, {"user_satisfaction_low": True})
+            self.metacognitive.monitor_cognitive_process(trace, {})
+    
+    def create_vow(self, commitment):
+        vow = VowObject(
+            commitment=commitment,
+            original_sentence=f"我承諾{commitment}",
+            scope=["general"],
+            withdrawal=WithdrawalConditions(conditions=["一般變更"], repair_owner="user"),
+            source_trace_id="trace-1"
+        )
+        self.vow_store.add(vow)
+        return vow
+
+
+def test_workers_share_learning_and_vow_state():
+    """測試多個工作行程透過協調者合併互動次數、學習模式、指標、信心度與誓言"""
+    server = create_coordinator_server(("127.0.0.1", 0), AUTHKEY)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    
+    first = Worker(server.address, "worker-1")
+    second = Worker(server.address, "worker-2")
+    
+    first.interact(3)
+    second.interact(5)
+    vow = first.create_vow("完成報告")
+    
+    assert first.sync.sync_now()
+    assert second.sync.sync_now()
+    assert first.sync.sync_now()
+    
+    for worker in (first, second):
+        assert worker.adaptive.system_state.total_interactions == 8
+        assert len(worker.adaptive.performance_metrics["response_time"]) == 8
+        assert worker.metacognitive.decision_confidence_sketch.count == 8
+        assert len(worker.metacognitive.decision_confidence_history) == 8
+        usage = sum(pattern.usage_count for pattern in worker.adaptive.learning_patterns.values())
+        assert usage == sum(pattern.usage_count for pattern in first.adaptive.learning_patterns.values())
+    
+    # 誓言只轉發給其他行程
+    assert second.vow_store.get(vow.id).commitment == "完成報告"
+    assert len(first.vow_store) == 1
+    
+    # 同步之後本地新增的資料在下一次同步時送出，不會重複計算
+    second.interact(2)
+    assert second.sync.sync_now()
+    assert first.sync.sync_now()
+    assert first.adaptive.system_state.total_interactions == 10
+    assert first.metacognitive.decision_confidence_sketch.count == 10
+    assert first.sync.get_stats()["workers"] == 2
+    
+    print("✅ Shared state sync test passed")
+
+
+def test_sync_failure_keeps_pending_vows():
+    """測試與協調者失聯時保留待同步的誓言"""
+    worker = Worker(("127.0.0.1", 1), "worker-offline")
+    worker.create_vow("準時交付")
+    
+    assert not worker.sync.sync_now()
+    stats = worker.sync.get_stats()
+    assert stats["failures"] == 1
+    assert stats["pending_vows"] == 1
+    
+    print("✅ Sync failure test passed")
+
+
+def test_vow_status_changes_propagate_and_converge():
+    """測試誓言狀態變更也會轉發，兩個行程同時變更同一誓言時收斂到協調者最後收到的版本"""
+    server = create_coordinator_server(("127.0.0.1", 0), AUTHKEY)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    
+    first = Worker(server.address, "worker-1")
+    second = Worker(server.address, "worker-2")
+    vow = first.create_vow("完成報告")
+    other = first.create_vow("準時交付")
+    assert first.sync.sync_now() and second.sync.sync_now()
+    
+    first.vow_store.fulfill(vow.id)
+    assert first.sync.sync_now() and second.sync.sync_now()
+    assert second.vow_store.get(vow.id).status == VowStatus.FULFILLED
+    assert [v.id for v in second.vow_store.query(status=VowStatus.FULFILLED)[1]] == [vow.id]
+    
+    # 兩邊同時變更：second 後送出，成為最新版本
+    first.vow_store.withdraw(other.id)
+    second.vow_store.fulfill(other.id)
+    assert first.sync.sync_now() and second.sync.sync_now() and first.sync.sync_now()
+    for worker in (first, second):
+        assert worker.vow_store.get(other.id).status == VowStatus.FULFILLED
+        assert worker.vow_store.query(status=VowStatus.WITHDRAWN)[0] == 0
+    
+    print("✅ Vow status propagation test passed")
+
+
+def test_vow_log_is_trimmed_below_acknowledged_cursor():
+    """測試所有行程都確認後修剪誓言更新紀錄，游標早於保留範圍的新行程仍取得全部誓言"""
+    coordinator = StateCoordinator()
+    
+    def sync(worker_id, cursor, vows=()):
+        delta = {"interactions": 0, "patterns": {}, "metrics": {}, "decision_confidence": [],
+                 "vows": list(vows), "vow_cursor": cursor}
+        return coordinator.sync(worker_id, delta)
+    
+    shared = sync("worker-1", 0, [{"id": f"vow-{i}", "status": "active"} for i in range(5)])
+    assert shared["vows"] == [] and shared["vow_cursor"] == 5
+    second = sync("worker-2", 0)
+    assert [vow["id"] for vow in second["vows"]] == [f"vow-{i}" for i in range(5)]
+    
+    # worker-1 再次更新 vow-0；同一誓言只保留最新版本
+    sync("worker-1", 5, [{"id": "vow-0", "status": "fulfilled"}])
+    assert len(coordinator.vows) == 5
+    update = sync("worker-2", 5)
+    assert update["vows"] == [{"id": "vow-0", "status": "fulfilled"}]
+    sync("worker-1", 6)
+    assert len(coordinator.vow_log) == 1   # worker-2 尚未確認序號 5
+    sync("worker-2", 6)
+    assert len(coordinator.vow_log) == 0
+    
+    late = sync("worker-3", 0)
+    assert sorted(vow["id"] for vow in late["vows"]) == [f"vow-{i}" for i in range(5)]
+    assert {vow["id"]: vow["status"] for vow in late["vows"]}["vow-0"] == "fulfilled"
+    
+    print("✅ Vow log trimming test passed")
@@ -207,4 +207,21 @@ def test_full_pipeline():
     
     print(f"✅ Full pipeline test passed: '{sentence}' -> {final_result['tone_function']}")
     print(f"   Trace ID: {final_result['source_trace'].id}")
-    print(f"   Steps: {len(final_result['source_trace'].steps)}")
\ No newline at end of file
+    print(f"   Steps: {len(final_result['source_trace'].steps)}")
+
+
+def test_classifier_batch_matches_single():
+    """測試批次分類與逐句分類結果一致"""
+    bridge = ToneBridge()
+    classifier = ToneFunctionClassifier()
+    sentences = ["我承諾完成任務。", "謝謝你！", "如何學習程式設計？", "你好", "請幫我開燈"]
+    
+    batch_results = classifier.classify_batch(bridge.analyze_batch(sentences))
+    single_results = [classifier.classify(bridge.analyze(sentence)) for sentence in sentences]
+    
+    assert [r["tone_function"] for r in batch_results] == [r["tone_function"] for r in single_results]
+    for result in batch_results:
+        assert len(result["source_trace"].steps) == 2
+        assert result["source_trace"].steps[1].tool == "core.ToneFunctionClassifier.v0.1"
+    
+    print("✅ Batch classification test passed")
\ No newline at end of file
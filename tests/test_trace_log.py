@@ -0,0 +1,157 @@
+# file: tests/test_trace_log.py
+import os
+from src.core.trace_log import TraceLog, TraceLogReader, encode_trace, decode_trace
+from src.schemas.source_trace import TraceRecorder, TraceStatus, TrustLevel
+
+
+def make_trace(trace_id: str, steps: int = 3) -> TraceRecorder:
+    trace = TraceRecorder(id=trace_id)
+    for i in range(steps):
+        trace.record_step(
+            tool=f"core.Step{i}.v0.1",
+            status=TraceStatus.SUCCESS if i % 2 == 0 else TraceStatus.FAIL,
+            evidence=f"證據 {i} for {trace_id}",
+            trust_level=TrustLevel.B,
+            latency_ms=i,
+            input_digest="sha256-abc" if i == 0 else None
+        )
+    return trace
+
+
+def test_record_round_trip():
+    """測試紀錄編碼後能還原成相同內容的 SourceTrace"""
+    trace = make_trace("round-trip")
+    record = encode_trace(trace)
+    decoded = decode_trace(record[8:])
+    
+    assert decoded.id == "round-trip"
+    assert [step.tool for step in decoded.steps] == [step.tool for step in trace.steps]
+    assert [step.status for step in decoded.steps] == [step.status for step in trace.steps]
+    assert decoded.steps[0].input_digest == "sha256-abc"
+    assert decoded.steps[1].input_digest is None
+    assert decoded.steps[1].evidence == "證據 1 for round-trip"
+    assert abs((decoded.steps[2].ts - trace.steps[2].ts).total_seconds()) < 0.001
+    
+    print("✅ Record round trip test passed")
+
+
+def test_append_lookup_and_scan(tmp_path):
+    """測試背景寫入後可依 id 查詢與依序掃描"""
+    log = TraceLog(str(tmp_path))
+    for i in range(100):
+        assert log.append(make_trace(f"trace-{i}"))
+    assert log.flush(timeout=5)
+    
+    reader = TraceLogReader(str(tmp_path))
+    assert reader.get("trace-42").steps[0].evidence == "證據 0 for trace-42"
+    assert reader.get("missing") is None
+    assert [trace.id for trace in reader.scan()] == [f"trace-{i}" for i in range(100)]
+    
+    # 同一個 reader 之後也能看見新追加的紀錄
+    log.append(make_trace("late"))
+    log.close()
+    assert reader.get("late") is not None
+    
+    stats = log.get_stats()
+    assert stats["written"] == 101
+    assert stats["commits"] <= 101
+    
+    print(f"✅ Append and lookup test passed: {stats['commits']} commits")
+
+
+def test_segment_rotation_by_size_and_time(tmp_path):
+    """測試分段檔案依大小與時間輪替"""
+    record_size = len(encode_trace(make_trace("trace-0")))
+    size_log = TraceLog(str(tmp_path / "size"), max_segment_bytes=8 + record_size * 3)
+    for i in range(10):
+        size_log.append(make_trace(f"trace-{i}"))
+    size_log.close()
+    
+    reader = size_log.reader()
+    assert len(reader.segments()) == 4
+    assert all(os.path.getsize(path) <= 8 + record_size * 3 for path in reader.segments())
+    assert [trace.id for trace in reader.scan()] == [f"trace-{i}" for i in range(10)]
+    
+    # 時間上限為 0 時每次提交都開新分段
+    time_log = TraceLog(str(tmp_path / "time"), max_segment_age=0)
+    for i in range(3):
+        time_log.append(make_trace(f"trace-{i}"))
+        time_log.flush(timeout=5)
+    time_log.close()
+    assert len(time_log.reader().segments()) == 3
+    
+    print("✅ Segment rotation test passed")
+
+
+def test_reader_ignores_torn_tail(tmp_path):
+    """測試讀取器忽略寫到一半的尾端紀錄，重新開啟的日誌接續新分段"""
+    log = TraceLog(str(tmp_path))
+    log.append(make_trace("complete"))
+    log.close()
+    
+    segment = log.reader().segments()[-1]
+    with open(segment, "ab") as f:
+        f.write(encode_trace(make_trace("torn"))[:20])
+    
+    reader = TraceLogReader(str(tmp_path))
+    assert [trace.id for trace in reader.scan()] == ["complete"]
+    assert reader.get("torn") is None
+    
+    reopened = TraceLog(str(tmp_path))
+    reopened.append(make_trace("after-restart"))
+    reopened.close()
+    assert len(reader.segments()) == 2
+    assert reader.get("after-restart") is not None
+    
+    print("✅ Torn tail test passed")
+
+
+def test_two_writers_share_directory(tmp_path):
+    """測試兩個寫入者（同一 pid）共用目錄時各寫各的分段，讀取器能查到雙方的全部紀錄"""
+    first = TraceLog(str(tmp_path))
+    second = TraceLog(str(tmp_path))
+    for i in range(20):
+        first.append(make_trace(f"first-{i}"))
+        second.append(make_trace(f"second-{i}"))
+        first.flush(timeout=5)
+        second.flush(timeout=5)
+    first.close()
+    second.close()
+    
+    reader = TraceLogReader(str(tmp_path))
+    assert len(reader.segments()) == 2
+    ids = [trace.id for trace in reader.scan()]
+    assert sorted(ids) == sorted([f"first-{i}" for i in range(20)] + [f"second-{i}" for i in range(20)])
+    assert reader.get("first-19").steps[0].evidence == "證據 0 for first-19"
+    assert reader.get("second-0").steps[0].evidence == "證據 0 for second-0"
+    
+    print("✅ Shared directory test passed")
+
+
+def test_sealed_segments_are_looked_up_by_index_file(tmp_path):
+    """測試封存的分段寫入索引檔，查詢時以索引檔定位而不在記憶體中保留 trace id"""
+    record_size = len(encode_trace(make_trace("trace-00")))
+    log = TraceLog(str(tmp_path), max_segment_bytes=8 + record_size * 4)
+    for i in range(10):
+        log.append(make_trace(f"trace-{i:02d}"))
+    log.append(make_trace("trace-03", steps=1))   # 同 id 再寫一次，查詢取最後一筆
+    assert log.flush(timeout=5)
+    
+    reader = log.reader()
+    segments = reader.segments()
+    assert len(segments) == 3
+    assert [os.path.exists(path[:-4] + ".idx") for path in segments] == [True, True, False]
+    
+    assert reader.get("trace-05").steps[0].evidence == "證據 0 for trace-05"
+    assert reader.get("missing") is None
+    assert len(reader.get("trace-03").steps) == 1
+    # 只有寫入中的分段建立記憶體索引
+    assert list(reader._indexes) == [segments[-1]]
+    
+    log.close()
+    assert os.path.exists(segments[-1][:-4] + ".idx")
+    assert len(reader.get("trace-03").steps) == 1
+    assert reader.get("trace-09") is not None
+    assert reader._indexes == {}
+    
+    print("✅ Segment index file test passed")
@@ -0,0 +1,104 @@
+# file: tests/test_vow_store.py
+import random
+from datetime import datetime, timedelta
+from src.core.vow_store import VowStore
+from src.schemas.vow_object import VowObject, VowStatus, VowPriority, WithdrawalConditions
+
+
+NOW = datetime(2025, 9, 15, 12, 0, 0)
+
+
+def make_vow(priority=VowPriority.MEDIUM, scope=None, deadline=None, trace_id="trace-1") -> VowObject:
+    return VowObject(
+        commitment="完成任務",
+        original_sentence="我承諾完成任務",
+        scope=scope or ["general"],
+        priority=priority,
+        deadline=deadline,
+        withdrawal=WithdrawalConditions(conditions=["一般變更"], repair_owner="user"),
+        source_trace_id=trace_id
+    )
+
+
+def test_query_by_secondary_indexes():
+    """測試依狀態、優先級、範圍與追溯 ID 查詢"""
+    store = VowStore()
+    high = [make_vow(VowPriority.HIGH, ["general", "time_bound"], trace_id=f"t{i}") for i in range(3)]
+    low = [make_vow(VowPriority.LOW, ["general"], trace_id="shared") for _ in range(2)]
+    for vow in high + low:
+        store.add(vow)
+    
+    total, vows = store.query(status=VowStatus.ACTIVE, priority=VowPriority.HIGH)
+    assert total == 3
+    assert [vow.id for vow in vows] == [vow.id for vow in high]
+    
+    assert store.query(scope="time_bound")[0] == 3
+    assert store.query(source_trace_id="shared", priority=VowPriority.LOW)[0] == 2
+    assert store.query(scope="time_bound", priority=VowPriority.LOW)[0] == 0
+    
+    total, vows = store.query(status=VowStatus.ACTIVE, limit=2)
+    assert total == 5 and len(vows) == 2
+    
+    # 狀態變更後索引同步更新
+    store.fulfill(high[0].id)
+    assert store.query(status=VowStatus.ACTIVE, priority=VowPriority.HIGH)[0] == 2
+    assert store.query(status=VowStatus.FULFILLED)[1] == [high[0]]
+    assert high[0].fulfilled_at is not None
+    
+    store.remove(low[0].id)
+    assert store.query(source_trace_id="shared")[0] == 1
+    assert len(store) == 4
+    
+    print("✅ Secondary index query test passed")
+
+
+def test_expire_due_uses_deadline_heap():
+    """測試過期處理只處理期限已過的生效中誓言"""
+    store = VowStore()
+    overdue = make_vow(deadline=NOW - timedelta(hours=1))
+    withdrawn = make_vow(deadline=NOW - timedelta(hours=2))
+    future = make_vow(deadline=NOW + timedelta(hours=1))
+    no_deadline = make_vow()
+    for vow in (overdue, withdrawn, future, no_deadline):
+        store.add(vow)
+    store.withdraw(withdrawn.id)
+    
+    expired = store.expire_due(now=NOW)
+    
+    assert expired == [overdue]
+    assert overdue.status == VowStatus.EXPIRED
+    assert withdrawn.status == VowStatus.WITHDRAWN
+    assert store.query(status=VowStatus.EXPIRED)[0] == 1
+    assert store.query(status=VowStatus.ACTIVE)[0] == 2
+    
+    # 再次執行不會重複處理
+    assert store.expire_due(now=NOW) == []
+    assert store.get_stats()["deadline_heap_size"] == 1
+    
+    print("✅ Expiration sweep test passed")
+
+
+def test_expiring_within_matches_full_scan():
+    """測試到期查詢與全量掃描結果一致"""
+    rng = random.Random(7)
+    store = VowStore()
+    vows = []
+    for _ in range(2000):
+        vow = make_vow(deadline=NOW + timedelta(minutes=rng.randint(-600, 6000)))
+        store.add(vow)
+        vows.append(vow)
+    for vow in rng.sample(vows, 300):
+        store.fulfill(vow.id)
+    
+    found = store.expiring_within(24, now=NOW)
+    expected = sorted(
+        (vow for vow in vows
+         if vow.status == VowStatus.ACTIVE and NOW <= vow.deadline <= NOW + timedelta(hours=24)),
+        key=lambda vow: vow.deadline
+    )
+    
+    assert [vow.deadline for vow in found] == [vow.deadline for vow in expected]
+    assert {vow.id for vow in found} == {vow.id for vow in expected}
+    assert len(store.expiring_within(24, now=NOW, limit=5)) == 5
+    
+    print(f"✅ Expiring-within test passed: {len(found)} vows")